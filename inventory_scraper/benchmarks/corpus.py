@@ -0,0 +1,157 @@
+"""
+ベンチマーク用のHTMLフィクスチャ
+fixtures/manifest.jsonに登録した保存済みのページ（サイトごとのHTML）と期待値を読み込み、
+新しいページを登録する
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+MANIFEST_PATH = FIXTURES_DIR / 'manifest.json'
+
+# scraper_config.jsonのサイト名とフィクスチャのディレクトリ名の対応
+SITE_DIRS = {
+    '楽天市場': 'rakuten',
+    'Amazon': 'amazon',
+    'メルカリSHOP': 'mercari_shops',
+    'メルカリ': 'mercari',
+    'Yahoo!オークション': 'yahoo_auction',
+    'Yahoo!ショッピング': 'yahoo_shopping'
+}
+
+# どのサイトにも該当しないページのディレクトリ名
+DEFAULT_SITE_DIR = 'default'
+
+# metaタグの文字コード指定（<meta charset="...">・<meta http-equiv="Content-Type" content="...; charset=...">）
+META_CHARSET_PATTERN = re.compile(r'(<meta[^>]*?charset=["\']?)[\w-]+', re.IGNORECASE)
+
+
+class FixturePage:
+    """保存済みのページ1件"""
+
+    def __init__(self, file: str, url: str, expected: Dict, note: str = '', base_dir: Path = FIXTURES_DIR):
+        """
+        Args:
+            file: base_dirからの相対パス
+            url: 保存元のURL（サイトの振り分けとサイト別の処理に使用する）
+            expected: 期待値（仕入れ価格・在庫ステータス）
+            note: ページの説明
+            base_dir: フィクスチャのディレクトリ（manifest.jsonのあるディレクトリ）
+        """
+        self.file = file
+        self.url = url
+        self.expected = expected
+        self.note = note
+        self.base_dir = Path(base_dir)
+
+    @property
+    def path(self) -> Path:
+        """HTMLファイルのパス"""
+        return self.base_dir / self.file
+
+    @property
+    def file_url(self) -> str:
+        """ブラウザで読み込むためのfile:// URL"""
+        return self.path.as_uri()
+
+    def read_bytes(self) -> bytes:
+        """HTMLを読み込む（文字コードはmetaタグから判定させるためバイト列のまま返す）"""
+        return self.path.read_bytes()
+
+    def to_dict(self) -> Dict:
+        """manifest.jsonに保存する辞書"""
+        entry = {'file': self.file, 'url': self.url, 'expected': self.expected}
+        if self.note:
+            entry['note'] = self.note
+        return entry
+
+
+def load_fixtures(manifest_path: Path = MANIFEST_PATH) -> List[FixturePage]:
+    """
+    登録済みのページを読み込む
+
+    Args:
+        manifest_path: manifest.jsonのパス
+
+    Returns:
+        List[FixturePage]: 登録順のページ（manifest.jsonがない場合は空）
+    """
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return []
+    return [
+        FixturePage(
+            entry['file'],
+            entry['url'],
+            entry.get('expected') or {},
+            entry.get('note', ''),
+            base_dir=Path(manifest_path).parent
+        )
+        for entry in manifest.get('pages', [])
+    ]
+
+
+def site_dir_name(site_name: Optional[str]) -> str:
+    """サイト名からフィクスチャのディレクトリ名を求める（未登録のサイトは英数字以外を_にした名前）"""
+    if not site_name:
+        return DEFAULT_SITE_DIR
+    if site_name in SITE_DIRS:
+        return SITE_DIRS[site_name]
+    return re.sub(r'[^0-9A-Za-z]+', '_', site_name).strip('_').lower() or DEFAULT_SITE_DIR
+
+
+def add_fixture(
+    markup: str,
+    url: str,
+    site_name: Optional[str],
+    expected: Dict,
+    note: str = '',
+    manifest_path: Path = MANIFEST_PATH
+) -> FixturePage:
+    """
+    ページのHTMLを保存してmanifest.jsonに登録する
+
+    同じURLが登録済みの場合は、そのページのHTMLと期待値を置き換える。
+
+    Args:
+        markup: ページのHTML（ブラウザで描画した後のDOM）
+        url: ページのURL
+        site_name: URLに該当するサイト名（該当しない場合はNone）
+        expected: 期待値（仕入れ価格・在庫ステータス）
+        note: ページの説明
+        manifest_path: manifest.jsonのパス
+
+    Returns:
+        FixturePage: 登録したページ
+    """
+    pages = load_fixtures(manifest_path)
+    existing = next((page for page in pages if page.url == url), None)
+    if existing is not None:
+        page = existing
+        page.expected = expected
+        page.note = note or page.note
+    else:
+        site_dir = site_dir_name(site_name)
+        stem = re.sub(r'[^0-9A-Za-z]+', '_', url.split('?')[0].rstrip('/').rsplit('/', 1)[-1]).strip('_') or 'page'
+        file = f"{site_dir}/{stem}.html"
+        used = {p.file for p in pages}
+        suffix = 2
+        while file in used:
+            file = f"{site_dir}/{stem}_{suffix}.html"
+            suffix += 1
+        page = FixturePage(file, url, expected, note, base_dir=Path(manifest_path).parent)
+        pages.append(page)
+
+    # UTF-8で保存するため、metaタグの文字コード（Shift_JISなど）も書き換えておく
+    markup = META_CHARSET_PATTERN.sub(r'\g<1>utf-8', markup)
+    page.path.parent.mkdir(parents=True, exist_ok=True)
+    with open(page.path, 'w', encoding='utf-8') as f:
+        f.write(markup)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump({'pages': [p.to_dict() for p in pages]}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    return page
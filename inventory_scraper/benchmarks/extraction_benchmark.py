@@ -0,0 +1,348 @@
+"""
+抽出ベンチマーク
+保存済みのページ（fixtures）に対してConfigurableScraperの価格・在庫ステータスの抽出を実行し、
+サイト別の処理速度（ページ/秒）・WebDriverの呼び出し回数・期待値との一致を表示する
+
+使い方（inventory_scraperディレクトリで実行）:
+    python benchmarks/extraction_benchmark.py                        # 静的HTMLの解析（ブラウザ不要）
+    python benchmarks/extraction_benchmark.py --mode browser         # ヘッドレスChromeでページを読み込んで抽出
+    python benchmarks/extraction_benchmark.py --save before.json     # 結果を保存
+    python benchmarks/extraction_benchmark.py --compare before.json  # 保存した結果と速度・抽出結果を比較
+    python benchmarks/extraction_benchmark.py --record URL [URL ...] # ページを保存してフィクスチャに登録
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import statistics
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# WebDriverの呼び出し回数を数えるため、計測を有効にしてから読み込む
+os.environ['SCRAPER_TIMINGS'] = 'true'
+
+from corpus import FixturePage, add_fixture, load_fixtures
+from src import instrumentation
+from src.configurable_scraper import ConfigurableScraper, ScraperConfigLoader
+from src.http_fetcher import HttpFetchResult
+from src.scraper_registry import ScraperRegistry
+
+# 期待値と比較する項目
+EXPECTED_KEYS = ('仕入れ価格', '在庫ステータス')
+
+# 実行モードごとの既定の繰り返し回数
+DEFAULT_REPEAT = {'static': 20, 'browser': 3}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='保存済みのページを使った価格・在庫ステータスの抽出ベンチマーク')
+    parser.add_argument(
+        '--mode',
+        choices=['static', 'browser', 'both'],
+        default='static',
+        help='static: 静的HTMLを解析する / browser: ヘッドレスChromeで読み込む / both: 両方（既定: static）'
+    )
+    parser.add_argument('--site', action='append', help='対象のサイト名（複数指定可、省略時はすべて）')
+    parser.add_argument('--repeat', type=int, help='1ページあたりの繰り返し回数（既定: static 20回、browser 3回）')
+    parser.add_argument('--config', type=Path, help='サイト設定ファイル（省略時はconfig/scraper_config.json）')
+    parser.add_argument('--save', type=Path, help='結果をJSONで保存する')
+    parser.add_argument('--compare', type=Path, help='--saveで保存した結果と比較する')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='ページをブラウザで開いて保存し、フィクスチャに登録する')
+    parser.add_argument('--verbose', action='store_true', help='スクレイパーのログを表示する')
+    return parser.parse_args(argv)
+
+
+def site_of(loader: ScraperConfigLoader, url: str) -> str:
+    """URLに該当するサイト名（該当しない場合は計測結果の集計と同じく「(該当なし)」）"""
+    router = loader.router
+    return router.site_name(router.route(url)) or '(該当なし)'
+
+
+@contextmanager
+def load_from_fixture(scraper: ConfigurableScraper, page: FixturePage):
+    """
+    scrape_with_browser()がpage.urlの代わりに保存したHTML（file://）を読み込むようにする
+
+    サイト別の処理（__NEXT_DATA__・メルカリSHOPなど）の判定には元のURLを使用させるため、
+    読み込むページだけを差し替える。
+    """
+    original_load_page = type(scraper).load_page
+    scraper.load_page = lambda url: original_load_page(scraper, page.file_url)
+    try:
+        yield
+    finally:
+        del scraper.load_page
+
+
+def measure_page(page: FixturePage, site: str, mode: str, extract: Callable[[], Dict], repeat: int) -> Dict:
+    """
+    1ページの抽出をrepeat回実行して計測する
+
+    Args:
+        page: 保存済みのページ
+        site: サイト名
+        mode: 実行モード
+        extract: 抽出を1回実行してスクレイピング結果を返す関数
+        repeat: 繰り返し回数
+
+    Returns:
+        Dict: 1回目の抽出結果・所要時間の中央値・1回あたりのWebDriver呼び出し回数
+    """
+    durations = []
+    result = None
+    webdriver_calls = 0
+    for _ in range(max(1, repeat)):
+        with instrumentation.track_url(page.url, site) as timing:
+            started = time.perf_counter()
+            current_result = extract()
+            durations.append(time.perf_counter() - started)
+            if timing is not None:
+                timing.result = current_result
+        if result is None:
+            result = current_result
+            webdriver_calls = timing.webdriver_calls if timing is not None else 0
+
+    actual = {key: result.get(key) for key in EXPECTED_KEYS}
+    expected = {key: page.expected.get(key) for key in EXPECTED_KEYS if key in page.expected}
+    return {
+        'file': page.file,
+        'url': page.url,
+        'site': site,
+        'mode': mode,
+        'expected': expected,
+        'actual': actual,
+        'ok': all(actual[key] == value for key, value in expected.items()),
+        'extractor': result.get('_extractor'),
+        'median_ms': round(statistics.median(durations) * 1000, 3),
+        'webdriver_calls': webdriver_calls
+    }
+
+
+def run_static(pages: List[FixturePage], loader: ScraperConfigLoader, repeat: int) -> List[Dict]:
+    """
+    保存したHTMLを静的HTMLとして解析する（http・http-then-browserの取得方式と同じ抽出処理）
+
+    Args:
+        pages: 保存済みのページ
+        loader: ScraperConfigLoaderインスタンス
+        repeat: 1ページあたりの繰り返し回数
+
+    Returns:
+        List[Dict]: ページごとの結果
+    """
+    registry = ScraperRegistry(None, loader)
+    records = []
+    for page in pages:
+        scraper = registry.get(page.url)
+        if not isinstance(scraper, ConfigurableScraper):
+            print(f"  スキップ: {page.file}（サイト設定のスクレイパーではありません）")
+            continue
+        # Content-Typeに文字コードの指定がない場合と同じく、metaタグから文字コードを判定させる
+        response = HttpFetchResult(page.url, 200, page.read_bytes(), None, 0.0)
+
+        def extract(scraper=scraper, page=page, response=response):
+            with instrumentation.stage('html_parse'):
+                return scraper.scrape_static_response(page.url, response)
+
+        records.append(measure_page(page, site_of(loader, page.url), 'static', extract, repeat))
+    return records
+
+
+def run_browser(pages: List[FixturePage], loader: ScraperConfigLoader, repeat: int) -> List[Dict]:
+    """
+    保存したHTMLをヘッドレスChromeで読み込んで抽出する（browserの取得方式と同じ抽出処理）
+
+    Args:
+        pages: 保存済みのページ
+        loader: ScraperConfigLoaderインスタンス
+        repeat: 1ページあたりの繰り返し回数
+
+    Returns:
+        List[Dict]: ページごとの結果
+    """
+    from src.browser import create_headless_scraper_browser
+
+    browser = create_headless_scraper_browser()
+    instrumentation.instrument_browser(browser)
+    try:
+        registry = ScraperRegistry(browser, loader)
+        records = []
+        for page in pages:
+            scraper = registry.get(page.url)
+            if not isinstance(scraper, ConfigurableScraper):
+                print(f"  スキップ: {page.file}（サイト設定のスクレイパーではありません）")
+                continue
+
+            def extract(scraper=scraper, page=page):
+                with load_from_fixture(scraper, page):
+                    return scraper.scrape_with_browser(page.url)
+
+            records.append(measure_page(page, site_of(loader, page.url), 'browser', extract, repeat))
+        return records
+    finally:
+        browser.quit()
+
+
+def print_report(mode: str, records: List[Dict]):
+    """サイト別の集計表と、期待値と異なるページを表示する"""
+    if not records:
+        print(f"=== 抽出ベンチマーク（{mode}）: 対象のページがありません ===")
+        return
+    by_site = defaultdict(list)
+    for record in records:
+        by_site[record['site']].append(record)
+
+    rows = [['サイト', 'ページ', '一致', 'ページ/秒', '中央値(ms/ページ)', 'WD呼出/ページ']]
+    for site, site_records in list(by_site.items()) + [('合計', records)]:
+        total_ms = sum(record['median_ms'] for record in site_records)
+        rows.append([
+            site,
+            str(len(site_records)),
+            f"{sum(record['ok'] for record in site_records)}/{len(site_records)}",
+            f"{len(site_records) * 1000 / total_ms:.1f}" if total_ms > 0 else '-',
+            f"{total_ms / len(site_records):.2f}",
+            f"{sum(record['webdriver_calls'] for record in site_records) / len(site_records):.1f}"
+        ])
+    print(f"=== 抽出ベンチマーク（{mode}） ===")
+    for line in instrumentation.format_table(rows):
+        print(line)
+
+    mismatches = [record for record in records if not record['ok']]
+    if mismatches:
+        print(f"⚠️  期待値と異なるページが{len(mismatches)}件あります:")
+        for record in mismatches:
+            print(f"  - {record['file']}: 期待値 {record['expected']} / 抽出結果 {record['actual']}")
+
+
+def compare_with_baseline(records: List[Dict], baseline_path: Path) -> bool:
+    """
+    保存した結果と比較し、サイト別の速度比と抽出結果が変わったページを表示する
+
+    Args:
+        records: 今回の結果
+        baseline_path: --saveで保存した結果のパス
+
+    Returns:
+        bool: 抽出結果が変わったページがない場合はTrue
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(record['mode'], record['file']): record for record in json.load(f).get('pages', [])}
+
+    by_site = defaultdict(lambda: [0.0, 0.0])
+    changed = []
+    for record in records:
+        before = baseline.get((record['mode'], record['file']))
+        if before is None:
+            continue
+        times = by_site[(record['mode'], record['site'])]
+        times[0] += before['median_ms']
+        times[1] += record['median_ms']
+        if before['actual'] != record['actual']:
+            changed.append((record, before))
+
+    if not by_site:
+        print(f"比較対象のページが{baseline_path}にありません")
+        return True
+    rows = [['モード', 'サイト', '変更前(ms)', '変更後(ms)', '速度比']]
+    for (mode, site), (before_ms, after_ms) in by_site.items():
+        rows.append([mode, site, f"{before_ms:.2f}", f"{after_ms:.2f}", f"{before_ms / after_ms:.2f}x" if after_ms > 0 else '-'])
+    print(f"=== 比較（{baseline_path}） ===")
+    for line in instrumentation.format_table(rows):
+        print(line)
+
+    if changed:
+        print(f"⚠️  抽出結果が変わったページが{len(changed)}件あります:")
+        for record, before in changed:
+            print(f"  - [{record['mode']}] {record['file']}: 変更前 {before['actual']} / 変更後 {record['actual']}")
+    else:
+        print("抽出結果はすべて変更前と同じです")
+    return not changed
+
+
+def record_pages(urls: List[str], loader: ScraperConfigLoader):
+    """
+    ページをブラウザ（.envのChromeプロファイル）で開いて保存し、フィクスチャに登録する
+
+    期待値には保存時の抽出結果を登録するため、ページを確認して誤っていればmanifest.jsonを修正すること。
+
+    Args:
+        urls: 保存するページのURL
+        loader: ScraperConfigLoaderインスタンス
+    """
+    from src.browser import create_browser
+
+    browser = create_browser()
+    try:
+        registry = ScraperRegistry(browser, loader)
+        for url in urls:
+            scraper = registry.get(url)
+            if isinstance(scraper, ConfigurableScraper):
+                result = scraper.scrape_with_browser(url)
+            else:
+                result = scraper.scrape(url)
+            site_name = loader.router.site_name(loader.router.route(url))
+            expected = {key: result.get(key) for key in EXPECTED_KEYS}
+            page = add_fixture(browser.page_source, url, site_name, expected)
+            print(f"保存しました: {page.file}（仕入れ価格: {expected['仕入れ価格']}, 在庫ステータス: {expected['在庫ステータス']}）")
+    finally:
+        browser.quit()
+    print("期待値は保存時の抽出結果です。ページを確認し、誤っている場合はfixtures/manifest.jsonを修正してください")
+
+
+def main(argv=None) -> int:
+    """ベンチマークを実行する（期待値・比較元と異なる結果があった場合は1を返す）"""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    # 結果を再現できるように、仕入れ元マスターは読み込まずscraper_config.jsonだけを使用する
+    loader = ScraperConfigLoader(config_path=args.config, use_spreadsheet=False)
+
+    if args.record:
+        record_pages(args.record, loader)
+        return 0
+
+    pages = load_fixtures()
+    if args.site:
+        pages = [page for page in pages if site_of(loader, page.url) in args.site]
+    if not pages:
+        print("対象のページがありません（fixtures/manifest.jsonを確認してください）")
+        return 1
+
+    modes = ['static', 'browser'] if args.mode == 'both' else [args.mode]
+    instrumentation.configure(None)
+    records: List[Dict] = []
+    for mode in modes:
+        repeat = args.repeat or DEFAULT_REPEAT[mode]
+        runner = run_static if mode == 'static' else run_browser
+        mode_records = runner(pages, loader, repeat)
+        print_report(mode, mode_records)
+        records += mode_records
+    instrumentation.print_summary()
+
+    success = all(record['ok'] for record in records)
+    if args.compare:
+        success = compare_with_baseline(records, args.compare) and success
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'modes': modes,
+                'pages': records
+            }, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存しました: {args.save}")
+    return 0 if success else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
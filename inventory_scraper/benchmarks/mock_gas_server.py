@@ -0,0 +1,549 @@
+"""
+模擬GAS Webアプリサーバー
+WebScrapingDirectUpdate.gsのdoPost（CSV・列形式・touched・idempotencyKey）と同じ契約で応答し、
+メモリ上の在庫管理シートを更新するローカルのHTTPサーバー。
+GASの処理時間（リクエストごとの起動時間・行数に比例する解析時間・ロック内の書き込み時間）を待機で再現し、
+5xx・HTMLエラーページ・遅い応答・更新後の応答の喪失を指定した割合で発生させる。
+
+使い方（inventory_scraperディレクトリで実行）:
+    python benchmarks/mock_gas_server.py --rows 10000 --error-rate 0.05
+    （表示されたURLを.envのGAS_WEB_APP_URLに設定して実行する）
+"""
+import io
+import csv
+import json
+import gzip
+import time
+import base64
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+# WebScrapingDirectUpdate.gsのCOLUMNAR_PAYLOAD_FORMATと対応
+COLUMNAR_PAYLOAD_FORMAT = 'columnar-gzip-v1'
+
+CSV_HEADERS = ['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# GASが実行時エラー・タイムアウト時に返すHTMLエラーページ（Python側は再送の対象とする）
+GAS_ERROR_HTML = """<!DOCTYPE html><html><head><link rel="shortcut icon" href="//ssl.gstatic.com/docs/script/images/favicon.ico"><title>エラー</title></head>
+<body style="margin:20px"><div><img alt="Google Apps Script" src="//ssl.gstatic.com/docs/script/images/logo.png"></div>
+<div style="text-align:center;font-family:monospace;margin:50px auto 0;max-width:600px">スクリプトが完了しましたが、何も返されませんでした。</div></body></html>
+""".encode('utf-8')
+
+
+def normalize_url(url: str) -> str:
+    """
+    在庫管理シートとCSVのURLを照合するための正規化（updateInventoryFromCsvのnormalizeUrlに倣った手順）
+
+    末尾のスラッシュを削除し、URLデコードしてからクエリパラメータを並べ替える。
+    再エンコードの結果はGASのnew URL()・URLSearchParamsと一致しない場合があるが、
+    模擬サーバーではシート側・CSV側の両方をこの関数で正規化するため照合には影響しない。
+    """
+    if not url or not isinstance(url, str):
+        return ''
+    normalized = url.strip()
+    if normalized.endswith('/'):
+        normalized = normalized[:-1]
+    normalized = unquote(normalized)
+    try:
+        parts = urlsplit(normalized)
+        if parts.scheme and parts.netloc:
+            query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+            normalized = urlunsplit((parts.scheme, parts.netloc, parts.path or '/', query, parts.fragment))
+    except ValueError:
+        pass
+    return normalized
+
+
+def decode_columnar_payload(data: str) -> List[List[str]]:
+    """
+    列形式（gzip+base64）のデータを、ヘッダー行を含むCSVと同じ形式の行データに変換する（decodeColumnarPayloadと同じ）
+
+    Args:
+        data: 列ごとの配列のJSONをgzip圧縮・base64エンコードした文字列
+
+    Returns:
+        List[List[str]]: ヘッダー行を含む行データ
+    """
+    columns = json.loads(gzip.decompress(base64.b64decode(data)).decode('utf-8'))
+    urls = columns.get('urls') or []
+    prices = columns.get('prices') or []
+    statuses = columns.get('statuses') or []
+    status_labels = columns.get('statusLabels') or []
+    offsets = columns.get('dt') or []
+    time_text = columns.get('timeText') or {}
+    base_time = datetime.strptime(columns['t0'], TIMESTAMP_FORMAT) if columns.get('t0') else None
+
+    rows = [list(CSV_HEADERS)]
+    for i, url in enumerate(urls):
+        price = prices[i] if i < len(prices) else None
+        status = statuses[i] if i < len(statuses) else None
+        offset = offsets[i] if i < len(offsets) else None
+        if str(i) in time_text:
+            last_updated = time_text[str(i)]
+        elif base_time is not None and offset is not None:
+            last_updated = (base_time + timedelta(seconds=offset)).strftime(TIMESTAMP_FORMAT)
+        else:
+            last_updated = ''
+        rows.append([
+            url,
+            '' if price is None else str(price),
+            '' if status is None else (status_labels[status] if status < len(status_labels) else ''),
+            last_updated
+        ])
+    return rows
+
+
+def append_touched_rows(rows: List[List[str]], touched: Dict[str, List[str]]) -> List[List[str]]:
+    """最終更新日時だけを更新するURLを、仕入れ価格・在庫ステータスを空欄にした行として追加する（appendTouchedRowsと同じ）"""
+    rows = rows if rows else [list(CSV_HEADERS)]
+    headers = rows[0]
+    if '仕入れ元URL' not in headers or '最終更新日時' not in headers:
+        return rows
+    url_index = headers.index('仕入れ元URL')
+    last_updated_index = headers.index('最終更新日時')
+    for last_updated, urls in touched.items():
+        for url in urls or []:
+            row = [''] * len(headers)
+            row[url_index] = url
+            row[last_updated_index] = last_updated
+            rows.append(row)
+    return rows
+
+
+class InventoryTable:
+    """
+    メモリ上の在庫管理シート（仕入れ元URL・仕入れ価格・在庫ステータス・最終更新日時）
+
+    apply()はupdateInventoryFromCsvと同じ規則で更新し、同じ集計値を返す。
+    """
+
+    def __init__(self):
+        self.rows: List[Dict] = []
+        self._index: Dict[str, int] = {}
+        self.cell_writes = 0
+
+    def load(self, rows: List[Tuple[str, object, str, str]]):
+        """
+        シートの内容を置き換える
+
+        Args:
+            rows: (仕入れ元URL, 仕入れ価格, 在庫ステータス, 最終更新日時)のリスト
+        """
+        self.rows = [
+            {'url': url, 'price': price, 'status': status, 'last_updated': last_updated}
+            for url, price, status, last_updated in rows
+        ]
+        self._index = {normalize_url(row['url']): i for i, row in enumerate(self.rows)}
+        self.cell_writes = 0
+
+    def get(self, url: str) -> Optional[Dict]:
+        """URLの行（見つからない場合はNone）"""
+        index = self._index.get(normalize_url(url))
+        return self.rows[index] if index is not None else None
+
+    def version(self) -> str:
+        """シートの内容のハッシュ（getSupplierMasterVersionの代わり）"""
+        digest = hashlib.sha256()
+        for row in self.rows:
+            digest.update(json.dumps(row, ensure_ascii=False, sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def apply(self, csv_rows: List[List[str]]) -> Dict:
+        """
+        CSVの行データで在庫管理シートを更新する
+
+        Args:
+            csv_rows: ヘッダー行を含む行データ
+
+        Returns:
+            Dict: doPostと同じ形式の結果（success・updateCount・priceUpdateCountなど）
+        """
+        headers = csv_rows[0]
+        if '仕入れ元URL' not in headers:
+            return {'success': False, 'error': '仕入れ元URL列が見つかりません'}
+        url_index = headers.index('仕入れ元URL')
+        price_index = headers.index('仕入れ価格') if '仕入れ価格' in headers else -1
+        status_index = headers.index('在庫ステータス') if '在庫ステータス' in headers else -1
+        last_updated_index = headers.index('最終更新日時') if '最終更新日時' in headers else -1
+
+        csv_map: Dict[str, Dict] = {}
+        for row in csv_rows[1:]:
+            url = row[url_index] if url_index < len(row) else ''
+            if not url or not url.strip():
+                continue
+            price = ''
+            raw_price = row[price_index] if 0 <= price_index < len(row) else ''
+            if raw_price not in ('', None):
+                try:
+                    value = float(raw_price)
+                    if value >= 0:
+                        price = int(value) if value.is_integer() else value
+                except ValueError:
+                    pass
+            csv_map[normalize_url(url)] = {
+                'price': price,
+                'status': row[status_index] if 0 <= status_index < len(row) else '',
+                'last_updated': row[last_updated_index] if 0 <= last_updated_index < len(row) else ''
+            }
+
+        counts = Counter()
+        for normalized, row_index in self._index.items():
+            update = csv_map.pop(normalized, None)
+            if update is None:
+                continue
+            row = self.rows[row_index]
+            row_updated = False
+            if update['price'] != '':
+                if row['price'] == update['price']:
+                    counts['unchanged'] += 1
+                else:
+                    row['price'] = update['price']
+                    counts['price'] += 1
+                    row_updated = True
+            if update['status']:
+                if str(row['status']).strip() == str(update['status']).strip():
+                    counts['unchanged'] += 1
+                else:
+                    row['status'] = update['status']
+                    counts['status'] += 1
+                    row_updated = True
+            if update['last_updated']:
+                row['last_updated'] = update['last_updated']
+                counts['date'] += 1
+                row_updated = True
+            if row_updated:
+                counts['rows'] += 1
+        self.cell_writes += counts['price'] + counts['status'] + counts['date']
+
+        return {
+            'success': True,
+            'updateCount': counts['rows'],
+            'priceUpdateCount': counts['price'],
+            'statusUpdateCount': counts['status'],
+            'dateUpdateCount': counts['date'],
+            'unchangedCellCount': counts['unchanged'],
+            'notFoundCount': len(csv_map),
+            'notFoundUrls': [{'normalizedUrl': url[:100], 'originalUrl': url[:100]} for url in list(csv_map)[:100]]
+        }
+
+
+class MockGasServer:
+    """
+    模擬GAS Webアプリサーバー
+
+    処理時間の再現:
+        request_ms: リクエストごとの起動・応答時間（ロック外）
+        parse_us: CSVの1行あたりの解析時間（ロック外、列形式はcolumnar_parse_us）
+        lock_ms: シートの読み込みなど更新1回あたりの時間（ロック内）
+        write_us: 1行あたりの照合・書き込み時間（ロック内）
+    GASと同様にシートの更新はロックで直列化するため、並行送信で短縮されるのはロック外の時間である。
+    既定値はおおよその目安のため、実際のデプロイの実行ログに合わせて調整すること。
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        request_ms: float = 800.0,
+        parse_us: float = 30.0,
+        columnar_parse_us: float = 10.0,
+        lock_ms: float = 300.0,
+        write_us: float = 20.0,
+        error_rate: float = 0.0,
+        html_error_rate: float = 0.0,
+        lost_response_rate: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_ms: float = 5000.0,
+        max_body_mb: float = 50.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            port: 待ち受けるポート（0の場合は空いているポート）
+            request_ms / parse_us / columnar_parse_us / lock_ms / write_us: 処理時間の再現（上記）
+            error_rate: 更新前に503を返すリクエストの割合
+            html_error_rate: 更新前にHTMLエラーページ（ステータス200）を返すリクエストの割合
+            lost_response_rate: 更新した後に503を返すリクエストの割合（再送時のidempotencyKeyの確認用）
+            slow_rate: 応答を遅らせるリクエストの割合
+            slow_ms: 遅らせる時間（ミリ秒）
+            max_body_mb: 受け付けるリクエストボディの上限（MB、超えた場合はHTMLエラーページ）
+            seed: 乱数シード
+        """
+        self.port = port
+        self.request_ms = request_ms
+        self.parse_us = parse_us
+        self.columnar_parse_us = columnar_parse_us
+        self.lock_ms = lock_ms
+        self.write_us = write_us
+        self.error_rate = error_rate
+        self.html_error_rate = html_error_rate
+        self.lost_response_rate = lost_response_rate
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.max_body_bytes = int(max_body_mb * 2 ** 20)
+        self.table = InventoryTable()
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        # GASのLockService.getScriptLock()に相当（シートの読み込みから書き込みまでを直列化する）
+        self._sheet_lock = threading.Lock()
+        # GASのCacheServiceに相当（処理済みのidempotencyKeyと結果）
+        self._idempotency: Dict[str, Dict] = {}
+        self._stats_lock = threading.Lock()
+        self.stats: Counter = Counter()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Webアプリの代わりに指定するURL"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/macros/s/mock/exec"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        """待ち受けを開始する"""
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), _make_handler(self))
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-gas', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """待ち受けを終了する"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(timeout=5)
+            self._server = None
+
+    def reset(self, rows: List[Tuple[str, object, str, str]]):
+        """在庫管理シート・処理済みのidempotencyKey・集計をリセットする"""
+        with self._sheet_lock:
+            self.table.load(rows)
+            self._idempotency.clear()
+        with self._stats_lock:
+            self.stats = Counter()
+
+    def count(self, key: str, value: int = 1):
+        """集計に加える"""
+        with self._stats_lock:
+            self.stats[key] += value
+
+    def chance(self, rate: float) -> bool:
+        """rateの確率でTrue"""
+        if rate <= 0:
+            return False
+        with self._random_lock:
+            return self._random.random() < rate
+
+    def handle_post(self, body: bytes) -> Tuple[int, bytes, str]:
+        """
+        doPostと同じ処理を行う
+
+        Returns:
+            Tuple[int, bytes, str]: (HTTPステータス, 応答本文, Content-Type)
+        """
+        self.count('requests')
+        self.count('request_bytes', len(body))
+        time.sleep(self.request_ms / 1000)
+        if self.chance(self.slow_rate):
+            self.count('slow')
+            time.sleep(self.slow_ms / 1000)
+        if self.chance(self.error_rate):
+            self.count('errors_5xx')
+            return 503, b'Service Unavailable', 'text/plain'
+        if self.chance(self.html_error_rate) or len(body) > self.max_body_bytes:
+            self.count('errors_html')
+            return 200, GAS_ERROR_HTML, 'text/html; charset=utf-8'
+
+        try:
+            payload = json.loads(body.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            return 200, _json({'success': False, 'error': f'JSON解析に失敗しました: {e}'}), 'application/json'
+
+        idempotency_key = payload.get('idempotencyKey')
+        touched = payload.get('touched')
+        try:
+            if payload.get('format') == COLUMNAR_PAYLOAD_FORMAT:
+                csv_rows = decode_columnar_payload(payload.get('data') or '')
+                parse_us = self.columnar_parse_us
+            else:
+                csv_content = payload.get('csvData') or ''
+                csv_rows = list(csv.reader(io.StringIO(csv_content))) if csv_content.strip() else []
+                if touched:
+                    csv_rows = append_touched_rows(csv_rows, touched)
+                parse_us = self.parse_us
+        except Exception as e:
+            return 200, _json({'success': False, 'error': f'CSVパースに失敗しました: {e}'}), 'application/json'
+        if len(csv_rows) <= 1 and not touched:
+            return 200, _json({'success': False, 'error': 'CSVデータが空です'}), 'application/json'
+        time.sleep(len(csv_rows) * parse_us / 1_000_000)
+
+        with self._sheet_lock:
+            cached = self._idempotency.get(idempotency_key) if idempotency_key else None
+            if cached is not None:
+                self.count('duplicates')
+                result = dict(cached, duplicate=True)
+            else:
+                time.sleep(self.lock_ms / 1000 + len(csv_rows) * self.write_us / 1_000_000)
+                result = self.table.apply(csv_rows)
+                if idempotency_key and result.get('success'):
+                    self._idempotency[idempotency_key] = dict(result, notFoundUrls=[])
+                self.count('applied')
+                self.count('applied_rows', len(csv_rows) - 1)
+
+        if self.chance(self.lost_response_rate):
+            # 更新は反映済みだが応答が失われた場合（再送時にidempotencyKeyで二重反映を防げるか確認する）
+            self.count('lost_responses')
+            return 503, b'Service Unavailable', 'text/plain'
+        return 200, _json(result), 'application/json'
+
+    def handle_get(self, query: Dict[str, str]) -> Dict:
+        """doGetのうち、仕入れ元マスターのバージョン確認と死活確認に応答する"""
+        if query.get('action') == 'supplierMasterVersion':
+            with self._sheet_lock:
+                return {'success': True, 'version': self.table.version(), 'sheetId': 0, 'rowCount': len(self.table.rows)}
+        return {'success': True, 'message': 'EC管理システム WebApp is running (mock)', 'timestamp': datetime.now().isoformat()}
+
+
+def _json(value: Dict) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def _make_handler(gas: MockGasServer):
+    """MockGasServerの設定で応答するリクエストハンドラーを作成する"""
+
+    class MockGasHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            status, response, content_type = gas.handle_post(body)
+            self._respond(status, response, content_type)
+
+        def do_GET(self):
+            query = dict(parse_qsl(urlsplit(self.path).query))
+            self._respond(200, _json(gas.handle_get(query)), 'application/json')
+
+        def _respond(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # アクセスログは出力しない
+            pass
+
+    return MockGasHandler
+
+
+def generate_inventory(count: int, seed: int = 0) -> List[Tuple[str, object, str, str]]:
+    """
+    在庫管理シートの行を作成する（複数サイト・クエリパラメータ付きのURLを含む）
+
+    Args:
+        count: 行数
+        seed: 乱数シード
+
+    Returns:
+        List[Tuple]: (仕入れ元URL, 仕入れ価格, 在庫ステータス, 最終更新日時)のリスト
+    """
+    rng = random.Random(seed)
+    templates = [
+        'https://item.rakuten.co.jp/shop-{shop}/item-{n}/',
+        'https://www.amazon.co.jp/dp/B0{n:08d}',
+        'https://jp.mercari.com/shops/product/P{n:010d}',
+        'https://jp.mercari.com/item/m{n:011d}',
+        'https://auctions.yahoo.co.jp/jp/auction/x{n:09d}',
+        'https://store.shopping.yahoo.co.jp/shop-{shop}/item-{n}.html?sc_i=shopping-pc-web-detail&ref=list'
+    ]
+    rows = []
+    for n in range(count):
+        url = templates[n % len(templates)].format(shop=n % 97, n=n)
+        rows.append((url, rng.randrange(500, 50000, 10), rng.choice(['在庫あり', '在庫あり', '売り切れ']), '2025-01-01 00:00:00'))
+    return rows
+
+
+def main(argv=None):
+    """模擬GAS Webアプリサーバーを起動し、Ctrl+Cで終了するまで待ち受ける"""
+    parser = argparse.ArgumentParser(description='GAS Webアプリ（doPost）の代わりに在庫管理シートをメモリ上で更新する模擬サーバー')
+    parser.add_argument('--port', type=int, default=8900, help='待ち受けるポート（既定: 8900）')
+    parser.add_argument('--rows', type=int, default=1000, help='在庫管理シートの行数（既定: 1000）')
+    parser.add_argument('--inventory-csv', help='在庫管理シートの代わりに読み込むCSV（仕入れ元URL・仕入れ価格・在庫ステータス・最終更新日時）')
+    add_server_arguments(parser)
+    args = parser.parse_args(argv)
+
+    gas = MockGasServer(port=args.port, **server_options(args))
+    if args.inventory_csv:
+        with open(args.inventory_csv, 'r', encoding='utf-8-sig') as f:
+            rows = [
+                (record.get('仕入れ元URL', ''), record.get('仕入れ価格', ''), record.get('在庫ステータス', ''), record.get('最終更新日時', ''))
+                for record in csv.DictReader(f)
+            ]
+    else:
+        rows = generate_inventory(args.rows, args.seed)
+    gas.reset(rows)
+    with gas:
+        print(f"模擬GAS Webアプリを起動しました（在庫管理シート {len(rows)}行、Ctrl+Cで終了）")
+        print(f"GAS_WEB_APP_URL={gas.url}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(f"集計: {dict(gas.stats)}")
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    """模擬サーバーの処理時間・エラーの発生割合の引数を追加する"""
+    parser.add_argument('--request-ms', type=float, default=800.0, help='リクエストごとの起動・応答時間（ミリ秒、既定: 800）')
+    parser.add_argument('--parse-us', type=float, default=30.0, help='CSV1行あたりの解析時間（マイクロ秒、既定: 30）')
+    parser.add_argument('--columnar-parse-us', type=float, default=10.0, help='列形式1行あたりの解析時間（マイクロ秒、既定: 10）')
+    parser.add_argument('--lock-ms', type=float, default=300.0, help='更新1回あたりのロック内の時間（ミリ秒、既定: 300）')
+    parser.add_argument('--write-us', type=float, default=20.0, help='1行あたりのロック内の照合・書き込み時間（マイクロ秒、既定: 20）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='503を返すリクエストの割合')
+    parser.add_argument('--html-error-rate', type=float, default=0.0, help='HTMLエラーページを返すリクエストの割合')
+    parser.add_argument('--lost-response-rate', type=float, default=0.0, help='更新した後に503を返すリクエストの割合')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='応答を遅らせるリクエストの割合')
+    parser.add_argument('--slow-ms', type=float, default=5000.0, help='遅らせる時間（ミリ秒、既定: 5000）')
+    parser.add_argument('--max-body-mb', type=float, default=50.0, help='受け付けるリクエストボディの上限（MB、既定: 50）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+
+
+def server_options(args: argparse.Namespace) -> Dict:
+    """add_server_argumentsで追加した引数をMockGasServerの引数にする"""
+    return {
+        'request_ms': args.request_ms,
+        'parse_us': args.parse_us,
+        'columnar_parse_us': args.columnar_parse_us,
+        'lock_ms': args.lock_ms,
+        'write_us': args.write_us,
+        'error_rate': args.error_rate,
+        'html_error_rate': args.html_error_rate,
+        'lost_response_rate': args.lost_response_rate,
+        'slow_rate': args.slow_rate,
+        'slow_ms': args.slow_ms,
+        'max_body_mb': args.max_body_mb,
+        'seed': args.seed
+    }
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+模擬ECサイトサーバー
+フィクスチャ（fixtures/）の商品ページをローカルのHTTPサーバーで配信する。
+応答の遅延・ばらつき、404（商品ページの削除）、429（アクセス制限）を再現できるため、
+実際の仕入れ先にアクセスせずにスクレイピング全体の処理速度を計測できる。
+
+サイトごとに別のループバックアドレス（127.0.1.2, 127.0.2.2, ...）で待ち受けるため、
+ホスト別のアクセス間隔（PolitenessScheduler・非同期HTTPクローラー）も実際と同じように働く。
+URLのパスには元のURL（例: item.rakuten.co.jp/...）を含めるため、サイト設定のURLパターンで振り分けられる。
+
+使い方（inventory_scraperディレクトリで実行）:
+    python benchmarks/mock_shop_server.py --latency 300 --jitter 100 --not-found-rate 0.05
+"""
+import sys
+import time
+import random
+import hashlib
+import argparse
+import threading
+from collections import Counter, defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import FixturePage, load_fixtures
+
+# 商品ページのパス（/p/<フィクスチャ番号>/<通し番号>/<元のURLのホスト以降>）
+PAGE_PATH_PREFIX = '/p/'
+
+NOT_FOUND_HTML = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>ページが見つかりません</title></head>
+<body><h1>404 Not Found</h1><p>お探しのページは見つかりませんでした。</p></body></html>
+""".encode('utf-8')
+
+RATE_LIMITED_HTML = """<!DOCTYPE html>
+<html lang="ja"><head><meta charset="utf-8"><title>Too Many Requests</title></head>
+<body><h1>429 Too Many Requests</h1><p>アクセスが集中しています。しばらくしてから再度お試しください。</p></body></html>
+""".encode('utf-8')
+
+
+class TokenBucket:
+    """ホストごとのアクセス制限（1秒あたりrate件、最大burst件まで連続して受け付ける）"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Args:
+            rate: 1秒あたりに受け付けるリクエスト数
+            burst: 連続して受け付けるリクエスト数（省略時はrateと同じ、最低1件）
+        """
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        """リクエストを1件受け付けられる場合はTrue"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return True
+            return False
+
+
+class MockShopServer:
+    """
+    模擬ECサイトサーバー
+
+    サイト（フィクスチャのディレクトリ）ごとにhosts_per_site個のアドレスで待ち受ける。
+    404にするURLはseedとURLのパスから決まるため、同じURLは何度取得しても同じ応答になる。
+    """
+
+    def __init__(
+        self,
+        pages: Optional[List[FixturePage]] = None,
+        port: int = 0,
+        hosts_per_site: int = 1,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        not_found_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        seed: int = 0
+    ):
+        """
+        Args:
+            pages: 配信するページ（省略時はfixtures/manifest.jsonのすべてのページ）
+            port: 待ち受けるポート（0の場合はアドレスごとに空いているポートを使用する）
+            hosts_per_site: サイトごとのアドレス数
+            latency_ms: 応答までの遅延（ミリ秒）
+            jitter_ms: 遅延のばらつき（±ミリ秒、一様分布）
+            not_found_rate: 404を返すURLの割合（0〜1）
+            rate_limit: ホストごとに1秒あたりに受け付けるリクエスト数（超えた場合は429、0は無制限）
+            seed: 404にするURLの選択と遅延のばらつきの乱数シード
+        """
+        self.pages = pages if pages is not None else load_fixtures()
+        self.port = port
+        self.hosts_per_site = max(1, hosts_per_site)
+        self.latency_ms = max(0.0, latency_ms)
+        self.jitter_ms = max(0.0, jitter_ms)
+        self.not_found_rate = min(1.0, max(0.0, not_found_rate))
+        self.rate_limit = max(0.0, rate_limit)
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._servers: List[ThreadingHTTPServer] = []
+        self._threads: List[threading.Thread] = []
+        self._stats_lock = threading.Lock()
+        self.status_counts: Counter = Counter()
+        self.requests_by_host: Counter = Counter()
+
+        # サイト（フィクスチャのディレクトリ名）ごとにページをまとめ、サイトの番号からアドレスを決める
+        self.site_pages: Dict[str, List[int]] = defaultdict(list)
+        for page_index, page in enumerate(self.pages):
+            self.site_pages[page.file.split('/', 1)[0]].append(page_index)
+        self.site_hosts: Dict[str, List[Tuple[str, int]]] = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def start(self):
+        """サイトごとのアドレスで待ち受けを開始する"""
+        handler = _make_handler(self)
+        for site_number, site in enumerate(self.site_pages):
+            hosts = []
+            for host_number in range(self.hosts_per_site):
+                # 127.0.<サイト番号+1>.<アドレス番号+2>（127.0.0.1は他の用途と重ならないよう使用しない）
+                address = f"127.0.{site_number + 1}.{host_number + 2}"
+                server = ThreadingHTTPServer((address, self.port), handler)
+                server.daemon_threads = True
+                thread = threading.Thread(target=server.serve_forever, name=f"mock-shop-{address}", daemon=True)
+                thread.start()
+                self._servers.append(server)
+                self._threads.append(thread)
+                hosts.append(server.server_address[:2])
+                if self.rate_limit > 0:
+                    self._buckets[address] = TokenBucket(self.rate_limit)
+            self.site_hosts[site] = hosts
+
+    def stop(self):
+        """待ち受けを終了する"""
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._servers = []
+        self._threads = []
+
+    def urls(self, count: int) -> List[str]:
+        """
+        商品ページのURLを作成する（サイト・ページ・アドレスを順に巡回する）
+
+        Args:
+            count: URL数
+
+        Returns:
+            List[str]: 商品ページのURL（すべて異なるURL）
+        """
+        sites = list(self.site_pages)
+        urls = []
+        for n in range(count):
+            site = sites[n % len(sites)]
+            round_number = n // len(sites)
+            page_indexes = self.site_pages[site]
+            page_index = page_indexes[round_number % len(page_indexes)]
+            host, port = self.site_hosts[site][round_number % len(self.site_hosts[site])]
+            original = self.pages[page_index].url.split('://', 1)[-1]
+            urls.append(f"http://{host}:{port}{PAGE_PATH_PREFIX}{page_index}/{n}/{original}")
+        return urls
+
+    def page_for(self, url_path: str) -> Optional[FixturePage]:
+        """URLのパスに対応するページ（商品ページのパスでない場合はNone）"""
+        if not url_path.startswith(PAGE_PATH_PREFIX):
+            return None
+        try:
+            page_index = int(url_path[len(PAGE_PATH_PREFIX):].split('/', 1)[0])
+        except ValueError:
+            return None
+        return self.pages[page_index] if 0 <= page_index < len(self.pages) else None
+
+    def is_not_found(self, url_path: str) -> bool:
+        """404を返すURLのパスかどうか（seedとパスから決まる）"""
+        if self.not_found_rate <= 0:
+            return False
+        digest = hashlib.sha256(f"{self.seed}:{url_path}".encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big') / 2 ** 64 < self.not_found_rate
+
+    def expected_result(self, url: str) -> Dict:
+        """
+        URLの期待値（404の場合は売り切れ・0円、それ以外はフィクスチャの期待値）
+
+        Args:
+            url: urls()で作成したURL
+
+        Returns:
+            Dict: 仕入れ価格・在庫ステータス（商品ページのURLでない場合は空）
+        """
+        path = '/' + url.split('://', 1)[-1].split('/', 1)[-1]
+        page = self.page_for(path)
+        if page is None:
+            return {}
+        if self.is_not_found(path):
+            return {'仕入れ価格': 0, '在庫ステータス': '売り切れ'}
+        return dict(page.expected)
+
+    def delay(self) -> float:
+        """応答までの遅延（秒）"""
+        with self._random_lock:
+            jitter = self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def allow(self, address: str) -> bool:
+        """アドレスへのリクエストを受け付けられるか（アクセス制限を超えた場合はFalse）"""
+        bucket = self._buckets.get(address)
+        return bucket is None or bucket.take()
+
+    def count(self, address: str, status: int):
+        """応答を集計する"""
+        with self._stats_lock:
+            self.status_counts[status] += 1
+            self.requests_by_host[address] += 1
+
+
+def _make_handler(shop: MockShopServer):
+    """MockShopServerの設定で応答するリクエストハンドラーを作成する"""
+
+    class MockShopHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            address = self.server.server_address[0]
+            path = self.path.split('?', 1)[0]
+            delay = shop.delay()
+            if delay:
+                time.sleep(delay)
+
+            page = shop.page_for(path)
+            if not shop.allow(address):
+                self._respond(429, RATE_LIMITED_HTML, {'Retry-After': '1'})
+            elif page is None or shop.is_not_found(path):
+                self._respond(404, NOT_FOUND_HTML)
+            else:
+                # 実際のサイトと同様に、文字コードはmetaタグで判定させる
+                self._respond(200, page.read_bytes())
+
+        def _respond(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+            shop.count(self.server.server_address[0], status)
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # アクセスログは出力しない（大量のリクエストで計測に影響するため）
+            pass
+
+    return MockShopHandler
+
+
+def main(argv=None):
+    """模擬ECサイトサーバーを起動し、Ctrl+Cで終了するまで待ち受ける"""
+    parser = argparse.ArgumentParser(description='フィクスチャの商品ページを配信する模擬ECサイトサーバー')
+    parser.add_argument('--port', type=int, default=8800, help='待ち受けるポート（既定: 8800）')
+    parser.add_argument('--hosts-per-site', type=int, default=1, help='サイトごとのアドレス数（既定: 1）')
+    parser.add_argument('--latency', type=float, default=0.0, help='応答までの遅延（ミリ秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='遅延のばらつき（±ミリ秒）')
+    parser.add_argument('--not-found-rate', type=float, default=0.0, help='404を返すURLの割合（0〜1）')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='ホストごとの1秒あたりのリクエスト数の上限（超えた場合は429）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument('--urls', type=int, default=0, help='作成した商品ページのURLを指定件数表示する')
+    args = parser.parse_args(argv)
+
+    shop = MockShopServer(
+        port=args.port,
+        hosts_per_site=args.hosts_per_site,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        not_found_rate=args.not_found_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    with shop:
+        for site, hosts in shop.site_hosts.items():
+            print(f"{site}: {', '.join(f'http://{host}:{port}' for host, port in hosts)}")
+        for url in shop.urls(args.urls):
+            print(url)
+        print("模擬ECサイトサーバーを起動しました（Ctrl+Cで終了）")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(f"応答数: {dict(shop.status_counts)}")
+
+
+if __name__ == '__main__':
+    main()
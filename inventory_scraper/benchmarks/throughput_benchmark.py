@@ -0,0 +1,386 @@
+"""
+スループットベンチマーク
+模擬ECサイトサーバー（mock_shop_server）の商品ページに対してscrape_urlsを実行し、
+1分あたりの処理URL数・URLごとの所要時間（p50/p95）・PythonとChromeのCPU・メモリ使用量を表示する。
+ワーカー数・取得方式・アクセス間隔などの設定を、実際の仕入れ先にアクセスせずに比較できる。
+
+使い方（inventory_scraperディレクトリで実行）:
+    python benchmarks/throughput_benchmark.py --urls 2000 --fetch-mode http
+    python benchmarks/throughput_benchmark.py --urls 300 --pool-size 4 --fetch-mode browser --latency 300 --jitter 100
+    python benchmarks/throughput_benchmark.py --urls 2000 --env SCRAPER_HTTP_CONCURRENCY=32 --save http32.json
+
+ChromeのCPU・メモリを計測するにはpsutilが必要です（pip install psutil）。
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import tempfile
+import threading
+import statistics
+from collections import defaultdict
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_shop_server import MockShopServer
+
+# 期待値と比較する項目
+EXPECTED_KEYS = ('仕入れ価格', '在庫ステータス')
+
+# CPU・メモリの計測間隔（秒）
+RESOURCE_SAMPLE_INTERVAL = 0.5
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='模擬ECサイトを使ったスクレイピング全体のスループットベンチマーク')
+    parser.add_argument('--urls', type=int, default=1000, help='処理するURL数（既定: 1000）')
+    parser.add_argument('--pool-size', type=int, help='ブラウザプールのワーカー数（省略時は.envのSCRAPER_POOL_SIZE）')
+    parser.add_argument(
+        '--fetch-mode',
+        choices=['browser', 'http', 'http-then-browser'],
+        help='すべてのサイトの取得方式を上書きする（省略時はscraper_config.jsonの設定）'
+    )
+    parser.add_argument('--access-interval', type=float, default=0.0, help='すべてのサイトのアクセス間隔（秒、既定: 0）')
+    parser.add_argument('--hosts-per-site', type=int, default=4, help='サイトごとの模擬サーバーのアドレス数（既定: 4）')
+    parser.add_argument('--latency', type=float, default=100.0, help='模擬サーバーの応答遅延（ミリ秒、既定: 100）')
+    parser.add_argument('--jitter', type=float, default=50.0, help='応答遅延のばらつき（±ミリ秒、既定: 50）')
+    parser.add_argument('--not-found-rate', type=float, default=0.02, help='404を返すURLの割合（既定: 0.02）')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help='ホストごとの1秒あたりのリクエスト数の上限（超えた場合は429、既定: 無制限）')
+    parser.add_argument('--seed', type=int, default=0, help='乱数シード')
+    parser.add_argument(
+        '--env',
+        action='append',
+        default=[],
+        metavar='KEY=VALUE',
+        help='実行前に設定する環境変数（例: SCRAPER_ASYNC_HTTP=false、複数指定可）'
+    )
+    parser.add_argument('--save', type=Path, help='結果をJSONで保存する')
+    parser.add_argument('--verbose', action='store_true', help='スクレイピングの進捗とログを表示する')
+    return parser.parse_args(argv)
+
+
+class ResourceMonitor:
+    """
+    PythonプロセスとChrome（子プロセス）のCPU時間・メモリ使用量を計測する
+
+    psutilがある場合は一定間隔で子プロセスを含めて計測する。
+    psutilがない場合はPythonプロセスのCPU時間と最大メモリ使用量のみを計測する。
+    """
+
+    def __init__(self, interval: float = RESOURCE_SAMPLE_INTERVAL):
+        """
+        Args:
+            interval: 計測間隔（秒）
+        """
+        self.interval = interval
+        try:
+            import psutil
+            self._psutil = psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._psutil = None
+            self._process = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_cpu = 0.0
+        self._child_cpu: Dict[int, float] = {}
+        self._child_started_cpu: Dict[int, float] = {}
+        self.python_cpu_seconds = 0.0
+        self.python_peak_rss = 0
+        self.chrome_cpu_seconds: Optional[float] = None
+        self.chrome_peak_rss: Optional[int] = None
+        self.chrome_peak_processes: Optional[int] = None
+
+    def start(self):
+        """計測を開始する"""
+        self._started_cpu = time.process_time()
+        if self._psutil is None:
+            return
+        # 開始前から動いている子プロセス（設定読み込み用のブラウザなど）は開始時点からのCPU時間を数える
+        for child in self._children():
+            try:
+                times = child.cpu_times()
+                self._child_started_cpu[child.pid] = times.user + times.system
+            except self._psutil.Error:
+                pass
+        self.chrome_cpu_seconds = 0.0
+        self.chrome_peak_rss = 0
+        self.chrome_peak_processes = 0
+        self._thread = threading.Thread(target=self._run, name='resource-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """計測を終了する"""
+        self.python_cpu_seconds = time.process_time() - self._started_cpu
+        if self._psutil is None:
+            try:
+                import resource
+                # Linuxはキロバイト、macOSはバイト
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                self.python_peak_rss = peak if sys.platform == 'darwin' else peak * 1024
+            except ImportError:
+                pass
+            return
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._sample()
+        self.chrome_cpu_seconds = sum(self._child_cpu.values())
+
+    def _children(self) -> List:
+        try:
+            return self._process.children(recursive=True)
+        except self._psutil.Error:
+            return []
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._sample()
+
+    def _sample(self):
+        try:
+            self.python_peak_rss = max(self.python_peak_rss, self._process.memory_info().rss)
+        except self._psutil.Error:
+            pass
+        rss = 0
+        children = self._children()
+        for child in children:
+            try:
+                times = child.cpu_times()
+                # 終了したプロセスのCPU時間も残すため、プロセスごとに最後に計測した値を保持する
+                self._child_cpu[child.pid] = times.user + times.system - self._child_started_cpu.get(child.pid, 0.0)
+                rss += child.memory_info().rss
+            except self._psutil.Error:
+                continue
+        self.chrome_peak_rss = max(self.chrome_peak_rss or 0, rss)
+        self.chrome_peak_processes = max(self.chrome_peak_processes or 0, len(children))
+
+
+def percentile(values: List[float], ratio: float) -> float:
+    """値のパーセンタイル（線形補間、値がない場合は0）"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * ratio
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def load_url_timings(path: Path) -> Dict[str, Dict]:
+    """計測結果（JSON Lines）をURLごとに読み込む（同じURLが複数回ある場合は最後の結果）"""
+    timings = {}
+    if not path.exists():
+        return timings
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            timings[entry.get('url')] = entry
+    return timings
+
+
+def apply_overrides(loader, fetch_mode: Optional[str], access_interval: float):
+    """すべてのサイト設定（デフォルト設定を含む）の取得方式・アクセス間隔を上書きする"""
+    site_configs = list(loader.config.get('sites', []))
+    if loader.config.get('default'):
+        site_configs.append(loader.config['default'])
+    for site_config in site_configs:
+        site_config['access_interval'] = access_interval
+        if fetch_mode:
+            site_config['fetch_mode'] = fetch_mode
+
+
+def main(argv=None) -> int:
+    """ベンチマークを実行する"""
+    args = parse_args(argv)
+
+    # src.configは読み込み時に環境変数を参照するため、読み込む前に設定する
+    os.environ['SCRAPER_TIMINGS'] = 'true'
+    for item in args.env:
+        key, separator, value = item.partition('=')
+        if not separator:
+            print(f"--envの形式が不正です（KEY=VALUE）: {item}")
+            return 2
+        os.environ[key.strip()] = value.strip()
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.ERROR,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    import pandas as pd
+    from src import instrumentation
+    from src.browser import create_headless_scraper_browser
+    from src.config import SCRAPER_POOL_SIZE
+    from src.configurable_scraper import ScraperConfigLoader
+    from src.scraper import scrape_urls
+
+    pool_size = args.pool_size or SCRAPER_POOL_SIZE
+    loader = ScraperConfigLoader(use_spreadsheet=False)
+    apply_overrides(loader, args.fetch_mode, args.access_interval)
+
+    timings_path = Path(tempfile.mkdtemp(prefix='throughput_')) / 'timings.jsonl'
+    instrumentation.configure(timings_path)
+
+    shop = MockShopServer(
+        hosts_per_site=args.hosts_per_site,
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        not_found_rate=args.not_found_rate,
+        rate_limit=args.rate_limit,
+        seed=args.seed
+    )
+    monitor = ResourceMonitor()
+    browser = None
+    with shop:
+        urls = shop.urls(args.urls)
+        df = pd.DataFrame({'仕入れ元URL': urls})
+        print(f"模擬ECサイト: {len(shop.site_pages)}サイト × {shop.hosts_per_site}アドレス、{len(urls)}件のURL")
+        print(
+            f"ワーカー数: {pool_size}、取得方式: {args.fetch_mode or 'サイト設定のとおり'}、"
+            f"アクセス間隔: {args.access_interval}秒、遅延: {args.latency}±{args.jitter}ms"
+        )
+
+        try:
+            # 逐次処理（ワーカー数1）でブラウザを使うサイトがある場合のみブラウザを起動する
+            if pool_size <= 1 and args.fetch_mode != 'http':
+                browser = create_headless_scraper_browser()
+                instrumentation.instrument_browser(browser)
+
+            monitor.start()
+            started = time.perf_counter()
+            output = io.StringIO()
+            with redirect_stdout(sys.stdout if args.verbose else output):
+                result_df = scrape_urls(
+                    df,
+                    browser,
+                    pool_size=pool_size,
+                    config_loader=loader,
+                    browser_factory=create_headless_scraper_browser
+                )
+            elapsed = time.perf_counter() - started
+            monitor.stop()
+        finally:
+            if browser is not None:
+                browser.quit()
+            instrumentation.print_summary()
+
+    report = build_report(args, pool_size, shop, urls, result_df, elapsed, load_url_timings(timings_path), monitor)
+    print_report(report)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存しました: {args.save}")
+    return 0
+
+
+def build_report(args, pool_size, shop, urls, result_df, elapsed, timings, monitor) -> Dict:
+    """計測結果をまとめる"""
+    results = {row['仕入れ元URL']: row for row in result_df.to_dict('records')}
+    by_site = defaultdict(lambda: {'latencies': [], 'waits': [], 'count': 0, 'ok': 0})
+    for url in urls:
+        timing = timings.get(url, {})
+        site = by_site[timing.get('site') or '(該当なし)']
+        site['count'] += 1
+        stages = timing.get('stages_ms') or {}
+        if 'total_ms' in timing:
+            wait = stages.get('politeness_wait', 0.0)
+            site['latencies'].append(timing['total_ms'] - wait)
+            site['waits'].append(wait)
+        expected = shop.expected_result(url)
+        actual = results.get(url, {})
+        if all(actual.get(key) == expected.get(key) for key in EXPECTED_KEYS):
+            site['ok'] += 1
+
+    all_latencies = [latency for site in by_site.values() for latency in site['latencies']]
+    return {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'settings': {
+            'urls': len(urls),
+            'pool_size': pool_size,
+            'fetch_mode': args.fetch_mode,
+            'access_interval': args.access_interval,
+            'hosts_per_site': args.hosts_per_site,
+            'latency_ms': args.latency,
+            'jitter_ms': args.jitter,
+            'not_found_rate': args.not_found_rate,
+            'rate_limit': args.rate_limit,
+            'env': args.env
+        },
+        'elapsed_seconds': round(elapsed, 2),
+        'urls_per_minute': round(len(urls) * 60 / elapsed, 1) if elapsed > 0 else None,
+        'latency_p50_ms': round(percentile(all_latencies, 0.5), 1),
+        'latency_p95_ms': round(percentile(all_latencies, 0.95), 1),
+        'accuracy': sum(site['ok'] for site in by_site.values()),
+        'sites': {
+            name: {
+                'count': site['count'],
+                'ok': site['ok'],
+                'latency_p50_ms': round(percentile(site['latencies'], 0.5), 1),
+                'latency_p95_ms': round(percentile(site['latencies'], 0.95), 1),
+                'politeness_wait_avg_ms': round(statistics.mean(site['waits']), 1) if site['waits'] else 0.0
+            }
+            for name, site in by_site.items()
+        },
+        'server_responses': {str(status): count for status, count in sorted(shop.status_counts.items())},
+        'resources': {
+            'python_cpu_seconds': round(monitor.python_cpu_seconds, 2),
+            'python_peak_rss_mb': round(monitor.python_peak_rss / 2 ** 20, 1),
+            'chrome_cpu_seconds': round(monitor.chrome_cpu_seconds, 2) if monitor.chrome_cpu_seconds is not None else None,
+            'chrome_peak_rss_mb': round(monitor.chrome_peak_rss / 2 ** 20, 1) if monitor.chrome_peak_rss is not None else None,
+            'chrome_peak_processes': monitor.chrome_peak_processes
+        }
+    }
+
+
+def print_report(report: Dict):
+    """計測結果を表示する"""
+    from src.instrumentation import format_table
+
+    settings = report['settings']
+    print("=== スループット ===")
+    print(
+        f"{settings['urls']}件 / {report['elapsed_seconds']}秒 = {report['urls_per_minute']} URL/分"
+        f"（URLごとの所要時間 p50: {report['latency_p50_ms']}ms, p95: {report['latency_p95_ms']}ms、"
+        f"期待値と一致: {report['accuracy']}/{settings['urls']}件）"
+    )
+    rows = [['サイト', '件数', '一致', 'p50(ms)', 'p95(ms)', '待機平均(ms)']]
+    for name, site in report['sites'].items():
+        rows.append([
+            name,
+            str(site['count']),
+            str(site['ok']),
+            f"{site['latency_p50_ms']:.0f}",
+            f"{site['latency_p95_ms']:.0f}",
+            f"{site['politeness_wait_avg_ms']:.0f}"
+        ])
+    for line in format_table(rows):
+        print(line)
+    print(f"模擬サーバーの応答: {', '.join(f'{status}: {count}件' for status, count in report['server_responses'].items())}")
+
+    resources = report['resources']
+    print(f"Python: CPU {resources['python_cpu_seconds']}秒, 最大メモリ {resources['python_peak_rss_mb']}MB")
+    if resources['chrome_cpu_seconds'] is None:
+        print("Chrome: psutilがないため計測していません（pip install psutil）")
+    else:
+        print(
+            f"Chrome: CPU {resources['chrome_cpu_seconds']}秒, 最大メモリ {resources['chrome_peak_rss_mb']}MB"
+            f"（最大{resources['chrome_peak_processes']}プロセス）"
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,273 @@
+"""
+アップロードベンチマーク
+模擬GAS Webアプリ（mock_gas_server）に対してupdate_spreadsheet_via_gasを実行し、
+行数（1千〜10万行）・送信形式（GAS_PAYLOAD_FORMAT）・チャンクサイズ（GAS_MAX_CHUNK_SIZE）・
+同時送信数（GAS_UPLOAD_CONCURRENCY）の組み合わせごとに、所要時間・1秒あたりの行数・リクエスト数・送信量を表示する。
+送信後の在庫管理シートを期待値と比較し、再送による二重反映や欠落がないことも確認する。
+
+設定は.envと同じく環境変数で渡すため、組み合わせごとに別プロセスでアップロードを実行する。
+
+使い方（inventory_scraperディレクトリで実行）:
+    python benchmarks/upload_benchmark.py
+    python benchmarks/upload_benchmark.py --rows 100000 --chunk-sizes 50000,1000000 --concurrency 1,4,8
+    python benchmarks/upload_benchmark.py --rows 10000 --error-rate 0.1 --html-error-rate 0.05 --lost-response-rate 0.05
+"""
+import io
+import os
+import csv
+import sys
+import json
+import time
+import argparse
+import tempfile
+import itertools
+import subprocess
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_gas_server import (
+    CSV_HEADERS,
+    MockGasServer,
+    add_server_arguments,
+    generate_inventory,
+    server_options
+)
+
+INVENTORY_ROOT = Path(__file__).resolve().parent.parent
+
+# 1つの組み合わせのアップロードの制限時間（秒）
+RUN_TIMEOUT = 1800
+
+
+def int_list(value: str) -> List[int]:
+    """カンマ区切りの整数のリスト"""
+    return [int(item) for item in value.split(',') if item.strip()]
+
+
+def str_list(value: str) -> List[str]:
+    """カンマ区切りの文字列のリスト"""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='模擬GAS Webアプリを使ったスプレッドシート更新のアップロードベンチマーク')
+    parser.add_argument('--rows', type=int_list, default=[1000, 10000], help='送信する行数（カンマ区切り、既定: 1000,10000）')
+    parser.add_argument('--formats', type=str_list, default=['csv', 'columnar'], help='GAS_PAYLOAD_FORMAT（カンマ区切り、既定: csv,columnar）')
+    parser.add_argument(
+        '--chunk-sizes',
+        type=int_list,
+        default=[50000, 500000],
+        help='GAS_MAX_CHUNK_SIZE（バイト、カンマ区切り、既定: 50000,500000）'
+    )
+    parser.add_argument('--concurrency', type=int_list, default=[1, 4], help='GAS_UPLOAD_CONCURRENCY（カンマ区切り、既定: 1,4）')
+    parser.add_argument('--status-change-rate', type=float, default=0.2, help='在庫ステータスも変化する行の割合（既定: 0.2）')
+    parser.add_argument('--retry-delay', type=float, default=0.5, help='GAS_UPLOAD_RETRY_DELAY（秒、既定: 0.5）')
+    add_server_arguments(parser)
+    parser.add_argument(
+        '--env',
+        action='append',
+        default=[],
+        metavar='KEY=VALUE',
+        help='アップロードの実行時に設定する環境変数（例: GAS_UPLOAD_MAX_RETRIES=8、複数指定可）'
+    )
+    parser.add_argument('--save', type=Path, help='結果をJSONで保存する')
+    parser.add_argument('--verbose', action='store_true', help='アップロードの進捗を表示する')
+    parser.add_argument('--run-upload', nargs=2, metavar=('CSV', 'URL'), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def build_results(inventory: List[Tuple[str, object, str, str]], status_change_rate: float) -> List[List[str]]:
+    """
+    在庫管理シートの全行について、仕入れ価格が変化した取得結果を作成する
+
+    Args:
+        inventory: 在庫管理シートの行
+        status_change_rate: 在庫ステータスも変化させる行の割合
+
+    Returns:
+        List[List[str]]: ヘッダー行を含む取得結果（delta送信のCSVと同じ列）
+    """
+    step = max(1, round(1 / status_change_rate)) if status_change_rate > 0 else 0
+    base_time = datetime.now().replace(microsecond=0)
+    rows = [list(CSV_HEADERS)]
+    for n, (url, price, status, _) in enumerate(inventory):
+        if step and n % step == 0:
+            status = '売り切れ' if status == '在庫あり' else '在庫あり'
+        # 取得時刻は実際の実行と同様に行ごとに少しずつずらす
+        last_updated = datetime.fromtimestamp(base_time.timestamp() + n // 50).strftime('%Y-%m-%d %H:%M:%S')
+        rows.append([url, str(int(price) + 10), status, last_updated])
+    return rows
+
+
+def count_mismatches(gas: MockGasServer, results: List[List[str]]) -> int:
+    """送信後の在庫管理シートが取得結果と一致しない行数"""
+    mismatches = 0
+    for url, price, status, last_updated in results[1:]:
+        row = gas.table.get(url)
+        if row is None or str(row['price']) != price or row['status'] != status or row['last_updated'] != last_updated:
+            mismatches += 1
+    return mismatches
+
+
+def run_upload(csv_path: str, script_url: str, verbose: bool) -> int:
+    """
+    update_spreadsheet_via_gasを実行し、所要時間をJSONで1行出力する（組み合わせごとの子プロセス）
+
+    Returns:
+        int: 終了コード（成功: 0）
+    """
+    from src.spreadsheet_updater import update_spreadsheet_via_gas
+
+    output = io.StringIO()
+    error = None
+    started = time.perf_counter()
+    try:
+        with redirect_stdout(sys.stderr if verbose else output):
+            update_spreadsheet_via_gas(csv_path=Path(csv_path), script_url=script_url)
+    except Exception as e:
+        error = str(e).splitlines()[0]
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'elapsed_seconds': elapsed, 'error': error}, ensure_ascii=False))
+    return 0 if error is None else 1
+
+
+def run_case(args, gas: MockGasServer, csv_path: Path, payload_format: str, chunk_size: int, concurrency: int) -> Dict:
+    """1つの組み合わせのアップロードを別プロセスで実行する"""
+    env = dict(os.environ)
+    env.update({
+        'GAS_PAYLOAD_FORMAT': payload_format,
+        'GAS_MAX_CHUNK_SIZE': str(chunk_size),
+        'GAS_UPLOAD_CONCURRENCY': str(concurrency),
+        'GAS_UPLOAD_RETRY_DELAY': str(args.retry_delay)
+    })
+    for item in args.env:
+        key, _, value = item.partition('=')
+        env[key.strip()] = value.strip()
+
+    command = [sys.executable, str(Path(__file__).resolve()), '--run-upload', str(csv_path), gas.url]
+    if args.verbose:
+        command.append('--verbose')
+    completed = subprocess.run(command, cwd=INVENTORY_ROOT, env=env, capture_output=True, text=True, timeout=RUN_TIMEOUT)
+    if args.verbose and completed.stderr:
+        print(completed.stderr, end='')
+    lines = completed.stdout.strip().splitlines()
+    try:
+        return json.loads(lines[-1])
+    except (IndexError, json.JSONDecodeError):
+        detail = (completed.stderr.strip().splitlines() or ['出力がありません'])[-1]
+        return {'elapsed_seconds': None, 'error': f"アップロードを実行できませんでした: {detail}"}
+
+
+def main(argv=None) -> int:
+    """ベンチマークを実行する"""
+    args = parse_args(argv)
+    if args.run_upload:
+        return run_upload(args.run_upload[0], args.run_upload[1], args.verbose)
+
+    for item in args.env:
+        if '=' not in item:
+            print(f"--envの形式が不正です（KEY=VALUE）: {item}")
+            return 2
+
+    gas = MockGasServer(**server_options(args))
+    work_dir = Path(tempfile.mkdtemp(prefix='upload_'))
+    cases = []
+    with gas:
+        for row_count in args.rows:
+            inventory = generate_inventory(row_count, args.seed)
+            results = build_results(inventory, args.status_change_rate)
+            csv_path = work_dir / f"results_{row_count}.csv"
+            with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
+                csv.writer(f).writerows(results)
+            csv_size = csv_path.stat().st_size
+
+            for payload_format, chunk_size, concurrency in itertools.product(args.formats, args.chunk_sizes, args.concurrency):
+                gas.reset(inventory)
+                print(f"{row_count}行 / {payload_format} / チャンク{chunk_size}バイト / 同時送信数{concurrency} ...", flush=True)
+                outcome = run_case(args, gas, csv_path, payload_format, chunk_size, concurrency)
+                elapsed = outcome['elapsed_seconds']
+                stats = dict(gas.stats)
+                case = {
+                    'rows': row_count,
+                    'csv_bytes': csv_size,
+                    'format': payload_format,
+                    'chunk_size': chunk_size,
+                    'concurrency': concurrency,
+                    'elapsed_seconds': round(elapsed, 2) if elapsed is not None else None,
+                    'rows_per_second': round(row_count / elapsed, 1) if elapsed else None,
+                    'requests': stats.get('requests', 0),
+                    'request_bytes': stats.get('request_bytes', 0),
+                    'error_responses': stats.get('errors_5xx', 0) + stats.get('errors_html', 0) + stats.get('lost_responses', 0),
+                    'duplicates': stats.get('duplicates', 0),
+                    'applied_rows': stats.get('applied_rows', 0),
+                    'mismatched_rows': count_mismatches(gas, results),
+                    'error': outcome['error']
+                }
+                cases.append(case)
+                if case['error']:
+                    print(f"  ❌ {case['error']}")
+
+    report = {
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'settings': {
+            'server': server_options(args),
+            'status_change_rate': args.status_change_rate,
+            'retry_delay': args.retry_delay,
+            'env': args.env
+        },
+        'cases': cases
+    }
+    print_report(report)
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"結果を保存しました: {args.save}")
+    return 1 if any(case['error'] or case['mismatched_rows'] for case in cases) else 0
+
+
+def print_report(report: Dict):
+    """計測結果を表示する"""
+    from src.instrumentation import format_table
+
+    print("=== アップロード ===")
+    rows = [['行数', '形式', 'チャンク(B)', '同時', '秒', '行/秒', 'リクエスト', '送信量(KB)', 'エラー応答', '重複', '不一致']]
+    for case in report['cases']:
+        rows.append([
+            str(case['rows']),
+            case['format'],
+            str(case['chunk_size']),
+            str(case['concurrency']),
+            f"{case['elapsed_seconds']:.2f}" if case['elapsed_seconds'] is not None else '-',
+            f"{case['rows_per_second']:.0f}" if case['rows_per_second'] else '-',
+            str(case['requests']),
+            f"{case['request_bytes'] / 1024:.0f}",
+            str(case['error_responses']),
+            str(case['duplicates']),
+            str(case['mismatched_rows'])
+        ])
+    for line in format_table(rows):
+        print(line)
+
+    # 行数ごとに最も速かった組み合わせ
+    for row_count in sorted({case['rows'] for case in report['cases']}):
+        candidates = [
+            case for case in report['cases']
+            if case['rows'] == row_count and not case['error'] and not case['mismatched_rows'] and case['elapsed_seconds']
+        ]
+        if candidates:
+            best = min(candidates, key=lambda case: case['elapsed_seconds'])
+            print(
+                f"{row_count}行の最速: GAS_PAYLOAD_FORMAT={best['format']} GAS_MAX_CHUNK_SIZE={best['chunk_size']} "
+                f"GAS_UPLOAD_CONCURRENCY={best['concurrency']}（{best['elapsed_seconds']}秒）"
+            )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
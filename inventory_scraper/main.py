@@ -3,6 +3,7 @@
 """
 import sys
 import os
+import argparse
 import logging
 from pathlib import Path
 from datetime import datetime
@@ -14,7 +15,7 @@ if getattr(sys, 'frozen', False):
     os.chdir(exe_dir)
 
 # ログ設定
-from src.config import LOGS_DIR, LOG_LEVEL
+from src.config import LOGS_DIR, LOG_LEVEL, SCRAPER_POOL_SIZE
 
 log_file = LOGS_DIR / f"scraper_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
 logging.basicConfig(
@@ -35,15 +36,70 @@ from src.uploader import save_result_csv
 from src.spreadsheet_updater import update_spreadsheet_via_gas
 
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    """コマンドライン引数を解析する"""
+    parser = argparse.ArgumentParser(description='在庫管理スクレイピングシステム')
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='更新間隔に関わらず、すべてのURLをスクレイピングする'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='中断された前回の実行を再開する（チェックポイントに記録済みのURLはスキップ）'
+    )
+    return parser.parse_args(argv)
+
+
+def create_config_loader(browser, supplier_df=None, fetcher=None, compiled_config=None):
+    """サイト設定ローダーを作成する（失敗した場合はNone）"""
+    try:
+        from src.configurable_scraper import ScraperConfigLoader
+        logger.info("設定ファイルローダーを初期化しています...")
+        return ScraperConfigLoader(
+            browser=browser,
+            use_spreadsheet=True,
+            supplier_df=supplier_df,
+            fetcher=fetcher,
+            compiled_config=compiled_config
+        )
+    except Exception as e:
+        logger.warning(f"設定ファイルローダーの初期化に失敗しました（各URLで個別に読み込みます）: {e}")
+        return None
+
+
+def open_state_store():
+    """スクレイピング状態ストアを開く（無効な場合・失敗した場合はNone）"""
+    from src.config import SCRAPER_STATE_STORE, SCRAPER_STATE_DB
+    if not SCRAPER_STATE_STORE:
+        return None
+    try:
+        from src.state_store import StateStore
+        return StateStore(SCRAPER_STATE_DB)
+    except Exception as e:
+        logger.warning(f"状態ストアを開けませんでした（前回の結果CSVを使用します）: {e}")
+        return None
+
+
+def main(argv=None):
     """
     メイン処理
     1. スプレッドシートからCSVをダウンロード
-    2. 各ECサイトをスクレイピング
-    3. 結果をCSVに保存
-    4. GAS Webアプリ経由でスプレッドシートを更新
+    2. 更新間隔を過ぎたURLを抽出（--full指定時は全件）
+    3. 各ECサイトをスクレイピング
+    4. 結果をCSVに保存
+    5. GAS Webアプリ経由でスプレッドシートを更新
     """
+    args = parse_args(argv)
     browser = None
+    state_store = None
+    from src.checkpoint import CheckpointJournal, results_to_dataframe
+    journal = CheckpointJournal()
+    stream_uploader = None
+    # URLごとの所要時間をログファイルと同じ名前のJSON Linesに出力する
+    from src import instrumentation
+    instrumentation.configure(log_file.with_name(f"{log_file.stem}_timings.jsonl"))
     
     try:
         logger.info("=== 在庫管理スクレイピングシステム 開始 ===")
@@ -54,40 +110,196 @@ def main():
         logger.info("ブラウザの初期化が完了しました")
         
         # 2. スプレッドシートからCSVをダウンロード
+        # 「在庫管理」シートと仕入れ元マスターシートを並行して直接取得し、取得できなかったシートはブラウザでダウンロードする
         logger.info("スプレッドシートからCSVをダウンロードしています...")
-        df = download_spreadsheet_csv(browser)
+        from src.config import SHEET_DIRECT_FETCH, SHEET_GID, SUPPLIER_SHEET_GID
+        fetcher = None
+        prefetched = {}
+        
+        # 仕入れ元マスターに変更がなければキャッシュした設定を使用し、ダウンロードを省略する
+        from src.config_cache import load_fresh_compiled_config
+        from src.configurable_scraper import ScraperConfigLoader
+        compiled_config = load_fresh_compiled_config(ScraperConfigLoader.default_config_path())
+        if compiled_config is not None:
+            logger.info("仕入れ元マスターに変更がないため、キャッシュした設定を使用します")
+        
+        if SHEET_DIRECT_FETCH:
+            from src.sheet_fetcher import SheetFetcher, fetch_sheets_concurrently
+            fetcher = SheetFetcher(browser)
+            from src.config import SPREADSHEET_ID
+            from src.gid_cache import load_cached_gid
+            gids = {'inventory': SHEET_GID}
+            # 仕入れ元マスターシートは.envのGID、なければ前回検出したGIDで取得する
+            supplier_gid = SUPPLIER_SHEET_GID.strip() or load_cached_gid(SPREADSHEET_ID)
+            if supplier_gid and compiled_config is None:
+                gids['supplier'] = supplier_gid
+            prefetched = fetch_sheets_concurrently(fetcher, gids)
+        df = download_spreadsheet_csv(browser, fetcher=fetcher, prefetched_df=prefetched.get('inventory'))
         logger.info(f"CSVダウンロード完了: {len(df)}件のデータを取得しました")
         
         if len(df) == 0:
             logger.warning("スクレイピング対象のURLが見つかりませんでした")
             return
         
-        # 3. スクレイピングを実行
-        logger.info("スクレイピングを開始します...")
-        result_df = scrape_urls(df, browser)
-        logger.info(f"スクレイピング完了: {len(result_df)}件の結果を取得しました")
+        config_loader = create_config_loader(
+            browser,
+            supplier_df=prefetched.get('supplier'),
+            fetcher=fetcher,
+            compiled_config=compiled_config
+        )
+        state_store = open_state_store()
+        # 差分送信の比較元として、スクレイピング前のスプレッドシートの値を保持しておく
+        sheet_df = df
         
-        # 4. 結果をCSVに保存
-        logger.info("結果をCSVファイルに保存しています...")
-        csv_path = save_result_csv(result_df)
-        logger.info(f"CSVファイルを保存しました: {csv_path}")
+        # チェックポイント: --resumeの場合は前回の実行で取得済み（未アップロード）の結果を読み込む
+        # 更新間隔の判定より先に読み込み、対象のURLがなくなってもこれらの結果はアップロードする
+        resumed_results = {}
+        if args.resume:
+            resumed_results = journal.load()
+            logger.info(f"チェックポイントから{len(resumed_results)}件の完了済み結果を読み込みました")
+            if resumed_results:
+                from src.state_store import normalize_url
+                done_mask = df['仕入れ元URL'].map(lambda url: normalize_url(str(url)) in resumed_results)
+                df = df[~done_mask]
+                logger.info(f"完了済みの{int(done_mask.sum())}件をスキップします（残り: {len(df)}件）")
+        elif journal.exists():
+            logger.warning("中断された前回の実行のチェックポイントがあります（破棄して最初から実行します。再開する場合は--resumeを指定してください）")
         
-        # 5. スプレッドシートに反映（GAS Webアプリ経由）
-        logger.info("Google Apps Script Webアプリ経由でスプレッドシートを更新しています...")
-        from src.config import GAS_WEB_APP_URL
+        # 3. 更新間隔（サイト別・在庫ステータス別のTTL）を過ぎたURLだけを対象にする
+        if args.full:
+            logger.info("--fullが指定されたため、すべてのURLをスクレイピングします")
+        else:
+            from src.freshness import FreshnessPolicy, select_stale_rows, load_previous_results
+            if state_store is not None:
+                previous_results = state_store.load_fetch_states(df['仕入れ元URL'])
+            elif journal.exists():
+                # 前回の結果CSVはアップロードが完了していない（チェックポイントが残っている）ため使用しない
+                previous_results = {}
+            else:
+                previous_results = load_previous_results()
+            df, skipped_count = select_stale_rows(df, FreshnessPolicy(config_loader), previous_results=previous_results)
+            logger.info(f"更新間隔内のため{skipped_count}件をスキップします（対象: {len(df)}件）")
+            if len(df) == 0 and not resumed_results:
+                logger.info("更新が必要なURLはありません")
+                logger.info("=== 在庫管理スクレイピングシステム 正常終了 ===")
+                return
+        
+        journal.open(resume=args.resume)
+        on_result = journal.append
+        
+        from src.config import GAS_WEB_APP_URL, GAS_UPLOAD_MODE, GAS_UPLOAD_TOUCHED, GAS_STREAM_UPLOAD
         if not GAS_WEB_APP_URL:
             raise Exception("GAS_WEB_APP_URLが設定されていません。.envファイルにGAS_WEB_APP_URLを設定してください。")
         
-        update_spreadsheet_via_gas(browser, csv_path, GAS_WEB_APP_URL)
+        if GAS_STREAM_UPLOAD:
+            # 完了した結果をスクレイピング中にバックグラウンドで送信する
+            from src.stream_uploader import StreamingUploader
+            stream_uploader = StreamingUploader(
+                GAS_WEB_APP_URL,
+                sheet_df=sheet_df if GAS_UPLOAD_MODE == 'delta' else None
+            )
+            stream_uploader.start()
+            
+            def on_result(result):
+                journal.append(result)
+                stream_uploader.submit(result)
+        
+        # 4. スクレイピングを実行（SCRAPER_POOL_SIZEが2以上の場合はブラウザプールで並列実行）
+        if len(df) == 0:
+            # チェックポイントの結果のみをアップロードする
+            logger.info("スクレイピングが必要なURLはありません（チェックポイントの結果をアップロードします）")
+            result_df = results_to_dataframe([])
+        else:
+            logger.info(f"スクレイピングを開始します（ワーカー数: {SCRAPER_POOL_SIZE}）...")
+            result_df = scrape_urls(
+                df,
+                browser,
+                pool_size=SCRAPER_POOL_SIZE,
+                config_loader=config_loader,
+                state_store=state_store,
+                on_result=on_result
+            )
+            logger.info(f"スクレイピング完了: {len(result_df)}件の結果を取得しました")
+        
+        # アップロードする結果（逐次送信した場合は送信できなかった結果のみ）
+        upload_df = result_df
+        if stream_uploader is not None:
+            stream_uploader.close()
+            upload_df = stream_uploader.undelivered_dataframe()
+            if state_store is not None:
+                # 逐次送信で反映済みの結果を記録する（更新間隔の判定は反映済みの結果だけを使用する）
+                undelivered_urls = set(upload_df['仕入れ元URL'])
+                delivered = [r for r in result_df.to_dict('records') if r['仕入れ元URL'] not in undelivered_urls]
+                state_store.mark_delivered(delivered)
+        
+        if resumed_results:
+            # 前回の実行で取得済みの結果（未アップロード）と結合する
+            import pandas as pd
+            resumed_df = results_to_dataframe(list(resumed_results.values()))
+            result_df = pd.concat([resumed_df, result_df], ignore_index=True)
+            upload_df = pd.concat([resumed_df, upload_df], ignore_index=True)
+            logger.info(f"チェックポイントの結果と結合しました: 合計{len(result_df)}件")
+        
+        # 5. 結果をCSVに保存
+        logger.info("結果をCSVファイルに保存しています...")
+        csv_path = save_result_csv(result_df)
+        logger.info(f"CSVファイルを保存しました: {csv_path}")
+        
+        # 6. スプレッドシートに反映（GAS Webアプリ経由）
+        if stream_uploader is not None and len(upload_df) == 0:
+            logger.info("すべての結果を逐次送信済みです")
+        else:
+            logger.info("Google Apps Script Webアプリ経由でスプレッドシートを更新しています...")
+            if upload_df is not result_df:
+                csv_path = save_result_csv(upload_df, filename='upload_remaining.csv')
+            
+            touched = None
+            if GAS_UPLOAD_MODE == 'delta':
+                # 価格・在庫ステータスが変化した行だけを送信する
+                from src.change_detector import split_changed_rows, count_touched
+                changed_df, touched = split_changed_rows(upload_df, sheet_df)
+                logger.info(f"差分送信: 変化あり{len(changed_df)}件 / 変化なし{count_touched(touched)}件")
+                csv_path = save_result_csv(changed_df, filename='upload_delta.csv')
+                if not GAS_UPLOAD_TOUCHED:
+                    touched = None
+            
+            update_spreadsheet_via_gas(browser, csv_path, GAS_WEB_APP_URL, touched=touched)
         logger.info("スプレッドシートの更新が完了しました")
+        if state_store is not None:
+            state_store.mark_delivered(upload_df.to_dict('records'))
+        
+        # アップロードまで完了したのでチェックポイントは不要
+        journal.discard()
+        
+        if state_store is not None:
+            summary = state_store.summarize()
+            logger.info(
+                f"状態ストア: {summary['total']}件のURL（在庫ステータス別: {summary['by_status']}、"
+                f"失敗中: {summary['failing']}件）"
+            )
         
         logger.info("=== 在庫管理スクレイピングシステム 正常終了 ===")
         
+    except KeyboardInterrupt:
+        # Ctrl+C などで中断された場合（ブラウザプールのワーカーは停止済み）
+        logger.warning("処理が中断されました。ブラウザを終了して終了します")
+        logger.warning("取得済みの結果はチェックポイントに保存されています（--resumeで再開できます）")
+        sys.exit(130)
+        
     except Exception as e:
         logger.error(f"エラーが発生しました: {e}", exc_info=True)
         sys.exit(1)
         
     finally:
+        if stream_uploader is not None:
+            # 中断時は送信せずに終了する（結果はチェックポイントに残っている）
+            stream_uploader.close(flush=False)
+        journal.close()
+        if state_store is not None:
+            state_store.close()
+        # サイト別の所要時間の集計表を表示する
+        instrumentation.print_summary()
+        
         # ブラウザを閉じる
         if browser:
             logger.info("ブラウザを閉じています...")
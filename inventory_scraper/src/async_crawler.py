@@ -0,0 +1,294 @@
+"""
+非同期HTTPクローラーモジュール
+取得方式がhttp / http-then-browserのサイトのURLを、ブラウザ処理の前にasyncio（aiohttp）で
+まとめて取得する。ホストごとの同時接続数・アクセス間隔を守りつつ、複数のリクエストを並行して処理する
+"""
+import asyncio
+import os
+import time
+import logging
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from .config import (
+    SCRAPER_HTTP_CONCURRENCY,
+    SCRAPER_HTTP_PER_HOST,
+    SCRAPER_HTTP_MIN_INTERVAL,
+    SCRAPER_HTTP_TIMEOUT
+)
+from .http_fetcher import DEFAULT_HEADERS, HttpFetchResult
+from .politeness import get_host
+from . import instrumentation
+from .instrumentation import UrlTiming, record_timing
+
+try:
+    import aiohttp
+except ImportError:
+    # aiohttpがインストールされていない場合は非同期クロールを行わず、従来の逐次処理で取得する
+    aiohttp = None
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+
+def is_available() -> bool:
+    """非同期HTTPクローラーが利用可能か（aiohttpがインストールされているか）"""
+    return aiohttp is not None
+
+
+def build_http_interval_resolver(config_loader=None) -> Callable[[str], float]:
+    """
+    URLから同一ホストへのHTTPリクエストの最小間隔（秒）を求める関数を作成する
+
+    サイト設定の「http_access_interval」を優先し、設定がない場合はサイトの「access_interval」
+    （仕入れ元マスターの「アクセス間隔(秒)」）を使用する。どちらもないサイトのみ.envのSCRAPER_HTTP_MIN_INTERVALを使用する。
+
+    Args:
+        config_loader: ScraperConfigLoaderインスタンス（省略可）
+
+    Returns:
+        Callable[[str], float]: URLを受け取り最小間隔を返す関数
+    """
+    def resolve(url: str) -> float:
+        site_config = None
+        if config_loader is not None:
+            try:
+                site_config = config_loader.find_site_config(url) or config_loader.get_default_config()
+            except Exception:
+                site_config = None
+        for key in ('http_access_interval', 'access_interval'):
+            interval = (site_config or {}).get(key)
+            if interval is None:
+                continue
+            try:
+                return max(0.0, float(interval))
+            except (TypeError, ValueError):
+                continue
+        return SCRAPER_HTTP_MIN_INTERVAL
+
+    return resolve
+
+
+class _HostLimiter:
+    """ホストごとの同時接続数とリクエスト間隔を制限する"""
+
+    def __init__(self, max_connections: int, interval: float):
+        self.semaphore = asyncio.Semaphore(max_connections)
+        self.interval = interval
+        self.next_allowed = 0.0
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # 次回のリクエスト可能時刻を予約してから待機する
+        slot = max(now, self.next_allowed)
+        self.next_allowed = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.semaphore.release()
+        return False
+
+
+class AsyncHttpCrawler:
+    """
+    aiohttpによる非同期HTTPクローラー
+
+    1つのClientSession（TCPConnectorの接続プール・keep-alive）を全リクエストで共有し、
+    取得したHTMLの解析はスレッドプールで行ってイベントループを止めないようにする。
+    """
+
+    def __init__(
+        self,
+        concurrency: int = SCRAPER_HTTP_CONCURRENCY,
+        per_host: int = SCRAPER_HTTP_PER_HOST,
+        timeout: float = SCRAPER_HTTP_TIMEOUT,
+        interval_resolver: Optional[Callable[[str], float]] = None
+    ):
+        """
+        Args:
+            concurrency: 同時に実行するリクエストの上限
+            per_host: 同一ホストへの同時接続数の上限
+            timeout: 1リクエストのタイムアウト（秒）
+            interval_resolver: URLから同一ホストへのリクエスト間隔（秒）を返す関数
+        """
+        if aiohttp is None:
+            raise RuntimeError('aiohttpがインストールされていません')
+        self.concurrency = max(1, concurrency)
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.interval_resolver = interval_resolver or build_http_interval_resolver()
+        # タスクのインデックスをキーとした計測結果（確定した結果だけをcrawl_static_urlsで記録する）
+        self.timings: Dict[int, UrlTiming] = {}
+
+    def crawl(self, tasks: List[Tuple[int, str, object]], total: Optional[int] = None) -> Dict[int, Dict]:
+        """
+        タスクを非同期で取得して抽出する
+
+        Args:
+            tasks: (インデックス, URL, ConfigurableScraper) のリスト
+            total: 進捗表示に使用する全体の件数（省略時はタスク数）
+
+        Returns:
+            Dict[int, Dict]: タスクのインデックスをキーとした結果辞書
+        """
+        if not tasks:
+            return {}
+        return asyncio.run(self._crawl(tasks, total or len(tasks)))
+
+    async def _crawl(self, tasks, total: int) -> Dict[int, Dict]:
+        intervals: Dict[str, float] = {}
+        for _, url, _ in tasks:
+            host = get_host(url)
+            # 同一ホストに複数のサイト設定が該当する場合は長い方の間隔を採用
+            intervals[host] = max(intervals.get(host, 0.0), self.interval_resolver(url))
+        limiters = {host: _HostLimiter(self.per_host, interval) for host, interval in intervals.items()}
+        global_limit = asyncio.Semaphore(self.concurrency)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.per_host,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
+        client_timeout = aiohttp.ClientTimeout(total=self.timeout)
+        results: Dict[int, Dict] = {}
+
+        with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1), thread_name_prefix='html-parser') as parser_pool:
+            async with aiohttp.ClientSession(connector=connector, headers=DEFAULT_HEADERS, timeout=client_timeout) as session:
+                async def run_task(idx, url, scraper):
+                    timing = UrlTiming(url, scraper.name)
+                    try:
+                        # ホストの順番待ち（アクセス間隔の待機を含む）の間は全体の同時実行枠を使わず、
+                        # 実際のリクエスト中だけ枠を確保する（1ホストのURLが多くても他のホストを待たせない）
+                        async with limiters[get_host(url)]:
+                            async with global_limit:
+                                response = await self._fetch(session, url)
+                        loop = asyncio.get_running_loop()
+                        if response is None:
+                            result = self._failed_result()
+                        else:
+                            timing.add('http_fetch', response.elapsed)
+                            result = await loop.run_in_executor(parser_pool, _parse_response, scraper, url, response, timing)
+                    except Exception as e:
+                        # 1件の想定外のエラーで他のURLの取得を止めないよう、失敗結果にする
+                        # （http-then-browserのサイトはブラウザで再取得される）
+                        logger.warning(f"  HTTP取得中にエラーが発生しました (URL: {url[:80]}...): {type(e).__name__}: {e}")
+                        result = self._failed_result()
+                    result['仕入れ元URL'] = url
+                    timing.result = result
+                    timing.total_seconds = sum(timing.stages.values())
+                    self.timings[idx] = timing
+                    results[idx] = result
+                    print(f"[{idx + 1}/{total}] (http) {url}: {result['仕入れ価格']} / {result['在庫ステータス']}")
+
+                outcomes = await asyncio.gather(
+                    *(run_task(idx, url, scraper) for idx, url, scraper in tasks),
+                    return_exceptions=True
+                )
+                for (idx, url, _), outcome in zip(tasks, outcomes):
+                    if isinstance(outcome, Exception):
+                        logger.warning(f"  HTTP取得の結果を記録できませんでした（ブラウザで再取得します） (URL: {url[:80]}...): {outcome}")
+
+        return results
+
+    async def _fetch(self, session, url: str) -> Optional[HttpFetchResult]:
+        """URLを取得する（接続エラー・タイムアウトの場合はNone）"""
+        started = time.monotonic()
+        try:
+            async with session.get(url, allow_redirects=True) as response:
+                content = await response.read()
+                return HttpFetchResult(
+                    url=str(response.url),
+                    status_code=response.status,
+                    content=content,
+                    encoding=response.charset,
+                    elapsed=time.monotonic() - started
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"  HTTP取得に失敗しました (URL: {url[:80]}...): {type(e).__name__}: {e}")
+            return None
+
+    @staticmethod
+    def _failed_result() -> Dict:
+        return {
+            '仕入れ価格': -1,
+            '在庫ステータス': '不明',
+            '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+
+def _parse_response(scraper, url: str, response: HttpFetchResult, timing: UrlTiming) -> Dict:
+    """HTMLの解析スレッドで価格・在庫を抽出する（解析時間と価格の取得方法をtimingに記録する）"""
+    with instrumentation.activate(timing), instrumentation.stage('html_parse'):
+        return scraper.scrape_static_response(url, response)
+
+
+def crawl_static_urls(
+    tasks: List[Tuple[int, str]],
+    config_loader,
+    total: Optional[int] = None
+) -> Tuple[Dict[int, Dict], Set[str]]:
+    """
+    HTTP取得が可能なサイトのURLを非同期でまとめて取得する
+
+    取得方式がhttpのURLは結果を確定し、http-then-browserのURLは価格・在庫を取得できた場合のみ確定する。
+    確定しなかったURLは、呼び出し側でブラウザにより処理する。
+
+    Args:
+        tasks: (インデックス, URL) のリスト
+        config_loader: ScraperConfigLoaderインスタンス
+        total: 進捗表示に使用する全体の件数
+
+    Returns:
+        Tuple[Dict[int, Dict], Set[str]]:
+            (確定した結果（インデックスがキー）, 静的取得に失敗しブラウザで再取得するURLの集合)
+    """
+    if not is_available():
+        logger.info("aiohttpがインストールされていないため、非同期HTTP取得は行いません")
+        return {}, set()
+
+    from .configurable_scraper import ConfigurableScraper
+    from .scraper_registry import ScraperRegistry
+
+    # ブラウザを使用しないスクレイパーをサイトごとに1つ作成して全URLで共有する
+    registry = ScraperRegistry(None, config_loader)
+    static_tasks = []
+    for idx, url in tasks:
+        scraper = registry.get(url)
+        if not isinstance(scraper, ConfigurableScraper):
+            continue
+        if scraper.fetch_mode != 'browser':
+            static_tasks.append((idx, url, scraper))
+
+    if not static_tasks:
+        return {}, set()
+
+    print(f"HTTP取得: {len(static_tasks)}件のURLを非同期で取得します")
+    started = time.monotonic()
+    crawler = AsyncHttpCrawler(interval_resolver=build_http_interval_resolver(config_loader))
+    crawled = crawler.crawl(static_tasks, total=total)
+
+    results: Dict[int, Dict] = {}
+    browser_fallback_urls: Set[str] = set()
+    for idx, url, scraper in static_tasks:
+        result = crawled.get(idx)
+        if result is None:
+            continue
+        is_failed = result['仕入れ価格'] == -1 or result['在庫ステータス'] == '不明'
+        if is_failed and scraper.fetch_mode == 'http-then-browser':
+            browser_fallback_urls.add(url)
+        else:
+            results[idx] = result
+            # ブラウザで再取得するURLは、ブラウザでの処理時に計測する
+            if idx in crawler.timings:
+                record_timing(crawler.timings[idx])
+
+    print(
+        f"HTTP取得完了: {len(results)}件を確定、{len(browser_fallback_urls)}件をブラウザで再取得します"
+        f"（{time.monotonic() - started:.1f}秒）"
+    )
+    return results, browser_fallback_urls
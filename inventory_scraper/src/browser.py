@@ -3,24 +3,53 @@
 Selenium WebDriverのインスタンスを生成する
 """
 import os
+import shutil
+import logging
+from pathlib import Path
+from typing import Optional
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
 from .config import CHROME_PROFILE_PATH, CHROME_PROFILE_NAME, DATA_DIR, CHROME_USER_AGENT
 
+# ロガーを設定
+logger = logging.getLogger(__name__)
 
-def create_browser():
+# ワーカー用プロファイルの保存先
+WORKER_PROFILES_DIR = DATA_DIR / 'browser_profiles'
+
+# プロファイルコピー時に除外するファイル・ディレクトリ（キャッシュやロックファイル）
+PROFILE_COPY_IGNORE_PATTERNS = (
+    'Cache', 'Code Cache', 'GPUCache', 'GrShaderCache', 'ShaderCache',
+    'Service Worker', 'Crashpad', 'Singleton*', 'LOCK', 'lockfile', '*.lock'
+)
+
+
+def create_browser(
+    user_data_dir: Optional[str] = None,
+    download_dir: Optional[Path] = None,
+    page_load_strategy: str = 'normal'
+):
     """
     Selenium WebDriverのインスタンスを生成する
     
+    Args:
+        user_data_dir: Chromeのユーザーデータディレクトリ（省略時は.envのプロファイルを使用）
+        download_dir: ダウンロード先ディレクトリ（省略時はDATA_DIR）
+        page_load_strategy: ドライバーのページ読み込み戦略（既定はnormal、browser.get()が読み込み完了まで待機する）
+    
     Returns:
         webdriver.Chrome: Chrome WebDriverのインスタンス
     """
     chrome_options = Options()
     
     # 既存のChromeプロファイルを使用（Googleログイン状態の維持）
-    if CHROME_PROFILE_PATH and CHROME_PROFILE_NAME:
+    if user_data_dir:
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
+        if CHROME_PROFILE_NAME:
+            chrome_options.add_argument(f'--profile-directory={CHROME_PROFILE_NAME}')
+    elif CHROME_PROFILE_PATH and CHROME_PROFILE_NAME:
         user_data_dir = os.path.join(CHROME_PROFILE_PATH, CHROME_PROFILE_NAME)
         chrome_options.add_argument(f'--user-data-dir={user_data_dir}')
         chrome_options.add_argument(f'--profile-directory={CHROME_PROFILE_NAME}')
@@ -38,15 +67,22 @@ def create_browser():
     
     # ダウンロード設定
     # DATA_DIRを絶対パスに変換して設定
-    download_dir = str(DATA_DIR.resolve())
+    download_dir = Path(download_dir) if download_dir else DATA_DIR
+    download_dir.mkdir(parents=True, exist_ok=True)
     prefs = {
-        'download.default_directory': download_dir,
+        'download.default_directory': str(download_dir.resolve()),
         'download.prompt_for_download': False,
         'download.directory_upgrade': True,
         'safebrowsing.enabled': True
     }
     chrome_options.add_experimental_option('prefs', prefs)
     
+    # ネットワークアイドル判定用にパフォーマンスログ（CDPのNetworkイベント）を有効化
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    
+    # noneの場合、browser.get()は読み込み完了を待たず、サイト別の読み込み戦略・期限はpage_loading.navigate()で判定する
+    chrome_options.page_load_strategy = page_load_strategy
+    
     # WebDriverManagerを使用してChromeDriverを自動管理
     service = Service(ChromeDriverManager().install())
     
@@ -60,3 +96,109 @@ def create_browser():
     })
     
     return driver
+
+
+def create_headless_browser(worker_id: int = 0, page_load_strategy: str = 'normal'):
+    """
+    Chromeプロファイルを使用しないヘッドレスのWebDriverを生成する（ベンチマーク用）
+    
+    ページの待機条件の判定を通常のスクレイピングと同じにするため、
+    パフォーマンスログ・User-Agentはcreate_browser()と同じ設定にする。
+    
+    Args:
+        worker_id: ワーカー番号（未使用）
+        page_load_strategy: ドライバーのページ読み込み戦略（既定はnormal）
+    
+    Returns:
+        webdriver.Chrome: Chrome WebDriverのインスタンス
+    """
+    chrome_options = Options()
+    chrome_options.add_argument('--headless=new')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    chrome_options.page_load_strategy = page_load_strategy
+    
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    driver.execute_cdp_cmd('Network.setUserAgentOverride', {
+        "userAgent": CHROME_USER_AGENT
+    })
+    return driver
+
+
+def create_headless_scraper_browser(worker_id: int = 0):
+    """
+    スクレイピング用のヘッドレスWebDriverを生成する（ベンチマーク用）
+    
+    BrowserPoolのbrowser_factoryとしても使用できる。create_worker_browser()と同じく
+    ページ読み込み戦略をnoneにし、読み込みの待機はpage_loading.navigate()に任せる。
+    
+    Args:
+        worker_id: ワーカー番号（BrowserPoolから渡される、未使用）
+    
+    Returns:
+        webdriver.Chrome: Chrome WebDriverのインスタンス
+    """
+    return create_headless_browser(worker_id, page_load_strategy='none')
+
+
+def prepare_worker_profile(worker_id: int) -> str:
+    """
+    ブラウザプール用のワーカー専用プロファイルディレクトリを用意する
+    
+    Chromeは同じユーザーデータディレクトリを複数プロセスで共有できないため、
+    .envで指定されたプロファイルをワーカーごとにコピーして使用する。
+    コピーは初回のみ行い、2回目以降は既存のコピーを再利用する。
+    
+    Args:
+        worker_id: ワーカー番号
+    
+    Returns:
+        str: ワーカー用ユーザーデータディレクトリのパス
+    """
+    worker_dir = WORKER_PROFILES_DIR / f'worker_{worker_id}'
+    if worker_dir.exists():
+        return str(worker_dir.resolve())
+    
+    source_dir = None
+    if CHROME_PROFILE_PATH and CHROME_PROFILE_NAME:
+        source_dir = Path(CHROME_PROFILE_PATH) / CHROME_PROFILE_NAME
+    
+    if source_dir and source_dir.is_dir():
+        logger.info(f"ワーカー{worker_id}用にChromeプロファイルをコピーしています: {source_dir} -> {worker_dir}")
+        try:
+            shutil.copytree(
+                source_dir,
+                worker_dir,
+                ignore=shutil.ignore_patterns(*PROFILE_COPY_IGNORE_PATTERNS)
+            )
+        except (OSError, shutil.Error) as e:
+            # 使用中のファイルなどでコピーに失敗した場合は空のプロファイルで続行
+            logger.warning(f"プロファイルのコピーに失敗しました（空のプロファイルを使用します）: {e}")
+            worker_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        worker_dir.mkdir(parents=True, exist_ok=True)
+    
+    return str(worker_dir.resolve())
+
+
+def create_worker_browser(worker_id: int):
+    """
+    ブラウザプールのワーカー用WebDriverを生成する
+    
+    create_browser()と同じ設定で、ワーカー専用のプロファイルとダウンロード先を使用する。
+    ワーカーのブラウザはスクレイピング専用のため、ページ読み込み戦略をnoneにし、
+    サイト別の読み込み戦略・期限・早期停止はpage_loading.navigate()で判定する。
+    
+    Args:
+        worker_id: ワーカー番号
+    
+    Returns:
+        webdriver.Chrome: Chrome WebDriverのインスタンス
+    """
+    user_data_dir = prepare_worker_profile(worker_id)
+    download_dir = DATA_DIR / 'downloads' / f'worker_{worker_id}'
+    return create_browser(user_data_dir=user_data_dir, download_dir=download_dir, page_load_strategy='none')
@@ -0,0 +1,281 @@
+"""
+ブラウザプールモジュール
+複数のWebDriverインスタンスでURLを並列にスクレイピングする
+"""
+import threading
+import logging
+from typing import Callable, Dict, List, Optional, Tuple, Any
+from selenium.common.exceptions import WebDriverException
+from .config import SCRAPER_WORKER_MAX_FAILURES
+from .politeness import PolitenessScheduler
+from .state_store import is_failed_result
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# ブラウザセッションが失われたことを示すエラーメッセージ
+DEAD_SESSION_MARKERS = (
+    'invalid session id',
+    'chrome not reachable',
+    'disconnected',
+    'session deleted',
+    'no such window',
+    'target window already closed'
+)
+
+# ブラウザの起動に連続して失敗した場合にワーカーを停止するまでの回数
+BROWSER_START_RETRIES = 3
+
+
+class BrowserPool:
+    """
+    WebDriverインスタンスのプール
+
+    ワーカースレッドごとに専用のWebDriverを持ち、共有の作業キューからURLを取り出して処理する。
+    結果はタスクのインデックスをキーとして返すため、呼び出し側で入力順に並べ直せる。
+    """
+
+    def __init__(
+        self,
+        size: int,
+        browser_factory: Optional[Callable[[int], Any]] = None,
+        max_failures: int = SCRAPER_WORKER_MAX_FAILURES,
+        on_browser_closed: Optional[Callable[[Any], None]] = None
+    ):
+        """
+        Args:
+            size: ワーカー（ブラウザ）数
+            browser_factory: ワーカー番号を受け取りWebDriverを返す関数（省略時はcreate_worker_browser）
+            max_failures: ブラウザを再起動するまでの連続失敗回数
+            on_browser_closed: ワーカーのブラウザを終了（再起動・停止）したときに呼び出す関数
+                               （ブラウザごとに保持している情報の破棄などに使用）
+        """
+        if browser_factory is None:
+            from .browser import create_worker_browser
+            browser_factory = create_worker_browser
+        self.size = max(1, size)
+        self.browser_factory = browser_factory
+        self.max_failures = max(1, max_failures)
+        self.on_browser_closed = on_browser_closed
+        self._browsers: Dict[int, Any] = {}
+        self._browsers_lock = threading.Lock()
+        self._factory_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+        return False
+
+    def run(
+        self,
+        tasks: List[Tuple[int, str]],
+        handler: Callable[[Any, str], Dict],
+        error_result: Callable[[str], Dict],
+        scheduler: Optional[PolitenessScheduler] = None
+    ) -> Dict[int, Dict]:
+        """
+        タスクをワーカーに振り分けて実行する
+
+        Args:
+            tasks: (インデックス, URL) のリスト
+            handler: (browser, url) を受け取り結果辞書を返す関数
+            error_result: URLを受け取りエラー時の結果辞書を返す関数
+            scheduler: タスクを払い出すスケジューラ（省略時はアクセス間隔なしで順に払い出す）
+
+        Returns:
+            Dict[int, Dict]: タスクのインデックスをキーとした結果辞書
+
+        Raises:
+            KeyboardInterrupt: 実行中に中断された場合（ブラウザは終了済み）
+        """
+        if scheduler is None:
+            scheduler = PolitenessScheduler(tasks, interval_resolver=lambda url: 0.0, jitter=0.0)
+
+        results: Dict[int, Dict] = {}
+        results_lock = threading.Lock()
+        total = len(tasks)
+        worker_count = min(self.size, total) if total else 0
+        # 稼働中のワーカー数（ブラウザを起動できずに停止したワーカーは除く）
+        self._active_workers = worker_count
+        self._active_lock = threading.Lock()
+
+        threads = []
+        for worker_id in range(worker_count):
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(worker_id, scheduler, handler, error_result, results, results_lock, total),
+                name=f'scraper-worker-{worker_id}',
+                daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+
+        try:
+            # join(timeout)で待機することで、メインスレッドがKeyboardInterruptを受け取れるようにする
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            logger.warning("中断要求を受け付けました。ワーカーを停止しています...")
+            scheduler.stop()
+            self.shutdown()
+            raise
+
+        return results
+
+    def _worker_loop(self, worker_id, scheduler, handler, error_result, results, results_lock, total):
+        """ワーカースレッドのメインループ"""
+        try:
+            self._process_tasks(worker_id, scheduler, handler, error_result, results, results_lock, total)
+        finally:
+            self._finish_worker(scheduler, error_result, results, results_lock)
+
+    def _process_tasks(self, worker_id, scheduler, handler, error_result, results, results_lock, total):
+        """スケジューラからタスクを取り出して処理する（ブラウザを起動できない場合は途中で終了する）"""
+        consecutive_failures = 0
+        start_failures = 0
+
+        while not self._stop_event.is_set():
+            task = scheduler.get()
+            if task is None:
+                break
+            idx, url = task
+
+            print(f"[{idx + 1}/{total}] (worker {worker_id}) 処理中: {url}")
+
+            result = None
+            start_failed = False
+            for attempt in range(2):
+                try:
+                    browser = self._get_browser(worker_id)
+                except Exception as e:
+                    logger.error(f"ワーカー{worker_id}: ブラウザの起動に失敗しました: {e}")
+                    start_failed = True
+                    break
+                start_failures = 0
+
+                session_lost = False
+                try:
+                    result = handler(browser, url)
+                    # スクレイパーは例外を握りつぶすため、失敗時はセッションの生存を確認する
+                    if is_failed_result(result):
+                        session_lost = not self._is_browser_alive(browser)
+                except Exception as e:
+                    logger.error(f"ワーカー{worker_id}: エラーが発生しました ({url}): {e}")
+                    result = None
+                    session_lost = self._is_dead_session_error(e) or not self._is_browser_alive(browser)
+
+                if session_lost and attempt == 0 and not self._stop_event.is_set():
+                    # ブラウザセッションが失われた場合は再起動して1回だけ再試行
+                    self._recycle_browser(worker_id, 'セッション切断')
+                    continue
+                break
+
+            if start_failed and result is None:
+                # URLの失敗ではないため、タスクを戻して他のワーカー（または次の起動）に処理させる
+                scheduler.requeue(task)
+                start_failures += 1
+                if start_failures >= BROWSER_START_RETRIES:
+                    logger.error(
+                        f"ワーカー{worker_id}: ブラウザの起動に{BROWSER_START_RETRIES}回連続で失敗したため停止します"
+                    )
+                    return
+                continue
+
+            if result is None:
+                result = error_result(url)
+
+            if is_failed_result(result):
+                consecutive_failures += 1
+                if consecutive_failures >= self.max_failures:
+                    self._recycle_browser(worker_id, f'{consecutive_failures}回連続で失敗')
+                    consecutive_failures = 0
+            else:
+                consecutive_failures = 0
+
+            with results_lock:
+                results[idx] = result
+
+    def _finish_worker(self, scheduler, error_result, results, results_lock):
+        """
+        ワーカーの終了を記録する
+
+        最後のワーカーが終了した時点で残っているタスク（ブラウザを起動できずに戻したタスク）は、
+        処理できるワーカーがないためエラー結果にする。
+        """
+        with self._active_lock:
+            self._active_workers -= 1
+            if self._active_workers > 0:
+                return
+            remaining_tasks = scheduler.drain()
+        if remaining_tasks:
+            logger.error(f"稼働中のワーカーがないため、残りの{len(remaining_tasks)}件をエラーとして記録します")
+        with results_lock:
+            for idx, url in remaining_tasks:
+                results[idx] = error_result(url)
+
+    def _get_browser(self, worker_id: int):
+        """ワーカーのブラウザを取得する（未作成の場合は作成する）"""
+        with self._browsers_lock:
+            browser = self._browsers.get(worker_id)
+        if browser is not None:
+            return browser
+
+        # ChromeDriverのダウンロード・起動が競合しないよう、生成は1つずつ行う
+        with self._factory_lock:
+            if self._stop_event.is_set():
+                raise RuntimeError('ブラウザプールは停止しています')
+            logger.info(f"ワーカー{worker_id}: ブラウザを起動しています...")
+            browser = self.browser_factory(worker_id)
+
+        with self._browsers_lock:
+            self._browsers[worker_id] = browser
+        return browser
+
+    def _recycle_browser(self, worker_id: int, reason: str):
+        """ワーカーのブラウザを終了し、次回取得時に再作成させる"""
+        logger.warning(f"ワーカー{worker_id}: ブラウザを再起動します（{reason}）")
+        with self._browsers_lock:
+            browser = self._browsers.pop(worker_id, None)
+        self._quit_browser(browser)
+
+    def shutdown(self):
+        """すべてのワーカーのブラウザを終了する"""
+        self._stop_event.set()
+        with self._browsers_lock:
+            browsers = list(self._browsers.items())
+            self._browsers.clear()
+        for worker_id, browser in browsers:
+            logger.info(f"ワーカー{worker_id}: ブラウザを閉じています...")
+            self._quit_browser(browser)
+
+    def _quit_browser(self, browser):
+        if browser is None:
+            return
+        try:
+            browser.quit()
+        except Exception as e:
+            logger.debug(f"ブラウザの終了に失敗しました（無視します）: {e}")
+        if self.on_browser_closed is not None:
+            try:
+                self.on_browser_closed(browser)
+            except Exception as e:
+                logger.debug(f"ブラウザ終了時の処理に失敗しました（無視します）: {e}")
+
+    @staticmethod
+    def _is_dead_session_error(error: Exception) -> bool:
+        if not isinstance(error, WebDriverException):
+            return False
+        message = str(error).lower()
+        return any(marker in message for marker in DEAD_SESSION_MARKERS)
+
+    @staticmethod
+    def _is_browser_alive(browser) -> bool:
+        try:
+            browser.current_url
+            return True
+        except Exception:
+            return False
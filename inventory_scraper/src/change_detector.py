@@ -0,0 +1,112 @@
+"""
+変更検出モジュール
+スクレイピング結果をスプレッドシートの現在の「仕入れ価格」「在庫ステータス」と比較し、
+値が変化した行だけをGAS Webアプリに送信できるようにする
+"""
+import re
+import logging
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from .state_store import normalize_url
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']
+
+
+def parse_sheet_price(value) -> Optional[int]:
+    """
+    スプレッドシートの「仕入れ価格」の値を数値に変換する
+
+    CSVエクスポートでは表示形式（「¥1,980」「1980.0」など）のまま出力されるため、数字以外を除去して比較する。
+
+    Args:
+        value: セルの値
+
+    Returns:
+        Optional[int]: 価格、空欄や数値でない場合はNone
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    text = re.sub(r'[^\d.\-]', '', str(value))
+    if not text:
+        return None
+    try:
+        return int(round(float(text)))
+    except ValueError:
+        return None
+
+
+def build_baseline(sheet_df: pd.DataFrame) -> Dict[str, Tuple[Optional[int], str]]:
+    """
+    スプレッドシートの現在の値を正規化URLをキーとした辞書にする
+
+    Args:
+        sheet_df: スプレッドシートからダウンロードしたDataFrame
+
+    Returns:
+        Dict[str, Tuple[Optional[int], str]]: 正規化URLをキーとした (仕入れ価格, 在庫ステータス)
+    """
+    if sheet_df is None or '仕入れ元URL' not in sheet_df.columns:
+        return {}
+    prices = sheet_df['仕入れ価格'] if '仕入れ価格' in sheet_df.columns else pd.Series(None, index=sheet_df.index)
+    statuses = sheet_df['在庫ステータス'] if '在庫ステータス' in sheet_df.columns else pd.Series('', index=sheet_df.index)
+    baseline = {}
+    for url, price, status in zip(sheet_df['仕入れ元URL'], prices, statuses):
+        if pd.isna(url) or not str(url).strip():
+            continue
+        status = '' if pd.isna(status) else str(status).strip()
+        baseline[normalize_url(str(url))] = (parse_sheet_price(price), status)
+    return baseline
+
+
+def split_changed_rows(
+    result_df: pd.DataFrame,
+    sheet_df: pd.DataFrame
+) -> Tuple[pd.DataFrame, Dict[str, List[str]]]:
+    """
+    スクレイピング結果を、スプレッドシートの値から変化した行と変化していない行に分ける
+
+    価格が-1（取得失敗）の行はGAS側で価格を書き込まないため、価格の比較対象にしない。
+    スプレッドシートに存在しないURLは変化した行として扱う。
+
+    Args:
+        result_df: スクレイピング結果のDataFrame
+        sheet_df: スクレイピング前にダウンロードしたスプレッドシートのDataFrame
+
+    Returns:
+        Tuple[pd.DataFrame, Dict[str, List[str]]]:
+            (変化した行のDataFrame, 変化していない行の最終更新日時ごとのURLリスト)
+    """
+    baseline = build_baseline(sheet_df)
+    changed_mask = []
+    touched: Dict[str, List[str]] = {}
+
+    for url, price, status, fetched_at in zip(
+        result_df['仕入れ元URL'],
+        result_df['仕入れ価格'],
+        result_df['在庫ステータス'],
+        result_df['最終更新日時']
+    ):
+        current = baseline.get(normalize_url(str(url)))
+        if current is None:
+            changed_mask.append(True)
+            continue
+
+        current_price, current_status = current
+        new_price = parse_sheet_price(price)
+        price_changed = new_price is not None and new_price >= 0 and new_price != current_price
+        status_changed = str(status).strip() != current_status
+        is_changed = price_changed or status_changed
+        changed_mask.append(is_changed)
+        if not is_changed:
+            touched.setdefault(str(fetched_at), []).append(str(url))
+
+    changed_df = result_df[pd.Series(changed_mask, index=result_df.index, dtype=bool)]
+    return changed_df.reindex(columns=RESULT_COLUMNS), touched
+
+
+def count_touched(touched: Dict[str, List[str]]) -> int:
+    """変化していない行の件数を返す"""
+    return sum(len(urls) for urls in touched.values())
@@ -0,0 +1,162 @@
+"""
+チェックポイントモジュール
+スクレイピング結果を1件ごとにJSONL形式のジャーナルへ追記し、
+中断した実行を--resumeで再開できるようにする
+"""
+import json
+import os
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+import pandas as pd
+from .config import DATA_DIR
+from .state_store import normalize_url
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = DATA_DIR / 'checkpoint.jsonl'
+
+# ジャーナルに保存する結果の列
+RESULT_COLUMNS = ['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']
+
+
+class CheckpointJournal:
+    """
+    スクレイピング結果のジャーナル
+
+    結果を1行1件のJSONで追記し、書き込みごとにfsyncする。
+    プロセスが異常終了しても、書き込み済みの結果は次回の--resumeで再利用できる。
+    アップロードが完了したらdiscard()でジャーナルを削除する。
+    """
+
+    def __init__(self, path: Path = CHECKPOINT_PATH):
+        """
+        Args:
+            path: ジャーナルファイルのパス
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def exists(self) -> bool:
+        """中断された実行のジャーナルが存在するか"""
+        return self.path.exists() and self.path.stat().st_size > 0
+
+    def load(self) -> Dict[str, Dict]:
+        """
+        ジャーナルから完了済みの結果を読み込む
+
+        書き込み途中で中断された最終行など、解析できない行は無視する。
+
+        Returns:
+            Dict[str, Dict]: 正規化URLをキーとした結果（同じURLは後の結果を優先）
+        """
+        results: Dict[str, Dict] = {}
+        if not self.path.exists():
+            return results
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"チェックポイントの{line_number}行目を解析できないため無視します")
+                    continue
+                if entry.get('type') != 'result':
+                    continue
+                result = entry.get('result') or {}
+                url_key = normalize_url(str(result.get('仕入れ元URL') or ''))
+                if url_key:
+                    results[url_key] = result
+        return results
+
+    def open(self, resume: bool = False):
+        """
+        ジャーナルを書き込み用に開く
+
+        Args:
+            resume: Trueの場合は既存のジャーナルに追記し、Falseの場合は新しく作り直す
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        mode = 'a' if resume else 'w'
+        with self._lock:
+            self._file = open(self.path, mode, encoding='utf-8')
+            if resume and self._file.tell() > 0 and not self._ends_with_newline():
+                # 書き込み途中で中断された最終行の後ろに続けて書かないよう改行する
+                self._file.write('\n')
+            self._write_line({
+                'type': 'resume' if resume else 'run',
+                'started_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            })
+
+    def append(self, result: Dict):
+        """
+        1件の結果を追記する（ワーカースレッドから呼び出される）
+
+        Args:
+            result: 「仕入れ元URL」を含むスクレイピング結果
+        """
+        entry = {
+            'type': 'result',
+            'result': {column: _to_json_value(result.get(column)) for column in RESULT_COLUMNS}
+        }
+        with self._lock:
+            if self._file is None:
+                return
+            self._write_line(entry)
+
+    def close(self):
+        """ジャーナルを閉じる（ファイルは残す）"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def discard(self):
+        """アップロード完了後にジャーナルを削除する"""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
+
+    def _write_line(self, entry: Dict):
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+
+def _to_json_value(value):
+    """pandas/numpyの値をJSONに変換できる値にする"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and pd.isna(value):
+        return None
+    return value
+
+
+def results_to_dataframe(results: List[Dict]) -> pd.DataFrame:
+    """
+    ジャーナルの結果をscrape_urlsと同じ列のDataFrameにする
+
+    Args:
+        results: 結果のリスト
+
+    Returns:
+        pd.DataFrame: 結果のDataFrame
+    """
+    if not results:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.DataFrame(results).reindex(columns=RESULT_COLUMNS)
@@ -35,9 +35,35 @@ load_dotenv(env_path)
 SPREADSHEET_ID = os.getenv('SPREADSHEET_ID', '')
 SHEET_GID = os.getenv('SHEET_GID', '0')  # 在庫管理シートのGID
 SUPPLIER_SHEET_GID = os.getenv('SUPPLIER_SHEET_GID', '')  # 仕入れ元マスターシートのGID（空の場合は自動検出）
+# ブラウザのCookieを引き継いでCSVエクスポートを直接取得するか（失敗時はブラウザでダウンロード）
+SHEET_DIRECT_FETCH = os.getenv('SHEET_DIRECT_FETCH', 'true').lower() in ('true', '1', 'yes')
+# CSVエクスポートを直接取得する場合のタイムアウト（秒）
+SHEET_FETCH_TIMEOUT = float(os.getenv('SHEET_FETCH_TIMEOUT', '30'))
 
 # Google Apps Script WebアプリURL（直接更新用）
 GAS_WEB_APP_URL = os.getenv('GAS_WEB_APP_URL', '')
+# 送信方式（delta: 価格・在庫ステータスが変化した行のみ送信 / full: 全件送信）
+GAS_UPLOAD_MODE = os.getenv('GAS_UPLOAD_MODE', 'delta').strip().lower()
+# deltaの場合に、変化のない行の「最終更新日時」も更新するか
+GAS_UPLOAD_TOUCHED = os.getenv('GAS_UPLOAD_TOUCHED', 'false').lower() in ('true', '1', 'yes')
+# 1回のPOSTで送信するCSVの最大サイズ（バイト）。超える場合はチャンクに分割する
+GAS_MAX_CHUNK_SIZE = max(1000, int(os.getenv('GAS_MAX_CHUNK_SIZE', '50000')))
+# チャンクを同時に送信する数
+GAS_UPLOAD_CONCURRENCY = max(1, int(os.getenv('GAS_UPLOAD_CONCURRENCY', '4')))
+# 429・5xx・HTMLエラーページの場合の再送回数と、初回の再送までの待機時間（秒、再送ごとに2倍）
+GAS_UPLOAD_MAX_RETRIES = max(0, int(os.getenv('GAS_UPLOAD_MAX_RETRIES', '4')))
+GAS_UPLOAD_RETRY_DELAY = float(os.getenv('GAS_UPLOAD_RETRY_DELAY', '2'))
+# 送信データの形式（csv: CSV文字列をそのまま送信 / columnar: 列ごとの配列をgzip圧縮して送信）
+GAS_PAYLOAD_FORMAT = os.getenv('GAS_PAYLOAD_FORMAT', 'csv').strip().lower()
+# スクレイピング中に完了した結果をバックグラウンドで逐次送信するか
+GAS_STREAM_UPLOAD = os.getenv('GAS_STREAM_UPLOAD', 'false').lower() in ('true', '1', 'yes')
+# 逐次送信で1回に送信する最大件数
+GAS_STREAM_BATCH_SIZE = max(1, int(os.getenv('GAS_STREAM_BATCH_SIZE', '200')))
+# 逐次送信で件数に達しなくても送信するまでの時間（秒）
+GAS_STREAM_INTERVAL = float(os.getenv('GAS_STREAM_INTERVAL', '60'))
+# 逐次送信に失敗したバッチの再送回数と、初回の再送までの待機時間（秒、再送ごとに2倍）
+GAS_STREAM_MAX_RETRIES = max(0, int(os.getenv('GAS_STREAM_MAX_RETRIES', '5')))
+GAS_STREAM_RETRY_DELAY = float(os.getenv('GAS_STREAM_RETRY_DELAY', '10'))
 
 # ローカルChrome設定
 CHROME_PROFILE_PATH = os.getenv('CHROME_PROFILE_PATH', '')
@@ -58,10 +84,84 @@ LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 # デバッグモードを有効にする場合は 'true' または '1' を設定（デフォルト: 無効）
 ENABLE_DEBUG_MODE = os.getenv('ENABLE_DEBUG_MODE', 'false').lower() in ('true', '1', 'yes')
 
+# スクレイピング並列実行設定
+# ブラウザプールのワーカー数（1の場合は従来通り単一ブラウザで逐次処理）
+SCRAPER_POOL_SIZE = max(1, int(os.getenv('SCRAPER_POOL_SIZE', '1')))
+# ワーカーのブラウザを再起動するまでの連続失敗回数
+SCRAPER_WORKER_MAX_FAILURES = max(1, int(os.getenv('SCRAPER_WORKER_MAX_FAILURES', '3')))
+
+# アクセス間隔設定
+# サイト別の「access_interval」（仕入れ元マスターの「アクセス間隔(秒)」）が未設定の場合の同一ホストへの最小アクセス間隔（秒）
+SCRAPER_DEFAULT_ACCESS_INTERVAL = float(os.getenv('SCRAPER_DEFAULT_ACCESS_INTERVAL', '3'))
+# アクセス間隔に加えるランダムな揺らぎの最大値（秒）
+SCRAPER_ACCESS_JITTER = float(os.getenv('SCRAPER_ACCESS_JITTER', '2'))
+
+# ページ準備完了待ち設定
+# サイト別の「ready_timeout」が未設定の場合の待機期限（秒）
+SCRAPER_READY_TIMEOUT = float(os.getenv('SCRAPER_READY_TIMEOUT', '10'))
+# network_idle条件で通信が途絶えたとみなすまでの時間（ミリ秒）
+SCRAPER_NETWORK_IDLE_MS = int(os.getenv('SCRAPER_NETWORK_IDLE_MS', '500'))
+
+# ページ読み込み設定
+# サイト別の page_load_strategy が未設定の場合の読み込み戦略（normal: loadイベント / eager: DOMContentLoaded / none: 待機しない）
+SCRAPER_PAGE_LOAD_STRATEGY = os.getenv('SCRAPER_PAGE_LOAD_STRATEGY', 'normal').strip().lower()
+# サイト別の page_load_timeout が未設定の場合の読み込み期限（秒）。期限に達したページは読み込みを打ち切る
+SCRAPER_PAGE_LOAD_TIMEOUT = float(os.getenv('SCRAPER_PAGE_LOAD_TIMEOUT', '30'))
+# サイト別の early_stop が未設定の場合に、待機条件（ready_conditions）を満たした時点で読み込みを打ち切るか
+SCRAPER_EARLY_STOP = os.getenv('SCRAPER_EARLY_STOP', 'false').lower() in ('true', '1', 'yes')
+
+# リソースブロック設定
+# 価格・在庫の抽出に使用しないリソースの読み込みをCDP（Network.setBlockedURLs）で遮断するか
+SCRAPER_RESOURCE_BLOCKING = os.getenv('SCRAPER_RESOURCE_BLOCKING', 'true').lower() in ('true', '1', 'yes')
+# サイト別の resource_blocking が未設定の場合に遮断する種類（image / media / font / stylesheet / tracker）
+SCRAPER_BLOCKED_RESOURCE_TYPES = os.getenv('SCRAPER_BLOCKED_RESOURCE_TYPES', 'image,media,font,tracker')
+
+# 価格・在庫の抽出方式
+# script: 1回のexecute_scriptでページ情報をまとめて取得（既定） / webdriver: 要素ごとにWebDriverで取得
+SCRAPER_EXTRACTION_MODE = os.getenv('SCRAPER_EXTRACTION_MODE', 'script').strip().lower()
+
+# ページの取得方式（サイト別のfetch_modeが未設定の場合に使用）
+# browser: Chromeで取得 / http: requestsでHTMLのみ取得 / http-then-browser: HTTPで取得できない場合のみChromeで取得
+SCRAPER_FETCH_MODE = os.getenv('SCRAPER_FETCH_MODE', 'browser').strip().lower()
+# HTTP取得のタイムアウト（秒）
+SCRAPER_HTTP_TIMEOUT = float(os.getenv('SCRAPER_HTTP_TIMEOUT', '15'))
+
+# 非同期HTTPクローラー設定（aiohttpが必要）
+# HTTP取得が可能なサイトのURLをブラウザ処理の前にまとめて非同期で取得する
+SCRAPER_ASYNC_HTTP = os.getenv('SCRAPER_ASYNC_HTTP', 'true').lower() in ('true', '1', 'yes')
+# 同時に実行するHTTPリクエストの上限
+SCRAPER_HTTP_CONCURRENCY = max(1, int(os.getenv('SCRAPER_HTTP_CONCURRENCY', '16')))
+# 同一ホストへの同時接続数の上限
+SCRAPER_HTTP_PER_HOST = max(1, int(os.getenv('SCRAPER_HTTP_PER_HOST', '2')))
+# 同一ホストへのHTTPリクエストの最小間隔（秒）。サイト別の http_access_interval・access_interval がどちらも未設定の場合に使用
+SCRAPER_HTTP_MIN_INTERVAL = float(os.getenv('SCRAPER_HTTP_MIN_INTERVAL', '0.5'))
+
+# 差分スクレイピング設定
+# 前回の取得から更新間隔（分）を過ぎたURLだけをスクレイピングする（main.pyの--fullで全件取得）
+# サイト別の refresh_ttl_minutes / refresh_ttl_by_status が未設定の場合に使用
+SCRAPER_REFRESH_TTL_MINUTES = float(os.getenv('SCRAPER_REFRESH_TTL_MINUTES', '120'))
+# 売り切れの商品の更新間隔（分）
+SCRAPER_SOLD_OUT_TTL_MINUTES = float(os.getenv('SCRAPER_SOLD_OUT_TTL_MINUTES', '1440'))
+
 # データ保存先
 DATA_DIR = BASE_DIR / 'data'
 LOGS_DIR = BASE_DIR / 'logs'
 
+# スクレイピング状態ストア（SQLite）
+# URLごとの最新の取得結果を保存し、更新間隔の判定と変更検出に使用する
+SCRAPER_STATE_STORE = os.getenv('SCRAPER_STATE_STORE', 'true').lower() in ('true', '1', 'yes')
+SCRAPER_STATE_DB = Path(os.getenv('SCRAPER_STATE_DB', str(DATA_DIR / 'scrape_state.sqlite3')))
+
+# サイト設定のキャッシュ（仕入れ元マスター + scraper_config.jsonをマージした設定）
+# 仕入れ元マスターに変更がない場合は、起動時のダウンロードを省略する
+SCRAPER_CONFIG_CACHE = os.getenv('SCRAPER_CONFIG_CACHE', 'true').lower() in ('true', '1', 'yes')
+# GAS側で仕入れ元マスターの変更を確認できない場合に、キャッシュを使用する期間（分）
+SCRAPER_CONFIG_CACHE_TTL_MINUTES = float(os.getenv('SCRAPER_CONFIG_CACHE_TTL_MINUTES', '60'))
+
+# 計測（URLごと・処理段階ごとの所要時間とWebDriverの呼び出し回数）
+# logs/scraper_<日時>_timings.jsonl に1URL1行で出力し、終了時にサイト別の集計表を表示する
+SCRAPER_TIMINGS = os.getenv('SCRAPER_TIMINGS', 'true').lower() in ('true', '1', 'yes')
+
 # ディレクトリが存在しない場合は作成
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 LOGS_DIR.mkdir(parents=True, exist_ok=True)
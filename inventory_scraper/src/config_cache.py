@@ -0,0 +1,196 @@
+"""
+サイト設定キャッシュモジュール
+仕入れ元マスターとscraper_config.jsonをマージした設定を保存し、
+仕入れ元マスターに変更がない場合は起動時のダウンロードを省略する
+"""
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+import requests
+from .config import (
+    DATA_DIR,
+    SPREADSHEET_ID,
+    GAS_WEB_APP_URL,
+    SCRAPER_CONFIG_CACHE,
+    SCRAPER_CONFIG_CACHE_TTL_MINUTES
+)
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+CONFIG_CACHE_PATH = DATA_DIR / 'config_cache.json'
+
+# キャッシュの形式（構造を変更した場合に古いキャッシュを無効にする）
+CACHE_FORMAT_VERSION = 1
+
+# GAS Webアプリに仕入れ元マスターのバージョンを問い合わせる際のタイムアウト（秒）
+VERSION_CHECK_TIMEOUT = 10
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_master_version_cache: Dict[str, Optional[str]] = {}
+_master_version_lock = threading.Lock()
+
+
+def hash_config(config: Dict) -> str:
+    """設定のハッシュ（キーの順序に依存しない）"""
+    return hashlib.sha256(json.dumps(config, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def hash_file(path: Path) -> Optional[str]:
+    """ファイルの内容のハッシュ（ファイルがない場合はNone）"""
+    try:
+        return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def fetch_master_version(script_url: str = GAS_WEB_APP_URL) -> Optional[str]:
+    """
+    GAS Webアプリから仕入れ元マスターのバージョン（シートの表示値のハッシュ）を取得する
+
+    1回の実行で複数回呼ばれても問い合わせは1回だけ行う。
+    GAS側が対応していない場合（古いデプロイ）や取得に失敗した場合はNoneを返す。
+
+    Args:
+        script_url: GAS WebアプリURL
+
+    Returns:
+        Optional[str]: バージョン、取得できない場合はNone
+    """
+    if not script_url:
+        return None
+    with _master_version_lock:
+        if script_url in _master_version_cache:
+            return _master_version_cache[script_url]
+        version = None
+        try:
+            response = requests.get(
+                script_url,
+                params={'action': 'supplierMasterVersion'},
+                timeout=VERSION_CHECK_TIMEOUT
+            )
+            result = response.json() if response.status_code == 200 else {}
+            if result.get('success') and result.get('version'):
+                version = str(result['version'])
+                if result.get('sheetId') is not None:
+                    # 仕入れ元マスターのGIDもわかるため、自動検出用のキャッシュを更新しておく
+                    from .gid_cache import save_cached_gid
+                    save_cached_gid(SPREADSHEET_ID, str(result['sheetId']))
+            else:
+                logger.info("GAS Webアプリが仕入れ元マスターのバージョン確認に対応していません（キャッシュの有効期限で判定します）")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.info(f"仕入れ元マスターのバージョンを取得できませんでした（キャッシュの有効期限で判定します）: {e}")
+        _master_version_cache[script_url] = version
+        return version
+
+
+def load_compiled_config(
+    json_config_path: Path,
+    master_version: Optional[str] = None,
+    cache_path: Path = CONFIG_CACHE_PATH,
+    ttl_minutes: float = SCRAPER_CONFIG_CACHE_TTL_MINUTES
+) -> Optional[Dict]:
+    """
+    キャッシュした設定を読み込む
+
+    次の場合はキャッシュを使用しない（Noneを返す）:
+    - スプレッドシートID・scraper_config.jsonの内容・キャッシュの形式が異なる
+    - 仕入れ元マスターのバージョンが取得でき、キャッシュ作成時と異なる
+    - バージョンが取得できず、キャッシュ作成からttl_minutes分以上経過している
+    - 保存した設定のハッシュが一致しない（ファイルの破損）
+
+    Args:
+        json_config_path: scraper_config.jsonのパス
+        master_version: 現在の仕入れ元マスターのバージョン（取得できない場合はNone）
+        cache_path: キャッシュファイルのパス
+        ttl_minutes: バージョンが取得できない場合の有効期間（分）
+
+    Returns:
+        Optional[Dict]: キャッシュした設定
+    """
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"設定キャッシュを読み込めませんでした（無視します）: {e}")
+        return None
+
+    if (
+        cache.get('format') != CACHE_FORMAT_VERSION
+        or cache.get('spreadsheet_id') != SPREADSHEET_ID
+        or cache.get('json_config_hash') != hash_file(json_config_path)
+    ):
+        return None
+
+    if master_version is not None:
+        if cache.get('master_version') != master_version:
+            return None
+    else:
+        try:
+            compiled_at = datetime.strptime(cache.get('compiled_at', ''), TIMESTAMP_FORMAT)
+        except ValueError:
+            return None
+        if datetime.now() - compiled_at >= timedelta(minutes=ttl_minutes):
+            return None
+
+    config = cache.get('config')
+    if not isinstance(config, dict) or cache.get('config_hash') != hash_config(config):
+        return None
+    return config
+
+
+def save_compiled_config(
+    config: Dict,
+    json_config_path: Path,
+    master_version: Optional[str] = None,
+    cache_path: Path = CONFIG_CACHE_PATH
+):
+    """
+    マージした設定をキャッシュに保存する
+
+    Args:
+        config: 仕入れ元マスターとscraper_config.jsonをマージした設定
+        json_config_path: scraper_config.jsonのパス
+        master_version: 仕入れ元マスターのバージョン（取得できない場合はNone）
+        cache_path: キャッシュファイルのパス
+    """
+    cache = {
+        'format': CACHE_FORMAT_VERSION,
+        'spreadsheet_id': SPREADSHEET_ID,
+        'master_version': master_version,
+        'json_config_hash': hash_file(json_config_path),
+        'config_hash': hash_config(config),
+        'compiled_at': datetime.now().strftime(TIMESTAMP_FORMAT),
+        'config': config
+    }
+    cache_path = Path(cache_path)
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        temp_path.replace(cache_path)
+    except OSError as e:
+        logger.warning(f"設定キャッシュを保存できませんでした: {e}")
+
+
+def load_fresh_compiled_config(json_config_path: Path) -> Optional[Dict]:
+    """
+    仕入れ元マスターに変更がない場合に、キャッシュした設定を返す（SCRAPER_CONFIG_CACHEが無効な場合はNone）
+
+    Args:
+        json_config_path: scraper_config.jsonのパス
+
+    Returns:
+        Optional[Dict]: キャッシュした設定
+    """
+    if not SCRAPER_CONFIG_CACHE:
+        return None
+    return load_compiled_config(json_config_path, fetch_master_version())
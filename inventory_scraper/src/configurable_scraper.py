@@ -4,9 +4,9 @@ JSON設定ファイルからサイト別のセレクタを読み込んでスク
 """
 import json
 import time
-import random
 import re
 import logging
+import threading
 from pathlib import Path
 from typing import Dict, Optional, List, Any
 from datetime import datetime
@@ -15,10 +15,63 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from .scraper import BaseScraper
+from .readiness import normalize_ready_conditions
+from .resource_blocking import build_blocked_url_patterns
+from .page_loading import normalize_page_load_strategy
+from .page_extractor import (
+    build_snapshot_request,
+    collect_page_snapshot,
+    snapshot_hash,
+    FALLBACK_ID_PRICE_SELECTORS,
+    FALLBACK_PRICE_SELECTORS
+)
+from .config import SCRAPER_EXTRACTION_MODE, SCRAPER_FETCH_MODE
+from . import instrumentation
 
 # ロガーを設定
 logger = logging.getLogger(__name__)
 
+# 価格テキスト（または親要素のテキスト）に含まれる場合に候補から除外するキーワード
+PRICE_EXCLUDE_KEYWORDS = ['楽天カード', 'ポイント利用', 'special', 'offer', '送料別', '内訳', '倍']
+# IDセレクタの場合は「倍」を含むテキストも候補とする（「送料別」のみチェックし「送料無料」は除外しない）
+ID_SELECTOR_EXCLUDE_KEYWORDS = ['楽天カード', 'ポイント利用', 'special', 'offer', '送料別', '内訳']
+
+# 抽出方式
+# script: 1回のexecute_scriptでページ情報をまとめて取得し、Python側で候補を選択する
+# webdriver: 要素ごとにWebDriverのコマンドを発行する（従来方式）
+EXTRACTION_MODES = ('script', 'webdriver')
+
+# ページの取得方式
+# browser: Chromeで取得する（従来方式）
+# http: requestsで取得した静的HTMLから抽出する（ブラウザを使用しない）
+# http-then-browser: 静的HTMLで価格・在庫を取得できなかった場合のみChromeで取得する
+FETCH_MODES = ('browser', 'http', 'http-then-browser')
+
+# 静的HTMLの取得で「売り切れ」とみなすHTTPステータス（商品ページの削除）
+GONE_STATUS_CODES = (404, 410)
+
+# 価格テキスト・エラーメッセージの解析に使用する正規表現
+YEN_PRICE_PATTERN = re.compile(r'[¥￥]\s*([0-9,]+)')
+FIRST_PRICE_PATTERN = re.compile(r'\d{1,3}(?:,\d{3})*')
+HTTP_STATUS_PATTERN = re.compile(r'\b([4-5]\d{2})\b')
+
+
+def compile_stock_keywords(keywords: Optional[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """
+    在庫ステータスのキーワードを小文字にそろえる（判定のたびに変換しないため）
+
+    Args:
+        keywords: サイト設定のstock_keywords
+
+    Returns:
+        Dict[str, List[str]]: in_stock・out_of_stockの小文字のキーワード
+    """
+    keywords = keywords or {}
+    return {
+        'in_stock': [str(keyword).lower() for keyword in keywords.get('in_stock') or []],
+        'out_of_stock': [str(keyword).lower() for keyword in keywords.get('out_of_stock') or []]
+    }
+
 
 class ConfigurableScraper(BaseScraper):
     """設定ファイルベースのスクレイパー"""
@@ -32,24 +85,184 @@ class ConfigurableScraper(BaseScraper):
         super().__init__(browser)
         self.config = config
         self.name = config.get('name', 'Unknown')
+        # 抽出方式（サイト設定のextraction_modeを優先）
+        self.extraction_mode = config.get('extraction_mode') or SCRAPER_EXTRACTION_MODE
+        if self.extraction_mode not in EXTRACTION_MODES:
+            logger.warning(f"不明な抽出方式のためscriptを使用します（{self.name}）: {self.extraction_mode}")
+            self.extraction_mode = 'script'
+        # 取得方式（サイト設定のfetch_modeを優先）
+        self.fetch_mode = config.get('fetch_mode') or SCRAPER_FETCH_MODE
+        if self.fetch_mode not in FETCH_MODES:
+            logger.warning(f"不明な取得方式のためbrowserを使用します（{self.name}）: {self.fetch_mode}")
+            self.fetch_mode = 'browser'
+        # サイト設定で待機条件・待機期限が指定されている場合は上書き
+        if config.get('ready_conditions'):
+            self.ready_conditions = normalize_ready_conditions(config['ready_conditions'])
+        if config.get('ready_timeout') is not None:
+            try:
+                self.ready_timeout = max(0.0, float(config['ready_timeout']))
+            except (TypeError, ValueError):
+                logger.warning(f"ready_timeoutの値が不正です（{self.name}）: {config['ready_timeout']}")
+        # 読み込み時に遮断するURLパターン（サイト設定のresource_blockingを優先）
+        if 'resource_blocking' in config:
+            self.blocked_url_patterns = build_blocked_url_patterns(config['resource_blocking'])
+        # 読み込み戦略・読み込み期限・待機条件を満たした時点での打ち切り（サイト設定を優先）
+        if config.get('page_load_strategy'):
+            self.page_load_strategy = normalize_page_load_strategy(config['page_load_strategy'], self.page_load_strategy)
+        if config.get('page_load_timeout') is not None:
+            try:
+                self.page_load_timeout = max(0.0, float(config['page_load_timeout']))
+            except (TypeError, ValueError):
+                logger.warning(f"page_load_timeoutの値が不正です（{self.name}）: {config['page_load_timeout']}")
+        if config.get('early_stop') is not None:
+            self.early_stop = str(config['early_stop']).strip().lower() in ('true', '1', 'yes', '有効')
+        # http-then-browserで静的HTMLに在庫表示がない場合に、ブラウザで再確認するか
+        # （在庫セレクタが売り切れ表示だけを対象とし、一致しなければ在庫ありとみなすサイトではfalseにする）
+        self.static_stock_fallback = str(config.get('static_stock_fallback', True)).strip().lower() in ('true', '1', 'yes', '有効')
+        
+        # スクレイパーはサイトごとに1つ作成して再利用するため（scraper_registry）、
+        # URLごとに設定から求めていたセレクタ・キーワードはここで1回だけ求めておく
+        self.price_selectors: List[str] = list(config.get('price_selectors', []))
+        self.price_exclude_selectors: List[str] = list(config.get('price_exclude_selectors', []))
+        self.stock_selectors: List[str] = list(config.get('stock_selectors', []))
+        self.stock_keywords = compile_stock_keywords(config.get('stock_keywords'))
+        self._exclude_patterns = self._compile_exclude_patterns(self.price_exclude_selectors)
+        self._snapshot_requests = {
+            include_next_data: build_snapshot_request(config, include_next_data)
+            for include_next_data in (False, True)
+        }
     
     def scrape(self, url: str) -> Dict[str, Any]:
         """
         設定ファイルに基づいて価格と在庫情報を取得する
         
+        取得方式（fetch_mode）がhttpまたはhttp-then-browserの場合は静的HTMLから抽出し、
+        http-then-browserで価格が見つからない（-1）か在庫が「不明」の場合のみブラウザで再取得する。
+        
         Args:
             url: スクレイピング対象のURL
             
         Returns:
             Dict[str, any]: スクレイピング結果
         """
+        if self.fetch_mode == 'browser':
+            return self.scrape_with_browser(url)
+        
+        result = self.scrape_static(url)
+        if self.fetch_mode == 'http' or self.browser is None:
+            return result
+        if result['仕入れ価格'] == -1 or result['在庫ステータス'] == '不明':
+            logger.info(f"  静的HTMLから取得できなかったため、ブラウザで再取得します: {url[:80]}")
+            return self.scrape_with_browser(url)
+        return result
+    
+    def scrape_static(self, url: str, fetcher=None) -> Dict[str, Any]:
+        """
+        ブラウザを使わずにHTTPで取得した静的HTMLから価格と在庫情報を取得する
+        
+        Args:
+            url: スクレイピング対象のURL
+            fetcher: HttpFetcherインスタンス（省略時はスレッドごとのインスタンスを使用）
+            
+        Returns:
+            Dict[str, any]: スクレイピング結果（404・410の場合は売り切れ、その他のエラーは-1/不明）
+        """
+        from .http_fetcher import get_http_fetcher
+        
         try:
-            self.browser.get(url)
-            # Yahoo!オークションの場合は少し長めに待機（JavaScriptで動的に読み込まれる可能性があるため）
-            if 'auctions.yahoo.co.jp' in url.lower():
-                time.sleep(random.uniform(5, 10))  # 5-10秒待機
-            else:
-                time.sleep(random.uniform(3, 7))  # ランダムな待機時間
+            with instrumentation.stage('http_fetch'):
+                response = (fetcher or get_http_fetcher()).fetch(url)
+        except Exception as e:
+            logger.warning(f"  HTTP取得に失敗しました (URL: {url[:80]}...): {type(e).__name__}: {e}")
+            return {
+                '仕入れ価格': -1,
+                '在庫ステータス': '不明',
+                '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            }
+        with instrumentation.stage('html_parse'):
+            return self.scrape_static_response(url, response)
+    
+    def scrape_static_response(self, url: str, response) -> Dict[str, Any]:
+        """
+        取得済みのHTTPレスポンスから価格と在庫情報を抽出する
+        
+        同期（HttpFetcher）・非同期（async_crawler）のどちらで取得した場合も同じ処理で抽出する。
+        
+        Args:
+            url: スクレイピング対象のURL
+            response: HttpFetchResultインスタンス
+            
+        Returns:
+            Dict[str, any]: スクレイピング結果（404・410の場合は売り切れ、その他のエラーは-1/不明）
+        """
+        from .http_fetcher import build_static_snapshot
+        
+        result = {
+            '仕入れ価格': -1,
+            '在庫ステータス': '不明',
+            '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            # 以下は状態ストア用の付加情報（DataFrameに変換する際に除外される）
+            '_extractor': 'http',
+            '_http_status': response.status_code,
+            '_latency_ms': int(response.elapsed * 1000)
+        }
+        
+        if response.status_code in GONE_STATUS_CODES:
+            logger.warning(f"  HTTP {response.status_code}が返されました (URL: {url[:80]}...)")
+            result['仕入れ価格'] = 0
+            result['在庫ステータス'] = '売り切れ'
+            return result
+        if response.status_code >= 400:
+            logger.warning(f"  HTTP {response.status_code}エラーが発生しました (URL: {url[:80]}...)")
+            return result
+        
+        is_yahoo_auction = 'auctions.yahoo.co.jp' in url.lower()
+        try:
+            snapshot = build_static_snapshot(response.markup, self.config, include_next_data=is_yahoo_auction)
+        except Exception as e:
+            logger.warning(f"  HTMLの解析に失敗しました (URL: {url[:80]}...): {e}")
+            return result
+        
+        result['_content_hash'] = snapshot_hash(snapshot)
+        
+        price = None
+        if is_yahoo_auction:
+            price = self._parse_yahoo_auction_next_data(snapshot.get('nextData'))
+            if price:
+                result['_extractor'] = 'http:next_data'
+                instrumentation.set_price_strategy('next_data')
+        if not price:
+            price = self._extract_price_from_snapshot(snapshot, self.price_selectors, url)
+        if price:
+            result['仕入れ価格'] = price
+        else:
+            logger.debug(f"  静的HTMLに価格が見つかりませんでした（URL: {url[:80]}...）")
+        
+        stock_texts = snapshot.get('stock') or []
+        if (self.fetch_mode == 'http-then-browser' and self.static_stock_fallback
+                and stock_texts and all(text is None for text in stock_texts)):
+            # 在庫表示がJavaScriptで描画されるなど、静的HTMLに在庫セレクタの要素がない場合はブラウザで再確認する
+            logger.debug(f"  静的HTMLに在庫表示が見つかりませんでした（URL: {url[:80]}...）")
+            result['在庫ステータス'] = '不明'
+        else:
+            result['在庫ステータス'] = self._decide_stock_status(stock_texts, self.stock_keywords)
+        return result
+    
+    def scrape_with_browser(self, url: str) -> Dict[str, Any]:
+        """
+        ブラウザでページを読み込んで価格と在庫情報を取得する
+        
+        Args:
+            url: スクレイピング対象のURL
+            
+        Returns:
+            Dict[str, any]: スクレイピング結果
+        """
+        try:
+            self.load_page(url)
+            # サイト別の待機条件（ready_conditions）を1つの期限内で待機する
+            # サイトへのアクセス間隔はscrape_urlsのPolitenessSchedulerが管理する
+            self.wait_until_ready(self.price_selectors)
             
             result = {
                 '仕入れ価格': 0,
@@ -57,21 +270,50 @@ class ConfigurableScraper(BaseScraper):
                 '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             }
             
+            is_yahoo_auction = 'auctions.yahoo.co.jp' in url.lower()
+            
+            # script方式: 価格・在庫の抽出に必要な情報を1回のWebDriver呼び出しでまとめて取得
+            # 取得に失敗した場合はwebdriver方式で抽出する
+            snapshot = None
+            if self.extraction_mode == 'script':
+                with instrumentation.stage('snapshot'):
+                    snapshot = collect_page_snapshot(
+                        self.browser,
+                        self.config,
+                        include_next_data=is_yahoo_auction,
+                        request=self._snapshot_requests[is_yahoo_auction]
+                    )
+            # 状態ストア用の付加情報（DataFrameに変換する際に除外される）
+            result['_extractor'] = 'script' if snapshot is not None else 'webdriver'
+            if snapshot is not None:
+                result['_content_hash'] = snapshot_hash(snapshot)
+            
             # 価格を取得
-            price = None
-            if 'auctions.yahoo.co.jp' in url.lower():
-                price = self._extract_yahoo_auction_price_from_next_data()
-                if price:
-                    logger.info(f"  Yahoo!オークション: __NEXT_DATA__から価格を取得しました: {price}円")
+            with instrumentation.stage('price_extraction'):
+                price = None
+                if is_yahoo_auction:
+                    if snapshot is not None:
+                        price = self._parse_yahoo_auction_next_data(snapshot.get('nextData'))
+                    else:
+                        price = self._extract_yahoo_auction_price_from_next_data()
+                    if price:
+                        result['_extractor'] += ':next_data'
+                        instrumentation.set_price_strategy('next_data')
+                        logger.info(f"  Yahoo!オークション: __NEXT_DATA__から価格を取得しました: {price}円")
 
-            if not price and '/shops/product/' in url.lower():
-                price = self._extract_mercari_shop_price()
-                if price:
-                    logger.info(f"  メルカリSHOP: 価格を取得しました: {price}円")
+                if not price and '/shops/product/' in url.lower():
+                    price = self._extract_mercari_shop_price()
+                    if price:
+                        result['_extractor'] = 'webdriver:mercari_shop'
+                        instrumentation.set_price_strategy('mercari_shop')
+                        logger.info(f"  メルカリSHOP: 価格を取得しました: {price}円")
 
-            if not price:
-                price_selectors = self.config.get('price_selectors', [])
-                price = self._extract_price_with_selectors(price_selectors, url)
+                if not price:
+                    price_selectors = self.price_selectors
+                    if snapshot is not None:
+                        price = self._extract_price_from_snapshot(snapshot, price_selectors, url)
+                    else:
+                        price = self._extract_price_with_selectors(price_selectors, url)
             
             if price:
                 result['仕入れ価格'] = price
@@ -88,12 +330,16 @@ class ConfigurableScraper(BaseScraper):
                     logger.warning(f"  警告: 価格が見つかりませんでした（URL: {url[:80]}...）")
             
             # 在庫ステータスを取得
-            stock_selectors = self.config.get('stock_selectors', [])
-            stock_keywords = self.config.get('stock_keywords', {})
-            stock_status = self._extract_stock_status_with_selectors(
-                stock_selectors, 
-                stock_keywords
-            )
+            with instrumentation.stage('stock_extraction'):
+                stock_selectors = self.stock_selectors
+                stock_keywords = self.stock_keywords
+                if snapshot is not None:
+                    stock_status = self._decide_stock_status(snapshot.get('stock') or [], stock_keywords)
+                else:
+                    stock_status = self._extract_stock_status_with_selectors(
+                        stock_selectors, 
+                        stock_keywords
+                    )
             result['在庫ステータス'] = stock_status
             
             return result
@@ -137,7 +383,7 @@ class ConfigurableScraper(BaseScraper):
             if status_code is None:
                 error_str = str(e)
                 # エラーメッセージから404などのステータスコードを探す
-                status_match = re.search(r'\b([4-5]\d{2})\b', error_str)
+                status_match = HTTP_STATUS_PATTERN.search(error_str)
                 if status_match:
                     try:
                         status_code = int(status_match.group(1))
@@ -424,9 +670,24 @@ class ConfigurableScraper(BaseScraper):
             next_data_text = self.browser.execute_script(
                 "return document.querySelector('script#__NEXT_DATA__')?.textContent || null;"
             )
-            if not next_data_text:
-                return None
+        except Exception as e:
+            logger.debug(f"__NEXT_DATA__の取得に失敗しました: {e}")
+            return None
+        return self._parse_yahoo_auction_next_data(next_data_text)
+
+    def _parse_yahoo_auction_next_data(self, next_data_text: Optional[str]) -> Optional[int]:
+        """
+        Yahoo!オークションの__NEXT_DATA__のテキストから現在価格（税額込み）を取得する
+
+        Args:
+            next_data_text: script#__NEXT_DATA__のテキスト
 
+        Returns:
+            Optional[int]: 価格、取得できない場合はNone
+        """
+        if not next_data_text:
+            return None
+        try:
             next_data = json.loads(next_data_text)
             item = (
                 next_data.get('props', {})
@@ -479,7 +740,7 @@ class ConfigurableScraper(BaseScraper):
         「送料込み」付近やタイトル付近から優先的に抽出
         「¥」記号を含む価格パターンを優先的に検索
         """
-        exclude_selectors = self.config.get('price_exclude_selectors', [])
+        exclude_selectors = self.price_exclude_selectors
         exclude_keywords = [
             'このショップの商品',
             'おすすめ',
@@ -593,7 +854,7 @@ class ConfigurableScraper(BaseScraper):
             return None
         
         # 「¥」または「￥」に続く数字パターンをマッチ（例: ¥4,800 や ¥4800）
-        matches = re.findall(r'[¥￥]\s*([0-9,]+)', text)
+        matches = YEN_PRICE_PATTERN.findall(text)
         if matches:
             try:
                 return int(matches[0].replace(',', ''))
@@ -608,7 +869,7 @@ class ConfigurableScraper(BaseScraper):
         """
         if not text:
             return None
-        matches = re.findall(r'\d{1,3}(?:,\d{3})*', text)
+        matches = FIRST_PRICE_PATTERN.findall(text)
         if not matches:
             return None
         try:
@@ -667,7 +928,37 @@ class ConfigurableScraper(BaseScraper):
         Returns:
             Optional[int]: 抽出された価格、見つからない場合はNone
         """
-        exclude_selectors = self.config.get('price_exclude_selectors', [])
+        exclude_selectors = self.price_exclude_selectors
+        found_prices = self._collect_price_candidates(selectors, exclude_selectors)
+        strategy = 'selectors'
+        
+        # Yahoo!オークションの場合、親要素から価格を抽出するフォールバック処理
+        if not found_prices and 'auctions.yahoo.co.jp' in url.lower():
+            found_prices = self._collect_yahoo_auction_fallback_prices()
+            strategy = 'yahoo_auction_fallback'
+        
+        # 見つかった価格から選択（Yahoo!オークションの場合は「現在」を含む価格を優先）
+        if found_prices:
+            instrumentation.set_price_strategy(strategy)
+            return self._select_found_price(found_prices, selectors, url)
+        
+        # すべてのセレクタで見つからなかった場合、すべての価格要素を取得して最大値を返す
+        price = self._extract_max_price_from_all_elements(exclude_selectors)
+        if price:
+            instrumentation.set_price_strategy('max_fallback')
+        return price
+    
+    def _collect_price_candidates(self, selectors: List[str], exclude_selectors: List[str]) -> List[Dict]:
+        """
+        価格セレクタに一致する要素から価格候補を収集する（WebDriverで要素ごとに取得）
+        
+        Args:
+            selectors: CSSセレクタのリスト
+            exclude_selectors: 除外するセレクタのリスト
+            
+        Returns:
+            List[Dict]: 価格候補のリスト（'price', 'text', 'selector'キーを持つ辞書）
+        """
         found_prices = []  # 見つかった価格をすべて保存
         
         # デバッグ: セレクタの試行状況を出力（DEBUGレベル）
@@ -759,10 +1050,7 @@ class ConfigurableScraper(BaseScraper):
                         is_id_selector = selector.startswith('#') or '[id=' in selector or '[id*=' in selector
                         
                         # 除外キーワードチェック（IDセレクタの場合は緩和）
-                        exclude_keywords = ['楽天カード', 'ポイント利用', 'special', 'offer', '送料別', '内訳', '倍']
-                        # IDセレクタの場合は「送料別」のみチェック（「送料無料」は除外しない）
-                        if is_id_selector:
-                            exclude_keywords = ['楽天カード', 'ポイント利用', 'special', 'offer', '送料別', '内訳']
+                        exclude_keywords = ID_SELECTOR_EXCLUDE_KEYWORDS if is_id_selector else PRICE_EXCLUDE_KEYWORDS
                         
                         if any(keyword in price_text_lower for keyword in exclude_keywords):
                             continue
@@ -795,257 +1083,470 @@ class ConfigurableScraper(BaseScraper):
             except Exception:
                 continue
         
-        # Yahoo!オークションの場合、親要素から価格を抽出するフォールバック処理
-        if not found_prices and 'auctions.yahoo.co.jp' in url.lower():
-            try:
-                # まず、設定ファイルのセレクタで価格を探す（再試行）
-                logger.warning(f"  Yahoo!オークション: 設定ファイルのセレクタで価格を再検索中...")
-                for selector in self.config.get('price_selectors', []):
-                    try:
-                        elements = self.browser.find_elements(By.CSS_SELECTOR, selector)
-                        for elem in elements:
-                            try:
-                                text = elem.text.strip()
-                                if text:
-                                    price = self.extract_price(text)
-                                    if price and price > 0:
-                                        # 親要素に「現在」が含まれているか確認
-                                        try:
-                                            parent = elem.find_element(By.XPATH, './..')
-                                            parent_text = parent.text.strip()
-                                            if '現在' in parent_text or '現在' in text:
-                                                found_prices.append({
-                                                    'price': price,
-                                                    'text': text[:100],
-                                                    'selector': selector
-                                                })
-                                                logger.warning(f"  設定セレクタ '{selector}' から価格を発見: {price}円 (テキスト: {text[:100]})")
-                                                break
-                                        except:
-                                            # 親要素チェックに失敗した場合でも、要素自体に「現在」が含まれていれば追加
-                                            if '現在' in text:
-                                                found_prices.append({
-                                                    'price': price,
-                                                    'text': text[:100],
-                                                    'selector': selector
-                                                })
-                                                logger.warning(f"  設定セレクタ '{selector}' から価格を発見（現在含む）: {price}円 (テキスト: {text[:100]})")
-                                                break
-                            except:
-                                continue
-                        if found_prices:
-                            break
-                    except:
-                        continue
-                
-                # 「現在」を含む要素を直接検索
-                if not found_prices:
-                    try:
-                        # 「現在」を含むすべての要素を検索
-                        current_price_elements = self.browser.find_elements(By.XPATH, "//*[contains(text(), '現在')]")
-                        logger.warning(f"  「現在」を含む要素を{len(current_price_elements)}件発見")
-                        
-                        all_current_candidates = []  # すべての「現在」価格候補を保存
-                        
-                        for i, elem in enumerate(current_price_elements[:30]):  # 最初の30件を確認
-                            try:
-                                text = elem.text.strip()
-                                if '現在' in text:
-                                    price = self.extract_price(text)
-                                    if price and price > 0:
-                                        logger.warning(f"    [{i}] 価格: {price}円, テキスト: {text[:150]}")
-                                        all_current_candidates.append({
-                                            'price': price,
-                                            'text': text[:200],
-                                            'element': elem
-                                        })
-                            except Exception as e:
-                                logger.debug(f"    要素[{i}]の処理エラー: {e}")
-                                continue
-                        
-                        # すべての候補から最適な価格を選択
-                        if all_current_candidates:
-                            best_candidate = self._select_best_price_candidate(all_current_candidates)
-                            if best_candidate:
-                                found_prices.append(best_candidate)
-                                selector_type = '合理的範囲' if best_candidate['selector'] == 'direct_current_price_element_reasonable' else '全候補'
-                                logger.warning(f"  「現在」を含む要素から価格を抽出（{selector_type}）: {best_candidate['price']}円 (テキスト: {best_candidate['text'][:100]})")
-                    except Exception as e:
-                        logger.warning(f"  直接検索エラー: {e}")
-                
-                # 「円」を含む要素の親要素から価格を抽出（「現在」を含む要素から価格が見つからなかった場合のみ）
-                if not found_prices:
-                    yen_elements = self.browser.find_elements(By.XPATH, "//*[contains(text(), '円')]")
-                    logger.warning(f"  Yahoo!オークション: 「円」を含む要素を{len(yen_elements)}件発見")
+        return found_prices
+    
+    def _collect_yahoo_auction_fallback_prices(self) -> List[Dict]:
+        """
+        Yahoo!オークション用: 「現在」や「円」を含む要素の親要素から価格候補を収集する
+        
+        Returns:
+            List[Dict]: 価格候補のリスト
+        """
+        found_prices = []
+        try:
+            # まず、設定ファイルのセレクタで価格を探す（再試行）
+            logger.warning(f"  Yahoo!オークション: 設定ファイルのセレクタで価格を再検索中...")
+            for selector in self.price_selectors:
+                try:
+                    elements = self.browser.find_elements(By.CSS_SELECTOR, selector)
+                    for elem in elements:
+                        try:
+                            text = elem.text.strip()
+                            if text:
+                                price = self.extract_price(text)
+                                if price and price > 0:
+                                    # 親要素に「現在」が含まれているか確認
+                                    try:
+                                        parent = elem.find_element(By.XPATH, './..')
+                                        parent_text = parent.text.strip()
+                                        if '現在' in parent_text or '現在' in text:
+                                            found_prices.append({
+                                                'price': price,
+                                                'text': text[:100],
+                                                'selector': selector
+                                            })
+                                            logger.warning(f"  設定セレクタ '{selector}' から価格を発見: {price}円 (テキスト: {text[:100]})")
+                                            break
+                                    except:
+                                        # 親要素チェックに失敗した場合でも、要素自体に「現在」が含まれていれば追加
+                                        if '現在' in text:
+                                            found_prices.append({
+                                                'price': price,
+                                                'text': text[:100],
+                                                'selector': selector
+                                            })
+                                            logger.warning(f"  設定セレクタ '{selector}' から価格を発見（現在含む）: {price}円 (テキスト: {text[:100]})")
+                                            break
+                        except:
+                            continue
+                    if found_prices:
+                        break
+                except:
+                    continue
+            
+            # 「現在」を含む要素を直接検索
+            if not found_prices:
+                try:
+                    # 「現在」を含むすべての要素を検索
+                    current_price_elements = self.browser.find_elements(By.XPATH, "//*[contains(text(), '現在')]")
+                    logger.warning(f"  「現在」を含む要素を{len(current_price_elements)}件発見")
                     
-                    # まず「現在」というキーワードを含む親要素を優先的に探す
-                    current_price_found = False
-                    current_price_candidates = []  # 「現在」を含むすべての価格候補を保存
+                    all_current_candidates = []  # すべての「現在」価格候補を保存
                     
-                    for yen_elem in yen_elements[:50]:  # 最初の50件を確認
+                    for i, elem in enumerate(current_price_elements[:30]):  # 最初の30件を確認
                         try:
-                            # 直接の親要素を確認
-                            parent = yen_elem.find_element(By.XPATH, './..')
-                            parent_text = parent.text.strip()
-                            
-                            # 親要素に「現在」が含まれている場合
-                            if parent_text and '現在' in parent_text:
-                                price = self.extract_price(parent_text)
+                            text = elem.text.strip()
+                            if '現在' in text:
+                                price = self.extract_price(text)
                                 if price and price > 0:
-                                    current_price_candidates.append({
+                                    logger.warning(f"    [{i}] 価格: {price}円, テキスト: {text[:150]}")
+                                    all_current_candidates.append({
                                         'price': price,
-                                        'text': parent_text[:200],
-                                        'level': 'parent'
+                                        'text': text[:200],
+                                        'element': elem
                                     })
-                                    logger.warning(f"    親要素から価格候補を追加: {price}円 (テキスト: {parent_text[:150]})")
-                            
-                            # 親要素に「現在」が含まれていない場合、祖父要素も確認
-                            try:
-                                grandparent = parent.find_element(By.XPATH, './..')
-                                grandparent_text = grandparent.text.strip()
-                                if grandparent_text and '現在' in grandparent_text:
-                                    price = self.extract_price(grandparent_text)
-                                    if price and price > 0:
-                                        current_price_candidates.append({
-                                            'price': price,
-                                            'text': grandparent_text[:200],
-                                            'level': 'grandparent'
-                                        })
-                                        logger.warning(f"    祖父要素から価格候補を追加: {price}円 (テキスト: {grandparent_text[:150]})")
-                            except:
-                                pass
-                            
-                            # さらに上位の要素も確認（曽祖父要素）
-                            try:
-                                great_grandparent = grandparent.find_element(By.XPATH, './..')
-                                great_grandparent_text = great_grandparent.text.strip()
-                                if great_grandparent_text and '現在' in great_grandparent_text:
-                                    price = self.extract_price(great_grandparent_text)
-                                    if price and price > 0:
-                                        current_price_candidates.append({
-                                            'price': price,
-                                            'text': great_grandparent_text[:200],
-                                            'level': 'great_grandparent'
-                                        })
-                                        logger.warning(f"    曽祖父要素から価格候補を追加: {price}円 (テキスト: {great_grandparent_text[:150]})")
-                            except:
-                                pass
-                        except:
+                        except Exception as e:
+                            logger.debug(f"    要素[{i}]の処理エラー: {e}")
                             continue
                     
-                    # 「現在」を含む価格候補から、最適な価格を選択
-                    if current_price_candidates:
-                        best_candidate = self._select_best_price_candidate(current_price_candidates)
+                    # すべての候補から最適な価格を選択
+                    if all_current_candidates:
+                        best_candidate = self._select_best_price_candidate(all_current_candidates)
                         if best_candidate:
-                            # levelキーがある場合は、selectorを上書き
-                            if 'level' in best_candidate:
-                                if best_candidate['selector'] == 'direct_current_price_element_reasonable':
-                                    best_candidate['selector'] = f"{best_candidate['level']}_of_yen_element_with_current_reasonable"
-                                else:
-                                    best_candidate['selector'] = f"{best_candidate['level']}_of_yen_element_with_current"
-                            
                             found_prices.append(best_candidate)
-                            level_str = f"{best_candidate.get('level', '')}要素から" if 'level' in best_candidate else ''
-                            selector_type = '合理的範囲' if 'reasonable' in best_candidate['selector'] else ''
-                            logger.warning(f"  「現在」を含む{level_str}価格を抽出（{selector_type}）: {best_candidate['price']}円 (テキスト: {best_candidate['text'][:100]})")
-                            current_price_found = True
-                        else:
-                            logger.warning(f"  「現在」を含む価格候補が見つかりましたが、価格が小さすぎます")
+                            selector_type = '合理的範囲' if best_candidate['selector'] == 'direct_current_price_element_reasonable' else '全候補'
+                            logger.warning(f"  「現在」を含む要素から価格を抽出（{selector_type}）: {best_candidate['price']}円 (テキスト: {best_candidate['text'][:100]})")
+                except Exception as e:
+                    logger.warning(f"  直接検索エラー: {e}")
+            
+            # 「円」を含む要素の親要素から価格を抽出（「現在」を含む要素から価格が見つからなかった場合のみ）
+            if not found_prices:
+                yen_elements = self.browser.find_elements(By.XPATH, "//*[contains(text(), '円')]")
+                logger.warning(f"  Yahoo!オークション: 「円」を含む要素を{len(yen_elements)}件発見")
+                
+                # まず「現在」というキーワードを含む親要素を優先的に探す
+                current_price_found = False
+                current_price_candidates = []  # 「現在」を含むすべての価格候補を保存
                 
-                # 「現在」を含む価格が見つからなかった場合、通常の親要素から価格を抽出
-                if not current_price_found:
-                    logger.warning(f"  「現在」を含む価格が見つかりませんでした。通常の親要素から価格を抽出します...")
-                    all_parent_prices = []
-                    for yen_elem in yen_elements[:50]:  # 最初の50件を確認
+                for yen_elem in yen_elements[:50]:  # 最初の50件を確認
+                    try:
+                        # 直接の親要素を確認
+                        parent = yen_elem.find_element(By.XPATH, './..')
+                        parent_text = parent.text.strip()
+                        
+                        # 親要素に「現在」が含まれている場合
+                        if parent_text and '現在' in parent_text:
+                            price = self.extract_price(parent_text)
+                            if price and price > 0:
+                                current_price_candidates.append({
+                                    'price': price,
+                                    'text': parent_text[:200],
+                                    'level': 'parent'
+                                })
+                                logger.warning(f"    親要素から価格候補を追加: {price}円 (テキスト: {parent_text[:150]})")
+                        
+                        # 親要素に「現在」が含まれていない場合、祖父要素も確認
                         try:
-                            parent = yen_elem.find_element(By.XPATH, './..')
-                            parent_text = parent.text.strip()
-                            if parent_text:
-                                # 関連商品セクションを除外（「この商品も注目されています」など）
-                                if 'この商品も注目されています' in parent_text or 'おすすめ' in parent_text or '関連商品' in parent_text:
-                                    continue
-                                
-                                price = self.extract_price(parent_text)
-                                # 価格が1000円以上の場合のみ有効（121円のような小さい価格を除外）
-                                if price and price >= 1000:
-                                    all_parent_prices.append({
+                            grandparent = parent.find_element(By.XPATH, './..')
+                            grandparent_text = grandparent.text.strip()
+                            if grandparent_text and '現在' in grandparent_text:
+                                price = self.extract_price(grandparent_text)
+                                if price and price > 0:
+                                    current_price_candidates.append({
                                         'price': price,
-                                        'text': parent_text[:100],
-                                        'selector': 'parent_of_yen_element'
+                                        'text': grandparent_text[:200],
+                                        'level': 'grandparent'
                                     })
+                                    logger.warning(f"    祖父要素から価格候補を追加: {price}円 (テキスト: {grandparent_text[:150]})")
                         except:
-                            continue
-                    
-                    if all_parent_prices:
-                        # 価格でソートして、最も小さい価格を選択（通常、現在価格が最も小さい）
-                        all_parent_prices.sort(key=lambda x: x['price'])
-                        logger.warning(f"  見つかった価格候補: {[p['price'] for p in all_parent_prices[:10]]}")
-                        found_prices.append(all_parent_prices[0])  # 最も小さい価格を追加
-                        logger.warning(f"  最も小さい価格を選択: {all_parent_prices[0]['price']}円 (テキスト: {all_parent_prices[0]['text'][:100]})")
-            except Exception as e:
-                logger.warning(f"  親要素からの価格抽出エラー: {e}")
-                import traceback
-                logger.warning(f"  エラー詳細: {traceback.format_exc()}")
-        
-        # 見つかった価格から選択（Yahoo!オークションの場合は「現在」を含む価格を優先）
-        if found_prices:
-            # メルカリSHOPは事前の専用抽出で処理済み。ここでは通常の選択ロジックを適用する。
-            
-            # Yahoo!オークションの場合、「現在」を含む価格を優先
-            if 'auctions.yahoo.co.jp' in url.lower():
-                # 「現在」を含む価格を優先的に選択
-                current_prices = [p for p in found_prices if '現在' in p.get('text', '')]
-                if current_prices:
-                    selected_price = current_prices[0]['price']
-                    logger.warning(f"  Yahoo!オークション: 「現在」を含む価格を選択: {selected_price}円")
-                    return selected_price
+                            pass
+                        
+                        # さらに上位の要素も確認（曽祖父要素）
+                        try:
+                            great_grandparent = grandparent.find_element(By.XPATH, './..')
+                            great_grandparent_text = great_grandparent.text.strip()
+                            if great_grandparent_text and '現在' in great_grandparent_text:
+                                price = self.extract_price(great_grandparent_text)
+                                if price and price > 0:
+                                    current_price_candidates.append({
+                                        'price': price,
+                                        'text': great_grandparent_text[:200],
+                                        'level': 'great_grandparent'
+                                    })
+                                    logger.warning(f"    曽祖父要素から価格候補を追加: {price}円 (テキスト: {great_grandparent_text[:150]})")
+                        except:
+                            pass
+                    except:
+                        continue
                 
-                # 「現在」を含む価格がない場合、関連商品セクションを除外
-                # 「この商品も注目されています」「おすすめ」などのキーワードを含む価格を除外
-                filtered_prices = []
-                for p in found_prices:
-                    text = p.get('text', '').lower()
-                    if 'この商品も注目されています' not in text and 'おすすめ' not in text and '関連商品' not in text:
-                        filtered_prices.append(p)
+                # 「現在」を含む価格候補から、最適な価格を選択
+                if current_price_candidates:
+                    best_candidate = self._select_best_price_candidate(current_price_candidates)
+                    if best_candidate:
+                        # levelキーがある場合は、selectorを上書き
+                        if 'level' in best_candidate:
+                            if best_candidate['selector'] == 'direct_current_price_element_reasonable':
+                                best_candidate['selector'] = f"{best_candidate['level']}_of_yen_element_with_current_reasonable"
+                            else:
+                                best_candidate['selector'] = f"{best_candidate['level']}_of_yen_element_with_current"
+                        
+                        found_prices.append(best_candidate)
+                        level_str = f"{best_candidate.get('level', '')}要素から" if 'level' in best_candidate else ''
+                        selector_type = '合理的範囲' if 'reasonable' in best_candidate['selector'] else ''
+                        logger.warning(f"  「現在」を含む{level_str}価格を抽出（{selector_type}）: {best_candidate['price']}円 (テキスト: {best_candidate['text'][:100]})")
+                        current_price_found = True
+                    else:
+                        logger.warning(f"  「現在」を含む価格候補が見つかりましたが、価格が小さすぎます")
+            
+            # 「現在」を含む価格が見つからなかった場合、通常の親要素から価格を抽出
+            if not current_price_found:
+                logger.warning(f"  「現在」を含む価格が見つかりませんでした。通常の親要素から価格を抽出します...")
+                all_parent_prices = []
+                for yen_elem in yen_elements[:50]:  # 最初の50件を確認
+                    try:
+                        parent = yen_elem.find_element(By.XPATH, './..')
+                        parent_text = parent.text.strip()
+                        if parent_text:
+                            # 関連商品セクションを除外（「この商品も注目されています」など）
+                            if 'この商品も注目されています' in parent_text or 'おすすめ' in parent_text or '関連商品' in parent_text:
+                                continue
+                            
+                            price = self.extract_price(parent_text)
+                            # 価格が1000円以上の場合のみ有効（121円のような小さい価格を除外）
+                            if price and price >= 1000:
+                                all_parent_prices.append({
+                                    'price': price,
+                                    'text': parent_text[:100],
+                                    'selector': 'parent_of_yen_element'
+                                })
+                    except:
+                        continue
                 
-                if filtered_prices:
-                    # フィルタリング後の価格から、最も小さい価格を選択（通常、現在価格が最も小さい）
-                    filtered_prices.sort(key=lambda x: x['price'])
-                    selected_price = filtered_prices[0]['price']
-                    logger.warning(f"  Yahoo!オークション: フィルタリング後の価格を選択: {selected_price}円 (候補: {[p['price'] for p in filtered_prices[:5]]})")
-                    return selected_price
+                if all_parent_prices:
+                    # 価格でソートして、最も小さい価格を選択（通常、現在価格が最も小さい）
+                    all_parent_prices.sort(key=lambda x: x['price'])
+                    logger.warning(f"  見つかった価格候補: {[p['price'] for p in all_parent_prices[:10]]}")
+                    found_prices.append(all_parent_prices[0])  # 最も小さい価格を追加
+                    logger.warning(f"  最も小さい価格を選択: {all_parent_prices[0]['price']}円 (テキスト: {all_parent_prices[0]['text'][:100]})")
+        except Exception as e:
+            logger.warning(f"  親要素からの価格抽出エラー: {e}")
+            import traceback
+            logger.warning(f"  エラー詳細: {traceback.format_exc()}")
+        
+        return found_prices
+    
+    def _select_found_price(self, found_prices: List[Dict], selectors: List[str], url: str = '') -> Optional[int]:
+        """
+        価格候補から採用する価格を選択する
+        
+        Args:
+            found_prices: 価格候補のリスト
+            selectors: CSSセレクタのリスト（優先順位）
+            url: スクレイピング対象のURL
             
-            # デバッグ情報を出力（DEBUGレベル）
-            if len(found_prices) > 1:
-                logger.debug(f"  複数の価格が見つかりました:")
-                for p in found_prices:
-                    logger.debug(f"    - {p['price']}円 (セレクタ: {p['selector']}, テキスト: {p['text']})")
+        Returns:
+            Optional[int]: 選択された価格
+        """
+        # メルカリSHOPは事前の専用抽出で処理済み。ここでは通常の選択ロジックを適用する。
+        
+        # Yahoo!オークションの場合、「現在」を含む価格を優先
+        if 'auctions.yahoo.co.jp' in url.lower():
+            # 「現在」を含む価格を優先的に選択
+            current_prices = [p for p in found_prices if '現在' in p.get('text', '')]
+            if current_prices:
+                selected_price = current_prices[0]['price']
+                logger.warning(f"  Yahoo!オークション: 「現在」を含む価格を選択: {selected_price}円")
+                return selected_price
             
-            # セレクタの優先順位に基づいて、最初に見つかった価格を返す
-            # 設定ファイルのセレクタ順序を保持するため、セレクタの順序で最初の価格を選択
-            selected_price = None
-            selected_selector = None
+            # 「現在」を含む価格がない場合、関連商品セクションを除外
+            # 「この商品も注目されています」「おすすめ」などのキーワードを含む価格を除外
+            filtered_prices = []
+            for p in found_prices:
+                text = p.get('text', '').lower()
+                if 'この商品も注目されています' not in text and 'おすすめ' not in text and '関連商品' not in text:
+                    filtered_prices.append(p)
             
-            # 設定ファイルのセレクタ順序に従って、最初に見つかった価格を選択
-            for selector in selectors:
-                for price_info in found_prices:
-                    if price_info['selector'] == selector:
-                        selected_price = price_info['price']
-                        selected_selector = selector
-                        break
-                if selected_price:
+            if filtered_prices:
+                # フィルタリング後の価格から、最も小さい価格を選択（通常、現在価格が最も小さい）
+                filtered_prices.sort(key=lambda x: x['price'])
+                selected_price = filtered_prices[0]['price']
+                logger.warning(f"  Yahoo!オークション: フィルタリング後の価格を選択: {selected_price}円 (候補: {[p['price'] for p in filtered_prices[:5]]})")
+                return selected_price
+        
+        # デバッグ情報を出力（DEBUGレベル）
+        if len(found_prices) > 1:
+            logger.debug(f"  複数の価格が見つかりました:")
+            for p in found_prices:
+                logger.debug(f"    - {p['price']}円 (セレクタ: {p['selector']}, テキスト: {p['text']})")
+        
+        # セレクタの優先順位に基づいて、最初に見つかった価格を返す
+        # 設定ファイルのセレクタ順序を保持するため、セレクタの順序で最初の価格を選択
+        selected_price = None
+        selected_selector = None
+        
+        # 設定ファイルのセレクタ順序に従って、最初に見つかった価格を選択
+        for selector in selectors:
+            for price_info in found_prices:
+                if price_info['selector'] == selector:
+                    selected_price = price_info['price']
+                    selected_selector = selector
                     break
+            if selected_price:
+                break
+        
+        # セレクタ順序で見つからない場合（通常は発生しない）、最初に見つかった価格を使用
+        if not selected_price:
+            selected_price = found_prices[0]['price']
+            selected_selector = found_prices[0]['selector']
+        
+        logger.debug(f"  選択した価格: {selected_price}円 (セレクタ: {selected_selector})")
+        return selected_price
+    
+    def _extract_price_from_snapshot(self, snapshot: Dict, selectors: List[str], url: str = '') -> Optional[int]:
+        """
+        ページスナップショットから価格を取得する（script方式）
+        
+        候補の収集・選択ロジックは_extract_price_with_selectorsと同じで、
+        WebDriverへの問い合わせを行わずにスナップショットを評価する。
+        
+        Args:
+            snapshot: collect_page_snapshotで取得したスナップショット
+            selectors: CSSセレクタのリスト
+            url: スクレイピング対象のURL
             
-            # セレクタ順序で見つからない場合（通常は発生しない）、最初に見つかった価格を使用
-            if not selected_price:
-                selected_price = found_prices[0]['price']
-                selected_selector = found_prices[0]['selector']
-            
-            logger.debug(f"  選択した価格: {selected_price}円 (セレクタ: {selected_selector})")
-            return selected_price
+        Returns:
+            Optional[int]: 抽出された価格、見つからない場合はNone
+        """
+        exclude_selectors = self.price_exclude_selectors
+        found_prices = self._collect_price_candidates_from_snapshot(snapshot, selectors, exclude_selectors)
+        strategy = 'selectors'
+        
+        # Yahoo!オークションのフォールバックはページ全体の探索が必要なため、WebDriverで実行する
+        # （静的HTMLから抽出している場合はブラウザがないため行わない）
+        if not found_prices and self.browser is not None and 'auctions.yahoo.co.jp' in url.lower():
+            found_prices = self._collect_yahoo_auction_fallback_prices()
+            strategy = 'yahoo_auction_fallback'
+        
+        if found_prices:
+            instrumentation.set_price_strategy(strategy)
+            return self._select_found_price(found_prices, selectors, url)
         
         # すべてのセレクタで見つからなかった場合、すべての価格要素を取得して最大値を返す
-        return self._extract_max_price_from_all_elements(exclude_selectors)
+        price = self._extract_max_price_from_snapshot(snapshot)
+        if price:
+            instrumentation.set_price_strategy('max_fallback')
+        return price
+    
+    def _collect_price_candidates_from_snapshot(
+        self,
+        snapshot: Dict,
+        selectors: List[str],
+        exclude_selectors: List[str]
+    ) -> List[Dict]:
+        """
+        ページスナップショットから価格候補を収集する
+        
+        Args:
+            snapshot: ページスナップショット
+            selectors: CSSセレクタのリスト
+            exclude_selectors: 除外するセレクタのリスト
+            
+        Returns:
+            List[Dict]: 価格候補のリスト（'price', 'text', 'selector'キーを持つ辞書）
+        """
+        elements = snapshot.get('elements') or []
+        found_prices = []
+        
+        for selector, element_ids in zip(selectors, snapshot.get('price') or []):
+            if not element_ids:
+                logger.debug(f"    セレクタ '{selector}': 要素が見つかりませんでした")
+                continue
+            logger.debug(f"    セレクタ '{selector}': {len(element_ids)}個の要素が見つかりました")
+            
+            # IDセレクタ（#で始まる）の場合は信頼性が高いので、親要素チェックをスキップ
+            is_id_selector = selector.startswith('#') or '[id=' in selector or '[id*=' in selector
+            exclude_keywords = ID_SELECTOR_EXCLUDE_KEYWORDS if is_id_selector else PRICE_EXCLUDE_KEYWORDS
+            
+            for element_id in element_ids:
+                element = elements[element_id]
+                if self._is_excluded_in_snapshot(element, exclude_selectors):
+                    logger.debug(f"      除外セレクタに該当するためスキップ: {selector}")
+                    continue
+                
+                price_text = (element.get('text') or '').strip()
+                if not price_text:
+                    continue
+                
+                if any(keyword in price_text.lower() for keyword in exclude_keywords):
+                    continue
+                
+                parent_text = element.get('parentText')
+                if not is_id_selector and parent_text is not None:
+                    if any(keyword in parent_text.lower() for keyword in exclude_keywords):
+                        continue
+                
+                price = self.extract_price(price_text)
+                if price and price > 0:
+                    logger.debug(f"      価格を発見: {price}円 (テキスト: {price_text[:50]})")
+                    found_prices.append({
+                        'price': price,
+                        'text': price_text[:50],
+                        'selector': selector
+                    })
+                else:
+                    logger.debug(f"      価格抽出失敗: テキスト='{price_text[:50]}'")
+        
+        return found_prices
+    
+    def _is_excluded_in_snapshot(self, element: Dict, exclude_selectors: List[str]) -> bool:
+        """
+        スナップショットの要素が除外セレクタに該当するか判定する
+        
+        _collect_price_candidatesと同じく、要素とその祖先要素（最大5階層）について
+        子孫に除外セレクタに一致する要素があるか、class/idが[class*=]/[id*=]形式の
+        パターンを含むかを確認する。
+        
+        Args:
+            element: スナップショットの要素情報
+            exclude_selectors: 除外するセレクタのリスト
+            
+        Returns:
+            bool: 除外対象の場合はTrue
+        """
+        if exclude_selectors is self.price_exclude_selectors:
+            patterns = self._exclude_patterns
+        else:
+            patterns = self._compile_exclude_patterns(exclude_selectors)
+        nodes = [element] + list(element.get('ancestors') or [])
+        for index, (class_pattern, id_pattern) in enumerate(patterns):
+            for node in nodes:
+                if index in (node.get('excludeHits') or []):
+                    return True
+                if class_pattern and class_pattern in (node.get('className') or ''):
+                    return True
+                if id_pattern and id_pattern in (node.get('id') or ''):
+                    return True
+        return False
+    
+    @classmethod
+    def _compile_exclude_patterns(cls, exclude_selectors: List[str]) -> List[tuple]:
+        """除外セレクタごとの(classの部分一致パターン, idの部分一致パターン)を求める"""
+        return [
+            (cls._attribute_pattern(selector, '[class*='), cls._attribute_pattern(selector, '[id*='))
+            for selector in exclude_selectors
+        ]
+
+    @staticmethod
+    def _attribute_pattern(exclude_selector: str, prefix: str) -> str:
+        """
+        [class*='xxx']・[id*='xxx']形式のセレクタから部分一致パターンを取り出す
+        
+        Args:
+            exclude_selector: 除外セレクタ
+            prefix: '[class*=' または '[id*='
+            
+        Returns:
+            str: パターン（該当しない場合は空文字）
+        """
+        if prefix not in exclude_selector:
+            return ''
+        if "'" in exclude_selector:
+            return exclude_selector.split("'")[1]
+        if '"' in exclude_selector:
+            return exclude_selector.split('"')[1]
+        return ''
+    
+    def _extract_max_price_from_snapshot(self, snapshot: Dict) -> Optional[int]:
+        """
+        ページスナップショットのフォールバック用セレクタの要素から最大価格を取得する
+        
+        Args:
+            snapshot: ページスナップショット
+            
+        Returns:
+            Optional[int]: 抽出された最大価格、見つからない場合はNone
+        """
+        elements = snapshot.get('elements') or []
+        
+        def prices_for(groups, check_parent: bool) -> List[int]:
+            prices = []
+            for element_ids in groups or []:
+                for element_id in element_ids:
+                    element = elements[element_id]
+                    price_text = (element.get('text') or '').strip()
+                    if not price_text:
+                        continue
+                    if any(keyword in price_text.lower() for keyword in ID_SELECTOR_EXCLUDE_KEYWORDS):
+                        continue
+                    parent_text = element.get('parentText')
+                    if check_parent and parent_text is not None:
+                        if any(keyword in parent_text.lower() for keyword in ID_SELECTOR_EXCLUDE_KEYWORDS):
+                            continue
+                    price = self.extract_price(price_text)
+                    if price and price > 0:
+                        prices.append(price)
+            return prices
+        
+        # IDセレクタで見つかった場合はそれを返す
+        all_prices = prices_for(snapshot.get('fallbackId'), check_parent=False)
+        if all_prices:
+            return max(all_prices)
+        
+        all_prices = prices_for(snapshot.get('fallback'), check_parent=True)
+        if all_prices:
+            # 最大値を返す（通常価格の方が高いことが多い）
+            return max(all_prices)
+        return None
     
     def _extract_max_price_from_all_elements(self, exclude_selectors: List[str]) -> Optional[int]:
         """
@@ -1058,18 +1559,10 @@ class ConfigurableScraper(BaseScraper):
             Optional[int]: 抽出された最大価格、見つからない場合はNone
         """
         try:
-            # IDセレクタを優先的にチェック（信頼性が高い）
-            id_selectors = [
-                "#itemPrice",
-                "[id*='itemPrice']",
-                "[id*='price']",
-                "#price"
-            ]
-            
             all_prices = []
             
-            # まずIDセレクタをチェック
-            for selector in id_selectors:
+            # まずIDセレクタをチェック（信頼性が高い）
+            for selector in FALLBACK_ID_PRICE_SELECTORS:
                 try:
                     elements = self.browser.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
@@ -1081,8 +1574,7 @@ class ConfigurableScraper(BaseScraper):
                             price_text_lower = price_text.lower()
                             
                             # IDセレクタの場合は「送料別」のみチェック（「送料無料」は除外しない）
-                            exclude_keywords = ['楽天カード', 'ポイント利用', 'special', 'offer', '送料別', '内訳']
-                            if any(keyword in price_text_lower for keyword in exclude_keywords):
+                            if any(keyword in price_text_lower for keyword in ID_SELECTOR_EXCLUDE_KEYWORDS):
                                 continue
                             
                             # IDセレクタの場合は親要素チェックをスキップ
@@ -1099,14 +1591,7 @@ class ConfigurableScraper(BaseScraper):
                 return max(all_prices)
             
             # IDセレクタで見つからない場合、一般的な価格セレクタで全要素を取得
-            all_price_selectors = [
-                "[class*='price']",
-                "[class*='Price']",
-                ".price",
-                "#price"
-            ]
-            
-            for selector in all_price_selectors:
+            for selector in FALLBACK_PRICE_SELECTORS:
                 try:
                     elements = self.browser.find_elements(By.CSS_SELECTOR, selector)
                     for element in elements:
@@ -1118,7 +1603,7 @@ class ConfigurableScraper(BaseScraper):
                             price_text_lower = price_text.lower()
                             
                             # 除外キーワードチェック
-                            exclude_keywords = ['楽天カード', 'ポイント利用', 'special', 'offer', '送料別', '内訳']
+                            exclude_keywords = ID_SELECTOR_EXCLUDE_KEYWORDS
                             if any(keyword in price_text_lower for keyword in exclude_keywords):
                                 continue
                             
@@ -1162,30 +1647,50 @@ class ConfigurableScraper(BaseScraper):
         Returns:
             str: 在庫ステータス（"在庫あり" or "売り切れ" or "不明"）
         """
+        def stock_texts():
+            for selector in selectors:
+                try:
+                    # ページの準備完了はscrape()で待機済みのため、セレクタごとの待機は行わない
+                    element = self.find_first_element(By.CSS_SELECTOR, selector)
+                    yield element.text if element else None
+                except Exception:
+                    continue
+        
+        # ジェネレータで1件ずつ取得するため、売り切れが見つかった時点で残りのセレクタは評価しない
+        return self._decide_stock_status(stock_texts(), keywords)
+    
+    def _decide_stock_status(self, stock_texts, keywords: Dict[str, List[str]]) -> str:
+        """
+        在庫セレクタごとのテキストから在庫ステータスを判定する
+        
+        Args:
+            stock_texts: 在庫セレクタごとの要素テキスト（要素がない場合はNone）
+            keywords: compile_stock_keywordsで小文字にそろえたキーワード辞書
+            
+        Returns:
+            str: 在庫ステータス（"在庫あり" or "売り切れ"）
+        """
         in_stock_keywords = keywords.get('in_stock', [])
         out_of_stock_keywords = keywords.get('out_of_stock', [])
         
         # デフォルトは「在庫あり」
         stock_status = '在庫あり'
         
-        for selector in selectors:
-            try:
-                element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=3)
-                if element:
-                    stock_text = element.text.lower()
-                    
-                    # 売り切れキーワードをチェック
-                    for keyword in out_of_stock_keywords:
-                        if keyword.lower() in stock_text:
-                            return '売り切れ'
-                    
-                    # 在庫ありキーワードをチェック
-                    for keyword in in_stock_keywords:
-                        if keyword.lower() in stock_text:
-                            stock_status = '在庫あり'
-                            break
-            except Exception:
+        for text in stock_texts:
+            if text is None:
                 continue
+            stock_text = text.lower()
+            
+            # 売り切れキーワードをチェック
+            for keyword in out_of_stock_keywords:
+                if keyword in stock_text:
+                    return '売り切れ'
+            
+            # 在庫ありキーワードをチェック
+            for keyword in in_stock_keywords:
+                if keyword in stock_text:
+                    stock_status = '在庫あり'
+                    break
         
         return stock_status
 
@@ -1193,38 +1698,69 @@ class ConfigurableScraper(BaseScraper):
 class ScraperConfigLoader:
     """スクレイパー設定ファイルのローダー"""
     
-    def __init__(self, config_path: Optional[Path] = None, browser=None, use_spreadsheet: bool = True):
+    def __init__(
+        self,
+        config_path: Optional[Path] = None,
+        browser=None,
+        use_spreadsheet: bool = True,
+        supplier_df=None,
+        fetcher=None,
+        compiled_config: Optional[Dict] = None
+    ):
         """
         Args:
             config_path: 設定ファイルのパス（省略時はデフォルトパスを使用）
             browser: Selenium WebDriverインスタンス（スプレッドシート読み込み用）
             use_spreadsheet: スプレッドシートから設定を読み込むかどうか（デフォルト: True）
+            supplier_df: 起動時に取得済みの仕入れ元マスターシートのDataFrame（省略時はダウンロードする）
+            fetcher: SheetFetcherインスタンス（仕入れ元マスターシートの直接取得用、省略可）
+            compiled_config: キャッシュから読み込んだマージ済みの設定（指定した場合はそのまま使用する）
         """
         if config_path is None:
-            # exe実行時と通常実行時で適切なベースディレクトリを取得
-            import sys
-            if getattr(sys, 'frozen', False):
-                # exe実行時: sys.executableがexeファイルのパス
-                base_dir = Path(sys.executable).parent.resolve()
-            else:
-                # 通常実行時: このファイルの親の親（inventory_scraper）をベースディレクトリとする
-                base_dir = Path(__file__).parent.parent.resolve()
-            config_path = base_dir / 'config' / 'scraper_config.json'
+            config_path = self.default_config_path()
         self.config_path = config_path
         self.browser = browser
         self.use_spreadsheet = use_spreadsheet
-        self.config = self._load_config()
+        self.supplier_df = supplier_df
+        self.fetcher = fetcher
+        self.config = compiled_config if compiled_config is not None else self._load_config()
+        self._router = None
+        self._router_lock = threading.Lock()
+    
+    @staticmethod
+    def default_config_path() -> Path:
+        """デフォルトの設定ファイル（config/scraper_config.json）のパス"""
+        # exe実行時と通常実行時で適切なベースディレクトリを取得
+        import sys
+        if getattr(sys, 'frozen', False):
+            # exe実行時: sys.executableがexeファイルのパス
+            base_dir = Path(sys.executable).parent.resolve()
+        else:
+            # 通常実行時: このファイルの親の親（inventory_scraper）をベースディレクトリとする
+            base_dir = Path(__file__).parent.parent.resolve()
+        return base_dir / 'config' / 'scraper_config.json'
     
     def _load_config(self) -> Dict:
         """設定ファイルを読み込む（スプレッドシート設定を優先）"""
         json_config = self._load_json_config()
         
         # スプレッドシートから設定を読み込む
-        if self.use_spreadsheet and self.browser:
+        if self.use_spreadsheet and (self.browser or self.supplier_df is not None):
+            from .config_cache import (
+                SCRAPER_CONFIG_CACHE, fetch_master_version, load_compiled_config, save_compiled_config
+            )
+            master_version = None
+            if SCRAPER_CONFIG_CACHE:
+                # 仕入れ元マスターに変更がなければ、前回マージした設定を使用する
+                master_version = fetch_master_version()
+                cached_config = load_compiled_config(self.config_path, master_version)
+                if cached_config is not None:
+                    logger.info("仕入れ元マスターに変更がないため、キャッシュした設定を使用します")
+                    return cached_config
             try:
                 from .spreadsheet_config_loader import SpreadsheetConfigLoader
-                spreadsheet_loader = SpreadsheetConfigLoader(self.browser)
-                spreadsheet_config = spreadsheet_loader.load_config_from_spreadsheet()
+                spreadsheet_loader = SpreadsheetConfigLoader(self.browser, fetcher=self.fetcher)
+                spreadsheet_config = spreadsheet_loader.load_config_from_spreadsheet(supplier_df=self.supplier_df)
                 
                 # スプレッドシート設定とJSON設定をマージ（スプレッドシート設定が優先）
                 merged_config = spreadsheet_loader.merge_with_json_config(
@@ -1232,6 +1768,8 @@ class ScraperConfigLoader:
                     self.config_path
                 )
                 logger.info("スプレッドシートから設定を読み込みました")
+                if SCRAPER_CONFIG_CACHE:
+                    save_compiled_config(merged_config, self.config_path, master_version)
                 return merged_config
             except Exception as e:
                 logger.warning(f"スプレッドシートから設定を読み込めませんでした（JSON設定を使用）: {e}")
@@ -1251,25 +1789,29 @@ class ScraperConfigLoader:
             logger.warning(f"設定ファイルのJSON解析に失敗しました: {e}")
             return {"sites": [], "default": {}}
     
+    @property
+    def router(self):
+        """サイト設定のURLパターンをコンパイルしたUrlRouter（最初の参照時に1回だけ作成）"""
+        if self._router is None:
+            with self._router_lock:
+                if self._router is None:
+                    from .url_router import UrlRouter
+                    self._router = UrlRouter(self.config.get('sites', []))
+        return self._router
+    
     def find_site_config(self, url: str) -> Optional[Dict]:
         """
         URLに基づいて該当するサイト設定を検索する
         
+        サイトの定義順に最初にURLパターンを含むサイトを返す（判定はUrlRouterで行う）。
+        
         Args:
             url: スクレイピング対象のURL
             
         Returns:
             Optional[Dict]: サイト設定、見つからない場合はNone
         """
-        url_lower = url.lower()
-        
-        for site_config in self.config.get('sites', []):
-            url_patterns = site_config.get('url_patterns', [])
-            for pattern in url_patterns:
-                if pattern.lower() in url_lower:
-                    return site_config
-        
-        return None
+        return self.router.find_site_config(url)
     
     def get_default_config(self) -> Dict:
         """デフォルト設定を取得する"""
@@ -3,18 +3,80 @@
 スプレッドシートの「在庫管理」シートをCSVとして取得する
 """
 import time
+import logging
 import pandas as pd
 from pathlib import Path
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from .config import SPREADSHEET_ID, SHEET_GID, DATA_DIR
+from .config import SPREADSHEET_ID, SHEET_GID, DATA_DIR, SHEET_DIRECT_FETCH
 
+# ロガーを設定
+logger = logging.getLogger(__name__)
 
-def download_spreadsheet_csv(browser, retry_count=1):
+
+def download_spreadsheet_csv(browser, retry_count=1, fetcher=None, prefetched_df=None):
     """
     スプレッドシートの「在庫管理」シートをCSVとして取得する
     
+    SHEET_DIRECT_FETCHが有効な場合は、ブラウザのCookieを引き継いだHTTPリクエストで
+    CSVエクスポートをメモリ上に直接読み込む（1往復で完了）。
+    取得できなかった場合は、ブラウザでダウンロードしたファイルを読み込む。
+    
+    Args:
+        browser: Selenium WebDriverインスタンス
+        retry_count: ブラウザでのダウンロードのリトライ回数（デフォルト: 1）
+        fetcher: SheetFetcherインスタンス（省略時はbrowserから作成）
+        prefetched_df: 起動時に取得済みのシートのデータ（指定した場合はダウンロードしない）
+    
+    Returns:
+        pd.DataFrame: スプレッドシートのデータをDataFrame形式で返す
+    
+    Raises:
+        Exception: ダウンロードに失敗した場合
+    """
+    if prefetched_df is not None:
+        return filter_inventory_rows(prefetched_df)
+    
+    if SHEET_DIRECT_FETCH:
+        from .sheet_fetcher import SheetFetcher, SheetFetchError
+        try:
+            df = (fetcher or SheetFetcher(browser)).fetch_csv(SHEET_GID)
+        except SheetFetchError as e:
+            logger.warning(f"CSVを直接取得できなかったため、ブラウザでダウンロードします: {e}")
+        else:
+            return filter_inventory_rows(df)
+    
+    return _download_via_browser(browser, retry_count)
+
+
+def filter_inventory_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    「在庫管理」シートのデータから「仕入れ元URL」列が空でない行を抽出する
+    
+    Args:
+        df: シートのデータ
+    
+    Returns:
+        pd.DataFrame: 抽出した行
+    
+    Raises:
+        Exception: 「仕入れ元URL」列がない場合
+    """
+    supplier_url_col = '仕入れ元URL'
+    if supplier_url_col in df.columns:
+        df = df[df[supplier_url_col].notna() & (df[supplier_url_col] != '')]
+    else:
+        raise Exception(f"CSVに「{supplier_url_col}」列が見つかりません")
+    
+    print(f"CSVダウンロード完了: {len(df)}件のデータを取得しました")
+    return df
+
+
+def _download_via_browser(browser, retry_count=1):
+    """
+    ブラウザでCSVエクスポートURLを開き、ダウンロードされたファイルを読み込む
+    
     Args:
         browser: Selenium WebDriverインスタンス
         retry_count: リトライ回数（デフォルト: 1）
@@ -33,8 +95,6 @@ def download_spreadsheet_csv(browser, retry_count=1):
     
     # ダウンロード前に既存のCSVファイル（upload_data.csv以外）を削除
     # これにより、実行のたびに (1), (2) のような番号付きファイルが増えるのを防ぐ
-    import logging
-    logger = logging.getLogger(__name__)
     existing_csv_files = list(data_dir.glob('*.csv'))
     protected_file = data_dir / 'upload_data.csv'  # スクレイピング結果ファイルは保護
     deleted_count = 0
@@ -96,7 +156,7 @@ def download_spreadsheet_csv(browser, retry_count=1):
         if not download_complete or latest_file is None:
             if retry_count > 0:
                 print(f"ダウンロードがタイムアウトしました。リトライします... (残り{retry_count}回)")
-                return download_spreadsheet_csv(browser, retry_count - 1)
+                return _download_via_browser(browser, retry_count - 1)
             else:
                 raise Exception("CSVダウンロードがタイムアウトしました")
         
@@ -105,14 +165,7 @@ def download_spreadsheet_csv(browser, retry_count=1):
         df = pd.read_csv(latest_file, encoding='utf-8-sig')
         
         # 仕入れ元URL列が空でない行のみをフィルタリング
-        supplier_url_col = '仕入れ元URL'
-        if supplier_url_col in df.columns:
-            df = df[df[supplier_url_col].notna() & (df[supplier_url_col] != '')]
-        else:
-            raise Exception(f"CSVに「{supplier_url_col}」列が見つかりません")
-        
-        print(f"CSVダウンロード完了: {len(df)}件のデータを取得しました")
-        return df
+        return filter_inventory_rows(df)
         
     except Exception as e:
         raise Exception("CSVダウンロードに失敗しました") from e
@@ -0,0 +1,182 @@
+"""
+更新間隔判定モジュール
+スプレッドシートの「最終更新日時」と状態ストア（無効な場合は前回の結果CSV）から各URLの経過時間を求め、
+サイト別・在庫ステータス別の更新間隔（TTL）を過ぎたURLだけをスクレイピング対象にする
+"""
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import pandas as pd
+from .config import DATA_DIR, SCRAPER_REFRESH_TTL_MINUTES, SCRAPER_SOLD_OUT_TTL_MINUTES
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 前回実行時の結果CSV（save_result_csvの保存先）
+PREVIOUS_RESULT_CSV = DATA_DIR / 'upload_data.csv'
+
+# 前回の取得に失敗したとみなす在庫ステータス（更新間隔に関わらず毎回取得する）
+RETRY_STATUSES = ('', '不明')
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """
+    「最終更新日時」列を日時に変換する（変換できない値はNaT）
+
+    スプレッドシートの表示形式により「2025/01/01 12:00:00」「2025-01-01 12:00:00」の
+    どちらの形式でも読み込めるようにする。
+
+    Args:
+        values: 日時文字列のSeries
+
+    Returns:
+        pd.Series: datetime64のSeries
+    """
+    return pd.to_datetime(values.astype(str).str.strip(), errors='coerce', format='mixed')
+
+
+class FreshnessPolicy:
+    """
+    URLごとの更新間隔（TTL）を決定する
+
+    優先順位:
+    1. サイト設定の「refresh_ttl_by_status」（在庫ステータス別、例: {"売り切れ": 1440}）
+    2. サイト設定の「refresh_ttl_minutes」（仕入れ元マスターの「更新間隔(分)」）
+    3. .envの既定値（売り切れはSCRAPER_SOLD_OUT_TTL_MINUTES、その他はSCRAPER_REFRESH_TTL_MINUTES）
+    """
+
+    def __init__(
+        self,
+        config_loader=None,
+        default_ttl_minutes: float = SCRAPER_REFRESH_TTL_MINUTES,
+        sold_out_ttl_minutes: float = SCRAPER_SOLD_OUT_TTL_MINUTES
+    ):
+        """
+        Args:
+            config_loader: ScraperConfigLoaderインスタンス（省略可）
+            default_ttl_minutes: 既定の更新間隔（分）
+            sold_out_ttl_minutes: 売り切れの商品の既定の更新間隔（分）
+        """
+        self.config_loader = config_loader
+        self.default_ttl_minutes = default_ttl_minutes
+        self.sold_out_ttl_minutes = sold_out_ttl_minutes
+
+    def ttl_minutes(self, url: str, status: Optional[str]) -> float:
+        """
+        URLと前回の在庫ステータスから更新間隔（分）を求める
+
+        Args:
+            url: 仕入れ元URL
+            status: 前回の在庫ステータス
+
+        Returns:
+            float: 更新間隔（分）。0の場合は毎回取得する
+        """
+        status = (status or '').strip()
+        if status in RETRY_STATUSES:
+            return 0.0
+
+        site_config = {}
+        if self.config_loader is not None:
+            try:
+                site_config = self.config_loader.find_site_config(url) or self.config_loader.get_default_config() or {}
+            except Exception:
+                site_config = {}
+
+        by_status = site_config.get('refresh_ttl_by_status') or {}
+        if status in by_status:
+            return self._to_minutes(by_status[status], self.default_ttl_minutes)
+        if site_config.get('refresh_ttl_minutes') is not None:
+            return self._to_minutes(site_config['refresh_ttl_minutes'], self.default_ttl_minutes)
+        if status == '売り切れ':
+            return self.sold_out_ttl_minutes
+        return self.default_ttl_minutes
+
+    @staticmethod
+    def _to_minutes(value, default: float) -> float:
+        try:
+            return max(0.0, float(value))
+        except (TypeError, ValueError):
+            return default
+
+
+def load_previous_results(csv_path: Path = PREVIOUS_RESULT_CSV) -> Dict[str, Tuple[Optional[datetime], str]]:
+    """
+    前回実行時の結果CSVからURLごとの取得日時と在庫ステータスを読み込む
+
+    Args:
+        csv_path: 結果CSVのパス
+
+    Returns:
+        Dict[str, Tuple[Optional[datetime], str]]: URLをキーとした (最終更新日時, 在庫ステータス)
+    """
+    if not Path(csv_path).exists():
+        return {}
+    try:
+        previous_df = pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str)
+    except Exception as e:
+        logger.warning(f"前回の結果CSVの読み込みに失敗しました（無視します）: {e}")
+        return {}
+    if '仕入れ元URL' not in previous_df.columns:
+        return {}
+
+    timestamps = parse_timestamps(previous_df.get('最終更新日時', pd.Series(index=previous_df.index, dtype=str)))
+    statuses = previous_df.get('在庫ステータス', pd.Series('', index=previous_df.index)).fillna('')
+    previous = {}
+    for url, fetched_at, status in zip(previous_df['仕入れ元URL'], timestamps, statuses):
+        if pd.isna(url):
+            continue
+        previous[str(url).strip()] = (None if pd.isna(fetched_at) else fetched_at.to_pydatetime(), str(status))
+    return previous
+
+
+def select_stale_rows(
+    df: pd.DataFrame,
+    policy: FreshnessPolicy,
+    previous_results: Optional[Dict[str, Tuple[Optional[datetime], str]]] = None,
+    now: Optional[datetime] = None
+) -> Tuple[pd.DataFrame, int]:
+    """
+    更新間隔を過ぎた行だけを抽出する
+
+    各URLの最終取得日時は、スプレッドシートの「最終更新日時」と前回までの取得結果のうち新しい方を使用する。
+    どちらにも日時がないURLは常に対象とする。
+
+    Args:
+        df: スプレッドシートからダウンロードしたDataFrame
+        policy: FreshnessPolicyインスタンス
+        previous_results: URLをキーとした (最終取得日時, 在庫ステータス)
+                          （StateStore.load_fetch_states の結果。省略時は前回の結果CSVから読み込む）
+        now: 現在日時（省略時はdatetime.now()）
+
+    Returns:
+        Tuple[pd.DataFrame, int]: (スクレイピング対象の行, スキップした件数)
+    """
+    if previous_results is None:
+        previous_results = load_previous_results()
+    now = now or datetime.now()
+
+    sheet_timestamps = parse_timestamps(df['最終更新日時']) if '最終更新日時' in df.columns else pd.Series(pd.NaT, index=df.index)
+    sheet_statuses = df['在庫ステータス'].fillna('').astype(str) if '在庫ステータス' in df.columns else pd.Series('', index=df.index)
+
+    is_stale = []
+    for url, sheet_fetched_at, sheet_status in zip(df['仕入れ元URL'], sheet_timestamps, sheet_statuses):
+        url = str(url).strip()
+        fetched_at = None if pd.isna(sheet_fetched_at) else sheet_fetched_at.to_pydatetime()
+        status = sheet_status
+
+        previous_fetched_at, previous_status = previous_results.get(url, (None, ''))
+        if previous_fetched_at is not None and (fetched_at is None or previous_fetched_at > fetched_at):
+            fetched_at = previous_fetched_at
+            status = previous_status
+
+        if fetched_at is None:
+            is_stale.append(True)
+            continue
+
+        age_minutes = max(0.0, (now - fetched_at).total_seconds() / 60)
+        is_stale.append(age_minutes >= policy.ttl_minutes(url, status))
+
+    stale_df = df[pd.Series(is_stale, index=df.index, dtype=bool)]
+    return stale_df, len(df) - len(stale_df)
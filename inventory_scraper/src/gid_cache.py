@@ -0,0 +1,96 @@
+"""
+シートGIDキャッシュモジュール
+自動検出した仕入れ元マスターシートのGIDをスプレッドシートIDごとに保存し、
+次回の起動時に検出を省略できるようにする
+"""
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from .config import DATA_DIR
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+GID_CACHE_PATH = DATA_DIR / 'gid_cache.json'
+
+# 仕入れ元マスターシートのキャッシュキー
+SUPPLIER_MASTER_KEY = 'supplier_master'
+
+
+def _load_cache(cache_path: Path) -> Dict:
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        return cache if isinstance(cache, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"GIDキャッシュを読み込めませんでした（無視します）: {e}")
+        return {}
+
+
+def _save_cache(cache: Dict, cache_path: Path):
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"GIDキャッシュを保存できませんでした: {e}")
+
+
+def load_cached_gid(spreadsheet_id: str, key: str = SUPPLIER_MASTER_KEY, cache_path: Path = GID_CACHE_PATH) -> Optional[str]:
+    """
+    キャッシュからシートのGIDを取得する
+
+    Args:
+        spreadsheet_id: スプレッドシートID
+        key: シートの種類（既定: 仕入れ元マスターシート）
+        cache_path: キャッシュファイルのパス
+
+    Returns:
+        Optional[str]: GID、キャッシュがない場合はNone
+    """
+    if not spreadsheet_id:
+        return None
+    entry = _load_cache(Path(cache_path)).get(spreadsheet_id, {}).get(key)
+    if isinstance(entry, dict) and entry.get('gid') not in (None, ''):
+        return str(entry['gid'])
+    return None
+
+
+def save_cached_gid(spreadsheet_id: str, gid: str, key: str = SUPPLIER_MASTER_KEY, cache_path: Path = GID_CACHE_PATH):
+    """
+    シートのGIDをキャッシュに保存する
+
+    Args:
+        spreadsheet_id: スプレッドシートID
+        gid: シートのGID
+        key: シートの種類（既定: 仕入れ元マスターシート）
+        cache_path: キャッシュファイルのパス
+    """
+    if not spreadsheet_id or gid in (None, ''):
+        return
+    cache_path = Path(cache_path)
+    cache = _load_cache(cache_path)
+    cache.setdefault(spreadsheet_id, {})[key] = {
+        'gid': str(gid),
+        'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    _save_cache(cache, cache_path)
+
+
+def clear_cached_gid(spreadsheet_id: str, key: str = SUPPLIER_MASTER_KEY, cache_path: Path = GID_CACHE_PATH):
+    """
+    キャッシュのGIDを削除する（シートが削除・変更された場合）
+
+    Args:
+        spreadsheet_id: スプレッドシートID
+        key: シートの種類（既定: 仕入れ元マスターシート）
+        cache_path: キャッシュファイルのパス
+    """
+    cache_path = Path(cache_path)
+    cache = _load_cache(cache_path)
+    if cache.get(spreadsheet_id, {}).pop(key, None) is not None:
+        _save_cache(cache, cache_path)
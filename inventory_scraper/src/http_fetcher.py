@@ -0,0 +1,248 @@
+"""
+HTTP取得モジュール
+ブラウザを起動せずにrequestsで商品ページのHTMLを取得し、
+page_extractorと同じ形式のページスナップショットを静的HTMLから作成する
+"""
+import threading
+import logging
+from typing import Dict, List, Optional, Union
+import requests
+from bs4 import BeautifulSoup
+from .config import CHROME_USER_AGENT, SCRAPER_HTTP_TIMEOUT
+from .page_extractor import (
+    MAX_ANCESTOR_DEPTH,
+    FALLBACK_ID_PRICE_SELECTORS,
+    FALLBACK_PRICE_SELECTORS
+)
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# ブラウザと同等のリクエストヘッダー
+DEFAULT_HEADERS = {
+    'User-Agent': CHROME_USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ja,en-US;q=0.8,en;q=0.6'
+}
+
+# 表示されないテキストを含む要素（innerTextと同様に除外する）
+NON_TEXT_TAGS = ('script', 'style', 'noscript', 'template')
+
+
+class HttpFetchResult:
+    """HTTP取得結果"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, encoding: Optional[str], elapsed: float):
+        """
+        Args:
+            url: リダイレクト後の最終URL
+            status_code: HTTPステータスコード
+            content: レスポンス本文
+            encoding: Content-Typeヘッダーで指定された文字コード（指定がない場合はNone）
+            elapsed: 取得にかかった時間（秒）
+        """
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.elapsed = elapsed
+
+    @property
+    def markup(self) -> Union[str, bytes]:
+        """
+        HTMLパーサーに渡す本文
+
+        文字コードがヘッダーで指定されていない場合はバイト列のまま返し、
+        BeautifulSoupにmetaタグから文字コードを判定させる（Shift_JISのページ対策）。
+        """
+        if self.encoding:
+            return self.content.decode(self.encoding, errors='replace')
+        return self.content
+
+
+class HttpFetcher:
+    """
+    requests.Sessionを使ったHTMLの取得
+
+    Sessionを再利用して同一ホストへの接続（keep-alive）とCookieを引き継ぐ。
+    """
+
+    def __init__(self, timeout: float = SCRAPER_HTTP_TIMEOUT, headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            timeout: リクエストのタイムアウト（秒）
+            headers: 追加のリクエストヘッダー
+        """
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+    def fetch(self, url: str) -> HttpFetchResult:
+        """
+        URLのHTMLを取得する
+
+        Args:
+            url: 取得対象のURL
+
+        Returns:
+            HttpFetchResult: 取得結果（4xx・5xxの場合も例外にせず返す）
+
+        Raises:
+            requests.exceptions.RequestException: 接続エラー・タイムアウトの場合
+        """
+        response = self.session.get(url, timeout=self.timeout, allow_redirects=True)
+        encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+        return HttpFetchResult(
+            url=response.url,
+            status_code=response.status_code,
+            content=response.content,
+            encoding=encoding,
+            elapsed=response.elapsed.total_seconds()
+        )
+
+    def close(self):
+        """Sessionを閉じる"""
+        self.session.close()
+
+
+_local = threading.local()
+
+
+def get_http_fetcher() -> HttpFetcher:
+    """
+    スレッドごとのHttpFetcherを取得する
+
+    requests.Sessionはスレッド間で共有しない方が安全なため、ワーカースレッドごとに作成する。
+
+    Returns:
+        HttpFetcher: 現在のスレッドのHttpFetcher
+    """
+    fetcher = getattr(_local, 'fetcher', None)
+    if fetcher is None:
+        fetcher = HttpFetcher()
+        _local.fetcher = fetcher
+    return fetcher
+
+
+def build_static_snapshot(markup: Union[str, bytes], config: Dict, include_next_data: bool = False) -> Dict:
+    """
+    静的HTMLからページスナップショットを作成する
+
+    page_extractor.PAGE_SNAPSHOT_SCRIPTと同じ構造の辞書を返すため、
+    ConfigurableScraperの候補選択ロジックをそのまま適用できる。
+    JavaScriptで描画される要素は含まれない。
+
+    Args:
+        markup: HTML（文字列またはバイト列）
+        config: サイト設定
+        include_next_data: __NEXT_DATA__のテキストを含めるかどうか
+
+    Returns:
+        Dict: ページスナップショット
+    """
+    soup = BeautifulSoup(markup, 'html.parser')
+
+    next_data = None
+    if include_next_data:
+        script = soup.select_one('script#__NEXT_DATA__')
+        next_data = script.string if script is not None else None
+
+    # innerTextと同様に、スクリプトやスタイルのテキストは含めない
+    for tag in soup.find_all(NON_TEXT_TAGS):
+        tag.decompose()
+
+    exclude_selectors: List[str] = list(config.get('price_exclude_selectors', []))
+    elements: List[Dict] = []
+    element_index: Dict[int, int] = {}
+    exclude_hit_cache: Dict[int, List[int]] = {}
+    invalid_selectors: List[str] = []
+
+    def visible_text(el) -> str:
+        # 描画情報がないため、hidden属性・display:noneの指定で非表示を判定する
+        node = el
+        while node is not None and getattr(node, 'name', None) not in (None, '[document]'):
+            style = (node.get('style') or '').replace(' ', '').lower()
+            if node.has_attr('hidden') or 'display:none' in style:
+                return ''
+            node = node.parent
+        return el.get_text(' ', strip=True)
+
+    def exclude_hits(el) -> List[int]:
+        key = id(el)
+        if key not in exclude_hit_cache:
+            hits = []
+            for i, selector in enumerate(exclude_selectors):
+                try:
+                    if el.select_one(selector) is not None:
+                        hits.append(i)
+                except Exception:
+                    # 不正なセレクタは無視する
+                    pass
+            exclude_hit_cache[key] = hits
+        return exclude_hit_cache[key]
+
+    def describe(el, with_ancestors: bool) -> int:
+        key = id(el)
+        if key in element_index:
+            return element_index[key]
+        parent = el.parent if el.parent is not None and el.parent.name != '[document]' else None
+        info = {
+            'text': visible_text(el),
+            'parentText': visible_text(parent) if parent is not None else None,
+            'className': ' '.join(el.get('class') or []),
+            'id': el.get('id') or ''
+        }
+        if with_ancestors:
+            info['excludeHits'] = exclude_hits(el)
+            info['ancestors'] = []
+            current = parent
+            for _ in range(MAX_ANCESTOR_DEPTH):
+                if current is None or current.name == '[document]':
+                    break
+                info['ancestors'].append({
+                    'className': ' '.join(current.get('class') or []),
+                    'id': current.get('id') or '',
+                    'excludeHits': exclude_hits(current)
+                })
+                current = current.parent
+        element_index[key] = len(elements)
+        elements.append(info)
+        return element_index[key]
+
+    def collect(selectors: List[str], with_ancestors: bool) -> List[List[int]]:
+        groups = []
+        for selector in selectors:
+            try:
+                groups.append([describe(el, with_ancestors) for el in soup.select(selector)])
+            except Exception:
+                invalid_selectors.append(selector)
+                groups.append([])
+        return groups
+
+    price = collect(list(config.get('price_selectors', [])), True)
+    fallback_id = collect(FALLBACK_ID_PRICE_SELECTORS, False)
+    fallback = collect(FALLBACK_PRICE_SELECTORS, False)
+
+    stock = []
+    for selector in config.get('stock_selectors', []):
+        try:
+            el = soup.select_one(selector)
+            stock.append(visible_text(el) if el is not None else None)
+        except Exception:
+            invalid_selectors.append(selector)
+            stock.append(None)
+
+    for selector in invalid_selectors:
+        logger.debug(f"    不正なセレクタを無視しました: {selector}")
+
+    return {
+        'elements': elements,
+        'price': price,
+        'fallbackId': fallback_id,
+        'fallback': fallback,
+        'stock': stock,
+        'nextData': next_data,
+        'invalidSelectors': invalid_selectors
+    }
@@ -0,0 +1,356 @@
+"""
+計測モジュール
+URLごと・処理段階ごとの所要時間とWebDriverの呼び出し回数を記録し、
+JSON Lines形式で出力してサイト別の集計を表示する
+"""
+import json
+import threading
+import time
+import logging
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from .config import SCRAPER_TIMINGS
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 処理段階（集計表の列の順）
+# politeness_wait: ホストのアクセス間隔を守るための待機
+# page_load: browser.get()（ページの読み込み）
+# readiness_wait: 待機条件（ready_conditions）を満たすまでの待機
+# snapshot: script方式のページ情報の一括取得
+# price_extraction / stock_extraction: 価格・在庫ステータスの抽出
+# http_fetch / html_parse: 静的HTMLの取得と解析
+STAGES = (
+    'politeness_wait',
+    'page_load',
+    'readiness_wait',
+    'snapshot',
+    'price_extraction',
+    'stock_extraction',
+    'http_fetch',
+    'html_parse'
+)
+
+_local = threading.local()
+
+
+class UrlTiming:
+    """1件のURLの計測結果"""
+
+    def __init__(self, url: str, site: Optional[str] = None):
+        """
+        Args:
+            url: 対象URL
+            site: サイト名
+        """
+        self.url = url
+        self.site = site
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.stages: Dict[str, float] = {}
+        self.price_strategy: Optional[str] = None
+        self.webdriver_calls = 0
+        self.total_seconds = 0.0
+        self.result: Dict = {}
+
+    def add(self, stage_name: str, seconds: float):
+        """処理段階の所要時間を加算する"""
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + max(0.0, seconds)
+
+    def to_dict(self) -> Dict:
+        """JSON Linesに出力する辞書"""
+        return {
+            'url': self.url,
+            'site': self.site,
+            'started_at': self.started_at,
+            'total_ms': round(self.total_seconds * 1000, 1),
+            'stages_ms': {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()},
+            'price_strategy': self.price_strategy,
+            'webdriver_calls': self.webdriver_calls,
+            'extractor': self.result.get('_extractor'),
+            'price': self.result.get('仕入れ価格'),
+            'stock_status': self.result.get('在庫ステータス'),
+            'worker': threading.current_thread().name
+        }
+
+
+class TimingRecorder:
+    """
+    計測結果の出力と集計
+
+    record()は複数のワーカースレッドから呼び出される。
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: JSON Linesの出力先（Noneの場合は集計のみ行う）
+        """
+        self.path = Path(path) if path is not None else None
+        self._lock = threading.Lock()
+        self._file = None
+        self._sites: Dict[str, Dict] = defaultdict(lambda: {
+            'count': 0,
+            'total': 0.0,
+            'stages': defaultdict(float),
+            'webdriver_calls': 0,
+            'strategies': Counter()
+        })
+
+    def record(self, timing: UrlTiming):
+        """
+        1件の計測結果を出力し、サイト別の集計に加える
+
+        Args:
+            timing: 計測結果
+        """
+        entry = timing.to_dict()
+        with self._lock:
+            site = self._sites[timing.site or '(該当なし)']
+            site['count'] += 1
+            site['total'] += timing.total_seconds
+            for name, seconds in timing.stages.items():
+                site['stages'][name] += seconds
+            site['webdriver_calls'] += timing.webdriver_calls
+            if timing.price_strategy:
+                site['strategies'][timing.price_strategy] += 1
+
+            if self.path is None:
+                return
+            try:
+                if self._file is None:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8')
+                self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+                self._file.flush()
+            except OSError as e:
+                logger.warning(f"計測結果を書き込めませんでした（以降は出力しません）: {e}")
+                self.path = None
+
+    def summary_lines(self) -> List[str]:
+        """
+        サイト別の集計表を作成する（合計時間の長い順）
+
+        Returns:
+            List[str]: 表の各行（計測結果がない場合は空）
+        """
+        with self._lock:
+            sites = sorted(self._sites.items(), key=lambda item: item[1]['total'], reverse=True)
+            if not sites:
+                return []
+            stage_names = [name for name in STAGES if any(site['stages'].get(name) for _, site in sites)]
+            header = ['サイト', '件数', '合計(秒)', '平均(ms)'] + [f"{name}(ms)" for name in stage_names] + ['WD呼出/件', '価格の取得方法']
+            rows = [header]
+            for name, site in sites:
+                count = site['count']
+                row = [
+                    name,
+                    str(count),
+                    f"{site['total']:.1f}",
+                    f"{site['total'] * 1000 / count:.0f}"
+                ]
+                row += [f"{site['stages'].get(stage_name, 0.0) * 1000 / count:.0f}" for stage_name in stage_names]
+                row.append(f"{site['webdriver_calls'] / count:.1f}")
+                row.append(', '.join(f"{strategy}:{n}" for strategy, n in site['strategies'].most_common()) or '-')
+                rows.append(row)
+        return format_table(rows)
+
+    def close(self):
+        """出力ファイルを閉じる"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _display_width(text: str) -> int:
+    """表の列揃え用の表示幅（全角文字は2文字分）"""
+    return sum(2 if ord(char) > 0x2E7F else 1 for char in text)
+
+
+def format_table(rows: List[List[str]]) -> List[str]:
+    """
+    表を列をそろえた文字列にする
+
+    Args:
+        rows: 見出し行を先頭にした各行のセル
+
+    Returns:
+        List[str]: 表の各行（見出しの下に区切り線を入れる）
+    """
+    widths = [max(_display_width(row[i]) for row in rows) for i in range(len(rows[0]))]
+    lines = []
+    for row_index, row in enumerate(rows):
+        cells = [cell + ' ' * (widths[i] - _display_width(cell)) for i, cell in enumerate(row)]
+        lines.append(' | '.join(cells).rstrip())
+        if row_index == 0:
+            lines.append('-+-'.join('-' * width for width in widths))
+    return lines
+
+
+_recorder: Optional[TimingRecorder] = TimingRecorder() if SCRAPER_TIMINGS else None
+
+
+def configure(path: Optional[Path]) -> Optional[TimingRecorder]:
+    """
+    計測結果の出力先を設定する（SCRAPER_TIMINGSが無効な場合は何もしない）
+
+    Args:
+        path: JSON Linesの出力先
+
+    Returns:
+        Optional[TimingRecorder]: 計測結果の記録先
+    """
+    global _recorder
+    if not SCRAPER_TIMINGS:
+        return None
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = TimingRecorder(path)
+    return _recorder
+
+
+def print_summary():
+    """サイト別の集計表を表示し、出力ファイルを閉じる"""
+    if _recorder is None:
+        return
+    lines = _recorder.summary_lines()
+    if lines:
+        print("=== サイト別の所要時間 ===")
+        for line in lines:
+            print(line)
+        if _recorder.path is not None:
+            print(f"URLごとの計測結果: {_recorder.path}")
+    _recorder.close()
+
+
+@contextmanager
+def track_url(url: str, site: Optional[str] = None) -> Iterator[Optional[UrlTiming]]:
+    """
+    1件のURLの処理を計測する（このスレッドで実行されるstage()の時間を集計する）
+
+    Args:
+        url: 対象URL
+        site: サイト名（後からtiming.siteに設定してもよい）
+
+    Yields:
+        Optional[UrlTiming]: 計測結果（計測が無効な場合はNone）
+    """
+    if _recorder is None:
+        yield None
+        return
+    timing = UrlTiming(url, site)
+    # スケジューラのget()で待機した時間は、次に処理するURLの待機時間とする
+    pending_wait = getattr(_local, 'pending_wait', 0.0)
+    if pending_wait:
+        timing.add('politeness_wait', pending_wait)
+        _local.pending_wait = 0.0
+    _local.timing = timing
+    started = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.total_seconds = time.perf_counter() - started + timing.stages.get('politeness_wait', 0.0)
+        _local.timing = None
+        _recorder.record(timing)
+
+
+def record_timing(timing: UrlTiming):
+    """
+    別の方法で計測した結果を記録する（非同期HTTP取得など）
+
+    Args:
+        timing: 計測結果
+    """
+    if _recorder is not None:
+        _recorder.record(timing)
+
+
+@contextmanager
+def activate(timing: Optional[UrlTiming]) -> Iterator[None]:
+    """
+    別のスレッドで作成した計測結果を、このスレッドの計測中のURLとして使用する（HTMLの解析スレッドなど）
+
+    Args:
+        timing: 計測結果（Noneの場合は何もしない）
+    """
+    previous = current()
+    _local.timing = timing
+    try:
+        yield
+    finally:
+        _local.timing = previous
+
+
+def current() -> Optional[UrlTiming]:
+    """このスレッドで計測中のURLの計測結果（計測していない場合はNone）"""
+    return getattr(_local, 'timing', None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    処理段階の所要時間を計測する（計測中のURLがない場合は何もしない）
+
+    Args:
+        name: 処理段階（STAGESのいずれか）
+    """
+    timing = current()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - started)
+
+
+def set_price_strategy(strategy: str):
+    """
+    価格を取得できた方法を記録する
+
+    Args:
+        strategy: next_data / mercari_shop / selectors / yahoo_auction_fallback / max_fallback
+    """
+    timing = current()
+    if timing is not None:
+        timing.price_strategy = strategy
+
+
+def note_politeness_wait(seconds: float):
+    """
+    アクセス間隔を守るために待機した時間を記録する（PolitenessScheduler.get()から呼び出される）
+
+    Args:
+        seconds: 待機時間（秒）
+    """
+    if _recorder is not None and seconds > 0:
+        _local.pending_wait = getattr(_local, 'pending_wait', 0.0) + seconds
+
+
+def instrument_browser(browser):
+    """
+    WebDriverのコマンド送信（WebElementの操作を含む）を数えるようにする（同じブラウザには1回だけ適用）
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+    """
+    if _recorder is None or browser is None or getattr(browser, '_timing_instrumented', False):
+        return
+    original_execute = browser.execute
+
+    def execute(driver_command, params=None):
+        timing = current()
+        if timing is not None:
+            timing.webdriver_calls += 1
+        return original_execute(driver_command, params)
+
+    try:
+        browser.execute = execute
+        browser._timing_instrumented = True
+    except AttributeError:
+        pass
@@ -0,0 +1,219 @@
+"""
+ページスナップショット取得モジュール
+サイト設定（価格・除外・在庫セレクタ）をページ内スクリプトに渡し、
+候補要素のテキスト・祖先要素のclass/id・在庫テキストを1回のWebDriver呼び出しで取得する
+"""
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 除外セレクタの判定で遡る祖先要素の最大階層
+MAX_ANCESTOR_DEPTH = 5
+
+# 価格セレクタで見つからなかった場合のフォールバック用セレクタ
+# IDセレクタを優先的にチェック（信頼性が高い）
+FALLBACK_ID_PRICE_SELECTORS = [
+    "#itemPrice",
+    "[id*='itemPrice']",
+    "[id*='price']",
+    "#price"
+]
+
+# IDセレクタで見つからない場合の一般的な価格セレクタ
+FALLBACK_PRICE_SELECTORS = [
+    "[class*='price']",
+    "[class*='Price']",
+    ".price",
+    "#price"
+]
+
+# 同一要素の情報は1回だけ返し、各セレクタは要素番号のリストで参照する
+PAGE_SNAPSHOT_SCRIPT = """
+const config = arguments[0];
+const excludeSelectors = config.excludeSelectors || [];
+const maxDepth = config.maxAncestorDepth || 0;
+const elements = [];
+const elementIndex = new Map();
+const excludeHitCache = new Map();
+const invalidSelectors = [];
+
+// WebElement.textと同様に、描画されていない要素は空文字とする
+function visibleText(el) {
+    if (!el || !el.getClientRects || el.getClientRects().length === 0) {
+        return '';
+    }
+    return (el.innerText || '').trim();
+}
+
+// 要素の子孫に除外セレクタに一致する要素があるか（除外セレクタの番号のリスト）
+function excludeHits(el) {
+    if (excludeHitCache.has(el)) {
+        return excludeHitCache.get(el);
+    }
+    const hits = [];
+    excludeSelectors.forEach((selector, i) => {
+        try {
+            if (el.querySelector(selector)) {
+                hits.push(i);
+            }
+        } catch (e) {
+            // 不正なセレクタは無視する
+        }
+    });
+    excludeHitCache.set(el, hits);
+    return hits;
+}
+
+function describe(el, withAncestors) {
+    if (elementIndex.has(el)) {
+        return elementIndex.get(el);
+    }
+    const parent = el.parentElement;
+    const info = {
+        text: visibleText(el),
+        parentText: parent ? visibleText(parent) : null,
+        className: el.getAttribute('class') || '',
+        id: el.getAttribute('id') || ''
+    };
+    if (withAncestors) {
+        info.excludeHits = excludeHits(el);
+        info.ancestors = [];
+        let current = parent;
+        for (let depth = 0; depth < maxDepth && current; depth++) {
+            info.ancestors.push({
+                className: current.getAttribute('class') || '',
+                id: current.getAttribute('id') || '',
+                excludeHits: excludeHits(current)
+            });
+            current = current.parentElement;
+        }
+    }
+    const index = elements.length;
+    elements.push(info);
+    elementIndex.set(el, index);
+    return index;
+}
+
+function collect(selectors, withAncestors) {
+    return (selectors || []).map((selector) => {
+        try {
+            return Array.from(document.querySelectorAll(selector)).map((el) => describe(el, withAncestors));
+        } catch (e) {
+            invalidSelectors.push(selector);
+            return [];
+        }
+    });
+}
+
+const price = collect(config.priceSelectors, true);
+const fallbackId = collect(config.fallbackIdSelectors, false);
+const fallback = collect(config.fallbackSelectors, false);
+
+const stock = (config.stockSelectors || []).map((selector) => {
+    try {
+        const el = document.querySelector(selector);
+        return el ? visibleText(el) : null;
+    } catch (e) {
+        invalidSelectors.push(selector);
+        return null;
+    }
+});
+
+let nextData = null;
+if (config.includeNextData) {
+    const script = document.querySelector('script#__NEXT_DATA__');
+    nextData = script ? script.textContent : null;
+}
+
+return {
+    elements: elements,
+    price: price,
+    fallbackId: fallbackId,
+    fallback: fallback,
+    stock: stock,
+    nextData: nextData,
+    invalidSelectors: invalidSelectors
+};
+"""
+
+
+def build_snapshot_request(config: Dict, include_next_data: bool = False) -> Dict:
+    """
+    サイト設定からページ内スクリプトに渡す引数を作成する
+
+    Args:
+        config: サイト設定
+        include_next_data: __NEXT_DATA__のテキストを含めるかどうか
+
+    Returns:
+        Dict: PAGE_SNAPSHOT_SCRIPTの引数
+    """
+    return {
+        'priceSelectors': list(config.get('price_selectors', [])),
+        'excludeSelectors': list(config.get('price_exclude_selectors', [])),
+        'stockSelectors': list(config.get('stock_selectors', [])),
+        'fallbackIdSelectors': FALLBACK_ID_PRICE_SELECTORS,
+        'fallbackSelectors': FALLBACK_PRICE_SELECTORS,
+        'maxAncestorDepth': MAX_ANCESTOR_DEPTH,
+        'includeNextData': include_next_data
+    }
+
+
+def collect_page_snapshot(
+    browser,
+    config: Dict,
+    include_next_data: bool = False,
+    request: Optional[Dict] = None
+) -> Optional[Dict]:
+    """
+    1回のexecute_scriptで価格・在庫の抽出に必要な情報をまとめて取得する
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+        config: サイト設定
+        include_next_data: __NEXT_DATA__のテキストを含めるかどうか
+        request: build_snapshot_requestで作成済みの引数（省略時はconfigから作成する）
+
+    Returns:
+        Optional[Dict]: スナップショット、取得に失敗した場合はNone
+    """
+    try:
+        snapshot = browser.execute_script(
+            PAGE_SNAPSHOT_SCRIPT,
+            request if request is not None else build_snapshot_request(config, include_next_data)
+        )
+    except Exception as e:
+        logger.debug(f"ページスナップショットの取得に失敗しました: {e}")
+        return None
+
+    if not isinstance(snapshot, dict):
+        return None
+
+    invalid_selectors: List[str] = snapshot.get('invalidSelectors') or []
+    for selector in invalid_selectors:
+        logger.debug(f"    不正なセレクタを無視しました: {selector}")
+    return snapshot
+
+
+def snapshot_hash(snapshot: Dict) -> str:
+    """
+    スナップショットのうち価格・在庫の判定に使用する部分のハッシュを求める
+
+    ページ全体のHTMLは広告やタイムスタンプで毎回変わるため、抽出対象の要素だけをハッシュ化する。
+
+    Args:
+        snapshot: ページスナップショット
+
+    Returns:
+        str: SHA-1のハッシュ値（16進数）
+    """
+    payload = json.dumps(
+        {key: snapshot.get(key) for key in ('elements', 'price', 'stock', 'nextData')},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
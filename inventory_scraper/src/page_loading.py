@@ -0,0 +1,161 @@
+"""
+ページ読み込みモジュール
+Chromeはページ読み込み戦略noneで起動し（browser.get()が読み込み完了を待たない）、
+サイト別の読み込み戦略（normal / eager / none）と読み込み期限をPython側で判定する。
+期限に達したページはwindow.stop()で読み込みを打ち切り、読み込み済みのDOMで抽出を続行する
+"""
+import time
+import logging
+import weakref
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from .config import SCRAPER_PAGE_LOAD_STRATEGY, SCRAPER_PAGE_LOAD_TIMEOUT
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 使用可能な読み込み戦略
+# normal: document.readyStateが'complete'（loadイベント）になるまで待機する
+# eager: document.readyStateが'interactive'（DOMContentLoaded）以降になるまで待機する
+# none: 新しいページに切り替わった時点で戻る（待機はready_conditionsに任せる）
+PAGE_LOAD_STRATEGIES = ('normal', 'eager', 'none')
+
+# 読み込み戦略ごとに待機を終える document.readyState
+READY_STATES = {
+    'normal': ('complete',),
+    'eager': ('interactive', 'complete'),
+    'none': ('loading', 'interactive', 'complete'),
+}
+
+# 遷移前のページに目印を付けるスクリプト（遷移後のページと区別するため）
+MARK_PREVIOUS_PAGE_SCRIPT = "window.__scraperPreviousPage = true;"
+
+# 遷移後のページの読み込み状態を取得するスクリプト
+LOAD_STATE_SCRIPT = """
+return {
+    navigated: !window.__scraperPreviousPage,
+    readyState: document.readyState,
+    errorPage: location.protocol === 'chrome-error:'
+};
+"""
+
+# 読み込みを打ち切るスクリプト
+STOP_LOADING_SCRIPT = "window.stop();"
+
+POLL_INTERVAL = 0.05
+
+# ブラウザごとに最後に設定したページ読み込みのタイムアウト（ドライバー側の戦略がnone以外の場合に使用）
+_page_load_timeouts: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def normalize_page_load_strategy(strategy, default: str = SCRAPER_PAGE_LOAD_STRATEGY) -> str:
+    """
+    設定値を読み込み戦略に変換する
+
+    Args:
+        strategy: 設定値（normal / eager / none、またはNone）
+        default: 設定値がない・不正な場合の戦略
+
+    Returns:
+        str: 読み込み戦略
+    """
+    if strategy is None or str(strategy).strip() == '':
+        return default
+    strategy = str(strategy).strip().lower()
+    if strategy not in PAGE_LOAD_STRATEGIES:
+        logger.warning(f"不明な読み込み戦略のため{default}を使用します: {strategy}")
+        return default
+    return strategy
+
+
+def driver_page_load_strategy(browser) -> str:
+    """ブラウザ起動時に指定したページ読み込み戦略（取得できない場合はnormal）"""
+    capabilities = getattr(browser, 'capabilities', None) or {}
+    return capabilities.get('pageLoadStrategy') or 'normal'
+
+
+def stop_loading(browser):
+    """読み込み中のページをwindow.stop()で打ち切る"""
+    try:
+        browser.execute_script(STOP_LOADING_SCRIPT)
+    except Exception as e:
+        logger.debug(f"ページの読み込みを打ち切れませんでした: {e}")
+
+
+def navigate(
+    browser,
+    url: str,
+    strategy: str = SCRAPER_PAGE_LOAD_STRATEGY,
+    timeout: float = SCRAPER_PAGE_LOAD_TIMEOUT
+) -> bool:
+    """
+    URLに遷移し、読み込み戦略に応じた状態になるか期限に達するまで待機する
+
+    期限に達した場合は読み込みを打ち切り、例外は発生させずに読み込み済みのDOMで続行できるようにする。
+    ドライバー側の戦略がnone以外の場合（create_browser()で作成したメインのブラウザなど）は、
+    browser.get()の待機にset_page_load_timeoutで期限を設ける。
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+        url: 遷移先のURL
+        strategy: 読み込み戦略（PAGE_LOAD_STRATEGIESのいずれか）
+        timeout: 読み込みの期限（秒）
+
+    Returns:
+        bool: 期限内に読み込みが完了した場合はTrue
+
+    Raises:
+        TimeoutException: 期限内に遷移先のページに切り替わらなかった場合
+        WebDriverException: ページに到達できなかった場合（Chromeのエラーページが表示された場合）
+    """
+    timeout = max(0.0, timeout)
+    if driver_page_load_strategy(browser) != 'none':
+        return _navigate_blocking(browser, url, timeout)
+
+    # 遷移前のページを読み取らないよう、目印のないページに切り替わるまでを読み込み中とみなす
+    try:
+        browser.execute_script(MARK_PREVIOUS_PAGE_SCRIPT)
+    except Exception as e:
+        logger.debug(f"遷移前のページに目印を付けられませんでした: {e}")
+    browser.get(url)
+
+    ready_states = READY_STATES.get(strategy, READY_STATES['normal'])
+    deadline = time.monotonic() + timeout
+    state = {}
+    while True:
+        try:
+            state = browser.execute_script(LOAD_STATE_SCRIPT) or {}
+        except Exception as e:
+            logger.debug(f"ページの読み込み状態の取得に失敗しました: {e}")
+            state = {}
+        if state.get('navigated'):
+            if state.get('errorPage'):
+                raise WebDriverException(f"ページを読み込めませんでした: {url}")
+            if state.get('readyState') in ready_states:
+                return True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            stop_loading(browser)
+            if not state.get('navigated'):
+                # 遷移前のページが表示されたままのため、読み込み済みのDOMでは続行しない
+                raise TimeoutException(f"ページが{timeout:g}秒以内に応答しませんでした: {url}")
+            logger.warning(f"  ページの読み込みが{timeout:g}秒以内に完了しないため打ち切ります（状態: {state}）: {url[:80]}")
+            return False
+        time.sleep(min(POLL_INTERVAL, remaining))
+
+
+def _navigate_blocking(browser, url: str, timeout: float) -> bool:
+    """browser.get()が読み込みを待機するブラウザで、ページ読み込みのタイムアウトを設けて遷移する"""
+    try:
+        if _page_load_timeouts.get(browser) != timeout:
+            browser.set_page_load_timeout(timeout)
+            _page_load_timeouts[browser] = timeout
+    except Exception as e:
+        logger.debug(f"ページ読み込みのタイムアウトを設定できませんでした: {e}")
+    try:
+        browser.get(url)
+    except TimeoutException:
+        logger.warning(f"  ページの読み込みが{timeout:g}秒以内に完了しないため打ち切ります: {url[:80]}")
+        stop_loading(browser)
+        return False
+    return True
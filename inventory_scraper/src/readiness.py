@@ -0,0 +1,271 @@
+"""
+ページ準備完了判定モジュール
+固定時間のスリープの代わりに、サイト別の条件（document.readyState、価格要素の有無、
+__NEXT_DATA__の有無、ネットワークアイドル）を1つの期限内で待機する
+"""
+import json
+import time
+import weakref
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence
+from .config import SCRAPER_READY_TIMEOUT, SCRAPER_NETWORK_IDLE_MS
+from .page_loading import stop_loading
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 使用可能な待機条件
+READY_CONDITIONS = (
+    'document_ready',   # document.readyState == 'complete'
+    'dom_ready',        # document.readyState が 'interactive' 以降
+    'price_selector',   # 価格セレクタのいずれかに一致する要素が存在する
+    'next_data',        # script#__NEXT_DATA__ が存在する
+    'network_idle',     # 通信中のリクエストがない状態が一定時間続いた
+)
+
+DEFAULT_READY_CONDITIONS = ('document_ready',)
+
+# 待機条件の判定に必要な情報を1回のWebDriver呼び出しで取得するスクリプト
+READY_STATE_SCRIPT = """
+const selectors = arguments[0] || [];
+const combinedSelector = arguments[1] || '';
+const state = {
+    readyState: document.readyState,
+    nextData: !!document.querySelector('script#__NEXT_DATA__'),
+    priceFound: false,
+    resourceCount: (performance.getEntriesByType ? performance.getEntriesByType('resource').length : 0)
+};
+let checked = false;
+if (combinedSelector) {
+    // セレクタをカンマで連結して1回のquerySelectorで判定する
+    try {
+        state.priceFound = !!document.querySelector(combinedSelector);
+        checked = true;
+    } catch (e) {
+        // 不正なセレクタを含む場合は1つずつ判定する
+    }
+}
+if (!checked) {
+    for (const selector of selectors) {
+        try {
+            if (document.querySelector(selector)) {
+                state.priceFound = true;
+                break;
+            }
+        } catch (e) {
+            // 不正なセレクタは無視する
+        }
+    }
+}
+return state;
+"""
+
+POLL_INTERVAL = 0.25
+
+
+class NetworkIdleTracker:
+    """
+    ChromeDriverのパフォーマンスログ（CDPのNetworkイベント）から通信中のリクエストを追跡する
+
+    パフォーマンスログが利用できない場合は、Resource Timingのエントリ数の変化で代用する。
+    """
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        self.cdp_available = True
+        self._last_resource_count = -1
+
+    def reset(self):
+        """ページ遷移前に呼び出し、過去のイベントを破棄する"""
+        self._drain()
+        self.inflight.clear()
+        self.last_activity = time.monotonic()
+        self._last_resource_count = -1
+
+    def discard(self):
+        """パフォーマンスログを解析せずに読み捨てる（network_idleを使用しないサイトのページ遷移前に呼び出す）"""
+        if not self.cdp_available:
+            return
+        try:
+            self.browser.get_log('performance')
+        except Exception:
+            logger.debug("パフォーマンスログが利用できないため、Resource Timingでネットワークアイドルを判定します")
+            self.cdp_available = False
+
+    def is_idle(self, idle_ms: int, resource_count: int) -> bool:
+        """
+        ネットワークがアイドル状態かどうかを判定する
+
+        Args:
+            idle_ms: アイドルとみなすまでの無通信時間（ミリ秒）
+            resource_count: Resource Timingのエントリ数（CDPが使えない場合の代替指標）
+
+        Returns:
+            bool: アイドル状態の場合はTrue
+        """
+        now = time.monotonic()
+        if self.cdp_available:
+            if self._drain():
+                self.last_activity = now
+            if self.inflight:
+                return False
+        elif resource_count != self._last_resource_count:
+            self._last_resource_count = resource_count
+            self.last_activity = now
+        return (now - self.last_activity) * 1000 >= idle_ms
+
+    def _drain(self) -> bool:
+        """パフォーマンスログを読み出して通信中リクエストを更新する（イベントがあればTrue）"""
+        if not self.cdp_available:
+            return False
+        try:
+            entries = self.browser.get_log('performance')
+        except Exception:
+            logger.debug("パフォーマンスログが利用できないため、Resource Timingでネットワークアイドルを判定します")
+            self.cdp_available = False
+            return False
+
+        had_events = False
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method', '')
+            request_id = message.get('params', {}).get('requestId')
+            if not request_id:
+                continue
+            if method == 'Network.requestWillBeSent':
+                self.inflight.add(request_id)
+                had_events = True
+            elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+                self.inflight.discard(request_id)
+                had_events = True
+        return had_events
+
+
+_trackers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_network_tracker(browser) -> NetworkIdleTracker:
+    """ブラウザごとのNetworkIdleTrackerを取得する"""
+    tracker = _trackers.get(browser)
+    if tracker is None:
+        tracker = NetworkIdleTracker(browser)
+        _trackers[browser] = tracker
+    return tracker
+
+
+def normalize_ready_conditions(conditions) -> List[str]:
+    """
+    設定値（文字列またはリスト）を待機条件のリストに変換する
+
+    Args:
+        conditions: カンマ区切り文字列、リスト、またはNone
+
+    Returns:
+        List[str]: 有効な待機条件のリスト（空の場合はデフォルト条件）
+    """
+    if isinstance(conditions, str):
+        conditions = [c.strip() for c in conditions.split(',')]
+    normalized = []
+    for condition in conditions or []:
+        if condition in READY_CONDITIONS:
+            normalized.append(condition)
+        elif condition:
+            logger.warning(f"不明な待機条件を無視します: {condition}")
+    return normalized or list(DEFAULT_READY_CONDITIONS)
+
+
+def prepare_page_load(browser, conditions: Iterable[str]):
+    """
+    ページ遷移の直前に呼び出し、ネットワークアイドル判定の状態をリセットする
+
+    パフォーマンスログは条件に関わらずChromeDriverに蓄積されるため、
+    network_idleを使用しないサイトでもページごとに読み捨てる。
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+        conditions: 待機条件のリスト
+    """
+    tracker = get_network_tracker(browser)
+    if 'network_idle' in conditions:
+        tracker.reset()
+    else:
+        tracker.discard()
+
+
+def wait_for_page_ready(
+    browser,
+    conditions: Sequence[str] = DEFAULT_READY_CONDITIONS,
+    price_selectors: Sequence[str] = (),
+    timeout: float = SCRAPER_READY_TIMEOUT,
+    network_idle_ms: int = SCRAPER_NETWORK_IDLE_MS,
+    early_stop: bool = False
+) -> bool:
+    """
+    すべての待機条件を満たすか、期限に達するまで待機する
+
+    要素ごとの待機は行わず、1回のスクリプト実行で全条件を判定する。
+    期限に達した場合も例外は発生させず、読み込み済みのDOMで抽出を続行できるようにする。
+    early_stopの場合は、条件を満たした時点で読み込み中の画像・広告などの読み込みを打ち切る。
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+        conditions: 待機条件のリスト（READY_CONDITIONSのいずれか）
+        price_selectors: price_selector条件で使用する価格セレクタ
+        timeout: 全体の待機期限（秒）
+        network_idle_ms: network_idle条件の無通信時間（ミリ秒）
+        early_stop: 条件を満たした時点でwindow.stop()で読み込みを打ち切るか
+
+    Returns:
+        bool: 期限内にすべての条件を満たした場合はTrue
+    """
+    conditions = list(conditions)
+    selectors = list(price_selectors) if 'price_selector' in conditions else []
+    combined_selector = ', '.join(selectors)
+    tracker = get_network_tracker(browser) if 'network_idle' in conditions else None
+    deadline = time.monotonic() + max(0.0, timeout)
+    state: Dict = {}
+
+    while True:
+        try:
+            state = browser.execute_script(READY_STATE_SCRIPT, selectors, combined_selector) or {}
+        except Exception as e:
+            logger.debug(f"ページ状態の取得に失敗しました: {e}")
+            state = {}
+
+        if _conditions_met(conditions, state, tracker, network_idle_ms):
+            if early_stop and state.get('readyState') != 'complete':
+                stop_loading(browser)
+            return True
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.debug(f"  待機条件 {conditions} を期限内に満たせませんでした（状態: {state}）")
+            return False
+        time.sleep(min(POLL_INTERVAL, remaining))
+
+
+def _conditions_met(
+    conditions: Sequence[str],
+    state: Dict,
+    tracker: Optional[NetworkIdleTracker],
+    network_idle_ms: int
+) -> bool:
+    ready_state = state.get('readyState')
+    for condition in conditions:
+        if condition == 'document_ready' and ready_state != 'complete':
+            return False
+        if condition == 'dom_ready' and ready_state not in ('interactive', 'complete'):
+            return False
+        if condition == 'price_selector' and not state.get('priceFound'):
+            return False
+        if condition == 'next_data' and not state.get('nextData'):
+            return False
+        if condition == 'network_idle' and tracker is not None:
+            if not tracker.is_idle(network_idle_ms, state.get('resourceCount', 0)):
+                return False
+    return True
@@ -0,0 +1,185 @@
+"""
+リソースブロックモジュール
+価格・在庫の抽出に使用しない画像・動画・フォント・広告/解析タグなどの読み込みを、
+CDPのNetwork.setBlockedURLsでサイト別に遮断する
+"""
+import logging
+import weakref
+from typing import Dict, Iterable, List, Tuple
+from .config import SCRAPER_RESOURCE_BLOCKING, SCRAPER_BLOCKED_RESOURCE_TYPES
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 広告・アクセス解析・レコメンドのタグを配信するホスト（サブドメインを含めて遮断する）
+TRACKER_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'doubleclick.net',
+    'adservice.google.com',
+    'adservice.google.co.jp',
+    'connect.facebook.net',
+    'analytics.twitter.com',
+    'ads-twitter.com',
+    'analytics.tiktok.com',
+    'criteo.com',
+    'criteo.net',
+    'amazon-adsystem.com',
+    'scorecardresearch.com',
+    'hotjar.com',
+    'clarity.ms',
+    'nr-data.net',
+    'rat.rakuten.co.jp',
+    'fls-fe.amazon.co.jp',
+    'unagi.amazon.co.jp',
+    'yjtag.jp',
+    'yads.yahoo.co.jp',
+    'im.ov.yahoo.co.jp',
+)
+
+
+def _extension_patterns(*extensions: str) -> List[str]:
+    """拡張子ごとに、クエリ文字列の有無の両方に一致するURLパターンを作成する"""
+    patterns = []
+    for extension in extensions:
+        patterns.extend([f'*.{extension}', f'*.{extension}?*'])
+    return patterns
+
+
+# 遮断できるリソースの種類とURLパターン
+# Network.setBlockedURLsはURLのワイルドカード（*）のみ指定できるため、種類は拡張子・配信ホストで判定する
+RESOURCE_TYPE_PATTERNS: Dict[str, List[str]] = {
+    'image': _extension_patterns('jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'),
+    'media': _extension_patterns('mp4', 'webm', 'm3u8', 'mov', 'mp3', 'm4a', 'ogg', 'wav'),
+    'font': _extension_patterns('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'stylesheet': _extension_patterns('css'),
+    'tracker': [pattern for host in TRACKER_HOSTS for pattern in (f'*://{host}/*', f'*://*.{host}/*')],
+}
+
+# 遮断しないことを表す設定値
+DISABLED_VALUES = ('none', 'off', 'false', 'なし', '無効')
+
+# 既定の種類を表す設定値
+DEFAULT_VALUES = ('default', '既定')
+
+
+def parse_resource_types(value) -> List[str]:
+    """
+    設定値（カンマ区切り文字列またはリスト）をリソースの種類のリストに変換する
+
+    Args:
+        value: カンマ区切り文字列、リスト、またはNone
+
+    Returns:
+        List[str]: 有効な種類のリスト
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    types = []
+    for resource_type in value or []:
+        resource_type = str(resource_type).strip().lower()
+        if resource_type in RESOURCE_TYPE_PATTERNS:
+            types.append(resource_type)
+        elif resource_type:
+            logger.warning(f"不明なリソースの種類を無視します: {resource_type}")
+    return types
+
+
+DEFAULT_BLOCKED_TYPES = tuple(parse_resource_types(SCRAPER_BLOCKED_RESOURCE_TYPES))
+
+
+def build_blocked_url_patterns(setting=None) -> Tuple[str, ...]:
+    """
+    サイト設定のresource_blockingから、Network.setBlockedURLsに渡すURLパターンを求める
+
+    Args:
+        setting: サイト設定のresource_blocking
+            None・True: 既定の種類（SCRAPER_BLOCKED_RESOURCE_TYPES）を遮断する
+            False・"none": 遮断しない
+            文字列・リスト: 種類（image・media・font・stylesheet・tracker・default）とURLパターンの並び
+                （仕入れ元マスターの「リソースブロック」列と同じ書式、「!」で始まる項目は遮断しない）
+            辞書: {"types": [...], "block_urls": [...], "allow_urls": [...]}（typesを省略した場合は既定の種類）
+
+    Returns:
+        Tuple[str, ...]: 遮断するURLパターン（SCRAPER_RESOURCE_BLOCKING=falseの場合は空）
+    """
+    if not SCRAPER_RESOURCE_BLOCKING or setting is False:
+        return ()
+    if setting is None or setting is True:
+        setting = {}
+
+    if isinstance(setting, dict):
+        types = parse_resource_types(setting['types']) if 'types' in setting else list(DEFAULT_BLOCKED_TYPES)
+        block_urls = [str(pattern).strip() for pattern in setting.get('block_urls') or [] if str(pattern).strip()]
+        allow = [str(pattern).strip() for pattern in setting.get('allow_urls') or [] if str(pattern).strip()]
+    else:
+        items = setting.split(',') if isinstance(setting, str) else list(setting)
+        items = [str(item).strip() for item in items if str(item).strip()]
+        if any(item.lower() in DISABLED_VALUES for item in items):
+            return ()
+        types, block_urls, allow = [], [], []
+        for item in items:
+            if item.startswith('!'):
+                allow.append(item[1:].strip())
+            elif item.lower() in DEFAULT_VALUES:
+                types.extend(DEFAULT_BLOCKED_TYPES)
+            elif item.lower() in RESOURCE_TYPE_PATTERNS:
+                types.append(item.lower())
+            else:
+                block_urls.append(item)
+
+    # 許可した種類は除き、許可したホスト・パターンを含むURLパターンは遮断しない
+    allowed_types = {item.lower() for item in allow if item.lower() in RESOURCE_TYPE_PATTERNS}
+    allowed_fragments = [item.strip('*') for item in allow if item.lower() not in RESOURCE_TYPE_PATTERNS and item.strip('*')]
+    patterns = []
+    for resource_type in types:
+        if resource_type not in allowed_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+    patterns.extend(block_urls)
+    patterns = [pattern for pattern in patterns if not any(fragment in pattern for fragment in allowed_fragments)]
+    return tuple(dict.fromkeys(patterns))
+
+
+DEFAULT_BLOCKED_URL_PATTERNS = build_blocked_url_patterns()
+
+# ブラウザごとに最後に設定したURLパターン
+_applied: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def apply_resource_blocking(browser, patterns: Iterable[str]) -> bool:
+    """
+    ブラウザに遮断するURLパターンを設定する
+
+    ブラウザ（ワーカー）ごとに前回設定したパターンを記録し、異なるサイトのURLに切り替わった場合のみ
+    CDPのコマンドを送信する。CDPを利用できないブラウザでは何もしない。
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+        patterns: 遮断するURLパターン
+
+    Returns:
+        bool: パターンを送信した場合はTrue
+    """
+    patterns = tuple(patterns)
+    try:
+        previous = _applied.get(browser)
+    except TypeError:
+        # 弱参照を作成できないオブジェクトの場合
+        return False
+    if previous == patterns:
+        return False
+
+    try:
+        if previous is None:
+            browser.execute_cdp_cmd('Network.enable', {})
+        browser.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(patterns)})
+    except Exception as e:
+        logger.debug(f"リソースブロックを設定できませんでした（遮断せずに続行します）: {e}")
+        # 失敗したブラウザでURLごとに再試行しないよう、設定済みとして記録する
+        _applied[browser] = patterns
+        return False
+    _applied[browser] = patterns
+    logger.debug(f"リソースブロックを設定しました（{len(patterns)}パターン）")
+    return True
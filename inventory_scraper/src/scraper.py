@@ -3,27 +3,48 @@
 Strategyパターンを使用して各ECサイトのスクレイピングを実装
 """
 import time
-import random
 import re
+import threading
 from abc import ABC, abstractmethod
+from collections import Counter
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import pandas as pd
+from .config import SCRAPER_READY_TIMEOUT, SCRAPER_PAGE_LOAD_TIMEOUT, SCRAPER_EARLY_STOP
+from .readiness import DEFAULT_READY_CONDITIONS, prepare_page_load, wait_for_page_ready
+from .resource_blocking import DEFAULT_BLOCKED_URL_PATTERNS, apply_resource_blocking
+from .page_loading import navigate, normalize_page_load_strategy
+from . import instrumentation
+
+# 価格テキストから数字を取り出す正規表現
+PRICE_PATTERN = re.compile(r'[\d,]+')
 
 
 class BaseScraper(ABC):
     """スクレイパーの基底クラス"""
     
+    # ページ準備完了の待機条件（readiness.READY_CONDITIONSのいずれか）
+    READY_CONDITIONS = DEFAULT_READY_CONDITIONS
+    
     def __init__(self, browser):
         """
         Args:
             browser: Selenium WebDriverインスタンス
         """
         self.browser = browser
+        # ページ準備完了の待機条件と期限（サイトへのアクセス間隔はscrape_urlsのPolitenessSchedulerが管理する）
+        self.ready_conditions = list(self.READY_CONDITIONS)
+        self.ready_timeout = SCRAPER_READY_TIMEOUT
+        # ページの読み込み時に遮断するURLパターン（サイト別の設定はConfigurableScraperで上書き）
+        self.blocked_url_patterns = DEFAULT_BLOCKED_URL_PATTERNS
+        # ページの読み込み戦略・読み込み期限と、待機条件を満たした時点で読み込みを打ち切るか
+        self.page_load_strategy = normalize_page_load_strategy(None)
+        self.page_load_timeout = SCRAPER_PAGE_LOAD_TIMEOUT
+        self.early_stop = SCRAPER_EARLY_STOP
     
     @abstractmethod
     def scrape(self, url: str) -> Dict[str, any]:
@@ -42,6 +63,61 @@ class BaseScraper(ABC):
         """
         pass
     
+    def load_page(self, url: str) -> bool:
+        """
+        ページを読み込む
+        
+        読み込み戦略（page_load_strategy）に応じた状態まで待機し、読み込み期限（page_load_timeout）に
+        達した場合は読み込みを打ち切って読み込み済みのDOMで続行する。
+        
+        Args:
+            url: 読み込むURL
+        
+        Returns:
+            bool: 期限内に読み込みが完了した場合はTrue
+        """
+        with instrumentation.stage('page_load'):
+            # 遮断するURLパターンはサイトが切り替わった場合のみ送信される
+            apply_resource_blocking(self.browser, self.blocked_url_patterns)
+            prepare_page_load(self.browser, self.ready_conditions)
+            return navigate(self.browser, url, self.page_load_strategy, self.page_load_timeout)
+    
+    def wait_until_ready(self, price_selectors: List[str] = ()) -> bool:
+        """
+        待機条件（ready_conditions）を満たすか、期限（ready_timeout）に達するまで待機する
+        
+        Args:
+            price_selectors: price_selector条件で使用する価格セレクタ
+        
+        Returns:
+            bool: 期限内に条件を満たした場合はTrue
+        """
+        with instrumentation.stage('readiness_wait'):
+            return wait_for_page_ready(
+                self.browser,
+                self.ready_conditions,
+                price_selectors,
+                self.ready_timeout,
+                early_stop=self.early_stop
+            )
+    
+    def find_first_element(self, by, value):
+        """
+        読み込み済みのDOMから最初に一致する要素を取得する（待機しない）
+        
+        Args:
+            by: SeleniumのByオブジェクト
+            value: セレクタ
+        
+        Returns:
+            WebElement: 見つかった要素、見つからない場合はNone
+        """
+        try:
+            elements = self.browser.find_elements(by, value)
+        except (NoSuchElementException, WebDriverException):
+            return None
+        return elements[0] if elements else None
+    
     def wait_and_get_element(self, by, value, timeout=10):
         """
         要素が表示されるまで待機して取得する
@@ -76,7 +152,7 @@ class BaseScraper(ABC):
             return None
         
         # 数字とカンマを抽出
-        price_match = re.search(r'[\d,]+', text.replace(',', ''))
+        price_match = PRICE_PATTERN.search(text.replace(',', ''))
         if price_match:
             try:
                 price = int(price_match.group().replace(',', ''))
@@ -162,7 +238,7 @@ class AmazonScraper(BaseScraper):
         try:
             # ページのロードを試行
             try:
-                self.browser.get(url)
+                self.load_page(url)
                 page_loaded = True
             except (TimeoutException, WebDriverException) as e:
                 # ページロード前のエラー（WebDriver/Timeoutエラー）
@@ -173,8 +249,6 @@ class AmazonScraper(BaseScraper):
                     '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
             
-            time.sleep(random.uniform(3, 7))  # ランダムな待機時間
-            
             result = {
                 '仕入れ価格': 0,
                 '在庫ステータス': '不明',
@@ -190,10 +264,13 @@ class AmazonScraper(BaseScraper):
                 '.a-price .a-offscreen'
             ]
             
+            # 待機条件を満たすまで待機してから、読み込み済みのDOMで要素を取得する
+            self.wait_until_ready(price_selectors)
+            
             price = None
             for selector in price_selectors:
                 try:
-                    price_element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=5)
+                    price_element = self.find_first_element(By.CSS_SELECTOR, selector)
                     if price_element:
                         price_text = price_element.text
                         price = self.extract_price(price_text)
@@ -218,7 +295,7 @@ class AmazonScraper(BaseScraper):
             stock_status = '在庫あり'  # デフォルト
             for selector in stock_selectors:
                 try:
-                    stock_element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=3)
+                    stock_element = self.find_first_element(By.CSS_SELECTOR, selector)
                     if stock_element:
                         stock_text = stock_element.text.lower()
                         if '在庫' in stock_text or 'stock' in stock_text:
@@ -271,6 +348,9 @@ class AmazonScraper(BaseScraper):
 class MercariScraper(BaseScraper):
     """メルカリ用スクレイパー"""
     
+    # メルカリはJavaScriptで描画されるため、価格要素の出現を待つ
+    READY_CONDITIONS = ('dom_ready', 'price_selector')
+    
     def scrape(self, url: str) -> Dict[str, any]:
         """
         メルカリ商品ページから価格と在庫情報を取得する
@@ -285,7 +365,7 @@ class MercariScraper(BaseScraper):
         try:
             # ページのロードを試行
             try:
-                self.browser.get(url)
+                self.load_page(url)
                 page_loaded = True
             except (TimeoutException, WebDriverException) as e:
                 # ページロード前のエラー（WebDriver/Timeoutエラー）
@@ -296,8 +376,6 @@ class MercariScraper(BaseScraper):
                     '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
             
-            time.sleep(random.uniform(3, 7))  # ランダムな待機時間
-            
             result = {
                 '仕入れ価格': 0,
                 '在庫ステータス': '不明',
@@ -311,10 +389,13 @@ class MercariScraper(BaseScraper):
                 '.merPrice'
             ]
             
+            # 待機条件を満たすまで待機してから、読み込み済みのDOMで要素を取得する
+            self.wait_until_ready(price_selectors)
+            
             price = None
             for selector in price_selectors:
                 try:
-                    price_element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=5)
+                    price_element = self.find_first_element(By.CSS_SELECTOR, selector)
                     if price_element:
                         price_text = price_element.text
                         price = self.extract_price(price_text)
@@ -339,7 +420,7 @@ class MercariScraper(BaseScraper):
             stock_status = '在庫あり'  # デフォルト
             for selector in status_selectors:
                 try:
-                    status_element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=3)
+                    status_element = self.find_first_element(By.CSS_SELECTOR, selector)
                     if status_element:
                         status_text = status_element.text.lower()
                         if '売り切れ' in status_text or '取引中' in status_text or 'sold' in status_text:
@@ -374,7 +455,7 @@ class YahooScraper(BaseScraper):
         try:
             # ページのロードを試行
             try:
-                self.browser.get(url)
+                self.load_page(url)
                 page_loaded = True
             except (TimeoutException, WebDriverException) as e:
                 # ページロード前のエラー（WebDriver/Timeoutエラー）
@@ -385,8 +466,6 @@ class YahooScraper(BaseScraper):
                     '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
                 }
             
-            time.sleep(random.uniform(3, 7))  # ランダムな待機時間
-            
             result = {
                 '仕入れ価格': 0,
                 '在庫ステータス': '不明',
@@ -400,10 +479,13 @@ class YahooScraper(BaseScraper):
                 '[data-testid="price"]'
             ]
             
+            # 待機条件を満たすまで待機してから、読み込み済みのDOMで要素を取得する
+            self.wait_until_ready(price_selectors)
+            
             price = None
             for selector in price_selectors:
                 try:
-                    price_element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=5)
+                    price_element = self.find_first_element(By.CSS_SELECTOR, selector)
                     if price_element:
                         price_text = price_element.text
                         price = self.extract_price(price_text)
@@ -427,7 +509,7 @@ class YahooScraper(BaseScraper):
             stock_status = '在庫あり'  # デフォルト
             for selector in stock_selectors:
                 try:
-                    stock_element = self.wait_and_get_element(By.CSS_SELECTOR, selector, timeout=3)
+                    stock_element = self.find_first_element(By.CSS_SELECTOR, selector)
                     if stock_element:
                         stock_text = stock_element.text.lower()
                         if '在庫' in stock_text:
@@ -487,42 +569,140 @@ def get_scraper(url: str, browser, config_loader=None) -> BaseScraper:
             pass
     
     # 既存のハードコーディングされたスクレイパー（互換性のため）
+    return legacy_scraper_class(url)(browser)
+
+
+def legacy_scraper_class(url: str) -> type:
+    """
+    設定ファイルが使えない場合に使用するハードコーディングされたスクレイパーのクラスを返す
+    
+    Args:
+        url: スクレイピング対象のURL
+    
+    Returns:
+        type: BaseScraperのサブクラス
+    """
     # 注意: より具体的なURLパターンを先にチェックする必要がある
     url_lower = url.lower()
     
     if 'amazon.co.jp' in url_lower or 'amazon.com' in url_lower:
-        return AmazonScraper(browser)
+        return AmazonScraper
     elif 'mercari.com' in url_lower or 'mercari.jp' in url_lower:
-        return MercariScraper(browser)
+        return MercariScraper
     elif 'shopping.yahoo.co.jp' in url_lower:
         # Yahoo!ショッピング専用
-        return YahooScraper(browser)
+        return YahooScraper
     elif 'yahoo.co.jp' in url_lower:
         # その他のYahoo!サイト（オークション含む）は設定ファイルベースで処理済み
         # フォールバック: Yahoo!ショッピング用スクレイパーを使用
-        return YahooScraper(browser)
+        return YahooScraper
     
     # 設定ファイルが使えない場合はAmazonスクレイパーを使用（デフォルト）
-    return AmazonScraper(browser)
+    return AmazonScraper
+
+
+def _create_failed_result(url: str) -> Dict[str, any]:
+    """
+    スクレイピングに失敗したURLの結果辞書を作成する
+    
+    Args:
+        url: スクレイピング対象のURL
+    
+    Returns:
+        Dict[str, any]: エラー結果辞書
+    """
+    return {
+        '仕入れ元URL': url,
+        '仕入れ価格': -1,
+        '在庫ステータス': '不明',
+        '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
 
 
-def scrape_urls(df: pd.DataFrame, browser) -> pd.DataFrame:
+def _scrape_single_url(
+    url: str,
+    browser,
+    config_loader=None,
+    browser_only: bool = False,
+    registry=None
+) -> Dict[str, any]:
+    """
+    1件のURLをスクレイピングする
+    
+    Args:
+        url: スクレイピング対象のURL
+        browser: Selenium WebDriverインスタンス
+        config_loader: ScraperConfigLoaderインスタンス（省略可）
+        browser_only: Trueの場合は静的HTMLでの取得を省略してブラウザで取得する
+                      （非同期HTTP取得で取得できなかったURL用）
+        registry: browser用のScraperRegistry（指定した場合は作成済みのスクレイパーを使用する）
+    
+    Returns:
+        Dict[str, any]: 「仕入れ元URL」を含むスクレイピング結果
+    """
+    started = time.monotonic()
+    instrumentation.instrument_browser(browser)
+    with instrumentation.track_url(url) as timing:
+        try:
+            if registry is not None:
+                scraper = registry.get(url)
+            else:
+                scraper = get_scraper(url, browser, config_loader=config_loader)
+            if timing is not None:
+                timing.site = getattr(scraper, 'name', None) or type(scraper).__name__
+            if browser_only and hasattr(scraper, 'scrape_with_browser'):
+                result = scraper.scrape_with_browser(url)
+            else:
+                result = scraper.scrape(url)
+            result['仕入れ元URL'] = url
+            # 状態ストア用の取得時間（HTTP取得の場合はレスポンス時間が設定済み）
+            result.setdefault('_latency_ms', int((time.monotonic() - started) * 1000))
+            result.setdefault('_extractor', type(scraper).__name__)
+        except Exception as e:
+            print(f"エラーが発生しました ({url}): {e}")
+            result = _create_failed_result(url)
+        if timing is not None:
+            timing.result = result
+        return result
+
+
+def scrape_urls(
+    df: pd.DataFrame,
+    browser,
+    pool_size: Optional[int] = None,
+    config_loader=None,
+    state_store=None,
+    on_result: Optional[Callable[[Dict], None]] = None,
+    browser_factory: Optional[Callable[[int], Any]] = None
+) -> pd.DataFrame:
     """
     DataFrameの「仕入れ元URL」列に基づいてスクレイピングを実行する
     
+    pool_sizeが2以上の場合は、ワーカーごとに専用のブラウザを持つBrowserPoolで
+    URLを並列に処理する。結果は入力順に並べ直して返す。
+    
     Args:
         df: スクレイピング対象のURLが含まれるDataFrame
-        browser: Selenium WebDriverインスタンス
+        browser: Selenium WebDriverインスタンス（設定読み込みと逐次処理に使用）
+        pool_size: 並列ワーカー数（省略時は.envのSCRAPER_POOL_SIZE）
+        config_loader: ScraperConfigLoaderインスタンス（省略時はここで作成）
+        state_store: StateStoreインスタンス（指定した場合は各結果を記録し、前回からの変化を集計する）
+        on_result: 1件の結果が確定するたびに呼び出す関数（チェックポイントの記録などに使用、
+                   ワーカースレッドから呼ばれるためスレッドセーフであること）
+        browser_factory: ブラウザプールのワーカー用WebDriverを作成する関数（省略時はcreate_worker_browser）
     
     Returns:
         pd.DataFrame: スクレイピング結果を含むDataFrame
     """
-    results = []
     supplier_url_col = '仕入れ元URL'
     
     if supplier_url_col not in df.columns:
         raise Exception(f"DataFrameに「{supplier_url_col}」列が見つかりません")
     
+    if pool_size is None:
+        from .config import SCRAPER_POOL_SIZE
+        pool_size = SCRAPER_POOL_SIZE
+    
     urls = df[supplier_url_col].tolist()
     total = len(urls)
     
@@ -530,35 +710,99 @@ def scrape_urls(df: pd.DataFrame, browser) -> pd.DataFrame:
     
     # パフォーマンス最適化: ScraperConfigLoaderを1回だけ作成して全URLで再利用
     # これにより、スプレッドシート設定読み込みが各URLごとに実行されることを防ぐ
-    config_loader = None
-    try:
-        from .configurable_scraper import ScraperConfigLoader
-        print("設定ファイルローダーを初期化しています...")
-        config_loader = ScraperConfigLoader(browser=browser, use_spreadsheet=True)
-        print("設定ファイルローダーの初期化が完了しました")
-    except Exception as e:
-        print(f"警告: 設定ファイルローダーの初期化に失敗しました（各URLで個別に読み込みます）: {e}")
-        config_loader = None
-    
-    for idx, url in enumerate(urls, 1):
-        if pd.isna(url) or url == '':
-            continue
-        
-        print(f"[{idx}/{total}] 処理中: {url}")
-        
+    if config_loader is None:
         try:
-            scraper = get_scraper(url, browser, config_loader=config_loader)
-            result = scraper.scrape(url)
-            result['仕入れ元URL'] = url
-            results.append(result)
+            from .configurable_scraper import ScraperConfigLoader
+            print("設定ファイルローダーを初期化しています...")
+            config_loader = ScraperConfigLoader(browser=browser, use_spreadsheet=True)
+            print("設定ファイルローダーの初期化が完了しました")
         except Exception as e:
-            print(f"エラーが発生しました ({url}): {e}")
-            results.append({
-                '仕入れ元URL': url,
-                '仕入れ価格': -1,
-                '在庫ステータス': '不明',
-                '最終更新日時': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
+            print(f"警告: 設定ファイルローダーの初期化に失敗しました（各URLで個別に読み込みます）: {e}")
+            config_loader = None
+    
+    tasks = [(idx, url) for idx, url in enumerate(urls) if not (pd.isna(url) or url == '')]
+    results_by_idx = {}
+    
+    # URL列をまとめてサイトに振り分け、該当するサイト設定がないURLを開始前に表示する
+    # 以降の処理（非同期取得・スケジューラ）にはサイトごとにまとめた順でタスクを渡す
+    if config_loader is not None and tasks:
+        try:
+            from .url_router import report_routing
+            site_groups = report_routing(config_loader.router, pd.Series([url for _, url in tasks]))
+            tasks = [tasks[position] for _, positions in sorted(site_groups.items()) for position in positions]
+        except Exception as e:
+            print(f"警告: URLのサイト振り分けに失敗しました: {e}")
+    
+    # 1件の結果が確定したときの処理（ワーカースレッドから呼ばれる）
+    change_counts = Counter()
+    change_counts_lock = threading.Lock()
+    
+    def record_result(result: Dict) -> Dict:
+        if state_store is not None:
+            try:
+                change = state_store.record(result)
+                result['_change'] = change
+                with change_counts_lock:
+                    change_counts[change] += 1
+            except Exception as e:
+                print(f"警告: 状態ストアへの記録に失敗しました ({result.get('仕入れ元URL')}): {e}")
+        if on_result is not None:
+            try:
+                on_result(result)
+            except Exception as e:
+                print(f"警告: 結果の通知処理に失敗しました ({result.get('仕入れ元URL')}): {e}")
+        return result
+    
+    # HTTP取得が可能なサイトのURLは、ブラウザ処理の前に非同期でまとめて取得する
+    browser_only_urls = set()
+    from .config import SCRAPER_ASYNC_HTTP
+    if SCRAPER_ASYNC_HTTP and config_loader is not None:
+        from .async_crawler import crawl_static_urls
+        static_results, browser_only_urls = crawl_static_urls(tasks, config_loader, total=total)
+        for result in static_results.values():
+            record_result(result)
+        results_by_idx.update(static_results)
+    browser_tasks = [(idx, url) for idx, url in tasks if idx not in results_by_idx]
+    
+    # サイトごとのスクレイパーはワーカー（ブラウザ）ごとに1回だけ作成して再利用する
+    from .scraper_registry import ScraperRegistryPool
+    registries = ScraperRegistryPool(config_loader)
+    
+    # ホストごとのアクセス間隔を守りつつ、異なるドメインのURLを交互に処理する
+    from .politeness import PolitenessScheduler, build_interval_resolver
+    scheduler = PolitenessScheduler(browser_tasks, interval_resolver=build_interval_resolver(config_loader))
+    
+    if pool_size > 1 and len(browser_tasks) > 1:
+        from .browser_pool import BrowserPool
+        print(f"ブラウザプール（{pool_size}ワーカー）で並列処理します")
+        with BrowserPool(pool_size, browser_factory=browser_factory, on_browser_closed=registries.discard) as pool:
+            results_by_idx.update(pool.run(
+                browser_tasks,
+                handler=lambda worker_browser, url: record_result(_scrape_single_url(
+                    url, worker_browser, config_loader, browser_only=url in browser_only_urls,
+                    registry=registries.get(worker_browser)
+                )),
+                error_result=_create_failed_result,
+                scheduler=scheduler
+            ))
+    else:
+        try:
+            while True:
+                task = scheduler.get()
+                if task is None:
+                    break
+                idx, url = task
+                print(f"[{idx + 1}/{total}] 処理中: {url}")
+                results_by_idx[idx] = record_result(_scrape_single_url(
+                    url, browser, config_loader, browser_only=url in browser_only_urls,
+                    registry=registries.get(browser)
+                ))
+        except KeyboardInterrupt:
+            scheduler.stop()
+            raise
+    
+    # 入力順に結果を並べる
+    results = [results_by_idx[idx] for idx in sorted(results_by_idx)]
     
     # 結果をDataFrameに変換
     columns_order = ['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']
@@ -572,4 +816,7 @@ def scrape_urls(df: pd.DataFrame, browser) -> pd.DataFrame:
         result_df = result_df.reindex(columns=columns_order)
     
     print(f"スクレイピング完了: {len(result_df)}件の結果を取得しました")
+    if state_store is not None:
+        from .state_store import format_change_counts
+        print(f"前回からの変化: {format_change_counts(change_counts)}")
     return result_df
@@ -0,0 +1,134 @@
+"""
+スクレイパー登録モジュール
+サイトごとのスクレイパーをブラウザ（ワーカー）ごとに1回だけ作成し、
+URLをUrlRouterで振り分けて同じスクレイパーを再利用する
+"""
+import threading
+import logging
+from typing import Dict, List
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+
+class ScraperRegistry:
+    """
+    1つのブラウザ用のスクレイパーの登録簿
+
+    作成時にサイト設定ごとのConfigurableScraper（セレクタ・キーワードはコンパイル済み）を作成し、
+    get()ではURLをサイトに振り分けて作成済みのスクレイパーを返す。
+    スクレイパーはブラウザを共有するため、1つの登録簿は1つのワーカーだけが使用すること。
+    """
+
+    def __init__(self, browser, config_loader=None):
+        """
+        Args:
+            browser: Selenium WebDriverインスタンス（静的HTMLのみで取得する場合はNone）
+            config_loader: ScraperConfigLoaderインスタンス（省略時はハードコーディングされたスクレイパーを使用）
+        """
+        from .configurable_scraper import ConfigurableScraper
+
+        self.browser = browser
+        self.config_loader = config_loader
+        self.router = None
+        self._site_scrapers: List = []
+        self._default_scraper = None
+        self._legacy_scrapers: Dict[type, object] = {}
+
+        if config_loader is None:
+            return
+        self.router = config_loader.router
+        for site_config in self.router.sites:
+            try:
+                self._site_scrapers.append(ConfigurableScraper(browser, site_config))
+            except Exception as e:
+                logger.warning(f"スクレイパーを作成できませんでした（{site_config.get('name', 'Unknown')}）: {e}")
+                self._site_scrapers.append(None)
+        default_config = config_loader.get_default_config()
+        if default_config:
+            try:
+                self._default_scraper = ConfigurableScraper(browser, default_config)
+            except Exception as e:
+                logger.warning(f"デフォルト設定のスクレイパーを作成できませんでした: {e}")
+
+    def get(self, url: str):
+        """
+        URLに対応するスクレイパーを返す
+
+        優先順位はget_scraperと同じ（該当するサイト設定、デフォルト設定、ハードコーディングされたスクレイパーの順）。
+
+        Args:
+            url: スクレイピング対象のURL
+
+        Returns:
+            BaseScraper: 作成済みのスクレイパー
+        """
+        from .scraper import AmazonScraper, legacy_scraper_class
+        if self.router is not None:
+            from .url_router import UNMATCHED
+            site_index = self.router.route(url)
+            if site_index == UNMATCHED:
+                # create_configurable_scraperと同じく、デフォルト設定もない場合はAmazonスクレイパーを使用する
+                return self._default_scraper or self._get_legacy_scraper(AmazonScraper)
+            if self._site_scrapers[site_index] is not None:
+                return self._site_scrapers[site_index]
+        return self._get_legacy_scraper(legacy_scraper_class(url))
+
+    def _get_legacy_scraper(self, scraper_class: type):
+        scraper = self._legacy_scrapers.get(scraper_class)
+        if scraper is None:
+            scraper = scraper_class(self.browser)
+            self._legacy_scrapers[scraper_class] = scraper
+        return scraper
+
+
+class ScraperRegistryPool:
+    """
+    ブラウザごとのScraperRegistryを保持する（ブラウザプールのワーカーから呼び出し可能）
+
+    ワーカーのブラウザが作り直された場合は、新しいブラウザ用の登録簿を作成する。
+    終了したブラウザの登録簿はdiscardで破棄する（ブラウザプールの終了通知から呼び出す）。
+    """
+
+    def __init__(self, config_loader=None):
+        """
+        Args:
+            config_loader: ScraperConfigLoaderインスタンス（省略可）
+        """
+        self.config_loader = config_loader
+        self._registries: Dict[int, ScraperRegistry] = {}
+        self._lock = threading.Lock()
+
+    def get(self, browser) -> ScraperRegistry:
+        """
+        ブラウザ用の登録簿を返す（初回の呼び出し時に作成する）
+
+        Args:
+            browser: Selenium WebDriverインスタンス
+
+        Returns:
+            ScraperRegistry: 登録簿
+        """
+        key = id(browser)
+        with self._lock:
+            registry = self._registries.get(key)
+            if registry is None or registry.browser is not browser:
+                registry = ScraperRegistry(browser, self.config_loader)
+                self._registries[key] = registry
+            return registry
+
+    def discard(self, browser):
+        """
+        ブラウザ用の登録簿を破棄する（ブラウザを終了したときに呼び出す）
+
+        Args:
+            browser: Selenium WebDriverインスタンス
+        """
+        with self._lock:
+            registry = self._registries.get(id(browser))
+            if registry is not None and registry.browser is browser:
+                del self._registries[id(browser)]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._registries)
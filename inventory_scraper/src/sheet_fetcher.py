@@ -0,0 +1,241 @@
+"""
+スプレッドシート直接取得モジュール
+ブラウザのCookie（ログイン状態）をrequestsのセッションに引き継ぎ、
+スプレッドシートのCSVエクスポートをファイルに保存せずメモリ上で読み込む
+"""
+import html
+import io
+import re
+import time
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+import requests
+from .config import SPREADSHEET_ID, SHEET_FETCH_TIMEOUT
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+
+class SheetFetchError(Exception):
+    """CSVエクスポートを直接取得できなかった場合のエラー（ブラウザでのダウンロードに切り替える）"""
+
+
+def build_export_url(gid: str, spreadsheet_id: str = SPREADSHEET_ID) -> str:
+    """
+    シートのCSVエクスポートURLを作成する
+
+    Args:
+        gid: シートのGID
+        spreadsheet_id: スプレッドシートID
+
+    Returns:
+        str: エクスポートURL
+    """
+    return f"https://docs.google.com/spreadsheets/d/{spreadsheet_id}/export?format=csv&gid={gid}"
+
+
+def parse_sheet_list(page: str) -> List[Tuple[str, str]]:
+    """
+    スプレッドシートのhtmlviewページからシートのGIDと名前を取得する
+
+    シート切り替えボタン（id="sheet-button-<GID>"）から名前付きで取得し、
+    見つからない場合はページ内の「gid=<数字>」をGIDの候補とする（名前は空文字）。
+
+    Args:
+        page: htmlviewページのHTML
+
+    Returns:
+        List[Tuple[str, str]]: (GID, シート名) のリスト（ページ内の出現順）
+    """
+    sheets: List[Tuple[str, str]] = []
+    seen = set()
+    for match in re.finditer(r'id="sheet-button-(\d+)"[^>]*>(.*?)</li>', page, re.DOTALL):
+        gid = match.group(1)
+        if gid in seen:
+            continue
+        seen.add(gid)
+        name = html.unescape(re.sub(r'<[^>]+>', '', match.group(2))).strip()
+        sheets.append((gid, name))
+    if not sheets:
+        for gid in re.findall(r'[?&#]gid=(\d+)', page):
+            if gid not in seen:
+                seen.add(gid)
+                sheets.append((gid, ''))
+    return sheets
+
+
+def collect_browser_cookies(browser) -> List[Dict]:
+    """
+    ブラウザのCookieを取得する
+
+    CDPのNetwork.getAllCookiesはドメインに関係なくすべてのCookie（HttpOnlyを含む）を返すため、
+    エクスポートURLのリダイレクト先（googleusercontent.com）のCookieも引き継げる。
+    CDPが使用できない場合は、現在のページのドメインのCookieだけを取得する。
+
+    Args:
+        browser: Selenium WebDriverインスタンス
+
+    Returns:
+        List[Dict]: Cookieのリスト（name, value, domain, path, secureを含む辞書）
+    """
+    try:
+        return browser.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+    except Exception as e:
+        logger.debug(f"CDPでCookieを取得できませんでした（現在のページのCookieを使用します）: {e}")
+    try:
+        return browser.get_cookies()
+    except Exception as e:
+        logger.debug(f"ブラウザのCookieを取得できませんでした: {e}")
+        return []
+
+
+class SheetFetcher:
+    """
+    ブラウザのログイン状態を引き継いだrequestsセッションでシートのCSVを取得する
+
+    セッションは最初の取得時に作成し、以降は同じ接続を再利用する（複数スレッドから呼び出し可能）。
+    """
+
+    def __init__(self, browser, spreadsheet_id: str = SPREADSHEET_ID, timeout: float = SHEET_FETCH_TIMEOUT):
+        """
+        Args:
+            browser: Selenium WebDriverインスタンス（Cookie・User-Agentの取得元）
+            spreadsheet_id: スプレッドシートID
+            timeout: 1リクエストのタイムアウト（秒）
+        """
+        self.browser = browser
+        self.spreadsheet_id = spreadsheet_id
+        self.timeout = timeout
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    def _get_session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._create_session()
+            return self._session
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        cookies = collect_browser_cookies(self.browser)
+        for cookie in cookies:
+            session.cookies.set(
+                cookie['name'],
+                cookie['value'],
+                domain=cookie.get('domain', ''),
+                path=cookie.get('path', '/'),
+                secure=cookie.get('secure', False)
+            )
+        try:
+            user_agent = self.browser.execute_script('return navigator.userAgent')
+            if user_agent:
+                session.headers['User-Agent'] = user_agent
+        except Exception:
+            pass
+        logger.debug(f"ブラウザのCookieを{len(cookies)}件引き継ぎました")
+        return session
+
+    def fetch_csv(self, gid: str) -> pd.DataFrame:
+        """
+        シートをCSVとして取得し、DataFrameとして読み込む
+
+        Args:
+            gid: シートのGID
+
+        Returns:
+            pd.DataFrame: シートのデータ
+
+        Raises:
+            SheetFetchError: 取得できなかった場合（ログインページ・エラーページが返された場合を含む）
+        """
+        export_url = build_export_url(gid, self.spreadsheet_id)
+        started = time.monotonic()
+        try:
+            response = self._get_session().get(export_url, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            raise SheetFetchError(f"GID {gid} のCSVを取得できませんでした: {e}") from e
+
+        if response.status_code != 200:
+            raise SheetFetchError(f"GID {gid} のCSVを取得できませんでした（HTTPステータス: {response.status_code}）")
+        content_type = response.headers.get('Content-Type', '').lower()
+        if 'text/html' in content_type:
+            # 未ログイン・権限なし・存在しないGIDの場合はHTMLのページが返される
+            raise SheetFetchError(f"GID {gid} のCSVを取得できませんでした（HTMLページが返されました）")
+
+        try:
+            df = pd.read_csv(io.BytesIO(response.content), encoding='utf-8-sig')
+        except Exception as e:
+            raise SheetFetchError(f"GID {gid} のCSVを読み込めませんでした: {e}") from e
+
+        logger.info(
+            f"GID {gid} のCSVを直接取得しました（{len(response.content)}バイト、{time.monotonic() - started:.1f}秒）"
+        )
+        return df
+
+    def list_sheets(self) -> List[Tuple[str, str]]:
+        """
+        スプレッドシートのシートの一覧を取得する（htmlviewページを1回取得）
+
+        Returns:
+            List[Tuple[str, str]]: (GID, シート名) のリスト
+
+        Raises:
+            SheetFetchError: 取得できなかった場合
+        """
+        url = f"https://docs.google.com/spreadsheets/d/{self.spreadsheet_id}/htmlview"
+        try:
+            response = self._get_session().get(url, timeout=self.timeout, allow_redirects=True)
+        except requests.exceptions.RequestException as e:
+            raise SheetFetchError(f"シートの一覧を取得できませんでした: {e}") from e
+        if response.status_code != 200:
+            raise SheetFetchError(f"シートの一覧を取得できませんでした（HTTPステータス: {response.status_code}）")
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            # charsetの指定がない場合、requestsはISO-8859-1として扱うためシート名が文字化けする
+            response.encoding = 'utf-8'
+        return parse_sheet_list(response.text)
+
+    def close(self):
+        """セッションを閉じる"""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+def fetch_sheets_concurrently(fetcher: SheetFetcher, gids: Dict[str, str]) -> Dict[str, Optional[pd.DataFrame]]:
+    """
+    複数のシートを並行して取得する
+
+    起動時に「在庫管理」シートと仕入れ元マスターシートを同時に取得し、両方がそろった時点でスクレイピングを開始できるようにする。
+    取得できなかったシートはNoneとし、呼び出し側でブラウザによるダウンロードに切り替える。
+
+    Args:
+        fetcher: SheetFetcherインスタンス
+        gids: 名前をキーとしたシートのGID
+
+    Returns:
+        Dict[str, Optional[pd.DataFrame]]: 名前をキーとしたシートのデータ（取得できなかった場合はNone）
+    """
+    if not gids:
+        return {}
+    started = time.monotonic()
+    # セッション（Cookieの引き継ぎ）はブラウザを操作するため、並行処理の前に作成しておく
+    fetcher._get_session()
+
+    def fetch(gid: str) -> Optional[pd.DataFrame]:
+        try:
+            return fetcher.fetch_csv(gid)
+        except SheetFetchError as e:
+            logger.warning(f"{e}（ブラウザでダウンロードします）")
+            return None
+
+    with ThreadPoolExecutor(max_workers=len(gids), thread_name_prefix='sheet-fetch') as executor:
+        futures = {name: executor.submit(fetch, gid) for name, gid in gids.items()}
+        sheets = {name: future.result() for name, future in futures.items()}
+
+    fetched = [name for name, df in sheets.items() if df is not None]
+    logger.info(f"シートを並行して取得しました: {', '.join(fetched) or 'なし'}（{time.monotonic() - started:.1f}秒）")
+    return sheets
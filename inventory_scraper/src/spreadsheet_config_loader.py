@@ -3,38 +3,64 @@
 仕入れ元マスターシートから設定を読み込んでJSON形式に変換
 """
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Optional
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from .config import SPREADSHEET_ID, DATA_DIR, SUPPLIER_SHEET_GID
+from .config import SPREADSHEET_ID, DATA_DIR, SUPPLIER_SHEET_GID, SHEET_GID
+from .gid_cache import load_cached_gid, save_cached_gid, clear_cached_gid
+
+# 仕入れ元マスターシートであることを判定するためのヘッダー
+SUPPLIER_MASTER_HEADERS = ['サイト名', 'URLパターン（カンマ区切り）', '価格セレクタ（カンマ区切り）']
+
+# 仕入れ元マスターシートの自動検出で同時に試行するシート数
+DISCOVERY_CONCURRENCY = 6
+
+# シートの一覧を取得できない場合に試行するGID（以前の検出範囲）
+LEGACY_CANDIDATE_GIDS = [str(i) for i in range(21)]
+
+
+def is_supplier_master(df: Optional[pd.DataFrame]) -> bool:
+    """DataFrameが仕入れ元マスターシートのデータかどうか（期待されるヘッダーをすべて含むか）"""
+    return df is not None and all(header in df.columns for header in SUPPLIER_MASTER_HEADERS)
 
 
 class SpreadsheetConfigLoader:
     """スプレッドシートからスクレイパー設定を読み込むクラス"""
     
-    def __init__(self, browser=None):
+    def __init__(self, browser=None, fetcher=None):
         """
         Args:
             browser: Selenium WebDriverインスタンス（CSVダウンロード用）
+            fetcher: SheetFetcherインスタンス（指定した場合はブラウザを使わずにCSVを直接取得する）
         """
         self.browser = browser
+        self.fetcher = fetcher
         self.supplier_sheet_gid = None  # 仕入れ元マスターシートのGID（後で検出）
     
-    def load_config_from_spreadsheet(self) -> Dict:
+    def load_config_from_spreadsheet(self, supplier_df: Optional[pd.DataFrame] = None) -> Dict:
         """
         スプレッドシートの仕入れ元マスターシートから設定を読み込む
         
+        Args:
+            supplier_df: 起動時に取得済みの仕入れ元マスターシートのデータ（省略時はダウンロードする）
+        
         Returns:
             Dict: JSON設定形式の辞書
         """
-        if not self.browser:
-            raise Exception("ブラウザインスタンスが必要です")
-        
-        # 仕入れ元マスターシートをCSVとしてダウンロード
-        df = self._download_supplier_master_csv()
+        if is_supplier_master(supplier_df):
+            df = supplier_df
+        else:
+            if supplier_df is not None:
+                print("取得済みのシートは仕入れ元マスターシートではないため、改めてダウンロードします")
+            if not self.browser:
+                raise Exception("ブラウザインスタンスが必要です")
+            
+            # 仕入れ元マスターシートをCSVとしてダウンロード
+            df = self._download_supplier_master_csv()
         
         # DataFrameをJSON設定形式に変換
         config = self._convert_dataframe_to_config(df)
@@ -49,15 +75,110 @@ class SpreadsheetConfigLoader:
             pd.DataFrame: 仕入れ元マスターシートのデータ
         """
         # 仕入れ元マスターシートのGIDを取得
-        # .envで指定されている場合はそれを使用、なければ自動検出
+        # .envで指定されている場合はそれを使用、なければキャッシュ、自動検出の順に試す
         if SUPPLIER_SHEET_GID and SUPPLIER_SHEET_GID.strip():
             # .envでGIDが指定されている場合は直接使用
             print(f"仕入れ元マスターシートのGIDを.envから取得: {SUPPLIER_SHEET_GID}")
+            df = self._fetch_supplier_master_direct(SUPPLIER_SHEET_GID)
+            if df is not None:
+                return df
             return self._download_csv_by_gid(SUPPLIER_SHEET_GID)
+        
+        # 前回検出したGIDを試す（ヘッダーを確認し、一致しなければ再検出）
+        cached_gid = load_cached_gid(SPREADSHEET_ID)
+        if cached_gid is not None:
+            print(f"仕入れ元マスターシートのGIDをキャッシュから取得: {cached_gid}")
+            df = self._fetch_supplier_master_direct(cached_gid)
+            if df is None:
+                try:
+                    df = self._download_csv_by_gid(cached_gid)
+                except Exception as e:
+                    print(f"キャッシュのGIDのシートを読み込めませんでした: {e}")
+            if df is not None:
+                return df
+            clear_cached_gid(SPREADSHEET_ID)
+        
+        # GIDが指定されていない場合は自動検出（複数のシートを試行）
+        print("仕入れ元マスターシートを検索中（GIDが.envで指定されていないため自動検出）...")
+        df = self._discover_supplier_master_sheet() if self.fetcher is not None else None
+        if df is None:
+            df = self._search_supplier_master_sheet()
+        save_cached_gid(SPREADSHEET_ID, self.supplier_sheet_gid)
+        print(f"検出したGIDを保存しました（次回から自動検出を省略します）: {self.supplier_sheet_gid}")
+        return df
+    
+    def _fetch_supplier_master_direct(self, gid: str) -> Optional[pd.DataFrame]:
+        """
+        SheetFetcherで指定されたGIDのシートを直接取得し、仕入れ元マスターシートであれば返す
+        
+        Args:
+            gid: シートのGID
+            
+        Returns:
+            Optional[pd.DataFrame]: 仕入れ元マスターシートのデータ（取得できない・一致しない場合はNone）
+        """
+        if self.fetcher is None:
+            return None
+        from .sheet_fetcher import SheetFetchError
+        try:
+            df = self.fetcher.fetch_csv(gid)
+        except SheetFetchError as e:
+            print(f"仕入れ元マスターシートを直接取得できませんでした: {e}")
+            return None
+        if not is_supplier_master(df):
+            print(f"GID {gid} のシートは仕入れ元マスターシートではありません")
+            return None
+        print(f"✓ 仕入れ元マスターシートを読み込みました（GID: {gid}）")
+        self.supplier_sheet_gid = gid
+        return df
+    
+    def _discover_supplier_master_sheet(self) -> Optional[pd.DataFrame]:
+        """
+        シートの一覧を1回取得し、候補のシートを並行して取得して仕入れ元マスターシートを検出する
+        
+        名前に「仕入れ元」を含むシートを優先し、一覧を取得できない場合は以前の検出範囲（GID 0-20）を試す。
+        
+        Returns:
+            Optional[pd.DataFrame]: 仕入れ元マスターシートのデータ（見つからない場合はNone）
+        """
+        from .sheet_fetcher import SheetFetchError
+        try:
+            sheets = self.fetcher.list_sheets()
+        except SheetFetchError as e:
+            print(f"  シートの一覧を取得できませんでした: {e}")
+            sheets = []
+        
+        if sheets:
+            print(f"  シートの一覧を取得しました: {len(sheets)}シート")
+            # 名前が一致するシートを先に試し、「在庫管理」シートは最後に回す
+            sheets.sort(key=lambda sheet: ('仕入れ元' not in sheet[1], sheet[0] == SHEET_GID))
+            candidate_gids = [gid for gid, _ in sheets]
         else:
-            # GIDが指定されていない場合は自動検出（複数のシートを試行）
-            print("仕入れ元マスターシートを検索中（GIDが.envで指定されていないため自動検出）...")
-            return self._search_supplier_master_sheet()
+            candidate_gids = [gid for gid in LEGACY_CANDIDATE_GIDS if gid != SHEET_GID]
+        
+        def probe(gid: str) -> Optional[pd.DataFrame]:
+            try:
+                df = self.fetcher.fetch_csv(gid)
+            except SheetFetchError:
+                return None
+            return df if is_supplier_master(df) else None
+        
+        with ThreadPoolExecutor(max_workers=DISCOVERY_CONCURRENCY, thread_name_prefix='gid-probe') as executor:
+            futures = {executor.submit(probe, gid): gid for gid in candidate_gids}
+            for future in as_completed(futures):
+                df = future.result()
+                if df is None:
+                    continue
+                gid = futures[future]
+                # 見つかった時点で未実行の試行は取り消す
+                for other in futures:
+                    other.cancel()
+                print(f"  ✓ 仕入れ元マスターシートを発見（GID: {gid}）")
+                self.supplier_sheet_gid = gid
+                return df
+        
+        print(f"  × {len(candidate_gids)}シートを試行しましたが、仕入れ元マスターシートが見つかりませんでした")
+        return None
     
     def _download_csv_by_gid(self, gid: str) -> pd.DataFrame:
         """
@@ -137,8 +258,7 @@ class SpreadsheetConfigLoader:
                 df = pd.read_csv(latest_file, encoding='utf-8-sig')
                 
                 # ヘッダーを確認して仕入れ元マスターシートかどうかを判定
-                expected_headers = ['サイト名', 'URLパターン（カンマ区切り）', '価格セレクタ（カンマ区切り）']
-                if all(header in df.columns for header in expected_headers):
+                if is_supplier_master(df):
                     print(f"✓ 仕入れ元マスターシートを読み込みました（GID: {gid}）")
                     self.supplier_sheet_gid = gid
                     
@@ -345,6 +465,43 @@ class SpreadsheetConfigLoader:
             if price_exclude_selectors:
                 site_config['price_exclude_selectors'] = price_exclude_selectors
             
+            # アクセス間隔（同一ホストへの最小アクセス間隔、秒）がある場合は追加
+            access_interval = self._parse_number(row.get('アクセス間隔(秒)', ''))
+            if access_interval is not None:
+                site_config['access_interval'] = access_interval
+            
+            # ページ準備完了の待機条件がある場合は追加（列がない場合は既定の条件を使用）
+            ready_conditions_str = str(row.get('待機条件（カンマ区切り）', '')).strip()
+            ready_conditions = [c.strip() for c in ready_conditions_str.split(',') if c.strip()] if ready_conditions_str != 'nan' else []
+            if ready_conditions:
+                site_config['ready_conditions'] = ready_conditions
+            
+            # 更新間隔（前回の取得からこの時間が経過したURLだけを取得、分）がある場合は追加
+            refresh_ttl_minutes = self._parse_number(row.get('更新間隔(分)', ''))
+            if refresh_ttl_minutes is not None:
+                site_config['refresh_ttl_minutes'] = refresh_ttl_minutes
+            
+            # 取得方式（browser / http / http-then-browser）がある場合は追加（列がない場合は.envの既定値を使用）
+            fetch_mode = str(row.get('取得方式', '')).strip().lower()
+            if fetch_mode and fetch_mode != 'nan':
+                site_config['fetch_mode'] = fetch_mode
+            
+            # 読み込み時に遮断するリソース（種類・URLパターンのカンマ区切り）がある場合は追加（列がない場合は.envの既定値を使用）
+            resource_blocking = str(row.get('リソースブロック', '')).strip()
+            if resource_blocking and resource_blocking != 'nan':
+                site_config['resource_blocking'] = resource_blocking
+            
+            # ページの読み込み戦略（normal / eager / none）・読み込み期限・早期停止がある場合は追加（列がない場合は.envの既定値を使用）
+            page_load_strategy = str(row.get('読み込み戦略', '')).strip().lower()
+            if page_load_strategy and page_load_strategy != 'nan':
+                site_config['page_load_strategy'] = page_load_strategy
+            page_load_timeout = self._parse_number(row.get('読み込み期限(秒)', ''))
+            if page_load_timeout is not None:
+                site_config['page_load_timeout'] = page_load_timeout
+            early_stop = str(row.get('早期停止', '')).strip()
+            if early_stop and early_stop != 'nan':
+                site_config['early_stop'] = early_stop in ('有効', 'true', 'TRUE', 'True', '1')
+            
             sites.append(site_config)
         
         # デフォルト設定（空の設定）
@@ -376,6 +533,26 @@ class SpreadsheetConfigLoader:
             'default': default_config
         }
     
+    @staticmethod
+    def _parse_number(value) -> Optional[float]:
+        """
+        セルの値を数値に変換する
+        
+        Args:
+            value: セルの値
+            
+        Returns:
+            Optional[float]: 数値、空欄や数値でない場合はNone
+        """
+        value_str = str(value).strip()
+        if not value_str or value_str == 'nan':
+            return None
+        try:
+            number = float(value_str)
+        except ValueError:
+            return None
+        return number if number >= 0 else None
+    
     def merge_with_json_config(self, spreadsheet_config: Dict, json_config_path: Path) -> Dict:
         """
         スプレッドシート設定とJSON設定ファイルをマージする
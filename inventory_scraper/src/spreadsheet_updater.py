@@ -5,13 +5,83 @@ Google Apps ScriptのWebアプリを直接呼び出してスプレッドシー
 このモジュールは、GASのWebアプリとして公開されたエンドポイントに
 POSTリクエストでCSVデータを送信し、スプレッドシートを更新します。
 """
+import base64
+import csv
+import gzip
+import io
 import json
 import os
+import random
+import threading
+import time
+import uuid
 import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from .config import (
+    GAS_MAX_CHUNK_SIZE,
+    GAS_PAYLOAD_FORMAT,
+    GAS_UPLOAD_CONCURRENCY,
+    GAS_UPLOAD_MAX_RETRIES,
+    GAS_UPLOAD_RETRY_DELAY
+)
 
+# 「最終更新日時」のみを更新するURLを1リクエストで送信する最大件数
+TOUCHED_BATCH_SIZE = 5000
 
-def update_spreadsheet_via_gas(browser=None, csv_path: Path = None, script_url: str = None):
+# 1リクエストのタイムアウト（秒）
+REQUEST_TIMEOUT = 300
+
+# 再送の対象とするHTTPステータスコード
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 列形式（gzip+base64）で送信する場合のformatの値（GAS側のdecodeColumnarPayloadと対応）
+COLUMNAR_PAYLOAD_FORMAT = 'columnar-gzip-v1'
+
+# 列形式での在庫ステータスのコード（配列の位置がコード）。これ以外の値は送信時に末尾に追加する
+STATUS_LABELS = ['在庫あり', '売り切れ', '不明']
+
+# 「最終更新日時」の形式（列形式では最初の日時からの経過秒数で送信する）
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class RetryableUploadError(Exception):
+    """再送すれば成功する可能性のある送信エラー（429・5xx・HTMLエラーページ・接続エラー）"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _get_session() -> requests.Session:
+    """
+    GAS Webアプリへの送信に使用するセッションを取得する
+
+    チャンクの並行送信・逐次送信で接続（keep-alive）を再利用するため、プロセス内で1つのセッションを共有する。
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(4, GAS_UPLOAD_CONCURRENCY))
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def update_spreadsheet_via_gas(
+    browser=None,
+    csv_path: Path = None,
+    script_url: str = None,
+    touched: Optional[Dict[str, List[str]]] = None
+):
     """
     Google Apps ScriptのWebアプリを呼び出してスプレッドシートを更新する
     
@@ -21,6 +91,8 @@ def update_spreadsheet_via_gas(browser=None, csv_path: Path = None, script_url:
         browser: Selenium WebDriverインスタンス（後方互換性のため、使用されません）
         csv_path: 更新データが含まれるCSVファイルのパス
         script_url: Google Apps ScriptのWebアプリURL（必須）
+        touched: 価格・在庫ステータスが変化しておらず「最終更新日時」だけを更新するURL
+                 （最終更新日時をキーとしたURLのリスト、省略可）
         
     Raises:
         Exception: 更新に失敗した場合
@@ -54,16 +126,22 @@ def update_spreadsheet_via_gas(browser=None, csv_path: Path = None, script_url:
         data_row_count = len(csv_content.splitlines()) - 1
         print(f"更新対象データ: {data_row_count}件（ヘッダー除く）")
         
+        if touched:
+            _send_touched(touched, script_url)
+        
+        if data_row_count <= 0:
+            print("価格・在庫ステータスが変化した行はありません")
+            return
+        
         # POSTリクエストでCSVデータを送信
         print("GAS WebアプリにCSVデータをPOST送信しています...")
         
-        # 大きなCSVの場合のチャンキング処理
-        MAX_CHUNK_SIZE = 50000  # 約50KBを1チャンクとする（保守的に設定）
+        # 大きなCSVの場合のチャンキング処理（GAS_MAX_CHUNK_SIZEバイトごとに分割し、並行して送信）
         csv_size = len(csv_content.encode('utf-8'))
         
-        if csv_size > MAX_CHUNK_SIZE:
+        if csv_size > GAS_MAX_CHUNK_SIZE:
             print(f"大きなCSVデータを検出しました（{csv_size}バイト）。チャンキング処理を実行します...")
-            _send_csv_in_chunks(csv_content, script_url, MAX_CHUNK_SIZE)
+            _send_csv_in_chunks(csv_content, script_url, GAS_MAX_CHUNK_SIZE)
         else:
             _send_csv_post(csv_content, script_url)
         
@@ -73,135 +151,384 @@ def update_spreadsheet_via_gas(browser=None, csv_path: Path = None, script_url:
         raise Exception(error_message)
 
 
-def _send_csv_post(csv_content: str, script_url: str):
+def _send_touched(touched: Dict[str, List[str]], script_url: str):
+    """
+    「最終更新日時」だけを更新するURLを、最終更新日時ごとにまとめて送信する
+    
+    Args:
+        touched: 最終更新日時をキーとしたURLのリスト
+        script_url: GAS WebアプリURL
+        
+    Raises:
+        Exception: 送信に失敗した場合
+    """
+    total = sum(len(urls) for urls in touched.values())
+    print(f"変化のない{total}件の最終更新日時を更新します")
+    
+    batch: Dict[str, List[str]] = {}
+    batch_size = 0
+    for fetched_at, urls in touched.items():
+        for url in urls:
+            batch.setdefault(fetched_at, []).append(url)
+            batch_size += 1
+            if batch_size >= TOUCHED_BATCH_SIZE:
+                _send_csv_post('', script_url, touched=batch)
+                batch = {}
+                batch_size = 0
+    if batch:
+        _send_csv_post('', script_url, touched=batch)
+
+
+def _send_csv_post(
+    csv_content: str,
+    script_url: str,
+    touched: Optional[Dict[str, List[str]]] = None,
+    idempotency_key: Optional[str] = None,
+    max_retries: int = GAS_UPLOAD_MAX_RETRIES
+):
     """
     CSVデータをPOSTリクエストで送信する
     
+    429・5xx・HTMLエラーページ・接続エラーの場合は、待機時間を倍にしながら最大max_retries回再送する。
+    再送しても同じidempotencyKeyを送信するため、GAS側で反映済みのリクエストが二重に反映されることはない。
+    
     Args:
-        csv_content: CSVデータ（文字列）
+        csv_content: CSVデータ（文字列、touchedのみ送信する場合は空文字）
         script_url: GAS WebアプリURL
+        touched: 「最終更新日時」だけを更新するURL（最終更新日時をキーとしたURLのリスト、省略可）
+        idempotency_key: 再送時の二重反映を防ぐキー（省略時は新しく発行）
+        max_retries: 再送回数
         
     Raises:
         Exception: 送信に失敗した場合
     """
-    try:
-        # JSON形式でCSVデータを送信
+    if GAS_PAYLOAD_FORMAT == 'columnar':
+        # 列ごとの配列をgzip圧縮して送信（GAS側でCSVの解析を省略できる）
+        payload = build_columnar_payload(csv_content, touched)
+    else:
+        # JSON形式でCSVデータを送信（日本語をエスケープせずUTF-8で送信し、送信サイズをCSVのバイト数に合わせる）
         payload = {"csvData": csv_content}
-        headers = {"Content-Type": "application/json"}
+        if touched:
+            payload["touched"] = touched
+    payload["idempotencyKey"] = idempotency_key or uuid.uuid4().hex
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    
+    attempt = 0
+    while True:
+        try:
+            result = _post_payload(body, script_url)
+            break
+        except RetryableUploadError as e:
+            if attempt >= max_retries:
+                print(f"❌ {e}")
+                raise Exception(f"{max_retries}回再送しても送信できませんでした: {e}")
+            delay = GAS_UPLOAD_RETRY_DELAY * (2 ** attempt)
+            if e.retry_after is not None:
+                delay = max(delay, e.retry_after)
+            delay *= random.uniform(1.0, 1.25)  # 同時に失敗したチャンクの再送が重ならないようにずらす
+            attempt += 1
+            print(f"⚠️  送信に失敗したため{delay:.1f}秒後に再送します（{attempt}/{max_retries}回目）: {str(e).splitlines()[0]}")
+            time.sleep(delay)
+    
+    if result.get('duplicate'):
+        print("✅ 反映済みのデータのため、GAS側で更新を省略しました")
+        return
+    print(f"✅ スプレッドシートの更新が完了しました")
+    print(f"   - 更新行数: {result.get('updateCount', 0)}行")
+    print(f"   - 仕入れ価格更新: {result.get('priceUpdateCount', 0)}件")
+    print(f"   - 在庫ステータス更新: {result.get('statusUpdateCount', 0)}件")
+    print(f"   - 最終更新日時更新: {result.get('dateUpdateCount', 0)}件")
+    if result.get('unchangedCellCount', 0) > 0:
+        print(f"   - 値が同じため書き込みを省略: {result.get('unchangedCellCount', 0)}セル")
+    if result.get('notFoundCount', 0) > 0:
+        print(f"   ⚠️  マッチしなかったURL: {result.get('notFoundCount', 0)}件")
+
+
+def build_columnar_payload(
+    csv_content: str,
+    touched: Optional[Dict[str, List[str]]] = None
+) -> Dict:
+    """
+    CSVデータとtouchedを列形式に変換し、gzip圧縮・base64エンコードしたペイロードを作成する
+    
+    列形式のJSON:
+        urls: 仕入れ元URLの配列
+        prices: 仕入れ価格の配列（空欄はnull）
+        statuses: 在庫ステータスのコードの配列（statusLabelsの位置、空欄はnull）
+        statusLabels: 在庫ステータスの値（0: 在庫あり / 1: 売り切れ / 2: 不明）
+        t0: 最も古い最終更新日時（YYYY-MM-DD HH:MM:SS）
+        dt: t0からの経過秒数の配列（空欄はnull）
+        timeText: 上記の形式で解析できない最終更新日時（行番号をキーとした文字列）
+    touchedのURLは仕入れ価格・在庫ステータスをnullとした行として追加する。
+    
+    Args:
+        csv_content: CSVデータ（文字列、touchedのみ送信する場合は空文字）
+        touched: 最終更新日時をキーとしたURLのリスト（省略可）
+        
+    Returns:
+        Dict: {"format": "columnar-gzip-v1", "data": base64文字列, "rowCount": 行数}
+    """
+    records = list(csv.DictReader(io.StringIO(csv_content))) if csv_content and csv_content.strip() else []
+    for fetched_at, urls in (touched or {}).items():
+        for url in urls:
+            records.append({'仕入れ元URL': url, '仕入れ価格': '', '在庫ステータス': '', '最終更新日時': fetched_at})
+    
+    status_labels = list(STATUS_LABELS)
+    status_codes = {label: code for code, label in enumerate(status_labels)}
+    urls: List[str] = []
+    prices: List[Optional[int]] = []
+    statuses: List[Optional[int]] = []
+    timestamps: List[Optional[datetime]] = []
+    time_text: Dict[str, str] = {}
+    
+    for record in records:
+        urls.append(record.get('仕入れ元URL') or '')
+        
+        price = (record.get('仕入れ価格') or '').strip()
+        try:
+            price_value = float(price) if price else None
+        except ValueError:
+            price_value = None
+        prices.append(int(price_value) if price_value is not None and price_value.is_integer() else price_value)
         
-        response = requests.post(
+        status = (record.get('在庫ステータス') or '').strip()
+        if not status:
+            statuses.append(None)
+        else:
+            if status not in status_codes:
+                status_codes[status] = len(status_labels)
+                status_labels.append(status)
+            statuses.append(status_codes[status])
+        
+        fetched_at = (record.get('最終更新日時') or '').strip()
+        parsed = None
+        if fetched_at:
+            try:
+                parsed = datetime.strptime(fetched_at, TIMESTAMP_FORMAT)
+            except ValueError:
+                time_text[str(len(timestamps))] = fetched_at
+        timestamps.append(parsed)
+    
+    valid_timestamps = [ts for ts in timestamps if ts is not None]
+    t0 = min(valid_timestamps) if valid_timestamps else None
+    columns = {
+        'urls': urls,
+        'prices': prices,
+        'statuses': statuses,
+        'statusLabels': status_labels,
+        't0': t0.strftime(TIMESTAMP_FORMAT) if t0 else None,
+        'dt': [int((ts - t0).total_seconds()) if ts is not None else None for ts in timestamps]
+    }
+    if time_text:
+        columns['timeText'] = time_text
+    
+    raw = json.dumps(columns, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    return {
+        "format": COLUMNAR_PAYLOAD_FORMAT,
+        "data": base64.b64encode(compressed).decode('ascii'),
+        "rowCount": len(urls)
+    }
+
+
+def _post_payload(body: bytes, script_url: str) -> Dict:
+    """
+    JSONボディを1回POSTし、GASの結果を返す
+    
+    Args:
+        body: UTF-8でエンコードしたJSONボディ
+        script_url: GAS WebアプリURL
+        
+    Returns:
+        Dict: GASの結果（success=True）
+        
+    Raises:
+        RetryableUploadError: 再送すれば成功する可能性のあるエラーの場合
+        Exception: その他の送信・更新エラーの場合
+    """
+    headers = {"Content-Type": "application/json; charset=utf-8"}
+    try:
+        response = _get_session().post(
             script_url,
-            json=payload,
+            data=body,
             headers=headers,
-            timeout=300  # 5分のタイムアウト
+            timeout=REQUEST_TIMEOUT  # 5分のタイムアウト
         )
-        
-        # ステータスコードを確認
+    except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+        raise RetryableUploadError(f"HTTPリクエストエラー: {e}")
+    except requests.exceptions.RequestException as e:
+        error_msg = f"HTTPリクエストエラー: {e}"
+        print(error_msg)
+        raise Exception(error_msg)
+    
+    # ステータスコードを確認
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        raise RetryableUploadError(
+            f"HTTPリクエストエラー: {response.status_code} {response.reason}",
+            retry_after=_parse_retry_after(response.headers.get('Retry-After'))
+        )
+    try:
         response.raise_for_status()
-        
-        # HTMLエラーページが返された場合のチェック
-        response_text = response.text.strip()
-        if response_text.startswith('<!DOCTYPE html>') or response_text.startswith('<html>'):
-            # HTMLエラーページが返された場合
-            error_message = (
-                "GAS WebアプリがHTMLエラーページを返しました。\n"
-                "以下の可能性があります：\n"
-                "1. doPost関数がデプロイされていない（新しいバージョンとしてデプロイが必要）\n"
-                "2. POSTリクエストがサポートされていない\n"
-                "3. 認証の問題\n"
-                "\n"
-                "対応方法：\n"
-                "1. GASエディタで「デプロイ」→「デプロイを管理」を開く\n"
-                "2. 既存のデプロイを選択して「新しいバージョンを保存」をクリック\n"
-                "3. デプロイ後に再度実行してください\n"
-                f"\nレスポンス（最初の500文字）:\n{response_text[:500]}"
-            )
-            print(f"❌ {error_message}")
-            raise Exception(error_message)
-        
-        # JSONレスポンスをパース
-        try:
-            result = response.json()
-            
-            if result.get('success'):
-                print(f"✅ スプレッドシートの更新が完了しました")
-                print(f"   - 更新行数: {result.get('updateCount', 0)}行")
-                print(f"   - 仕入れ価格更新: {result.get('priceUpdateCount', 0)}件")
-                print(f"   - 在庫ステータス更新: {result.get('statusUpdateCount', 0)}件")
-                print(f"   - 最終更新日時更新: {result.get('dateUpdateCount', 0)}件")
-                if result.get('notFoundCount', 0) > 0:
-                    print(f"   ⚠️  マッチしなかったURL: {result.get('notFoundCount', 0)}件")
-            else:
-                error_msg = result.get('error', '不明なエラー')
-                print(f"❌ スプレッドシートの更新に失敗しました: {error_msg}")
-                raise Exception(f"更新失敗: {error_msg}")
-                
-        except json.JSONDecodeError as e:
-            error_message = (
-                f"JSON解析に失敗しました: {e}\n"
-                f"レスポンス内容（最初の1000文字）:\n{response_text[:1000]}"
-            )
-            print(f"警告: {error_message}")
-            raise Exception(f"レスポンスの解析に失敗しました: {e}")
-            
     except requests.exceptions.RequestException as e:
         error_msg = f"HTTPリクエストエラー: {e}"
         print(error_msg)
         raise Exception(error_msg)
+    
+    # HTMLエラーページが返された場合のチェック
+    # （GASの一時的な障害・実行時間超過でも返されるため再送の対象とする）
+    response_text = response.text.strip()
+    if response_text.startswith('<!DOCTYPE html>') or response_text.startswith('<html>'):
+        error_message = (
+            "GAS WebアプリがHTMLエラーページを返しました。\n"
+            "以下の可能性があります：\n"
+            "1. doPost関数がデプロイされていない（新しいバージョンとしてデプロイが必要）\n"
+            "2. POSTリクエストがサポートされていない\n"
+            "3. 認証の問題\n"
+            "\n"
+            "対応方法：\n"
+            "1. GASエディタで「デプロイ」→「デプロイを管理」を開く\n"
+            "2. 既存のデプロイを選択して「新しいバージョンを保存」をクリック\n"
+            "3. デプロイ後に再度実行してください\n"
+            f"\nレスポンス（最初の500文字）:\n{response_text[:500]}"
+        )
+        raise RetryableUploadError(error_message)
+    
+    # JSONレスポンスをパース
+    try:
+        result = response.json()
+    except json.JSONDecodeError as e:
+        error_message = (
+            f"JSON解析に失敗しました: {e}\n"
+            f"レスポンス内容（最初の1000文字）:\n{response_text[:1000]}"
+        )
+        print(f"警告: {error_message}")
+        raise Exception(f"レスポンスの解析に失敗しました: {e}")
+    
+    if not result.get('success'):
+        error_msg = result.get('error', '不明なエラー')
+        if result.get('retryable'):
+            raise RetryableUploadError(f"更新失敗: {error_msg}")
+        print(f"❌ スプレッドシートの更新に失敗しました: {error_msg}")
+        raise Exception(f"更新失敗: {error_msg}")
+    return result
+
 
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-Afterヘッダー（秒数）を解析する"""
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
 
-def _send_csv_in_chunks(csv_content: str, script_url: str, max_chunk_size: int):
+
+def _split_csv_chunks(csv_content: str, max_chunk_size: int) -> List[str]:
     """
-    大きなCSVデータをチャンクに分割して送信する
+    CSVデータを、送信時のサイズがmax_chunk_sizeバイト以下のチャンクに分割する
+    
+    各チャンクにはヘッダー行を付ける。行はCSVのレコード単位で分割するため、
+    改行を含むセルが途中で分割されることはない。1行でmax_chunk_sizeを超える場合はその行だけのチャンクにする。
+    
+    Args:
+        csv_content: CSVデータ（文字列）
+        max_chunk_size: 1チャンクの最大サイズ（バイト、JSONに埋め込んだ状態で計算）
+        
+    Returns:
+        List[str]: チャンクごとのCSVデータ
+    """
+    rows = list(csv.reader(io.StringIO(csv_content)))
+    if not rows:
+        return []
+    
+    def format_row(row: List[str]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerow(row)
+        return buffer.getvalue()
+    
+    def payload_size(text: str) -> int:
+        # JSON文字列としてエスケープした後のUTF-8のバイト数（前後の引用符を除く）
+        return len(json.dumps(text, ensure_ascii=False).encode('utf-8')) - 2
+    
+    header_line = format_row(rows[0])
+    header_size = payload_size(header_line)
+    chunks: List[str] = []
+    chunk_lines: List[str] = []
+    chunk_size = header_size
+    for row in rows[1:]:
+        line = format_row(row)
+        line_size = payload_size(line)
+        if chunk_lines and chunk_size + line_size > max_chunk_size:
+            chunks.append((header_line + ''.join(chunk_lines))[:-1])
+            chunk_lines = []
+            chunk_size = header_size
+        chunk_lines.append(line)
+        chunk_size += line_size
+    if chunk_lines:
+        chunks.append((header_line + ''.join(chunk_lines))[:-1])
+    return chunks
+
+
+def _send_csv_in_chunks(
+    csv_content: str,
+    script_url: str,
+    max_chunk_size: int,
+    concurrency: int = GAS_UPLOAD_CONCURRENCY
+):
+    """
+    大きなCSVデータをチャンクに分割し、並行して送信する
+    
+    各チャンクには「実行ごとのID-チャンク番号」のidempotencyKeyを付け、再送しても二重に反映されないようにする。
+    GAS側ではシートの更新をロックで直列化するため、並行送信で短縮されるのは通信・CSV解析の待ち時間である。
     
     Args:
         csv_content: CSVデータ（文字列）
         script_url: GAS WebアプリURL
         max_chunk_size: 1チャンクの最大サイズ（バイト）
+        concurrency: 同時に送信するチャンク数
         
     Raises:
         Exception: 送信に失敗した場合
     """
-    lines = csv_content.splitlines()
-    if len(lines) < 2:
-        # ヘッダーのみまたは空の場合は通常送信
-        _send_csv_post(csv_content, script_url)
+    chunks = _split_csv_chunks(csv_content, max_chunk_size)
+    if len(chunks) <= 1:
+        # ヘッダーのみ、または1チャンクに収まる場合は通常送信
+        _send_csv_post(chunks[0] if chunks else csv_content, script_url)
         return
     
-    header = lines[0]
-    data_lines = lines[1:]
-    
-    # チャンクサイズを計算（ヘッダーを含めた行数ベースで分割）
-    total_size = len(csv_content.encode('utf-8'))
-    estimated_chunk_count = max(1, (total_size + max_chunk_size - 1) // max_chunk_size)
-    lines_per_chunk = max(1, len(data_lines) // estimated_chunk_count)
+    chunk_count = len(chunks)
+    upload_id = uuid.uuid4().hex
+    workers = min(max(1, concurrency), chunk_count)
+    print(f"CSVデータを{chunk_count}チャンクに分割して送信します（同時送信数: {workers}）")
     
-    print(f"CSVデータを{estimated_chunk_count}チャンクに分割して送信します（1チャンクあたり約{lines_per_chunk}行）")
+    def send_chunk(chunk_number: int, chunk_content: str):
+        print(f"チャンク {chunk_number}/{chunk_count} を送信中...")
+        _send_csv_post(chunk_content, script_url, idempotency_key=f"{upload_id}-{chunk_number}")
     
     # 失敗したチャンクを記録するリスト
     failed_chunks = []
+    started = time.monotonic()
     
-    # チャンクごとに送信
-    for i in range(0, len(data_lines), lines_per_chunk):
-        chunk_lines = data_lines[i:i + lines_per_chunk]
-        chunk_content = '\n'.join([header] + chunk_lines)
-        chunk_number = (i // lines_per_chunk) + 1
-        
-        print(f"チャンク {chunk_number}/{estimated_chunk_count} を送信中...")
-        try:
-            _send_csv_post(chunk_content, script_url)
-        except Exception as e:
-            error_info = {
-                'chunk_number': chunk_number,
-                'error': str(e),
-                'chunk_content_preview': chunk_content[:200] if chunk_content else ''  # 最初の200文字を記録
-            }
-            failed_chunks.append(error_info)
-            print(f"⚠️  チャンク {chunk_number} の送信でエラーが発生しました: {e}")
-            # エラーを記録し、次のチャンクを続行
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='gas-upload') as executor:
+        futures = {
+            executor.submit(send_chunk, chunk_number, chunk_content): (chunk_number, chunk_content)
+            for chunk_number, chunk_content in enumerate(chunks, start=1)
+        }
+        for future in as_completed(futures):
+            chunk_number, chunk_content = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                error_info = {
+                    'chunk_number': chunk_number,
+                    'error': str(e),
+                    'chunk_content_preview': chunk_content[:200] if chunk_content else ''  # 最初の200文字を記録
+                }
+                failed_chunks.append(error_info)
+                print(f"⚠️  チャンク {chunk_number} の送信でエラーが発生しました: {e}")
+                # エラーを記録し、次のチャンクを続行
     
     # 失敗したチャンクがある場合は例外を発生させる
     if failed_chunks:
+        failed_chunks.sort(key=lambda info: info['chunk_number'])
         failed_chunk_numbers = [info['chunk_number'] for info in failed_chunks]
         error_messages = [f"チャンク {info['chunk_number']}: {info['error']}" for info in failed_chunks]
         error_message = (
@@ -212,5 +539,4 @@ def _send_csv_in_chunks(csv_content: str, script_url: str, max_chunk_size: int):
         print(f"❌ {error_message}")
         raise Exception(error_message)
     
-    print("すべてのチャンクの送信が完了しました")
-
+    print(f"すべてのチャンクの送信が完了しました（{time.monotonic() - started:.1f}秒）")
@@ -0,0 +1,353 @@
+"""
+スクレイピング状態ストアモジュール
+URLごとの最新の価格・在庫ステータス・取得日時・取得時間・抽出方式・HTTP結果・内容ハッシュと、
+スプレッドシートへの反映日時をSQLiteに保存し、更新間隔の判定・変更検出・集計に使用する
+"""
+import sqlite3
+import threading
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+from .config import SCRAPER_STATE_DB
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# IN句で一度に問い合わせるURL数（SQLiteのパラメータ数上限より小さくする）
+LOOKUP_CHUNK_SIZE = 500
+
+# 変更検出の結果
+CHANGE_NEW = 'new'              # 初回取得
+CHANGE_CHANGED = 'changed'      # 価格または在庫ステータスが変化
+CHANGE_UNCHANGED = 'unchanged'  # 変化なし
+CHANGE_FAILED = 'failed'        # 取得失敗（前回の値は保持）
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS url_state (
+    url_key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    price INTEGER,
+    stock_status TEXT,
+    fetched_at TEXT,
+    changed_at TEXT,
+    last_attempt_at TEXT,
+    latency_ms INTEGER,
+    extractor TEXT,
+    http_status INTEGER,
+    outcome TEXT,
+    content_hash TEXT,
+    fail_count INTEGER NOT NULL DEFAULT 0,
+    delivered_at TEXT,
+    delivered_status TEXT
+) WITHOUT ROWID;
+"""
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def normalize_url(url: str) -> str:
+    """
+    URLを正規化する（状態ストア・チェックポイント・変更検出で使用するローカルの照合キー）
+
+    前後の空白と末尾のスラッシュを除去し、URLデコードしたうえでクエリパラメータをソートする。
+    手順はGASのWebScrapingDirectUpdate.gsのnormalizeUrlに倣っているが、GAS側はnew URL()と
+    URLSearchParamsで再エンコードするため、結果の文字列は一致しない場合がある。
+    GAS側のキーとの照合には使用せず、Python側で正規化したURL同士の比較にだけ使用すること。
+
+    Args:
+        url: 対象URL
+
+    Returns:
+        str: 正規化したURL（URLでない場合は空文字）
+    """
+    if not url or not isinstance(url, str):
+        return ''
+    normalized = url.strip()
+    if normalized.endswith('/'):
+        normalized = normalized[:-1]
+    normalized = unquote(normalized)
+    try:
+        parts = urlsplit(normalized)
+        if parts.query:
+            query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+            normalized = urlunsplit((parts.scheme, parts.netloc, parts.path, query, parts.fragment))
+    except ValueError:
+        pass
+    return normalized
+
+
+def is_failed_result(result: Dict) -> bool:
+    """取得に失敗した結果（価格-1または在庫不明）かどうか"""
+    return result.get('仕入れ価格') == -1 or result.get('在庫ステータス') == '不明'
+
+
+class StateStore:
+    """
+    SQLiteによるURLごとのスクレイピング状態
+
+    WALモードで開き、1つの接続をロックで保護して複数のワーカースレッドから書き込めるようにする。
+    主キー（正規化URL）で検索するため、10万件以上でも1件あたりの検索はミリ秒未満で完了する。
+    """
+
+    def __init__(self, db_path: Path = SCRAPER_STATE_DB):
+        """
+        Args:
+            db_path: SQLiteファイルのパス
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(SCHEMA)
+            self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """データベースを閉じる"""
+        with self._lock:
+            self._conn.close()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        URLの状態を取得する
+
+        Args:
+            url: 仕入れ元URL
+
+        Returns:
+            Optional[Dict]: 状態（列名をキーとした辞書）、記録がない場合はNone
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT * FROM url_state WHERE url_key = ?', (normalize_url(url),)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_many(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """
+        複数URLの状態をまとめて取得する
+
+        Args:
+            urls: 仕入れ元URLのリスト
+
+        Returns:
+            Dict[str, Dict]: 正規化URLをキーとした状態の辞書（記録がないURLは含まない）
+        """
+        keys = list({normalize_url(url) for url in urls if url})
+        states: Dict[str, Dict] = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                for row in self._conn.execute(
+                    f'SELECT * FROM url_state WHERE url_key IN ({placeholders})', chunk
+                ):
+                    states[row['url_key']] = dict(row)
+        return states
+
+    def load_fetch_states(self, urls: Iterable[str]) -> Dict[str, Tuple[Optional[datetime], str]]:
+        """
+        更新間隔の判定用に、URLごとのスプレッドシートへの反映日時と在庫ステータスを取得する
+
+        取得済みでもアップロードに失敗した結果は含めない（次回の実行で再取得する）。
+
+        Args:
+            urls: 仕入れ元URLのリスト
+
+        Returns:
+            Dict[str, Tuple[Optional[datetime], str]]: 元のURLをキーとした (反映した結果の取得日時, 在庫ステータス)
+        """
+        urls = [str(url).strip() for url in urls if url]
+        states = self.get_many(urls)
+        fetch_states = {}
+        for url in urls:
+            state = states.get(normalize_url(url))
+            if not state or not state.get('delivered_at'):
+                continue
+            try:
+                delivered_at = datetime.strptime(state['delivered_at'], TIMESTAMP_FORMAT)
+            except ValueError:
+                continue
+            fetch_states[url] = (delivered_at, state.get('delivered_status') or '')
+        return fetch_states
+
+    def mark_delivered(self, results: Iterable[Dict]) -> int:
+        """
+        スプレッドシートへの反映が完了した結果を記録する（更新間隔の判定に使用する）
+
+        取得に失敗した結果（-1/不明）は次回も再取得するため記録しない。
+
+        Args:
+            results: アップロードしたスクレイピング結果のリスト
+
+        Returns:
+            int: 記録した件数
+        """
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
+        rows = []
+        for result in results:
+            url_key = normalize_url(str(result.get('仕入れ元URL') or '').strip())
+            if not url_key or is_failed_result(result):
+                continue
+            rows.append((str(result.get('最終更新日時') or now), result.get('在庫ステータス'), url_key))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE url_state SET delivered_at = ?, delivered_status = ? WHERE url_key = ?', rows
+            )
+            self._conn.commit()
+        return len(rows)
+
+    def record(self, result: Dict) -> str:
+        """
+        1件のスクレイピング結果を記録し、前回からの変化を返す
+
+        取得に失敗した結果（-1/不明）の場合は、前回の価格・在庫ステータス・取得日時を保持し、
+        失敗回数と最終試行日時だけを更新する。
+
+        Args:
+            result: 「仕入れ元URL」を含むスクレイピング結果（_extractorなどの付加情報を含んでもよい）
+
+        Returns:
+            str: CHANGE_NEW / CHANGE_CHANGED / CHANGE_UNCHANGED / CHANGE_FAILED のいずれか
+        """
+        url = str(result.get('仕入れ元URL') or '').strip()
+        url_key = normalize_url(url)
+        if not url_key:
+            return CHANGE_FAILED
+
+        now = datetime.now().strftime(TIMESTAMP_FORMAT)
+        fetched_at = result.get('最終更新日時') or now
+        price = result.get('仕入れ価格')
+        status = result.get('在庫ステータス')
+        failed = is_failed_result(result)
+        if failed:
+            outcome = 'failed'
+        elif result.get('_http_status') in (404, 410):
+            outcome = 'not_found'
+        else:
+            outcome = 'ok'
+
+        with self._lock:
+            previous = self._conn.execute(
+                'SELECT price, stock_status, changed_at, fetched_at FROM url_state WHERE url_key = ?', (url_key,)
+            ).fetchone()
+
+            if failed:
+                change = CHANGE_FAILED
+                self._conn.execute(
+                    """
+                    INSERT INTO url_state (url_key, url, last_attempt_at, latency_ms, extractor,
+                                           http_status, outcome, fail_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, 1)
+                    ON CONFLICT(url_key) DO UPDATE SET
+                        url = excluded.url,
+                        last_attempt_at = excluded.last_attempt_at,
+                        latency_ms = excluded.latency_ms,
+                        extractor = excluded.extractor,
+                        http_status = excluded.http_status,
+                        outcome = excluded.outcome,
+                        fail_count = url_state.fail_count + 1
+                    """,
+                    (url_key, url, now, result.get('_latency_ms'), result.get('_extractor'),
+                     result.get('_http_status'), outcome)
+                )
+            else:
+                if previous is None or previous['fetched_at'] is None:
+                    change = CHANGE_NEW
+                elif previous['price'] != price or previous['stock_status'] != status:
+                    change = CHANGE_CHANGED
+                else:
+                    change = CHANGE_UNCHANGED
+                changed_at = fetched_at if change != CHANGE_UNCHANGED else previous['changed_at']
+                self._conn.execute(
+                    """
+                    INSERT INTO url_state (url_key, url, price, stock_status, fetched_at, changed_at,
+                                           last_attempt_at, latency_ms, extractor, http_status, outcome,
+                                           content_hash, fail_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)
+                    ON CONFLICT(url_key) DO UPDATE SET
+                        url = excluded.url,
+                        price = excluded.price,
+                        stock_status = excluded.stock_status,
+                        fetched_at = excluded.fetched_at,
+                        changed_at = excluded.changed_at,
+                        last_attempt_at = excluded.last_attempt_at,
+                        latency_ms = excluded.latency_ms,
+                        extractor = excluded.extractor,
+                        http_status = excluded.http_status,
+                        outcome = excluded.outcome,
+                        content_hash = excluded.content_hash,
+                        fail_count = 0
+                    """,
+                    (url_key, url, price, status, fetched_at, changed_at, now, result.get('_latency_ms'),
+                     result.get('_extractor'), result.get('_http_status'), outcome, result.get('_content_hash'))
+                )
+            self._conn.commit()
+        return change
+
+    def record_many(self, results: Iterable[Dict]) -> Counter:
+        """
+        複数のスクレイピング結果を記録する
+
+        Args:
+            results: スクレイピング結果のリスト
+
+        Returns:
+            Counter: 変化の種類ごとの件数
+        """
+        counts: Counter = Counter()
+        for result in results:
+            change = self.record(result)
+            result['_change'] = change
+            counts[change] += 1
+        return counts
+
+    def summarize(self) -> Dict:
+        """
+        ストア全体の集計を取得する
+
+        Returns:
+            Dict: URL数、在庫ステータス別件数、抽出方式別の件数と平均取得時間、失敗中のURL数
+        """
+        with self._lock:
+            total = self._conn.execute('SELECT COUNT(*) FROM url_state').fetchone()[0]
+            by_status = {
+                row[0] or '(未取得)': row[1]
+                for row in self._conn.execute('SELECT stock_status, COUNT(*) FROM url_state GROUP BY stock_status')
+            }
+            by_extractor = {
+                row[0] or '(不明)': {'count': row[1], 'avg_latency_ms': row[2]}
+                for row in self._conn.execute(
+                    'SELECT extractor, COUNT(*), AVG(latency_ms) FROM url_state GROUP BY extractor'
+                )
+            }
+            failing = self._conn.execute('SELECT COUNT(*) FROM url_state WHERE fail_count > 0').fetchone()[0]
+        return {
+            'total': total,
+            'by_status': by_status,
+            'by_extractor': by_extractor,
+            'failing': failing
+        }
+
+
+def format_change_counts(counts: Counter) -> str:
+    """変化の種類ごとの件数を表示用の文字列にする"""
+    return (
+        f"新規 {counts.get(CHANGE_NEW, 0)}件 / 変更 {counts.get(CHANGE_CHANGED, 0)}件 / "
+        f"変更なし {counts.get(CHANGE_UNCHANGED, 0)}件 / 失敗 {counts.get(CHANGE_FAILED, 0)}件"
+    )
@@ -0,0 +1,233 @@
+"""
+逐次送信モジュール
+スクレイピング中に完了した結果を件数または時間でまとめ、バックグラウンドスレッドから
+GAS Webアプリに送信する。送信に失敗したバッチはスクレイピングを止めずに再送する
+"""
+import queue
+import threading
+import time
+import uuid
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import pandas as pd
+from .config import (
+    GAS_STREAM_BATCH_SIZE,
+    GAS_STREAM_INTERVAL,
+    GAS_STREAM_MAX_RETRIES,
+    GAS_STREAM_RETRY_DELAY,
+    GAS_UPLOAD_TOUCHED
+)
+from .change_detector import RESULT_COLUMNS, split_changed_rows
+from .spreadsheet_updater import _send_csv_post
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# 送信スレッドに終了を伝えるための値
+_STOP = object()
+
+
+@dataclass
+class _PendingBatch:
+    """送信待ちのバッチ"""
+    number: int
+    results: List[Dict]
+    attempts: int = 0
+    next_attempt_at: float = 0.0
+    # 再送時にGAS側で二重に反映されないよう、バッチごとに同じキーを送信する
+    idempotency_key: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+
+class StreamingUploader:
+    """
+    スクレイピング結果の逐次送信
+
+    submit()はキューに積むだけなのでワーカースレッドを待たせない。
+    送信スレッドは、GAS_STREAM_BATCH_SIZE件たまるか最初の結果からGAS_STREAM_INTERVAL秒が経過した時点で
+    1バッチを送信し、失敗したバッチは待機時間を倍にしながら最大GAS_STREAM_MAX_RETRIES回まで再送する。
+    再送しても送信できなかった結果は undelivered_dataframe() で取得し、実行終了時にまとめて送信する。
+    """
+
+    def __init__(
+        self,
+        script_url: str,
+        sheet_df: Optional[pd.DataFrame] = None,
+        batch_size: int = GAS_STREAM_BATCH_SIZE,
+        flush_interval: float = GAS_STREAM_INTERVAL,
+        max_retries: int = GAS_STREAM_MAX_RETRIES,
+        retry_delay: float = GAS_STREAM_RETRY_DELAY,
+        send_touched: bool = GAS_UPLOAD_TOUCHED
+    ):
+        """
+        Args:
+            script_url: GAS WebアプリURL
+            sheet_df: スクレイピング前のスプレッドシートのDataFrame
+                      （指定した場合は価格・在庫ステータスが変化した行だけを送信する）
+            batch_size: 1回に送信する最大件数
+            flush_interval: 件数に達しなくても送信するまでの時間（秒）
+            max_retries: 失敗したバッチの再送回数
+            retry_delay: 初回の再送までの待機時間（秒、再送ごとに2倍）
+            send_touched: sheet_df指定時に、変化のない行の「最終更新日時」も更新するか
+        """
+        self.script_url = script_url
+        self.sheet_df = sheet_df
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.0, flush_interval)
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = max(0.0, retry_delay)
+        self.send_touched = send_touched
+
+        self._queue: queue.Queue = queue.Queue()
+        self._retries: List[_PendingBatch] = []
+        self._undelivered: List[Dict] = []
+        self._thread: Optional[threading.Thread] = None
+        self._batch_count = 0
+        self.sent_count = 0
+        self.delivered_count = 0
+
+    def start(self):
+        """送信スレッドを開始する"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='gas-stream-uploader', daemon=True)
+        self._thread.start()
+        print(
+            f"逐次送信を開始します（{self.batch_size}件または{self.flush_interval:g}秒ごとに送信）"
+        )
+
+    def submit(self, result: Dict):
+        """
+        1件の結果を送信キューに追加する（ワーカースレッドから呼び出される）
+
+        Args:
+            result: スクレイピング結果
+        """
+        self._queue.put({column: result.get(column) for column in RESULT_COLUMNS})
+
+    def close(self, flush: bool = True) -> bool:
+        """
+        送信スレッドを終了する
+
+        Args:
+            flush: Trueの場合はキューに残った結果と再送待ちのバッチを送信してから終了する。
+                   Falseの場合は送信せずに未送信として扱う（中断時など）
+
+        Returns:
+            bool: すべての結果を送信できた場合はTrue
+        """
+        if self._thread is None:
+            return not self._undelivered
+        self._queue.put((_STOP, flush))
+        self._thread.join()
+        self._thread = None
+        print(
+            f"逐次送信を終了しました: {self.delivered_count}件を送信済み、"
+            f"未送信 {len(self._undelivered)}件（送信回数: {self.sent_count}回）"
+        )
+        return not self._undelivered
+
+    def undelivered_dataframe(self) -> pd.DataFrame:
+        """
+        送信できなかった結果を取得する
+
+        Returns:
+            pd.DataFrame: scrape_urlsと同じ列のDataFrame
+        """
+        if not self._undelivered:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return pd.DataFrame(self._undelivered).reindex(columns=RESULT_COLUMNS)
+
+    def _run(self):
+        batch: List[Dict] = []
+        deadline = None
+        while True:
+            now = time.monotonic()
+            wait_until = [t for t in (deadline, self._next_retry_at()) if t is not None]
+            timeout = max(0.0, min(wait_until) - now) if wait_until else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple) and item and item[0] is _STOP:
+                flush = item[1]
+                self._drain(batch, flush)
+                return
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            now = time.monotonic()
+            if batch and (len(batch) >= self.batch_size or (deadline is not None and now >= deadline)):
+                self._batch_count += 1
+                self._retries.append(_PendingBatch(self._batch_count, batch))
+                batch = []
+                deadline = None
+
+            for pending in [p for p in self._retries if p.next_attempt_at <= now]:
+                self._retries.remove(pending)
+                self._attempt(pending, final=False)
+
+    def _drain(self, batch: List[Dict], flush: bool):
+        """終了時にキューに残った結果と再送待ちのバッチを処理する"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if not (isinstance(item, tuple) and item and item[0] is _STOP):
+                batch.append(item)
+
+        pending_batches = self._retries
+        self._retries = []
+        for start in range(0, len(batch), self.batch_size):
+            self._batch_count += 1
+            pending_batches.append(_PendingBatch(self._batch_count, batch[start:start + self.batch_size]))
+
+        for pending in pending_batches:
+            if flush:
+                # 終了時はスクレイピングを待たせないよう、待機せずに1回だけ送信する
+                self._attempt(pending, final=True)
+            else:
+                self._undelivered.extend(pending.results)
+
+    def _next_retry_at(self) -> Optional[float]:
+        if not self._retries:
+            return None
+        return min(p.next_attempt_at for p in self._retries)
+
+    def _attempt(self, pending: _PendingBatch, final: bool):
+        """バッチを送信し、失敗した場合は再送を予約する"""
+        pending.attempts += 1
+        try:
+            self._send(pending.results, pending.idempotency_key)
+            self.delivered_count += len(pending.results)
+            return
+        except Exception as e:
+            print(f"⚠️  逐次送信のバッチ {pending.number}（{len(pending.results)}件）の送信に失敗しました"
+                  f"（{pending.attempts}回目）: {e}")
+
+        if final or pending.attempts > self.max_retries:
+            logger.warning(f"逐次送信のバッチ {pending.number} を送信できませんでした。実行終了時にまとめて送信します")
+            self._undelivered.extend(pending.results)
+            return
+        pending.next_attempt_at = time.monotonic() + self.retry_delay * (2 ** (pending.attempts - 1))
+        self._retries.append(pending)
+
+    def _send(self, results: List[Dict], idempotency_key: str):
+        """1バッチを送信する（変化のない行だけの場合は送信しない）"""
+        batch_df = pd.DataFrame(results).reindex(columns=RESULT_COLUMNS)
+        touched = None
+        if self.sheet_df is not None:
+            batch_df, touched = split_changed_rows(batch_df, self.sheet_df)
+            if not self.send_touched:
+                touched = None
+        if batch_df.empty and not touched:
+            return
+        csv_content = batch_df.to_csv(index=False) if not batch_df.empty else ''
+        print(f"逐次送信: {len(batch_df)}件をGAS Webアプリに送信しています...")
+        self.sent_count += 1
+        _send_csv_post(csv_content, self.script_url, touched=touched, idempotency_key=idempotency_key)
@@ -0,0 +1,202 @@
+"""
+URLルーティングモジュール
+サイト設定のURLパターンを1回だけオートマトンにコンパイルし、
+URLの列をまとめてサイトに振り分ける
+"""
+import threading
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+import pandas as pd
+
+# ロガーを設定
+logger = logging.getLogger(__name__)
+
+# どのサイトにも該当しないことを表すサイト番号
+UNMATCHED = -1
+
+
+class UrlRouter:
+    """
+    URLからサイト設定を求めるルーター
+
+    すべてのサイトのURLパターン（小文字）からAho–Corasickオートマトンを作成し、
+    URLを1回走査するだけで、含まれるパターンのうち最も先に定義されたサイトを求める。
+    判定結果は従来のfind_site_config（サイトの定義順に「パターン in URL」を調べて最初の一致を返す）と同じになる。
+    同じURLの判定結果はキャッシュする（複数スレッドから呼び出し可能）。
+    """
+
+    def __init__(self, sites: List[Dict]):
+        """
+        Args:
+            sites: サイト設定のリスト（設定の「sites」、定義順が優先順位）
+        """
+        self.sites = list(sites)
+        # 状態ごとの遷移・失敗遷移・その状態で一致するパターンの最小サイト番号
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[int] = [UNMATCHED]
+        self._cache: Dict[str, int] = {}
+        self._cache_lock = threading.Lock()
+        self.pattern_count = 0
+        self._build()
+
+    def _build(self):
+        for site_index, site_config in enumerate(self.sites):
+            for pattern in site_config.get('url_patterns') or []:
+                pattern = str(pattern).lower()
+                # 空のパターンは従来どおりすべてのURLに一致する
+                self._add_pattern(pattern, site_index)
+
+        # 幅優先で失敗遷移を求め、失敗遷移先で一致するパターンも引き継ぐ
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._best[next_state] = _min_site(self._best[next_state], self._best[self._fail[next_state]])
+
+    def _add_pattern(self, pattern: str, site_index: int):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(UNMATCHED)
+                self._goto[state][char] = next_state
+            state = next_state
+        self._best[state] = _min_site(self._best[state], site_index)
+        self.pattern_count += 1
+
+    def _scan(self, url_lower: str) -> int:
+        goto = self._goto
+        fail = self._fail
+        best_by_state = self._best
+        best = best_by_state[0]
+        state = 0
+        for char in url_lower:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = best_by_state[state]
+            if found != UNMATCHED and (best == UNMATCHED or found < best):
+                best = found
+                if best == 0:
+                    # 最優先のサイトに一致した場合はそれ以上調べる必要がない
+                    break
+        return best
+
+    def route(self, url) -> int:
+        """
+        URLに該当するサイトの番号を求める
+
+        Args:
+            url: 対象URL
+
+        Returns:
+            int: サイトの番号（sitesのインデックス）、該当しない場合はUNMATCHED
+        """
+        if url is None or (not isinstance(url, str) and pd.isna(url)):
+            return UNMATCHED
+        url_lower = str(url).lower()
+        site_index = self._cache.get(url_lower)
+        if site_index is None:
+            site_index = self._scan(url_lower)
+            with self._cache_lock:
+                self._cache[url_lower] = site_index
+        return site_index
+
+    def find_site_config(self, url: str) -> Optional[Dict]:
+        """
+        URLに該当するサイト設定を求める
+
+        Args:
+            url: 対象URL
+
+        Returns:
+            Optional[Dict]: サイト設定、見つからない場合はNone
+        """
+        site_index = self.route(url)
+        return self.sites[site_index] if site_index != UNMATCHED else None
+
+    def site_name(self, site_index: int) -> Optional[str]:
+        """サイトの番号から表示用のサイト名を求める（該当しない場合はNone）"""
+        if site_index == UNMATCHED:
+            return None
+        site_config = self.sites[site_index]
+        return site_config.get('name') or f"サイト{site_index + 1}"
+
+    def classify(self, urls: pd.Series) -> pd.Series:
+        """
+        URLの列をまとめてサイトに振り分ける（重複するURLは1回だけ判定する）
+
+        Args:
+            urls: URLの列
+
+        Returns:
+            pd.Series: urlsと同じインデックスのサイト番号（該当しない場合はUNMATCHED）
+        """
+        unique_urls = pd.unique(urls.dropna())
+        site_by_url = {url: self.route(url) for url in unique_urls}
+        return urls.map(site_by_url).fillna(UNMATCHED).astype(int)
+
+    def group_by_site(self, urls: pd.Series) -> Dict[int, List]:
+        """
+        URLの列をサイトごとにまとめる
+
+        Args:
+            urls: URLの列
+
+        Returns:
+            Dict[int, List]: サイト番号（該当しない場合はUNMATCHED）をキーとしたurlsのインデックスのリスト
+        """
+        site_indexes = self.classify(urls)
+        return {int(site_index): list(index) for site_index, index in site_indexes.groupby(site_indexes).groups.items()}
+
+
+def _min_site(a: int, b: int) -> int:
+    if a == UNMATCHED:
+        return b
+    if b == UNMATCHED:
+        return a
+    return min(a, b)
+
+
+def report_routing(router: UrlRouter, urls: pd.Series, max_unmatched: int = 10) -> Dict[int, List]:
+    """
+    スクレイピング開始前にサイトごとの件数と、どのサイトにも該当しないURLを表示する
+
+    Args:
+        router: UrlRouterインスタンス
+        urls: 対象URLの列（空のURLは除いておく）
+        max_unmatched: 表示する該当なしURLの最大件数
+
+    Returns:
+        Dict[int, List]: group_by_siteの結果
+    """
+    groups = router.group_by_site(urls)
+    counts = [
+        f"{router.site_name(site_index)}: {len(index)}件"
+        for site_index, index in sorted(groups.items())
+        if site_index != UNMATCHED
+    ]
+    if counts:
+        print(f"サイト別の件数: {', '.join(counts)}")
+
+    unmatched = groups.get(UNMATCHED, [])
+    if unmatched:
+        print(f"⚠️  どのサイト設定にも該当しないURLが{len(unmatched)}件あります（デフォルト設定で処理します）:")
+        for url in urls.loc[unmatched[:max_unmatched]]:
+            print(f"  - {url}")
+        if len(unmatched) > max_unmatched:
+            print(f"  ...ほか{len(unmatched) - max_unmatched}件")
+    return groups
@@ -0,0 +1,68 @@
+# test_async_crawler.py
+# 非同期HTTPクローラーのホスト別の制限を、HTTP通信なしで確認する（pytestで実行）
+import asyncio
+import time
+
+from src.async_crawler import AsyncHttpCrawler
+from src.http_fetcher import HttpFetchResult
+
+# 1リクエストの擬似的な応答時間（秒）
+FETCH_SECONDS = 0.02
+
+
+class RecordingScraper:
+    """抽出した時刻をURLごとに記録するスクレイパー"""
+
+    name = 'test'
+
+    def __init__(self):
+        self.finished_at = {}
+
+    def scrape_static_response(self, url, response):
+        self.finished_at[url] = time.monotonic()
+        return {'仕入れ価格': 100, '在庫ステータス': '在庫あり', '最終更新日時': ''}
+
+
+def make_crawler(concurrency, per_host, intervals):
+    crawler = AsyncHttpCrawler(
+        concurrency=concurrency,
+        per_host=per_host,
+        interval_resolver=lambda url: intervals.get(url.split('/')[2], 0.0)
+    )
+
+    async def fake_fetch(session, url):
+        await asyncio.sleep(FETCH_SECONDS)
+        return HttpFetchResult(url, 200, b'<html></html>', 'utf-8', FETCH_SECONDS)
+
+    crawler._fetch = fake_fetch
+    return crawler
+
+
+def test_busy_host_does_not_block_other_hosts():
+    # host-a: アクセス間隔0.1秒のURLが20件（ホストの順番待ちが約2秒続く）、host-b: 間隔なしのURLが5件
+    scraper = RecordingScraper()
+    tasks = [(n, f'http://host-a/{n}', scraper) for n in range(20)]
+    tasks += [(20 + n, f'http://host-b/{n}', scraper) for n in range(5)]
+    crawler = make_crawler(concurrency=4, per_host=2, intervals={'host-a': 0.1})
+
+    started = time.monotonic()
+    results = crawler.crawl(tasks)
+
+    assert len(results) == len(tasks)
+    host_b_done = max(at for url, at in scraper.finished_at.items() if 'host-b' in url) - started
+    host_a_done = max(at for url, at in scraper.finished_at.items() if 'host-a' in url) - started
+    # host-aの順番待ちのタスクが全体の同時実行枠を占有していると、host-bはhost-aの大半が終わるまで待たされる
+    assert host_b_done < 0.5, host_b_done
+    assert host_a_done >= 1.8, host_a_done
+
+
+def test_host_interval_is_kept():
+    scraper = RecordingScraper()
+    tasks = [(n, f'http://host-a/{n}', scraper) for n in range(5)]
+    crawler = make_crawler(concurrency=8, per_host=4, intervals={'host-a': 0.1})
+
+    crawler.crawl(tasks)
+
+    finished = sorted(scraper.finished_at.values())
+    gaps = [later - earlier for earlier, later in zip(finished, finished[1:])]
+    assert min(gaps) >= 0.09, gaps
@@ -0,0 +1,60 @@
+# test_browser_pool.py
+# ブラウザプールのブラウザ再起動・終了と、ブラウザごとのスクレイパー登録簿の破棄を確認する（Chrome不要、pytestで実行）
+from src.browser_pool import BrowserPool
+from src.scraper_registry import ScraperRegistryPool
+
+
+class FakeBrowser:
+    """quitとcurrent_urlだけを持つWebDriverの代わり"""
+
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.current_url = 'about:blank'
+        self.quit_count = 0
+
+    def quit(self):
+        self.quit_count += 1
+
+
+def failed_result(url):
+    return {'仕入れ元URL': url, '仕入れ価格': -1, '在庫ステータス': '不明', '最終更新日時': ''}
+
+
+def test_registries_are_discarded_when_browsers_are_closed():
+    registries = ScraperRegistryPool()
+    created = []
+
+    def browser_factory(worker_id):
+        browser = FakeBrowser(worker_id)
+        created.append(browser)
+        return browser
+
+    def handler(browser, url):
+        registries.get(browser)
+        return failed_result(url)
+
+    tasks = [(n, f'https://example.com/{n}') for n in range(6)]
+    with BrowserPool(2, browser_factory=browser_factory, max_failures=2,
+                     on_browser_closed=registries.discard) as pool:
+        results = pool.run(tasks, handler=handler, error_result=failed_result)
+        # 連続失敗による再起動で終了したブラウザの登録簿は残らない
+        assert len(registries) <= 2
+        assert len(created) > 2
+
+    assert sorted(results) == list(range(6))
+    # 停止時にすべてのブラウザが終了し、登録簿も空になる
+    assert all(browser.quit_count == 1 for browser in created)
+    assert len(registries) == 0
+
+
+def test_discard_keeps_registry_of_other_browser():
+    registries = ScraperRegistryPool()
+    first, second = FakeBrowser(0), FakeBrowser(1)
+    registries.get(first)
+    registry = registries.get(second)
+
+    registries.discard(first)
+    registries.discard(first)
+
+    assert len(registries) == 1
+    assert registries.get(second) is registry
@@ -0,0 +1,68 @@
+# test_change_detector.py
+# スプレッドシートの値との比較で変化した行だけを送信対象にすることを確認する（pytestで実行）
+import pandas as pd
+
+from src.change_detector import RESULT_COLUMNS, count_touched, parse_sheet_price, split_changed_rows
+
+
+def test_parse_sheet_price():
+    assert parse_sheet_price('¥1,980') == 1980
+    assert parse_sheet_price('1980.0') == 1980
+    assert parse_sheet_price(2480) == 2480
+    assert parse_sheet_price('-1') == -1
+    assert parse_sheet_price('') is None
+    assert parse_sheet_price('価格なし') is None
+    assert parse_sheet_price(None) is None
+    assert parse_sheet_price(float('nan')) is None
+
+
+def test_split_changed_rows():
+    sheet_df = pd.DataFrame({
+        '仕入れ元URL': [
+            'https://example.com/item?b=2&a=1',
+            'https://example.com/same',
+            'https://example.com/sold-out',
+            'https://example.com/failed',
+        ],
+        '仕入れ価格': ['¥1,000', '2,000', '3000', '4000'],
+        '在庫ステータス': ['在庫あり', '在庫あり', '在庫あり', '在庫あり'],
+    })
+    result_df = pd.DataFrame({
+        # クエリの順序や前後の空白が違っても同じURLとして比較する
+        '仕入れ元URL': [
+            'https://example.com/item?a=1&b=2',
+            ' https://example.com/same ',
+            'https://example.com/sold-out',
+            'https://example.com/failed',
+            'https://example.com/new',
+        ],
+        '仕入れ価格': [1200, 2000, 3000, -1, 500],
+        '在庫ステータス': ['在庫あり', '在庫あり', '売り切れ', '在庫あり', '在庫あり'],
+        '最終更新日時': ['2026-01-01 10:00:00'] * 5,
+    })
+
+    changed_df, touched = split_changed_rows(result_df, sheet_df)
+
+    assert list(changed_df.columns) == RESULT_COLUMNS
+    # 価格の変化・在庫の変化・シートにないURLが送信対象、取得失敗（-1）の価格は比較しない
+    assert list(changed_df['仕入れ元URL']) == [
+        'https://example.com/item?a=1&b=2',
+        'https://example.com/sold-out',
+        'https://example.com/new',
+    ]
+    assert touched == {
+        '2026-01-01 10:00:00': [' https://example.com/same ', 'https://example.com/failed'],
+    }
+    assert count_touched(touched) == 2
+
+
+def test_split_changed_rows_without_sheet_columns():
+    result_df = pd.DataFrame({
+        '仕入れ元URL': ['https://example.com/a'],
+        '仕入れ価格': [100],
+        '在庫ステータス': ['在庫あり'],
+        '最終更新日時': ['2026-01-01 10:00:00'],
+    })
+    changed_df, touched = split_changed_rows(result_df, pd.DataFrame({'商品名': ['a']}))
+    assert len(changed_df) == 1
+    assert touched == {}
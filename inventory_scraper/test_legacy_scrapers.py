@@ -0,0 +1,26 @@
+# test_legacy_scrapers.py
+# 設定ファイルが使えない場合のスクレイパーの振り分けを確認する（python test_legacy_scrapers.py または pytest で実行）
+from src.scraper import AmazonScraper, BaseScraper, MercariScraper, YahooScraper, legacy_scraper_class
+
+EXPECTED = {
+    'https://www.amazon.co.jp/dp/B000000001': AmazonScraper,
+    'https://www.amazon.com/dp/B000000001': AmazonScraper,
+    'https://jp.mercari.com/item/m1': MercariScraper,
+    'https://www.mercari.com/jp/items/m1/': MercariScraper,
+    'https://store.shopping.yahoo.co.jp/shop/item.html': YahooScraper,
+    'https://auctions.yahoo.co.jp/jp/auction/x1': YahooScraper,
+    'https://item.rakuten.co.jp/shop/item/': AmazonScraper,
+    'https://store.example.com/products/1': AmazonScraper,
+}
+
+
+def test_legacy_scraper_class():
+    for url, expected in EXPECTED.items():
+        scraper_class = legacy_scraper_class(url)
+        assert scraper_class is expected, f"{url}: {scraper_class}"
+        assert issubclass(scraper_class, BaseScraper)
+
+
+if __name__ == '__main__':
+    test_legacy_scraper_class()
+    print("=== 振り分け確認: OK ===")
@@ -0,0 +1,104 @@
+# test_spreadsheet_updater.py
+# GASへ送信するデータの分割・変換を確認する（HTTP通信なし、pytestで実行）
+import base64
+import csv
+import gzip
+import io
+import json
+
+from src.spreadsheet_updater import COLUMNAR_PAYLOAD_FORMAT, _split_csv_chunks, build_columnar_payload
+
+HEADER = ['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']
+
+
+def make_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def payload_size(text):
+    return len(json.dumps(text, ensure_ascii=False).encode('utf-8')) - 2
+
+
+def test_split_csv_chunks_respects_byte_limit():
+    rows = [[f'https://example.com/商品/{n}', str(1000 + n), '在庫あり', '2026-01-01 10:00:00'] for n in range(200)]
+    max_chunk_size = 2000
+
+    chunks = _split_csv_chunks(make_csv(rows), max_chunk_size)
+
+    assert len(chunks) > 1
+    parsed_rows = []
+    for chunk in chunks:
+        assert payload_size(chunk) <= max_chunk_size
+        chunk_rows = list(csv.reader(io.StringIO(chunk)))
+        # すべてのチャンクの先頭にヘッダー行が付く
+        assert chunk_rows[0] == HEADER
+        parsed_rows.extend(chunk_rows[1:])
+    assert parsed_rows == rows
+
+
+def test_split_csv_chunks_keeps_quoted_newlines():
+    rows = [
+        ['https://example.com/a', '100', '在庫あり\n（残りわずか）', '2026-01-01 10:00:00'],
+        ['https://example.com/b', '200', '売り切れ', '2026-01-01 10:00:00'],
+        ['https://example.com/c', '300', '"引用符"を含む\r\n値', '2026-01-01 10:00:00'],
+    ]
+    chunks = _split_csv_chunks(make_csv(rows), 120)
+
+    parsed_rows = []
+    for chunk in chunks:
+        chunk_rows = list(csv.reader(io.StringIO(chunk)))
+        assert chunk_rows[0] == HEADER
+        parsed_rows.extend(chunk_rows[1:])
+    assert parsed_rows == rows
+
+
+def test_split_csv_chunks_oversized_row_and_empty_input():
+    rows = [['https://example.com/' + 'x' * 500, '100', '在庫あり', '2026-01-01 10:00:00']]
+    chunks = _split_csv_chunks(make_csv(rows), 100)
+    # 1行で上限を超える場合はその行だけのチャンクにする
+    assert len(chunks) == 1
+    assert list(csv.reader(io.StringIO(chunks[0])))[1:] == rows
+    assert _split_csv_chunks('', 100) == []
+    assert _split_csv_chunks(make_csv([]), 100) == []
+
+
+def decode_columnar_payload(payload):
+    """GAS側のdecodeColumnarPayloadと同じ手順（base64→gunzip→JSON）で復元する"""
+    return json.loads(gzip.decompress(base64.b64decode(payload['data'])).decode('utf-8'))
+
+
+def test_build_columnar_payload_round_trip():
+    rows = [
+        ['https://example.com/商品/1', '1980', '在庫あり', '2026-01-01 10:00:05'],
+        ['https://example.com/2', '-1', '不明', '2026-01-01 10:00:00'],
+        ['https://example.com/3', '', '取り寄せ', '2026/01/01 10:01'],
+        ['https://example.com/4', '12.5', '', ''],
+    ]
+    touched = {'2026-01-01 10:02:00': ['https://example.com/5']}
+
+    payload = build_columnar_payload(make_csv(rows), touched)
+
+    assert payload['format'] == COLUMNAR_PAYLOAD_FORMAT
+    assert payload['rowCount'] == 5
+    columns = decode_columnar_payload(payload)
+    assert columns['urls'] == [row[0] for row in rows] + ['https://example.com/5']
+    assert columns['prices'] == [1980, -1, None, 12.5, None]
+    # 既定にない在庫ステータスはstatusLabelsの末尾に追加される
+    assert columns['statusLabels'] == ['在庫あり', '売り切れ', '不明', '取り寄せ']
+    assert [None if code is None else columns['statusLabels'][code] for code in columns['statuses']] == [
+        '在庫あり', '不明', '取り寄せ', None, None
+    ]
+    assert columns['t0'] == '2026-01-01 10:00:00'
+    assert columns['dt'] == [5, 0, None, None, 120]
+    assert columns['timeText'] == {'2': '2026/01/01 10:01'}
+
+
+def test_build_columnar_payload_is_deterministic():
+    csv_content = make_csv([['https://example.com/1', '100', '在庫あり', '2026-01-01 10:00:00']])
+    # gzipのmtimeを固定しているため、同じ内容からは同じペイロードになる
+    assert build_columnar_payload(csv_content) == build_columnar_payload(csv_content)
+    assert decode_columnar_payload(build_columnar_payload('', None))['urls'] == []
@@ -0,0 +1,72 @@
+# test_state_store.py
+# 状態ストアの記録・反映日時と、URLの正規化を確認する（一時ディレクトリのSQLiteを使用、pytestで実行）
+from datetime import datetime
+
+from src.state_store import (
+    CHANGE_CHANGED,
+    CHANGE_FAILED,
+    CHANGE_NEW,
+    CHANGE_UNCHANGED,
+    StateStore,
+    normalize_url,
+)
+
+
+def make_result(url, price=1980, status='在庫あり', fetched_at='2026-01-01 10:00:00'):
+    return {'仕入れ元URL': url, '仕入れ価格': price, '在庫ステータス': status, '最終更新日時': fetched_at}
+
+
+def test_normalize_url():
+    assert normalize_url(' https://example.com/item/ ') == 'https://example.com/item'
+    assert normalize_url('https://example.com/item?b=2&a=1') == normalize_url('https://example.com/item?a=1&b=2')
+    assert normalize_url('https://example.com/%E5%95%86%E5%93%81') == 'https://example.com/商品'
+    assert normalize_url('https://example.com/item?q=&a=1') == 'https://example.com/item?a=1&q='
+    assert normalize_url('') == ''
+    assert normalize_url(None) == ''
+
+
+def test_record_detects_changes(tmp_path):
+    with StateStore(tmp_path / 'state.sqlite3') as store:
+        url = 'https://example.com/item?b=2&a=1'
+        assert store.record(make_result(url)) == CHANGE_NEW
+        assert store.record(make_result(url)) == CHANGE_UNCHANGED
+        assert store.record(make_result(url, price=2480)) == CHANGE_CHANGED
+        # 取得に失敗した場合は前回の値を保持し、失敗回数だけを更新する
+        assert store.record(make_result(url, price=-1, status='不明')) == CHANGE_FAILED
+        assert store.record(make_result('')) == CHANGE_FAILED
+
+        state = store.get(' https://example.com/item?a=1&b=2 ')
+        assert state['price'] == 2480
+        assert state['stock_status'] == '在庫あり'
+        assert state['fail_count'] == 1
+
+
+def test_load_fetch_states_uses_delivered_results_only(tmp_path):
+    with StateStore(tmp_path / 'state.sqlite3') as store:
+        delivered = make_result('https://example.com/delivered', status='売り切れ', fetched_at='2026-01-02 09:30:00')
+        pending = make_result('https://example.com/pending')
+        failed = make_result('https://example.com/failed', price=-1, status='不明')
+        for result in (delivered, pending, failed):
+            store.record(result)
+
+        # アップロードが完了した結果だけを反映済みとして記録する（失敗した結果は記録しない）
+        assert store.mark_delivered([delivered, failed]) == 1
+
+        fetch_states = store.load_fetch_states([
+            'https://example.com/delivered/',
+            'https://example.com/pending',
+            'https://example.com/failed',
+            'https://example.com/unknown',
+        ])
+        # 元のURLをキーとして返す
+        assert fetch_states == {
+            'https://example.com/delivered/': (datetime(2026, 1, 2, 9, 30), '売り切れ'),
+        }
+
+
+def test_state_persists_across_reopen(tmp_path):
+    db_path = tmp_path / 'state.sqlite3'
+    with StateStore(db_path) as store:
+        store.record(make_result('https://example.com/item'))
+    with StateStore(db_path) as store:
+        assert store.record(make_result('https://example.com/item')) == CHANGE_UNCHANGED
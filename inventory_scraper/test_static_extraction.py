@@ -0,0 +1,54 @@
+# test_static_extraction.py
+# 静的HTML（http・http-then-browserの取得方式）からの抽出を保存済みのページで確認する（pytestで実行）
+import copy
+from pathlib import Path
+
+from benchmarks.corpus import FIXTURES_DIR, load_fixtures
+from src.configurable_scraper import ConfigurableScraper, ScraperConfigLoader
+from src.http_fetcher import HttpFetchResult
+
+# 在庫表示がJavaScriptで描画されるページ（静的HTMLには在庫セレクタの要素がない）
+SCRIPT_STOCK_PAGE = FIXTURES_DIR / 'amazon' / 'jp_stock_rendered_by_script.html'
+SCRIPT_STOCK_URL = 'https://www.amazon.co.jp/dp/B0SAMPLE03'
+
+
+def load_config():
+    return ScraperConfigLoader(use_spreadsheet=False)
+
+
+def scrape_static(scraper: ConfigurableScraper, url: str, path: Path):
+    response = HttpFetchResult(url, 200, path.read_bytes(), None, 0.0)
+    return scraper.scrape_static_response(url, response)
+
+
+def test_fixture_pages():
+    loader = load_config()
+    for page in load_fixtures():
+        site_config = loader.find_site_config(page.url) or loader.get_default_config()
+        result = scrape_static(ConfigurableScraper(None, site_config), page.url, page.path)
+        for key, value in page.expected.items():
+            assert result[key] == value, f"{page.file}: {key}={result[key]}"
+
+
+def test_missing_stock_falls_back_to_browser():
+    site_config = load_config().find_site_config(SCRIPT_STOCK_URL)
+    assert site_config['fetch_mode'] == 'http-then-browser'
+    result = scrape_static(ConfigurableScraper(None, site_config), SCRIPT_STOCK_URL, SCRIPT_STOCK_PAGE)
+    assert result['仕入れ価格'] == 2480
+    # 「不明」の場合はscrape()・crawl_static_urlsがブラウザで再取得する
+    assert result['在庫ステータス'] == '不明'
+
+
+def test_missing_stock_without_browser_fallback():
+    site_config = copy.deepcopy(load_config().find_site_config(SCRIPT_STOCK_URL))
+    for overrides in ({'fetch_mode': 'http'}, {'static_stock_fallback': False}):
+        result = scrape_static(ConfigurableScraper(None, {**site_config, **overrides}), SCRIPT_STOCK_URL, SCRIPT_STOCK_PAGE)
+        assert result['在庫ステータス'] == '在庫あり', overrides
+
+
+def test_scrape_retries_with_browser_when_stock_is_unknown(monkeypatch):
+    site_config = load_config().find_site_config(SCRIPT_STOCK_URL)
+    scraper = ConfigurableScraper(object(), site_config)
+    monkeypatch.setattr(scraper, 'scrape_static', lambda url: scrape_static(scraper, url, SCRIPT_STOCK_PAGE))
+    monkeypatch.setattr(scraper, 'scrape_with_browser', lambda url: {'仕入れ価格': 2480, '在庫ステータス': '在庫あり'})
+    assert scraper.scrape(SCRIPT_STOCK_URL)['在庫ステータス'] == '在庫あり'
@@ -0,0 +1,61 @@
+# test_url_router.py
+# URLルーターの振り分けが従来のfind_site_config（定義順の線形探索）と一致することを確認する（pytestで実行）
+import pandas as pd
+
+from src.configurable_scraper import ScraperConfigLoader
+from src.url_router import UNMATCHED, UrlRouter
+
+URLS = [
+    'https://www.amazon.co.jp/dp/B000000001',
+    'https://WWW.AMAZON.CO.JP/gp/product/B000000002',
+    'https://jp.mercari.com/item/m1',
+    'https://jp.mercari.com/shops/product/abc',
+    'https://store.shopping.yahoo.co.jp/shop/item.html',
+    'https://auctions.yahoo.co.jp/jp/auction/x1',
+    'https://item.rakuten.co.jp/shop/item/',
+    'https://example.com/redirect?to=https://www.amazon.co.jp/dp/B1',
+    'https://store.example.com/products/1',
+    '',
+]
+
+
+def linear_find_site_config(sites, url):
+    """ルーター導入前のfind_site_config（サイトの定義順に「パターン in URL」を調べる）"""
+    url_lower = url.lower()
+    for site_config in sites:
+        for pattern in site_config.get('url_patterns') or []:
+            if str(pattern).lower() in url_lower:
+                return site_config
+    return None
+
+
+def test_router_matches_linear_scan_for_configured_sites():
+    sites = ScraperConfigLoader(use_spreadsheet=False).config.get('sites', [])
+    router = UrlRouter(sites)
+    for url in URLS:
+        assert router.find_site_config(url) is linear_find_site_config(sites, url), url
+
+
+def test_router_prefers_first_defined_site_for_overlapping_patterns():
+    sites = [
+        {'name': 'shops', 'url_patterns': ['/shops/product/']},
+        {'name': 'mercari', 'url_patterns': ['mercari.com']},
+        {'name': 'mercari-shops', 'url_patterns': ['jp.mercari.com/shops']},
+        {'name': 'catch-all', 'url_patterns': ['']},
+    ]
+    router = UrlRouter(sites)
+    urls = URLS + ['https://jp.mercari.com/shops/product/xyz', 'https://mercari.com/']
+    for url in urls:
+        assert router.find_site_config(url) is linear_find_site_config(sites, url), url
+
+
+def test_group_by_site_keeps_row_order_within_site():
+    sites = [{'name': 'amazon', 'url_patterns': ['amazon.co.jp']}, {'name': 'mercari', 'url_patterns': ['mercari.com']}]
+    router = UrlRouter(sites)
+    urls = pd.Series([
+        'https://jp.mercari.com/item/m1',
+        'https://www.amazon.co.jp/dp/1',
+        'https://example.com/',
+        'https://www.amazon.co.jp/dp/2',
+    ])
+    assert router.group_by_site(urls) == {0: [1, 3], 1: [0], UNMATCHED: [2]}
@@ -10,6 +10,16 @@
  * 4. CSVデータをURLパラメータとして送信
  */
 
+// 処理済みのidempotencyKeyを保持する時間（秒、CacheServiceの上限は6時間）
+const UPLOAD_IDEMPOTENCY_TTL_SECONDS = 21600;
+// 同時に届いたチャンクの書き込みを直列化するためのロック待ち時間（ミリ秒）
+const UPLOAD_LOCK_TIMEOUT_MS = 300000;
+// 列ごとの配列をgzip圧縮・base64エンコードした送信形式（Python側のbuild_columnar_payloadと対応）
+const COLUMNAR_PAYLOAD_FORMAT = 'columnar-gzip-v1';
+// URL照合のデバッグログ（CSVの各行のURLと、マッチしない行の類似URLを出力する）
+// 行数に比例してログと類似度計算が増えるため、調査時のみtrueにする
+const UPLOAD_DEBUG_LOGGING = false;
+
 /**
  * Webアプリのエントリーポイント（POSTリクエスト）
  * Python側からPOSTリクエストでCSVデータを受信する
@@ -23,13 +33,26 @@ function doPost(e) {
     
     // POSTボディからCSVデータを取得
     let csvContent = null;
+    // 価格・在庫ステータスが変化しておらず、最終更新日時だけを更新するURL（最終更新日時 -> URLの配列）
+    let touched = null;
+    // 再送されたチャンクを二重に反映しないためのキー（Python側でチャンクごとに発行）
+    let idempotencyKey = null;
+    // 列形式で送信された場合のデータ（base64文字列）
+    let columnarData = null;
     
     // JSON形式のPOSTボディの場合
     if (e.postData && e.postData.type === 'application/json') {
       try {
         const jsonData = JSON.parse(e.postData.contents);
         csvContent = jsonData.csvData;
-        console.log('JSON形式のPOSTボディからCSVデータを取得しました（長さ:', csvContent ? csvContent.length : 0, '文字）');
+        touched = jsonData.touched || null;
+        idempotencyKey = jsonData.idempotencyKey || null;
+        if (jsonData.format === COLUMNAR_PAYLOAD_FORMAT) {
+          columnarData = jsonData.data || '';
+          console.log('列形式のPOSTボディを受信しました（', jsonData.rowCount, '行、', columnarData.length, '文字）');
+        } else {
+          console.log('JSON形式のPOSTボディからCSVデータを取得しました（長さ:', csvContent ? csvContent.length : 0, '文字）');
+        }
       } catch (parseError) {
         console.error('JSON解析エラー:', parseError);
         return ContentService.createTextOutput(JSON.stringify({
@@ -44,7 +67,8 @@ function doPost(e) {
       console.log('プレーンテキストのPOSTボディからCSVデータを取得しました（長さ:', csvContent.length, '文字）');
     }
     
-    if (!csvContent || csvContent.trim() === '') {
+    const hasCsv = csvContent && csvContent.trim() !== '';
+    if (!hasCsv && !touched && !columnarData) {
       const errorMsg = 'POSTボディにCSVデータが含まれていません';
       console.error(errorMsg);
       return ContentService.createTextOutput(JSON.stringify({
@@ -56,7 +80,15 @@ function doPost(e) {
     // CSVをパース
     let csvRows;
     try {
-      csvRows = parseCsvWithMultilineSupport(csvContent);
+      if (columnarData) {
+        // 列形式の場合はCSVの解析を行わずに行データを組み立てる
+        csvRows = decodeColumnarPayload(columnarData);
+      } else {
+        csvRows = hasCsv ? parseCsvWithMultilineSupport(csvContent) : [];
+        if (touched) {
+          csvRows = appendTouchedRows(csvRows, touched);
+        }
+      }
       console.log('CSVデータをパースしました:', csvRows.length, '行');
     } catch (parseError) {
       console.error('CSVパースエラー:', parseError);
@@ -76,7 +108,40 @@ function doPost(e) {
     }
     
     // スプレッドシートを更新
-    const result = updateInventoryFromCsv(csvRows);
+    // チャンクは並行して送信されるため、シートの読み込みから書き込みまでをロックで直列化する
+    const lock = LockService.getScriptLock();
+    if (!lock.tryLock(UPLOAD_LOCK_TIMEOUT_MS)) {
+      return ContentService.createTextOutput(JSON.stringify({
+        success: false,
+        retryable: true,
+        error: '他の更新処理が実行中のため、ロックを取得できませんでした'
+      })).setMimeType(ContentService.MimeType.JSON);
+    }
+    let result;
+    try {
+      const cache = CacheService.getScriptCache();
+      const cacheKey = idempotencyKey ? 'upload:' + idempotencyKey : null;
+      const cached = cacheKey ? cache.get(cacheKey) : null;
+      if (cached) {
+        // 反映済みのチャンクが再送された場合は、前回の結果を返す
+        console.log('処理済みのidempotencyKeyのため、更新を省略します:', idempotencyKey);
+        result = JSON.parse(cached);
+        result.duplicate = true;
+      } else {
+        result = updateInventoryFromCsv(csvRows);
+        if (cacheKey && result.success) {
+          // キャッシュの値の上限（100KB）を超えないよう、デバッグ用のURLリストは保存しない
+          const summary = Object.assign({}, result, { notFoundUrls: [] });
+          try {
+            cache.put(cacheKey, JSON.stringify(summary), UPLOAD_IDEMPOTENCY_TTL_SECONDS);
+          } catch (cacheError) {
+            console.warn('idempotencyKeyの保存に失敗しました:', cacheError);
+          }
+        }
+      }
+    } finally {
+      lock.releaseLock();
+    }
     
     // 結果をJSON形式で返す
     return ContentService.createTextOutput(JSON.stringify(result))
@@ -91,6 +156,170 @@ function doPost(e) {
   }
 }
 
+/**
+ * 仕入れ元マスターシートのバージョン（表示値のSHA-256）を取得する
+ * Python側はこの値がキャッシュ作成時と同じであれば、仕入れ元マスターのダウンロードを省略する
+ * 
+ * @returns {Object} { success, version, sheetId, rowCount }
+ */
+function getSupplierMasterVersion() {
+  try {
+    const sheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName(SHEET_NAMES.SUPPLIER_MASTER);
+    if (!sheet) {
+      return { success: false, error: '仕入れ元マスターシートが見つかりません' };
+    }
+    // CSVエクスポートと同じく表示値でハッシュを計算する
+    const values = sheet.getDataRange().getDisplayValues();
+    const digest = Utilities.computeDigest(
+      Utilities.DigestAlgorithm.SHA_256,
+      JSON.stringify(values),
+      Utilities.Charset.UTF_8
+    );
+    const version = digest.map(b => ((b + 256) % 256).toString(16).padStart(2, '0')).join('');
+    return {
+      success: true,
+      version: version,
+      sheetId: sheet.getSheetId(),
+      rowCount: values.length
+    };
+  } catch (error) {
+    console.error('仕入れ元マスターのバージョン取得エラー:', error);
+    return { success: false, error: error.message };
+  }
+}
+
+/**
+ * 列形式（gzip+base64）のデータを、updateInventoryFromCsvが受け取るCSVと同じ形式の行データに変換する
+ * 
+ * @param {string} data - 列ごとの配列のJSONをgzip圧縮・base64エンコードした文字列
+ * @returns {Array<Array<string>>} ヘッダー行を含む行データ
+ */
+function decodeColumnarPayload(data) {
+  const bytes = Utilities.base64Decode(data);
+  const json = Utilities.ungzip(Utilities.newBlob(bytes, 'application/x-gzip')).getDataAsString('UTF-8');
+  const columns = JSON.parse(json);
+  
+  const urls = columns.urls || [];
+  const prices = columns.prices || [];
+  const statuses = columns.statuses || [];
+  const statusLabels = columns.statusLabels || [];
+  const offsets = columns.dt || [];
+  const timeText = columns.timeText || {};
+  const baseTime = columns.t0 ? parseTimestampUtc(columns.t0) : null;
+  
+  const rows = [['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']];
+  for (let i = 0; i < urls.length; i++) {
+    const price = prices[i];
+    const status = statuses[i];
+    let lastUpdated = '';
+    if (timeText[i] !== undefined) {
+      lastUpdated = timeText[i];
+    } else if (baseTime !== null && offsets[i] !== null && offsets[i] !== undefined) {
+      lastUpdated = formatTimestampUtc(baseTime + offsets[i] * 1000);
+    }
+    rows.push([
+      urls[i],
+      price === null || price === undefined ? '' : String(price),
+      status === null || status === undefined ? '' : (statusLabels[status] || ''),
+      lastUpdated
+    ]);
+  }
+  console.log(`列形式のデータを変換しました: ${urls.length}行`);
+  return rows;
+}
+
+/**
+ * 「YYYY-MM-DD HH:MM:SS」をタイムゾーンの影響を受けないようUTCとして解釈する
+ * 
+ * @param {string} text - 日時文字列
+ * @returns {number|null} UTCとして解釈したミリ秒、解析できない場合はnull
+ */
+function parseTimestampUtc(text) {
+  const match = /^(\d{4})-(\d{2})-(\d{2}) (\d{2}):(\d{2}):(\d{2})$/.exec(String(text).trim());
+  if (!match) {
+    return null;
+  }
+  return Date.UTC(+match[1], +match[2] - 1, +match[3], +match[4], +match[5], +match[6]);
+}
+
+/**
+ * parseTimestampUtcで解釈したミリ秒を「YYYY-MM-DD HH:MM:SS」に戻す
+ * 
+ * @param {number} millis - UTCとして解釈したミリ秒
+ * @returns {string} 日時文字列
+ */
+function formatTimestampUtc(millis) {
+  const date = new Date(millis);
+  const pad = value => String(value).padStart(2, '0');
+  return `${date.getUTCFullYear()}-${pad(date.getUTCMonth() + 1)}-${pad(date.getUTCDate())} ` +
+    `${pad(date.getUTCHours())}:${pad(date.getUTCMinutes())}:${pad(date.getUTCSeconds())}`;
+}
+
+/**
+ * 最終更新日時だけを更新するURLを、CSVと同じ形式の行として追加する
+ * 仕入れ価格・在庫ステータスを空欄にすることで、updateInventoryFromCsvは最終更新日時のみを書き込む
+ * 
+ * @param {Array<Array<string>>} csvRows - パース済みCSVデータ（空の場合はヘッダーを作成）
+ * @param {Object<string, Array<string>>} touched - 最終更新日時をキーとしたURLの配列
+ * @returns {Array<Array<string>>} 行を追加したCSVデータ
+ */
+function appendTouchedRows(csvRows, touched) {
+  const rows = csvRows.length > 0 ? csvRows : [['仕入れ元URL', '仕入れ価格', '在庫ステータス', '最終更新日時']];
+  const headers = rows[0];
+  const urlIndex = headers.indexOf('仕入れ元URL');
+  const lastUpdatedIndex = headers.indexOf('最終更新日時');
+  if (urlIndex === -1 || lastUpdatedIndex === -1) {
+    console.warn('CSVに「仕入れ元URL」または「最終更新日時」列がないため、touchedを無視します');
+    return rows;
+  }
+  
+  let touchedCount = 0;
+  Object.keys(touched).forEach(lastUpdated => {
+    (touched[lastUpdated] || []).forEach(url => {
+      const row = new Array(headers.length).fill('');
+      row[urlIndex] = url;
+      row[lastUpdatedIndex] = lastUpdated;
+      rows.push(row);
+      touchedCount++;
+    });
+  });
+  console.log(`最終更新日時のみを更新する行を追加しました: ${touchedCount}件`);
+  return rows;
+}
+
+/**
+ * 1列分の更新をまとめて書き込む
+ * 離れた行をまとめて書き込むと変更のないセルまで書き換えるため、
+ * 行番号の間隔がmaxGapを超える箇所で書き込み範囲を分割する
+ * 範囲内の変更のない行は読み込み済みのシートデータの値で埋める（再読み込みを省略）
+ * 
+ * @param {GoogleAppsScript.Spreadsheet.Sheet} sheet - 在庫管理シート
+ * @param {number} column - 書き込む列番号（1始まり）
+ * @param {Map<number, *>} updates - 行番号（1始まり） -> 値
+ * @param {Array<Array<*>>} sheetData - getDataRange().getValues()で読み込んだシートデータ
+ * @param {number} maxGap - 1回の書き込みにまとめる行番号の最大間隔
+ */
+function writeColumnUpdates(sheet, column, updates, sheetData, maxGap) {
+  if (updates.size === 0) {
+    return;
+  }
+  const sortedRows = Array.from(updates.keys()).sort((a, b) => a - b);
+  let segmentStart = 0;
+  for (let i = 1; i <= sortedRows.length; i++) {
+    if (i < sortedRows.length && sortedRows[i] - sortedRows[i - 1] <= maxGap) {
+      continue;
+    }
+    const startRow = sortedRows[segmentStart];
+    const endRow = sortedRows[i - 1];
+    const values = [];
+    for (let rowNumber = startRow; rowNumber <= endRow; rowNumber++) {
+      values.push([updates.has(rowNumber) ? updates.get(rowNumber) : sheetData[rowNumber - 1][column - 1]]);
+    }
+    sheet.getRange(startRow, column, values.length, 1).setValues(values);
+    segmentStart = i;
+  }
+}
+
 /**
  * Webアプリの統合エントリーポイント（GETリクエスト）
  * パラメータに応じて適切なハンドラーに振り分ける
@@ -112,6 +341,11 @@ function doGet(e) {
     return handleCsvInventoryUpdate(e);
   }
 
+  if (e.parameter.action === 'supplierMasterVersion') {
+    return ContentService.createTextOutput(JSON.stringify(getSupplierMasterVersion()))
+      .setMimeType(ContentService.MimeType.JSON);
+  }
+
   return ContentService.createTextOutput(JSON.stringify({
     success: true,
     message: 'EC管理システム WebApp is running',
@@ -412,8 +646,10 @@ function updateInventoryFromCsv(csvRows) {
           originalUrl: supplierUrl  // デバッグ用に元のURLも保存
         });
         
-        console.log(`CSV行[${i}]: 元のURL=${supplierUrl.substring(0, 80)}...`);
-        console.log(`CSV行[${i}]: 正規化URL=${normalizedUrl.substring(0, 80)}...`);
+        if (UPLOAD_DEBUG_LOGGING) {
+          console.log(`CSV行[${i}]: 元のURL=${supplierUrl.substring(0, 80)}...`);
+          console.log(`CSV行[${i}]: 正規化URL=${normalizedUrl.substring(0, 80)}...`);
+        }
       }
     }
     
@@ -425,6 +661,8 @@ function updateInventoryFromCsv(csvRows) {
     let statusUpdateCount = 0;
     let dateUpdateCount = 0;
     let notFoundCount = 0;
+    // 現在の値と同じため書き込みを省略したセル数
+    let unchangedCellCount = 0;
     
     // 更新データを蓄積するMap（行番号 -> 値）
     const purchasePriceUpdates = new Map();
@@ -442,8 +680,8 @@ function updateInventoryFromCsv(csvRows) {
       const normalizedSheetUrl = normalizeUrl(sheetSupplierUrl);
       const csvRow = csvMap.get(normalizedSheetUrl);
       
-      // デバッグ用: マッチしない場合のログ
-      if (!csvRow) {
+      // デバッグ用: マッチしない場合のログ（差分送信では大半の行がマッチしないため、UPLOAD_DEBUG_LOGGINGの場合のみ）
+      if (!csvRow && UPLOAD_DEBUG_LOGGING) {
         console.log(`行[${i + 1}]: マッチしませんでした`);
         console.log(`  スプレッドシートURL: ${sheetSupplierUrl.substring(0, 80)}...`);
         console.log(`  正規化URL: ${normalizedSheetUrl.substring(0, 80)}...`);
@@ -460,18 +698,26 @@ function updateInventoryFromCsv(csvRows) {
         const rowNumber = i + 1;
         let rowUpdated = false;
         
-        // 仕入れ価格を更新（配列に蓄積）
+        // 仕入れ価格を更新（配列に蓄積、現在の値と同じ場合は書き込まない）
         if (csvRow.purchasePrice !== undefined && csvRow.purchasePrice !== '') {
-          purchasePriceUpdates.set(rowNumber, csvRow.purchasePrice);
-          priceUpdateCount++;
-          rowUpdated = true;
+          if (row[purchasePriceCol - 1] === csvRow.purchasePrice) {
+            unchangedCellCount++;
+          } else {
+            purchasePriceUpdates.set(rowNumber, csvRow.purchasePrice);
+            priceUpdateCount++;
+            rowUpdated = true;
+          }
         }
         
-        // 在庫ステータスを更新（配列に蓄積）
+        // 在庫ステータスを更新（配列に蓄積、現在の値と同じ場合は書き込まない）
         if (csvRow.stockStatus !== undefined && csvRow.stockStatus !== '') {
-          stockStatusUpdates.set(rowNumber, csvRow.stockStatus);
-          statusUpdateCount++;
-          rowUpdated = true;
+          if (String(row[stockStatusCol - 1]).trim() === String(csvRow.stockStatus).trim()) {
+            unchangedCellCount++;
+          } else {
+            stockStatusUpdates.set(rowNumber, csvRow.stockStatus);
+            statusUpdateCount++;
+            rowUpdated = true;
+          }
         }
         
         // 最終更新日時を更新（配列に蓄積）
@@ -489,56 +735,11 @@ function updateInventoryFromCsv(csvRows) {
       }
     }
     
-    // バッチ書き込み: 仕入れ価格
-    if (purchasePriceUpdates.size > 0) {
-      const sortedRows = Array.from(purchasePriceUpdates.keys()).sort((a, b) => a - b);
-      const startRow = sortedRows[0];
-      const endRow = sortedRows[sortedRows.length - 1];
-      const numRows = endRow - startRow + 1;
-      
-      // 現在の値を取得して、更新が必要な行のみ新しい値で置き換え
-      const currentValues = inventorySheet.getRange(startRow, purchasePriceCol, numRows, 1).getValues();
-      const purchasePriceValues = currentValues.map((value, index) => {
-        const rowNum = startRow + index;
-        return purchasePriceUpdates.has(rowNum) ? [purchasePriceUpdates.get(rowNum)] : value;
-      });
-      
-      inventorySheet.getRange(startRow, purchasePriceCol, numRows, 1).setValues(purchasePriceValues);
-    }
-    
-    // バッチ書き込み: 在庫ステータス
-    if (stockStatusUpdates.size > 0) {
-      const sortedRows = Array.from(stockStatusUpdates.keys()).sort((a, b) => a - b);
-      const startRow = sortedRows[0];
-      const endRow = sortedRows[sortedRows.length - 1];
-      const numRows = endRow - startRow + 1;
-      
-      // 現在の値を取得して、更新が必要な行のみ新しい値で置き換え
-      const currentValues = inventorySheet.getRange(startRow, stockStatusCol, numRows, 1).getValues();
-      const stockStatusValues = currentValues.map((value, index) => {
-        const rowNum = startRow + index;
-        return stockStatusUpdates.has(rowNum) ? [stockStatusUpdates.get(rowNum)] : value;
-      });
-      
-      inventorySheet.getRange(startRow, stockStatusCol, numRows, 1).setValues(stockStatusValues);
-    }
-    
-    // バッチ書き込み: 最終更新日時
-    if (lastUpdatedUpdates.size > 0) {
-      const sortedRows = Array.from(lastUpdatedUpdates.keys()).sort((a, b) => a - b);
-      const startRow = sortedRows[0];
-      const endRow = sortedRows[sortedRows.length - 1];
-      const numRows = endRow - startRow + 1;
-      
-      // 現在の値を取得して、更新が必要な行のみ新しい値で置き換え
-      const currentValues = inventorySheet.getRange(startRow, lastUpdatedCol, numRows, 1).getValues();
-      const lastUpdatedValues = currentValues.map((value, index) => {
-        const rowNum = startRow + index;
-        return lastUpdatedUpdates.has(rowNum) ? [lastUpdatedUpdates.get(rowNum)] : value;
-      });
-      
-      inventorySheet.getRange(startRow, lastUpdatedCol, numRows, 1).setValues(lastUpdatedValues);
-    }
+    // バッチ書き込み（行番号の間隔が離れている箇所では書き込み範囲を分割）
+    const MAX_WRITE_GAP = 20;
+    writeColumnUpdates(inventorySheet, purchasePriceCol, purchasePriceUpdates, sheetData, MAX_WRITE_GAP);
+    writeColumnUpdates(inventorySheet, stockStatusCol, stockStatusUpdates, sheetData, MAX_WRITE_GAP);
+    writeColumnUpdates(inventorySheet, lastUpdatedCol, lastUpdatedUpdates, sheetData, MAX_WRITE_GAP);
     
     // 仕入れ価格を更新した場合、プログラムによる更新では編集時トリガーが発火しないため価格履歴を明示的に同期
     if (priceUpdateCount > 0) {
@@ -563,6 +764,7 @@ function updateInventoryFromCsv(csvRows) {
       priceUpdateCount: priceUpdateCount,
       statusUpdateCount: statusUpdateCount,
       dateUpdateCount: dateUpdateCount,
+      unchangedCellCount: unchangedCellCount,
       notFoundCount: notFoundCount,
       notFoundUrls: notFoundUrls  // デバッグ用
     };